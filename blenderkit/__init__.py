@@ -1168,7 +1168,8 @@ class BlenderKitModelSearchProps(PropertyGroup, BlenderKitCommonSearchProps):
         name="Import Method",
         items=(
             ('LINK_GROUP', 'Link Group', ''),
-            ('APPEND_OBJECTS', 'Append Objects', ''),
+            ('APPEND_OBJECTS', 'Append Objects',
+             'append the objects. Several copies placed at once share their mesh and other data'),
         ),
         description="choose if the assets will be linked or appended",
         default="LINK_GROUP"
@@ -1342,6 +1343,18 @@ class BlenderKitAddonPreferences(AddonPreferences):
 
     thumb_size: IntProperty(name="Assetbar thumbnail Size", default=96, min=-1, max=256)
 
+    search_cache_time: IntProperty(name="Search Cache Time",
+                                   description="Minutes for which search results are reused without asking the server. "
+                                               "Older results are revalidated, and used when offline",
+                                   default=10,
+                                   min=0,
+                                   max=10000)
+
+    thumbnail_cache_size: IntProperty(name="Thumbnail Cache Size (MB)",
+                                      description="Thumbnails used least recently are removed above this size",
+                                      default=500,
+                                      min=10,
+                                      max=100000)
 
     asset_counter: IntProperty(name="Usage Counter",
                                description="Counts usages so it asks for registration only after reaching a limit",
@@ -1384,6 +1397,8 @@ class BlenderKitAddonPreferences(AddonPreferences):
         # layout.prop(self, "panel_behaviour")
         layout.prop(self, "thumb_size")
         layout.prop(self, "max_assetbar_rows")
+        layout.prop(self, "search_cache_time")
+        layout.prop(self, "thumbnail_cache_size")
 
 
 # registration
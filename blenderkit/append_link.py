@@ -96,26 +96,17 @@ def link_group(file_name, obnames=[], location=(0, 0, 0), link=False, parent = N
             if col == kwargs['name']:
                 data_to.collections = [col]
 
-    rotation = (0, 0, 0)
-    if kwargs.get('rotation') is not None:
-        rotation = kwargs['rotation']
-
-    bpy.ops.object.empty_add(type='PLAIN_AXES', location=location, rotation=rotation)
-    main_object = bpy.context.view_layer.objects.active
-    main_object.instance_type = 'COLLECTION'
-
-    main_object.parent = parent
-    main_object.matrix_world.translation = location
-
+    instance_collection = None
     for col in bpy.data.collections:
         if col.library is not None:
             fp = bpy.path.abspath(col.library.filepath)
             fp1 = bpy.path.abspath(file_name)
             if fp == fp1:
-                main_object.instance_collection = col
+                instance_collection = col
                 break;
 
-    main_object.name = main_object.instance_collection.name
+    main_object = instance_group(instance_collection, location=location, rotation=kwargs.get('rotation'),
+                                 parent=parent)
 
     # bpy.ops.wm.link(directory=file_name + "/Collection/", filename=kwargs['name'], link=link, instance_collections=True,
     #                 autoselect=True)
@@ -128,6 +119,23 @@ def link_group(file_name, obnames=[], location=(0, 0, 0), link=False, parent = N
     return main_object, []
 
 
+def instance_group(collection, location=(0, 0, 0), rotation=None, parent=None):
+    '''add an empty instancing an already linked group'''
+    if rotation is None:
+        rotation = (0, 0, 0)
+
+    bpy.ops.object.empty_add(type='PLAIN_AXES', location=location, rotation=rotation)
+    main_object = bpy.context.view_layer.objects.active
+    main_object.instance_type = 'COLLECTION'
+
+    main_object.parent = parent
+    main_object.matrix_world.translation = location
+
+    main_object.instance_collection = collection
+    main_object.name = main_object.instance_collection.name
+    return main_object
+
+
 def append_particle_system(file_name, obnames=[], location=(0, 0, 0), link=False, **kwargs):
     '''link an instanced group - model type asset'''
 
@@ -232,3 +240,84 @@ def append_objects(file_name, obnames=[], location=(0, 0, 0), link=False, **kwar
 
 
     return main_object, return_obs
+
+
+def duplicate_objects(main_object, obs, location=(0, 0, 0), **kwargs):
+    '''
+    place another copy of objects appended by append_objects(), without loading the file again.
+    The copies share their data (meshes, armatures, materials) with the originals,
+    references between the objects are remapped to the copies.
+    '''
+    scene = bpy.context.scene
+
+    copies = {}
+    for obj in obs:
+        copies[obj] = obj.copy()
+        scene.collection.objects.link(copies[obj])
+    for obj, copy in copies.items():
+        if obj.parent in copies:
+            copy.parent = copies[obj.parent]
+        elif obj.parent is None:
+            copy.location = location
+    remap_object_references(copies)
+
+    main_object = copies[main_object]
+    if kwargs.get('rotation') is not None:
+        main_object.rotation_euler = kwargs['rotation']
+
+    if kwargs.get('parent') is not None:
+        main_object.parent = bpy.data.objects[kwargs['parent']]
+        main_object.matrix_world.translation = location
+
+    return main_object, list(copies.values())
+
+
+def remap_object_references(copies):
+    '''point modifiers, constraints and drivers of copied objects to the copies of the objects they use'''
+
+    def remap_pointers(struct):
+        for prop in struct.bl_rna.properties:
+            if prop.type == 'POINTER' and not prop.is_readonly and prop.fixed_type.identifier == 'Object':
+                ob = getattr(struct, prop.identifier)
+                if ob in copies:
+                    setattr(struct, prop.identifier, copies[ob])
+
+    for copy in copies.values():
+        structs = list(copy.modifiers) + list(copy.constraints)
+        if copy.pose is not None:
+            for pose_bone in copy.pose.bones:
+                structs.extend(pose_bone.constraints)
+        for struct in structs:
+            remap_pointers(struct)
+            # armature constraint
+            for target in getattr(struct, 'targets', ()):
+                remap_pointers(target)
+
+        if copy.animation_data is not None:
+            for fcurve in copy.animation_data.drivers:
+                for var in fcurve.driver.variables:
+                    for target in var.targets:
+                        if target.id in copies:
+                            target.id = copies[target.id]
+
+
+def can_duplicate_objects(obs):
+    '''
+    check if duplicate_objects() makes a correct copy of the objects. Drivers of the shared data
+    (e.g. shape keys driven by bones) can't point to the copied objects, such objects have to be appended again.
+    '''
+    obs = set(obs)
+    for obj in obs:
+        datas = [obj.data]
+        if getattr(obj.data, 'shape_keys', None) is not None:
+            datas.append(obj.data.shape_keys)
+        for data in datas:
+            animation_data = getattr(data, 'animation_data', None)
+            if animation_data is None:
+                continue
+            for fcurve in animation_data.drivers:
+                for var in fcurve.driver.variables:
+                    for target in var.targets:
+                        if target.id in obs:
+                            return False
+    return True
@@ -0,0 +1,99 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# <pep8 compliant>
+
+# Needs Blender, run with:
+# blender -b --factory-startup --python-exit-code 1 --python blenderkit/append_link_test.py
+
+import os
+import sys
+import unittest
+
+import bpy
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from blenderkit import append_link
+
+
+class DuplicateObjectsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.existing = set(bpy.data.objects)
+        scene = bpy.context.scene
+
+        # rig with a skinned body, and a prop held by the rig and following the body
+        self.rig = bpy.data.objects.new('rig', bpy.data.armatures.new('rig'))
+        self.body = bpy.data.objects.new('body', bpy.data.meshes.new('body'))
+        self.body.parent = self.rig
+        modifier = self.body.modifiers.new('Armature', 'ARMATURE')
+        modifier.object = self.rig
+
+        self.prop = bpy.data.objects.new('prop', None)
+        self.prop.parent = self.rig
+        constraint = self.prop.constraints.new('ARMATURE')
+        constraint.targets.new().target = self.rig
+        self.prop.constraints.new('COPY_LOCATION').target = self.body
+        fcurve = self.prop.driver_add('location', 2)
+        fcurve.driver.variables.new().targets[0].id = self.body
+
+        self.obs = [self.rig, self.body, self.prop]
+        for ob in self.obs:
+            scene.collection.objects.link(ob)
+
+    def tearDown(self):
+        for ob in set(bpy.data.objects) - self.existing:
+            bpy.data.objects.remove(ob)
+
+    def test_duplicate_objects(self):
+        main_object, copies = append_link.duplicate_objects(self.rig, self.obs, location=(1.0, 2.0, 3.0))
+        rig, body, prop = copies
+
+        self.assertEqual(main_object, rig)
+        self.assertNotIn(rig, self.obs)
+        self.assertEqual(tuple(rig.location), (1.0, 2.0, 3.0))
+        self.assertEqual(body.parent, rig)
+        self.assertEqual(prop.parent, rig)
+        # data is shared
+        self.assertEqual(body.data, self.body.data)
+
+        self.assertEqual(body.modifiers['Armature'].object, rig)
+        self.assertEqual(prop.constraints['Armature'].targets[0].target, rig)
+        self.assertEqual(prop.constraints['Copy Location'].target, body)
+        self.assertEqual(prop.animation_data.drivers[0].driver.variables[0].targets[0].id, body)
+
+        # the originals are untouched
+        self.assertEqual(self.body.modifiers['Armature'].object, self.rig)
+        self.assertEqual(self.prop.constraints['Copy Location'].target, self.body)
+        self.assertEqual(self.prop.animation_data.drivers[0].driver.variables[0].targets[0].id, self.body)
+
+    def test_can_duplicate_objects(self):
+        self.assertTrue(append_link.can_duplicate_objects(self.obs))
+
+        # shape keys are shared by the copies, their drivers can't follow the copied rig
+        self.body.shape_key_add(name='Basis')
+        fcurve = self.body.data.shape_keys.driver_add('eval_time')
+        fcurve.driver.variables.new().targets[0].id = self.rig
+
+        self.assertFalse(append_link.can_duplicate_objects(self.obs))
+        # without the rig, the driver doesn't point to one of the copies
+        self.assertTrue(append_link.can_duplicate_objects([self.body, self.prop]))
+
+
+if __name__ == '__main__':
+    unittest.main(argv=[sys.argv[0]])
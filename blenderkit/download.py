@@ -30,11 +30,15 @@ else:
     from blenderkit import paths, append_link, utils, ui, colors, tasks_queue, rerequests
 
 import threading
+import concurrent.futures
 import time
 import requests
 import shutil, sys, os
 import uuid
 import copy
+import json
+import hashlib
+import base64
 
 import bpy
 from bpy.props import (
@@ -50,6 +54,22 @@ from bpy.app.handlers import persistent
 
 download_threads = []
 
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+# files at least this big are downloaded in several ranges at once, if the server supports it
+PARALLEL_DOWNLOAD_MIN_SIZE = 64 * 1024 * 1024
+PARALLEL_DOWNLOAD_THREADS = 4
+# batch downloads, see download_batch()
+BATCH_URL_THREADS = 8
+BATCH_DOWNLOAD_THREADS = 4
+# the bytes written are the ones of the file, a compressed transfer would break sizes and ranges
+DOWNLOAD_HEADERS = {'Accept-Encoding': 'identity'}
+# checksum headers the server may send with the file, and how they are computed
+CHECKSUM_HEADERS = (
+    ('Content-MD5', 'md5'),
+    ('x-amz-checksum-sha256', 'sha256'),
+    ('x-amz-checksum-sha1', 'sha1'),
+)
+
 
 def check_missing():
     '''checks for missing files, and possibly starts re-download of these into the scene'''
@@ -320,6 +340,8 @@ def append_asset(asset_data, **kwargs):  # downloaders=[], location=None,
         link = sprops.append_link == 'LINK'
         # then append link
         if downloaders:
+            first_parent = None
+            first_obs = []
             for downloader in downloaders:
                 # this cares for adding particle systems directly to target mesh, but I had to block it now,
                 # because of the sluggishnes of it. Possibly re-enable when it's possible to do this faster?
@@ -331,21 +353,33 @@ def append_asset(asset_data, **kwargs):  # downloaders=[], location=None,
                                                        name=asset_data['name'])
                     return
 
-                if sprops.import_as == 'GROUP':
+                # the file is loaded only for the first placement, the others reuse what it brought in.
+                if sprops.import_as == 'GROUP' and first_parent is not None:
+                    parent = append_link.instance_group(first_parent.instance_collection,
+                                                        location=downloader['location'],
+                                                        rotation=downloader['rotation'],
+                                                        parent=downloader.get('parent', kwargs.get('parent')))
+                elif sprops.import_as == 'GROUP':
                     parent, newobs = append_link.link_group(file_names[-1],
                                                             location=downloader['location'],
                                                             rotation=downloader['rotation'],
                                                             link=link,
                                                             name=asset_data['name'],
-                                                            parent=kwargs.get('parent'))
-
+                                                            parent=downloader.get('parent', kwargs.get('parent')))
+                elif first_parent is not None and append_link.can_duplicate_objects(first_obs):
+                    parent, newobs = append_link.duplicate_objects(first_parent, first_obs,
+                                                                   location=downloader['location'],
+                                                                   rotation=downloader['rotation'],
+                                                                   parent=downloader.get('parent', kwargs.get('parent')))
                 else:
                     parent, newobs = append_link.append_objects(file_names[-1],
                                                                 location=downloader['location'],
                                                                 rotation=downloader['rotation'],
                                                                 link=link,
                                                                 name=asset_data['name'],
-                                                                parent=kwargs.get('parent'))
+                                                                parent=downloader.get('parent', kwargs.get('parent')))
+                if first_parent is None:
+                    first_parent, first_obs = parent, newobs
                 if parent.type == 'EMPTY' and link:
                     bmin = asset_data['bbox_min']
                     bmax = asset_data['bbox_max']
@@ -441,11 +475,14 @@ def append_asset(asset_data, **kwargs):  # downloaders=[], location=None,
 
 
 @bpy.app.handlers.persistent
-def timer_update():  # TODO might get moved to handle all blenderkit stuff, not to slow down.
-    '''check for running and finished downloads and react. write progressbars too.'''
+def timer_update():
+    '''
+    check for running and finished downloads and react. write progressbars too.
+    tasks_queue handler, woken up when downloads start or finish.
+    '''
     global download_threads
     if len(download_threads) == 0:
-        return 1
+        return None
     s = bpy.context.scene
     for threaddata in download_threads:
         t = threaddata[0]
@@ -467,7 +504,7 @@ def timer_update():  # TODO might get moved to handle all blenderkit stuff, not
                 sprops = utils.get_search_props()
                 sprops.report = tcom.report
                 download_threads.remove(threaddata)
-                return
+                return .5
             file_names = paths.get_download_filenames(asset_data)
             wm = bpy.context.window_manager
 
@@ -515,6 +552,8 @@ def timer_update():  # TODO might get moved to handle all blenderkit stuff, not
                                 sres['downloaded'] = 100
 
                 utils.p('finished download thread')
+    if len(download_threads) == 0:
+        return None
     return .5
 
 
@@ -533,8 +572,14 @@ class Downloader(threading.Thread):
     def stopped(self):
         return self._stop_event.is_set()
 
-    # def main_download_thread(asset_data, tcom, scene_id, api_key):
     def run(self):
+        try:
+            self.download()
+        finally:
+            tasks_queue.wake(timer_update)
+
+    # def main_download_thread(asset_data, tcom, scene_id, api_key):
+    def download(self):
         '''try to download file from blenderkit'''
         asset_data = self.asset_data
         tcom = self.tcom
@@ -565,28 +610,271 @@ class Downloader(threading.Thread):
             utils.p('stopping download: ' + asset_data['name'])
             return;
 
-        with open(file_name, "wb") as f:
-            print("Downloading %s" % file_name)
-            headers = utils.get_headers(api_key)
+        print("Downloading %s" % file_name)
+        download_file(asset_data['url'], file_name, tcom, self.stopped)
+
+
+class BatchDownloader(threading.Thread):
+    '''
+    Download several assets at once. Download urls are requested concurrently,
+    then the files are downloaded in parallel. Each asset has its own ThreadCom, self.tcom has the progress of all.
+    '''
+
+    def __init__(self, assets, scene_id, api_key):
+        super(BatchDownloader, self).__init__()
+        self.assets = assets  # list of (asset_data, tcom)
+        self.tcom = ThreadCom()
+        self.scene_id = scene_id
+        self.api_key = api_key
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def stopped(self):
+        return self._stop_event.is_set()
+
+    def update_progress(self):
+        tcoms = [tcom for asset_data, tcom in self.assets]
+        self.tcom.downloaded = sum(tcom.downloaded for tcom in tcoms)
+        self.tcom.progress = sum(tcom.progress for tcom in tcoms) / len(tcoms)
+
+    def get_url(self, asset):
+        asset_data, tcom = asset
+        has_url = get_download_url(asset_data, self.scene_id, self.api_key, tcom=tcom)
+        if not has_url:
+            tasks_queue.add_task(
+                (ui.add_report, ('Failed to obtain download URL for %s.' % asset_data['name'], 5, colors.RED)))
+        return has_url is True and not tcom.error
+
+    def download_asset(self, asset):
+        asset_data, tcom = asset
+        if self.stopped():
+            return
+        file_name = paths.get_download_filenames(asset_data)[0]
+        print("Downloading %s" % file_name)
+        download_file(asset_data['url'], file_name, tcom, self.stopped)
+
+    def run(self):
+        try:
+            self.download_assets()
+        finally:
+            tasks_queue.wake(timer_update)
+
+    def download_assets(self):
+        with concurrent.futures.ThreadPoolExecutor(max_workers=BATCH_URL_THREADS) as executor:
+            has_urls = list(executor.map(self.get_url, self.assets))
+
+        to_download = []
+        for asset, has_url in zip(self.assets, has_urls):
+            asset_data, tcom = asset
+            if not has_url:
+                continue
+            if check_existing(asset_data) and not tcom.passargs.get('delete'):
+                tcom.downloaded = 100
+                tcom.progress = 100
+                continue
+            to_download.append(asset)
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=BATCH_DOWNLOAD_THREADS) as executor:
+            futures = [executor.submit(self.download_asset, asset) for asset in to_download]
+            while futures:
+                done, futures = concurrent.futures.wait(futures, timeout=.2)
+                for future in done:
+                    if future.exception() is not None:
+                        utils.p(future.exception())
+                self.update_progress()
+        self.update_progress()
+
+
+def read_download_state(part_name):
+    try:
+        with open(part_name + '.json', 'r') as f:
+            state = json.load(f)
+        # without an ETag there is no way to know the file on the server is still the same
+        if state['etag'] is not None and os.path.getsize(part_name) == state['size']:
+            return state
+    except (OSError, ValueError, KeyError):
+        pass
+    return None
+
+
+def write_download_state(part_name, state):
+    with open(part_name + '.json', 'w') as f:
+        json.dump(state, f)
+
+
+def remove_partial_download(part_name):
+    for fn in (part_name, part_name + '.json'):
+        if os.path.isfile(fn):
+            os.remove(fn)
+
+
+def get_expected_checksum(response):
+    '''
+    (hash name, hex digest) of the whole file as sent by the server, or None.
+    Only explicit checksums are used, an ETag isn't always the md5 of the file.
+    '''
+    for header, hash_name in CHECKSUM_HEADERS:
+        value = response.headers.get(header)
+        # checksums of files uploaded in parts end with -<number of parts>, they aren't the one of the file
+        if value is None or '-' in value:
+            continue
+        try:
+            return hash_name, base64.b64decode(value, validate=True).hex()
+        except ValueError:
+            continue
+    return None
+
+
+def file_checksum(file_name, hash_name):
+    file_hash = hashlib.new(hash_name)
+    with open(file_name, 'rb') as f:
+        for data in iter(lambda: f.read(DOWNLOAD_CHUNK_SIZE), b''):
+            file_hash.update(data)
+    return file_hash.hexdigest()
+
+
+def download_range(session, url, part_name, segment, state, tcom, stopped, response=None):
+    '''
+    Download the missing part of a [start, end, position] segment of the file into part_name.
+    response is an already open response to continue from, otherwise a range request is done.
+    Returns False if the server didn't send the requested range.
+    '''
+    start, end, pos = segment
+    if pos >= end:
+        return True
+    if response is None:
+        headers = dict(DOWNLOAD_HEADERS, Range='bytes=%i-%i' % (pos, end - 1))
+        if state['etag'] is not None:
+            # the whole file is sent instead of the range if it changed in between
+            headers['If-Range'] = state['etag']
+        response = session.get(url, headers=headers, stream=True)
+        if response.status_code != 206:
+            response.close()
+            return False
+
+    with open(part_name, 'r+b', buffering=0) as f:
+        f.seek(pos)
+        for data in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+            data = data[:end - segment[2]]
+            f.write(data)
+            segment[2] += len(data)
+
+            # progress of all the segments
+            tcom.downloaded = sum(s[2] - s[0] for s in state['segments'])
+            tcom.progress = int(100 * tcom.downloaded / tcom.file_size)
+            if segment[2] >= end or stopped():
+                break
+    response.close()
+    return True
+
+
+def download_file(url, file_name, tcom, stopped, resume=True):
+    '''
+    Download url to file_name. The data goes to a temporary file first, which is renamed once it's complete and
+    verified, so file_name is never an incomplete file.
+    Interrupted downloads are resumed with range requests, large files are downloaded in several ranges at once.
+    Returns True when the file was downloaded.
+    '''
+    with rerequests.new_session(PARALLEL_DOWNLOAD_THREADS) as session:
+        return download_file_in_session(session, url, file_name, tcom, stopped, resume=resume)
+
+
+def download_file_in_session(session, url, file_name, tcom, stopped, resume=True):
+    part_name = file_name + '.part'
 
-            response = requests.get(asset_data['url'], stream=True)
-            total_length = response.headers.get('Content-Length')
+    state = read_download_state(part_name) if resume else None
+    response = None
+    if state is None:
+        remove_partial_download(part_name)
+        response = session.get(url, headers=DOWNLOAD_HEADERS, stream=True)
+        if response.status_code != 200:
+            tcom.report = 'Download failed, server responded %i.' % response.status_code
+            tcom.error = True
+            return False
 
-            if total_length is None:  # no content length header
+        total_length = response.headers.get('Content-Length')
+        if total_length is None:  # no content length header
+            with open(part_name, 'wb') as f:
                 f.write(response.content)
-            else:
-                tcom.file_size = int(total_length)
-                dl = 0
-                for data in response.iter_content(chunk_size=4096):
-                    dl += len(data)
-                    tcom.downloaded = dl
-                    tcom.progress = int(100 * tcom.downloaded / tcom.file_size)
-                    f.write(data)
-                    if self.stopped():
-                        utils.p('stopping download: ' + asset_data['name'])
-                        f.close()
-                        os.remove(file_name)
-                        return;
+            os.replace(part_name, file_name)
+            return True
+
+        size = int(total_length)
+        state = {
+            'size': size,
+            'etag': response.headers.get('ETag'),
+            'checksum': get_expected_checksum(response),
+        }
+        if state['checksum'] is None:
+            utils.p('no checksum sent with the file, it will not be verified: ' + file_name)
+        if response.headers.get('Accept-Ranges') == 'bytes' and size >= PARALLEL_DOWNLOAD_MIN_SIZE:
+            response.close()
+            response = None
+            bounds = [size * i // PARALLEL_DOWNLOAD_THREADS for i in range(PARALLEL_DOWNLOAD_THREADS + 1)]
+            state['segments'] = [[bounds[i], bounds[i + 1], bounds[i]] for i in range(PARALLEL_DOWNLOAD_THREADS)]
+        else:
+            # the response is read as one segment
+            state['segments'] = [[0, size, 0]]
+
+        with open(part_name, 'wb') as f:
+            f.truncate(size)
+        write_download_state(part_name, state)
+    else:
+        utils.p('resuming download: ' + file_name)
+
+    tcom.file_size = state['size']
+    segments = state['segments']
+    results = [True] * len(segments)
+
+    def download_segment(i):
+        try:
+            results[i] = download_range(session, url, part_name, segments[i], state, tcom, stopped,
+                                        response=response if i == 0 else None)
+        except Exception as e:
+            utils.p(e)
+            results[i] = e
+
+    threads = [threading.Thread(target=download_segment, args=(i,), daemon=True) for i in range(1, len(segments))]
+    for thread in threads:
+        thread.start()
+    download_segment(0)
+    for thread in threads:
+        thread.join()
+
+    errors = [result for result in results if isinstance(result, Exception)]
+    if errors:
+        # what was downloaded is kept, the next download of the file continues from there.
+        write_download_state(part_name, state)
+        tcom.report = 'Download failed: %s' % errors[0]
+        tcom.error = True
+        return False
+
+    if not all(results):
+        # the file changed on the server or ranges aren't supported anymore
+        if resume:
+            return download_file_in_session(session, url, file_name, tcom, stopped, resume=False)
+        tcom.report = 'Download failed, server did not send the requested data.'
+        tcom.error = True
+        return False
+
+    if any(s[2] < s[1] for s in segments):
+        # stopped or interrupted, the next download of the file continues from here.
+        write_download_state(part_name, state)
+        utils.p('stopping download: ' + file_name)
+        return False
+
+    checksum = state.get('checksum')
+    if checksum is not None and file_checksum(part_name, checksum[0]) != checksum[1]:
+        remove_partial_download(part_name)
+        tcom.report = 'Downloaded file is corrupted, please try again.'
+        tcom.error = True
+        return False
+
+    os.replace(part_name, file_name)
+    remove_partial_download(part_name)
+    return True
 
 
 class ThreadCom:  # object passed to threads to read background process stdout info
@@ -630,6 +918,7 @@ def download(asset_data, **kwargs):
     global download_threads
     download_threads.append(
         [readthread, asset_data, tcom])
+    tasks_queue.wake(timer_update)
 
 
 def check_downloading(asset_data, **kwargs):
@@ -643,9 +932,9 @@ def check_downloading(asset_data, **kwargs):
         if p_asset_data['id'] == asset_data['id']:
             at = asset_data['asset_type']
             if at in ('model', 'material'):
-                downloader = {'location': kwargs['model_location'],
-                              'rotation': kwargs['model_rotation']}
-                p[2].passargs['downloaders'].append(downloader)
+                downloaders = kwargs.get('downloaders') or [{'location': kwargs['model_location'],
+                                                             'rotation': kwargs['model_rotation']}]
+                p[2].passargs['downloaders'].extend(downloaders)
             downloading = True
 
     return downloading
@@ -795,9 +1084,10 @@ def start_download(asset_data, **kwargs):
         if not done:
             at = asset_data['asset_type']
             if at in ('model', 'material'):
-                downloader = {'location': kwargs['model_location'],
-                              'rotation': kwargs['model_rotation']}
-                download(asset_data, downloaders=[downloader], **kwargs)
+                if not kwargs.get('downloaders'):
+                    kwargs['downloaders'] = [{'location': kwargs['model_location'],
+                                              'rotation': kwargs['model_rotation']}]
+                download(asset_data, **kwargs)
 
             elif asset_data['asset_type'] == 'scene':
                 download(asset_data, **kwargs)
@@ -805,6 +1095,61 @@ def start_download(asset_data, **kwargs):
                 download(asset_data)
 
 
+def download_batch(asset_ids, **kwargs):
+    '''
+    Download several assets from the search results at once, each is appended as soon as its file is downloaded.
+    Used by the scene.blenderkit_download_batch operator, can also be called from scripts.
+    kwargs are passed to append_asset() of all the assets. Models are placed at model_location, or at the positions
+    in downloaders, which can be a dict of lists of downloaders by asset id. All placements of an asset are appended
+    together, so its file is loaded only once.
+    Returns the BatchDownloader thread.
+    '''
+    global download_threads
+    user_preferences = bpy.context.preferences.addons['blenderkit'].preferences
+    api_key = user_preferences.api_key
+    scene_id = get_scene_id()
+
+    s = bpy.context.scene
+    search_results = {r['id']: r for r in s.get('search results', [])}
+    au = s.get('assets used', {})
+    placements = kwargs.pop('downloaders', {})
+
+    assets = []
+    for asset_id in asset_ids:
+        asset_data = search_results[asset_id].to_dict()
+        if asset_data['asset_base_id'] in au:
+            asset_data = au[asset_data['asset_base_id']].to_dict()
+
+        at = asset_data['asset_type']
+        if at in ('model', 'material') and kwargs.get('model_location') is not None:
+            downloaders = placements.get(asset_id)
+            if downloaders is None:
+                downloaders = [{'location': kwargs['model_location'],
+                                'rotation': kwargs.get('model_rotation', (0, 0, 0))}]
+            if check_downloading(asset_data, downloaders=downloaders):
+                continue
+            passargs = dict(kwargs, downloaders=list(downloaders))
+        elif any(p[1]['id'] == asset_data['id'] for p in download_threads):
+            continue
+        else:
+            passargs = dict(kwargs)
+
+        tcom = ThreadCom()
+        tcom.passargs = passargs
+        assets.append((asset_data, tcom))
+
+    if len(assets) == 0:
+        return None
+
+    readthread = BatchDownloader(assets, scene_id, api_key)
+    readthread.start()
+
+    for asset_data, tcom in assets:
+        download_threads.append([readthread, asset_data, tcom])
+    tasks_queue.wake(timer_update)
+    return readthread
+
+
 asset_types = (
     ('MODEL', 'Model', 'set of objects'),
     ('SCENE', 'Scene', 'scene'),
@@ -826,7 +1171,8 @@ class BlenderkitKillDownloadOperator(bpy.types.Operator):
     def execute(self, context):
         global download_threads
         td = download_threads[self.thread_index]
-        download_threads.remove(td)
+        # all assets of a batch download are stopped together
+        download_threads[:] = [threaddata for threaddata in download_threads if threaddata[0] is not td[0]]
         td[0].stop()
         return {'FINISHED'}
 
@@ -881,7 +1227,26 @@ class BlenderkitDownloadOperator(bpy.types.Operator):
                 atype == 'model' or atype == 'material') and bpy.context.active_object is not None:
             bpy.ops.object.mode_set(mode='OBJECT')
 
-        if self.replace:  # cleanup first, assign later.
+        if self.replace and atype == 'model':  # cleanup first, assign later.
+            obs = utils.get_selected_models()
+
+            # one download for all the replaced models, so the file is appended only once
+            downloaders = []
+            for ob in obs:
+                downloaders.append({'location': tuple(ob.matrix_world.translation),
+                                    'rotation': tuple(ob.matrix_world.to_euler()),
+                                    'parent': ob.parent})
+                utils.delete_hierarchy(ob)
+            if downloaders:
+                kwargs = {
+                    'cast_parent': self.cast_parent,
+                    'model_location': downloaders[0]['location'],
+                    'model_rotation': downloaders[0]['rotation'],
+                    'downloaders': downloaders,
+                    'replace': False,
+                }
+                start_download(asset_data, **kwargs)
+        elif self.replace:  # cleanup first, assign later.
             obs = utils.get_selected_models()
 
             for ob in obs:
@@ -910,17 +1275,51 @@ class BlenderkitDownloadOperator(bpy.types.Operator):
         return {'FINISHED'}
 
 
+class BlenderkitDownloadBatchOperator(bpy.types.Operator):
+    """Download all models of the search results and place them in a row"""
+    bl_idname = "scene.blenderkit_download_batch"
+    bl_label = "BlenderKit Download Search Results"
+    bl_options = {'REGISTER', 'UNDO', 'INTERNAL'}
+
+    model_location: FloatVectorProperty(name='Location', description='start of the row of models', default=(0, 0, 0))
+    spacing: FloatProperty(name='Spacing', description='gap between the models', default=0.5, min=0)
+
+    @classmethod
+    def poll(cls, context):
+        return context.mode == 'OBJECT' and len(context.scene.get('search results') or []) > 0
+
+    def execute(self, context):
+        x, y, z = self.model_location
+        downloaders = {}
+        for r in context.scene['search results']:
+            if r['asset_type'] != 'model':
+                continue
+            x -= r['bbox_min'][0]
+            downloaders[r['id']] = [{'location': (x, y, z), 'rotation': (0, 0, 0)}]
+            x += r['bbox_max'][0] + self.spacing
+
+        if len(downloaders) == 0:
+            self.report({'WARNING'}, 'No models in the search results')
+            return {'CANCELLED'}
+
+        download_batch(list(downloaders), model_location=tuple(self.model_location), model_rotation=(0, 0, 0),
+                       downloaders=downloaders)
+        return {'FINISHED'}
+
+
 def register_download():
     bpy.utils.register_class(BlenderkitDownloadOperator)
+    bpy.utils.register_class(BlenderkitDownloadBatchOperator)
     bpy.utils.register_class(BlenderkitKillDownloadOperator)
     bpy.app.handlers.load_post.append(scene_load)
     bpy.app.handlers.save_pre.append(scene_save)
-    bpy.app.timers.register(timer_update, persistent=True)
+    tasks_queue.add_handler(timer_update)
 
 
 def unregister_download():
     bpy.utils.unregister_class(BlenderkitDownloadOperator)
+    bpy.utils.unregister_class(BlenderkitDownloadBatchOperator)
     bpy.utils.unregister_class(BlenderkitKillDownloadOperator)
     bpy.app.handlers.load_post.remove(scene_load)
     bpy.app.handlers.save_pre.remove(scene_save)
-    bpy.app.timers.unregister(timer_update)
+    tasks_queue.remove_handler(timer_update)
@@ -31,14 +31,28 @@ import requests
 import bpy
 
 
+def new_session(pool_size=10):
+    '''
+    Session keeping up to pool_size connections per host alive between requests.
+    Can be passed to the request functions below with session=
+    '''
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
 def rerequest(method, url, **kwargs):
     # first get any additional args from kwargs
     immediate = False
     if kwargs.get('immediate'):
         immediate = kwargs['immediate']
         kwargs.pop('immediate')
+    # a pooled session, otherwise each request opens its own connection
+    session = kwargs.pop('session', None) or requests
     # first normal attempt
-    response = requests.request(method, url, **kwargs)
+    response = session.request(method, url, **kwargs)
 
     utils.p(url)
     utils.p(response.status_code)
@@ -68,7 +82,7 @@ def rerequest(method, url, **kwargs):
                             bpy.context.preferences.addons['blenderkit'].preferences.api_key_refresh = refresh_token
 
                         kwargs['headers'] = utils.get_headers(auth_token)
-                        response = requests.request(method, url, **kwargs)
+                        response = session.request(method, url, **kwargs)
                         utils.p('reresult', response.status_code)
                         if response.status_code >= 400:
                             utils.p('reresult', response.text)
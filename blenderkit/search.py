@@ -54,6 +54,9 @@ from bpy.types import (
 import requests, os, random
 import time
 import threading
+import queue
+import itertools
+import hashlib
 import tempfile
 import json
 import bpy
@@ -76,10 +79,12 @@ def check_errors(rdata):
 
 
 search_threads = []
-thumb_sml_download_threads = {}
-thumb_full_download_threads = {}
 reports = ''
 
+# evict_search_cache() scans all the cached files, it's run at most once in this many seconds
+CACHE_EVICTION_INTERVAL = 60
+last_cache_eviction = 0
+
 
 def refresh_token_timer():
     ''' this timer gets run every 20 hours. It refreshes tokens and categories.'''
@@ -115,12 +120,14 @@ def fetch_server_data():
 
 
 @bpy.app.handlers.persistent
-def timer_update():  # TODO might get moved to handle all blenderkit stuff.
-
+def timer_update():
+    '''tasks_queue handler, woken up by finished search threads.'''
     global search_threads
+    if len(search_threads) == 0:
+        return None
     # don't do anything while dragging - this could switch asset type during drag, and make results list length different,
     # causing a lot of throuble literally.
-    if len(search_threads) == 0 or bpy.context.scene.blenderkitUI.dragging:
+    if bpy.context.scene.blenderkitUI.dragging:
         return 1
     for thread in search_threads:  # TODO this doesn't check all processess when one gets removed, but most time only
         # one is running anyway
@@ -266,7 +273,12 @@ def timer_update():  # TODO might get moved to handle all blenderkit stuff.
 
             # print('finished search thread')
             mt('preview loading finished')
-    return .3
+    if len(search_threads) == 0:
+        return None
+    if any(not thread[0].is_alive() for thread in search_threads):
+        return .3
+    # the running threads wake this up when they finish, this is just a fallback
+    return 1
 
 
 def load_previews():
@@ -545,30 +557,81 @@ def get_items_textures(self, context):
     return search_items_textures
 
 
-class ThumbDownloader(threading.Thread):
-    query = None
-
-    def __init__(self, url, path):
-        super(ThumbDownloader, self).__init__()
-        self.url = url
-        self.path = path
-        self._stop_event = threading.Event()
-
-    def stop(self):
-        self._stop_event.set()
-
-    def stopped(self):
-        return self._stop_event.is_set()
-
-    def run(self):
-        r = rerequests.get(self.url, stream=False)
-        if r.status_code == 200:
-            with open(self.path, 'wb') as f:
-                f.write(r.content)
-            # ORIGINALLY WE DOWNLOADED THUMBNAILS AS STREAM, BUT THIS WAS TOO SLOW.
-            # with open(path, 'wb') as f:
-            #     for chunk in r.iter_content(1048576*4):
-            #         f.write(chunk)
+class ThumbDownloader():
+    '''
+    Downloads thumbnails with a fixed pool of threads sharing keep-alive connections.
+    Jobs are done by priority, so small thumbnails of the first results come before the rest.
+    '''
+    SMALL = 0
+    LARGE = 1
+
+    def __init__(self, threads=8):
+        self.nthreads = threads
+        self.threads = []
+        self.session = None
+        self.queue = queue.PriorityQueue()
+        self.counter = itertools.count()  # keeps the order of jobs with the same priority
+        self.lock = threading.Lock()
+        self.generation = 0  # jobs queued before cancel() have an older generation
+        self.pending = {}  # path: [event set when the job is done, generation of the job]
+
+    def add(self, url, path, priority):
+        '''
+        Queue a thumbnail, returns an event set once it's downloaded (or skipped).
+        '''
+        with self.lock:
+            job = self.pending.get(path)
+            if job is None:
+                job = self.pending[path] = [threading.Event(), None]
+            if job[1] != self.generation:
+                # new, or requeued after being cancelled
+                job[1] = self.generation
+                self.queue.put((priority, next(self.counter), self.generation, url, path))
+
+            if self.session is None:
+                self.session = rerequests.new_session(self.nthreads)
+            while len(self.threads) < self.nthreads:
+                thread = threading.Thread(target=self.worker, daemon=True)
+                thread.start()
+                self.threads.append(thread)
+        return job[0]
+
+    def cancel(self):
+        '''
+        Drop the queued jobs, e.g. when a new search replaces the previous one.
+        Downloads in progress are finished.
+        '''
+        with self.lock:
+            self.generation += 1
+
+    def done(self, path, generation):
+        with self.lock:
+            job = self.pending.get(path)
+            if job is None or job[1] != generation:
+                return
+            del self.pending[path]
+        job[0].set()
+
+    def worker(self):
+        while True:
+            priority, _, generation, url, path = self.queue.get()
+            try:
+                if generation == self.generation and not os.path.exists(path):
+                    r = rerequests.get(url, stream=False, session=self.session)
+                    if r.status_code == 200:
+                        # an existing path is a complete thumbnail, the same one can be downloaded by two
+                        # workers after a cancel(), so each writes its own part file.
+                        part_path = '%s.%i.part' % (path, threading.get_ident())
+                        with open(part_path, 'wb') as f:
+                            f.write(r.content)
+                        os.replace(part_path, path)
+            except Exception as e:
+                utils.p(e)
+            finally:
+                self.done(path, generation)
+
+
+thumb_downloader = ThumbDownloader()
 
 
 def write_author(a_id, adata):
@@ -666,6 +729,101 @@ def get_profile():
     return a
 
 
+def get_search_cache_path(urlquery, headers):
+    # results depend on the user too, e.g. private assets
+    key = hashlib.sha1((urlquery + str(headers.get('Authorization'))).encode()).hexdigest()
+    return os.path.join(paths.get_temp_dir('search_cache'), key + '.json')
+
+
+def cached_search_request(urlquery, headers, cache_time):
+    '''
+    Get search results, from the local cache if they aren't older than cache_time seconds.
+    Older results are revalidated with their ETag, and used as they are when the server can't be reached.
+    Raises RequestException when there is no cached copy, ValueError when the response isn't json.
+    '''
+    cache_path = get_search_cache_path(urlquery, headers)
+    cached = None
+    try:
+        with open(cache_path, 'r') as infile:
+            cached = json.load(infile)
+    except (OSError, ValueError):
+        pass
+
+    if cached is not None:
+        os.utime(cache_path)  # recently used, see evict_search_cache()
+        if time.time() - cached['time'] < cache_time:
+            return cached['data']
+        if cached.get('etag') is not None:
+            headers = dict(headers)
+            headers['If-None-Match'] = cached['etag']
+
+    try:
+        r = rerequests.get(urlquery, headers=headers)
+    except requests.exceptions.RequestException as e:
+        if cached is None:
+            raise
+        utils.p('using cached search results, ', e)
+        return cached['data']
+
+    if r.status_code == 304 and cached is not None:
+        rdata = cached['data']
+        etag = cached['etag']
+    else:
+        try:
+            rdata = r.json()
+        except Exception as inst:
+            print(inst)
+            raise ValueError(r.text)
+        if r.status_code != 200:
+            # errors, e.g. invalid token, aren't cached
+            return rdata
+        etag = r.headers.get('ETag')
+
+    cached = {'time': time.time(), 'etag': etag, 'data': rdata}
+    # the same query can be written by several search threads at once
+    with tempfile.NamedTemporaryFile('w', dir=os.path.dirname(cache_path), suffix='.tmp', delete=False) as outfile:
+        json.dump(cached, outfile)
+    os.replace(outfile.name, cache_path)
+    return rdata
+
+
+def evict_search_cache(max_size, keep=()):
+    '''
+    Remove the least recently used thumbnails and cached search results above max_size bytes.
+    Files in keep are never removed.
+    '''
+    tempdir = paths.get_temp_dir()
+    files = []
+    total_size = 0
+    for subdir in os.listdir(tempdir):
+        if not subdir.endswith('_search') and subdir != 'search_cache':
+            continue
+        subdir = os.path.join(tempdir, subdir)
+        for fn in os.listdir(subdir):
+            fpath = os.path.join(subdir, fn)
+            # the results currently loaded in the asset bar
+            if fn.endswith('_searchresult.json') or fpath in keep:
+                continue
+            try:
+                stat = os.stat(fpath)
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, fpath))
+            total_size += stat.st_size
+
+    if total_size <= max_size:
+        return
+    files.sort()
+    for mtime, size, fpath in files:
+        if total_size <= max_size:
+            break
+        try:
+            os.remove(fpath)
+            total_size -= size
+        except OSError:
+            pass
+
+
 class Searcher(threading.Thread):
     query = None
 
@@ -682,10 +840,15 @@ class Searcher(threading.Thread):
         return self._stop_event.is_set()
 
     def run(self):
-        maxthreads = 50
+        try:
+            self.search()
+        finally:
+            tasks_queue.wake(timer_update)
+
+    def search(self):
         query = self.query
         params = self.params
-        global reports
+        global reports, last_cache_eviction
 
         t = time.time()
         mt('search thread started')
@@ -734,7 +897,7 @@ class Searcher(threading.Thread):
 
         try:
             utils.p(urlquery)
-            r = rerequests.get(urlquery, headers=headers)
+            rdata = cached_search_request(urlquery, headers, params['cache_time'])
             reports = ''
             # utils.p(r.text)
         except requests.exceptions.RequestException as e:
@@ -742,12 +905,9 @@ class Searcher(threading.Thread):
             reports = e
             # props.report = e
             return
+        except ValueError as e:
+            reports = str(e)
         mt('response is back ')
-        try:
-            rdata = r.json()
-        except Exception as inst:
-            reports = r.text
-            print(inst)
 
         mt('data parsed ')
 
@@ -772,7 +932,6 @@ class Searcher(threading.Thread):
             return
 
         mt('search finished')
-        i = 0
 
         thumb_small_urls = []
         thumb_small_filepaths = []
@@ -815,65 +974,35 @@ class Searcher(threading.Thread):
         with open(json_filepath, 'w') as outfile:
             json.dump(rdata, outfile)
 
-        killthreads_sml = []
-        for k in thumb_sml_download_threads.keys():
-            if k not in thumb_small_filepaths:
-                killthreads_sml.append(k)  # do actual killing here?
-
-        killthreads_full = []
-        for k in thumb_full_download_threads.keys():
-            if k not in thumb_full_filepaths:
-                killthreads_full.append(k)  # do actual killing here?
-        # TODO do the killing/ stopping here! remember threads might have finished inbetween!
-
-        if self.stopped():
-            utils.p('stopping search : ' + query['keywords'])
-            return
-
-        # this loop handles downloading of small thumbnails
-        for imgpath, url in sml_thbs:
-            if imgpath not in thumb_sml_download_threads and not os.path.exists(imgpath):
-                thread = ThumbDownloader(url, imgpath)
-                # thread = threading.Thread(target=download_thumbnail, args=([url, imgpath]),
-                #                           daemon=True)
-                thread.start()
-                thumb_sml_download_threads[imgpath] = thread
-                # threads.append(thread)
-
-                if len(thumb_sml_download_threads) > maxthreads:
-                    while len(thumb_sml_download_threads) > maxthreads:
-                        threads_copy = thumb_sml_download_threads.copy()  # because for loop can erase some of the items.
-                        for tk, thread in threads_copy.items():
-                            if not thread.is_alive():
-                                thread.join()
-                                # utils.p(x)
-                                del (thumb_sml_download_threads[tk])
-                                # utils.p('fetched thumbnail ', i)
-                                i += 1
         if self.stopped():
             utils.p('stopping search : ' + query['keywords'])
             return
-        idx = 0
-        while len(thumb_sml_download_threads) > 0:
-            threads_copy = thumb_sml_download_threads.copy()  # because for loop can erase some of the items.
-            for tk, thread in threads_copy.items():
-                if not thread.is_alive():
-                    thread.join()
-                    del (thumb_sml_download_threads[tk])
-                    i += 1
 
-        if self.stopped():
-            utils.p('stopping search : ' + query['keywords'])
-            return
-
-        # start downloading full thumbs in the end
-        for imgpath, url in full_thbs:
-            if imgpath not in thumb_full_download_threads and not os.path.exists(imgpath):
-                thread = ThumbDownloader(url, imgpath)
-                # thread = threading.Thread(target=download_thumbnail, args=([url, imgpath]),
-                #                           daemon=True)
-                thread.start()
-                thumb_full_download_threads[imgpath] = thread
+        # thumbnails already downloaded are marked as recently used
+        missing_thumbs = False
+        for imgpath in thumb_small_filepaths + thumb_full_filepaths:
+            if os.path.exists(imgpath):
+                os.utime(imgpath)
+            else:
+                missing_thumbs = True
+        # the cache only grows much with new thumbnails
+        if missing_thumbs and time.time() - last_cache_eviction > CACHE_EVICTION_INTERVAL:
+            last_cache_eviction = time.time()
+            evict_search_cache(params['thumbnail_cache_size'], set(thumb_small_filepaths + thumb_full_filepaths))
+
+        # small thumbnails first, in the order of the results. The search is finished once these are here.
+        events = [thumb_downloader.add(url, imgpath, (ThumbDownloader.SMALL, i))
+                  for i, (imgpath, url) in enumerate(sml_thbs) if not os.path.exists(imgpath)]
+        for event in events:
+            while not event.wait(.1):
+                if self.stopped():
+                    utils.p('stopping search : ' + query['keywords'])
+                    return
+
+        # large thumbnails are downloaded in the background
+        for i, (imgpath, url) in enumerate(full_thbs):
+            if not os.path.exists(imgpath):
+                thumb_downloader.add(url, imgpath, (ThumbDownloader.LARGE, i))
         mt('thumbnails finished')
 
 
@@ -1010,13 +1139,16 @@ def add_search_process(query, params):
     while (len(search_threads) > 0):
         old_thread = search_threads.pop(0)
         old_thread[0].stop()
-        # TODO CARE HERE FOR ALSO KILLING THE THREADS...AT LEAST NOW SEARCH DONE FIRST WON'T REWRITE AN OLDER ONE
+    if not params['get_next']:
+        # thumbnails of the previous results aren't needed anymore
+        thumb_downloader.cancel()
 
     tempdir = paths.get_temp_dir('%s_search' % query['asset_type'])
     thread = Searcher(query, params)
     thread.start()
 
     search_threads.append([thread, tempdir, query['asset_type']])
+    tasks_queue.wake(timer_update)
 
     mt('thread started')
 
@@ -1077,7 +1209,9 @@ def search(category='', get_next=False, author_id=''):
         'scene_uuid': bpy.context.scene.get('uuid', None),
         'addon_version': version_checker.get_addon_version(),
         'api_key': user_preferences.api_key,
-        'get_next': get_next
+        'get_next': get_next,
+        'cache_time': user_preferences.search_cache_time * 60,
+        'thumbnail_cache_size': user_preferences.thumbnail_cache_size * 1024 * 1024,
     }
 
     # if free_only:
@@ -1152,16 +1286,17 @@ def register_search():
     for c in classes:
         bpy.utils.register_class(c)
 
-    bpy.app.timers.register(timer_update, persistent = True)
+    tasks_queue.add_handler(timer_update)
 
     categories.load_categories()
 
 
 def unregister_search():
     bpy.app.handlers.load_post.remove(scene_load)
+    thumb_downloader.cancel()
 
     for c in classes:
         bpy.utils.unregister_class(c)
 
-    bpy.app.timers.unregister(timer_update)
+    tasks_queue.remove_handler(timer_update)
 
@@ -27,7 +27,26 @@ import bpy
 from bpy.app.handlers import persistent
 
 import queue
+import time
 
+# the dispatcher runs as often as this while there's work, and backs off to MAX_INTERVAL when idle.
+# While handlers wait for worker threads it doesn't back off more than to WAIT_INTERVAL,
+# so wake() calls from the threads are picked up quickly.
+MIN_INTERVAL = .05
+WAIT_INTERVAL = .2
+MAX_INTERVAL = 1.0
+
+# handler -> time when it should run next, None while it waits for wake()
+handlers = {}
+interval = MIN_INTERVAL
+
+stats = {
+    'max_queue_depth': 0,
+    'tasks': 0,
+    'task_latency': 0.0,  # sum of the times tasks waited in the queue
+    'max_task_latency': 0.0,
+    'handler_time': {},  # handler name -> time spent running it
+}
 
 
 @persistent
@@ -45,31 +64,123 @@ def get_queue():
     return t.task_queue
 
 
+def get_events():
+    t = bpy.types.Scene
+
+    if not hasattr(t, 'task_events'):
+        t.task_events = queue.Queue()
+    return t.task_events
+
+
 def add_task(task):
     q = get_queue()
-    q.put(task)
+    q.put((task, time.time()))
+    stats['max_queue_depth'] = max(stats['max_queue_depth'], q.qsize())
+
+
+def add_handler(handler):
+    '''
+    Register a function to be run by the dispatcher in the main thread. Like a bpy timer, it returns the time
+    after which it wants to run again, or None to wait until it's woken up by wake().
+    '''
+    handlers[handler] = time.time()
+
+
+def remove_handler(handler):
+    handlers.pop(handler, None)
+
+
+def wake(handler):
+    '''run a handler as soon as possible. Can be called from any thread, e.g. when a worker thread finishes.'''
+    get_events().put(handler)
+
+
+def get_stats():
+    '''instrumentation of the dispatcher, e.g. for debugging a slow UI'''
+    s = dict(stats)
+    s['queue_depth'] = get_queue().qsize()
+    s['average_task_latency'] = stats['task_latency'] / max(stats['tasks'], 1)
+    s['interval'] = interval
+    s['waiting_handlers'] = [h.__name__ for h, due in handlers.items() if due is None]
+    return s
+
+
+def run_task(task, added):
+    latency = time.time() - added
+    stats['tasks'] += 1
+    stats['task_latency'] += latency
+    stats['max_task_latency'] = max(stats['max_task_latency'], latency)
+    utils.p('as a task:   ')
+    utils.p(task, 'waited %.3f s' % latency)
+    try:
+        task[0](*task[1])
+    except Exception as e:
+        utils.p('task failed:')
+        print(e)
+
+
+def run_handler(handler):
+    t = time.time()
+    try:
+        delay = handler()
+    except Exception as e:
+        utils.p('handler failed:')
+        print(e)
+        delay = MAX_INTERVAL
+    now = time.time()
+    if handler in handlers:
+        handlers[handler] = None if delay is None else now + delay
+    handler_time = stats['handler_time']
+    handler_time[handler.__name__] = handler_time.get(handler.__name__, 0.0) + now - t
 
 
 def queue_worker():
+    '''
+    The dispatcher. Runs tasks added from threads by add_task(), and the handlers that are due or were woken up.
+    '''
+    global interval
+    busy = False
+
+    # wake events are applied before running anything, so a wake() posted meanwhile is never lost.
+    events = get_events()
+    now = time.time()
+    while not events.empty():
+        handler = events.get()
+        if handler in handlers:
+            handlers[handler] = now
+
     q = get_queue()
     while not q.empty():
-        utils.p('as a task:   ')
-        # print('window manager', bpy.context.window_manager)
-        task = q.get()
-        utils.p(task)
-        try:
-            task[0](*task[1])
-        except Exception as e:
-            utils.p('task failed:')
-            print(e)
-    return 2.0
+        task, added = q.get()
+        run_task(task, added)
+        busy = True
+
+    for handler, due in list(handlers.items()):
+        if due is not None and due <= now:
+            run_handler(handler)
+            busy = True
+
+    dues = [due for due in handlers.values() if due is not None]
+    if busy or not events.empty():
+        interval = MIN_INTERVAL
+    elif len(dues) > 0:
+        interval = min(interval * 2, WAIT_INTERVAL)
+    else:
+        interval = min(interval * 2, MAX_INTERVAL)
+
+    next_time = interval
+    if len(dues) > 0:
+        next_time = min(next_time, max(min(dues) - time.time(), MIN_INTERVAL))
+    return next_time
 
 
 def register():
     bpy.app.handlers.load_post.append(scene_load)
+    if not (bpy.app.timers.is_registered(queue_worker)):
+        bpy.app.timers.register(queue_worker, persistent=True)
 
 
 def unregister():
     bpy.app.handlers.load_post.remove(scene_load)
-
-
+    if bpy.app.timers.is_registered(queue_worker):
+        bpy.app.timers.unregister(queue_worker)
@@ -339,6 +339,11 @@ def draw_panel_model_search(self, context):
     if props.randomize_rotation:
         layout.prop(props, 'randomize_rotation_amount')
 
+    if s.get('search results'):
+        layout.separator()
+        op = layout.operator('scene.blenderkit_download_batch', text='Place all results', icon='IMPORT')
+        op.model_location = s.cursor.location
+
 
 def draw_panel_scene_search(self, context):
     s = context.scene
@@ -882,6 +887,14 @@ class VIEW3D_PT_blenderkit_downloads(Panel):
 
     def draw(self, context):
         layout = self.layout
+        batches = []
+        for threaddata in download.download_threads:
+            if isinstance(threaddata[0], download.BatchDownloader) and threaddata[0] not in batches:
+                batches.append(threaddata[0])
+        for batch in batches:
+            row = layout.row()
+            row.label(text='%i assets' % len(batch.assets))
+            row.label(text=str(int(batch.tcom.progress)) + ' %')
         for threaddata in download.download_threads:
             tcom = threaddata[2]
             asset_data = threaddata[1]
@@ -20,10 +20,11 @@
 
 # Script copyright (C) Campbell Barton
 
-from math import radians, ceil
+from math import ceil
 
 import bpy
-from mathutils import Vector, Euler, Matrix
+import numpy as np
+from mathutils import Vector, Matrix
 
 
 class BVH_Node:
@@ -51,8 +52,9 @@ class BVH_Node:
         'rot_order',
         # Same as above but a string 'XYZ' format..
         'rot_order_str',
-        # A list one tuple's one for each frame: (locx, locy, locz, rotx, roty, rotz),
+        # Array with one row for each frame: (locx, locy, locz, rotx, roty, rotz),
         # euler rotation ALWAYS stored xyz order, even when native used.
+        # The first row is the rest pose.
         'anim_data',
         # Convenience function, bool, same as: (channels[0] != -1 or channels[1] != -1 or channels[2] != -1).
         'has_loc',
@@ -92,9 +94,9 @@ class BVH_Node:
 
         self.children = []
 
-        # List of 6 length tuples: (lx, ly, lz, rx, ry, rz)
+        # Rows of (lx, ly, lz, rx, ry, rz)
         # even if the channels aren't used they will just be zero.
-        self.anim_data = [(0, 0, 0, 0, 0, 0)]
+        self.anim_data = np.zeros((1, 6))
 
     def __repr__(self):
         return (
@@ -112,10 +114,159 @@ def sorted_nodes(bvh_nodes):
     return bvh_nodes_list
 
 
+# Axes of the euler rotation orders, and whether the order is odd,
+# as used for conversions between matrices and eulers.
+_eul_order_axes = {
+    'XYZ': ((0, 1, 2), False),
+    'XZY': ((0, 2, 1), True),
+    'YXZ': ((1, 0, 2), True),
+    'YZX': ((1, 2, 0), False),
+    'ZXY': ((2, 0, 1), False),
+    'ZYX': ((2, 1, 0), True),
+}
+
+
+def euler_to_matrix_array(eul, order):
+    """
+    Same as Euler(eul[i], order).to_matrix() for each row of the (N, 3) array eul.
+    Returns an (N, 3, 3) array.
+    """
+    mat = np.empty((len(eul), 3, 3))
+    mat[:] = np.identity(3)
+    for axis in order:
+        i = "XYZ".index(axis)
+        j = (i + 1) % 3
+        k = (i + 2) % 3
+        c = np.cos(eul[:, i])
+        s = np.sin(eul[:, i])
+        rot = np.zeros((len(eul), 3, 3))
+        rot[:, i, i] = 1.0
+        rot[:, j, j] = c
+        rot[:, j, k] = -s
+        rot[:, k, j] = s
+        rot[:, k, k] = c
+        mat = rot @ mat
+    return mat
+
+
+def matrix_to_euler_array(mat, order):
+    """
+    Convert the (N, 3, 3) array of rotation matrices mat to eulers of the given order.
+
+    Like Matrix.to_euler(order, compatible) is used frame by frame, the solution
+    closest to the previous frame is picked, so the curves don't flip.
+    """
+    (i, j, k), parity = _eul_order_axes[order]
+
+    cy = np.hypot(mat[:, i, i], mat[:, j, i])
+    eul1 = np.empty((len(mat), 3))
+    eul2 = np.empty((len(mat), 3))
+    eul1[:, i] = np.arctan2(mat[:, k, j], mat[:, k, k])
+    eul1[:, j] = np.arctan2(-mat[:, k, i], cy)
+    eul1[:, k] = np.arctan2(mat[:, j, i], mat[:, i, i])
+    eul2[:, i] = np.arctan2(-mat[:, k, j], -mat[:, k, k])
+    eul2[:, j] = np.arctan2(-mat[:, k, i], -cy)
+    eul2[:, k] = np.arctan2(-mat[:, j, i], -mat[:, i, i])
+
+    # Gimbal lock
+    lock = cy <= 16.0 * np.finfo(np.float32).eps
+    eul1[lock, i] = np.arctan2(-mat[lock, j, k], mat[lock, j, j])
+    eul1[lock, k] = 0.0
+    eul2[lock] = eul1[lock]
+
+    if parity:
+        eul1 = -eul1
+        eul2 = -eul2
+
+    def distance(a, b):
+        d = np.abs(a - b) % (2.0 * np.pi)
+        return np.minimum(d, 2.0 * np.pi - d).sum(axis=1)
+
+    # Both solutions of a frame are continued by one solution of the next frame,
+    # track in which frames they swap, starting with the one closest to zero rotation.
+    swap = np.empty(len(mat), dtype=bool)
+    swap[0] = distance(eul1[:1], 0.0)[0] > distance(eul2[:1], 0.0)[0]
+    swap[1:] = (distance(eul1[:-1], eul1[1:]) + distance(eul2[:-1], eul2[1:]) >
+                distance(eul1[:-1], eul2[1:]) + distance(eul2[:-1], eul1[1:]))
+    use_eul2 = (np.cumsum(swap) % 2).astype(bool)
+    eul1[use_eul2] = eul2[use_eul2]
+
+    return np.unwrap(eul1, axis=0)
+
+
+def matrix_to_quaternion_array(mat):
+    """
+    Same as Matrix.to_quaternion() for each matrix of the (N, 3, 3) array mat.
+    Returns an (N, 4) array of (w, x, y, z) quaternions.
+    """
+    quat = np.empty((len(mat), 4))
+    m = mat
+
+    tr = 0.25 * (1.0 + m[:, 0, 0] + m[:, 1, 1] + m[:, 2, 2])
+    a = tr > np.finfo(np.float32).eps
+    b = ~a & (m[:, 0, 0] > m[:, 1, 1]) & (m[:, 0, 0] > m[:, 2, 2])
+    c = ~a & ~b & (m[:, 1, 1] > m[:, 2, 2])
+    d = ~a & ~b & ~c
+
+    s = np.sqrt(tr[a])
+    quat[a, 0] = s
+    s = 1.0 / (4.0 * s)
+    quat[a, 1] = (m[a, 2, 1] - m[a, 1, 2]) * s
+    quat[a, 2] = (m[a, 0, 2] - m[a, 2, 0]) * s
+    quat[a, 3] = (m[a, 1, 0] - m[a, 0, 1]) * s
+
+    s = 2.0 * np.sqrt(1.0 + m[b, 0, 0] - m[b, 1, 1] - m[b, 2, 2])
+    quat[b, 1] = 0.25 * s
+    s = 1.0 / s
+    quat[b, 0] = (m[b, 2, 1] - m[b, 1, 2]) * s
+    quat[b, 2] = (m[b, 0, 1] + m[b, 1, 0]) * s
+    quat[b, 3] = (m[b, 0, 2] + m[b, 2, 0]) * s
+
+    s = 2.0 * np.sqrt(1.0 + m[c, 1, 1] - m[c, 0, 0] - m[c, 2, 2])
+    quat[c, 2] = 0.25 * s
+    s = 1.0 / s
+    quat[c, 0] = (m[c, 0, 2] - m[c, 2, 0]) * s
+    quat[c, 1] = (m[c, 0, 1] + m[c, 1, 0]) * s
+    quat[c, 3] = (m[c, 1, 2] + m[c, 2, 1]) * s
+
+    s = 2.0 * np.sqrt(1.0 + m[d, 2, 2] - m[d, 0, 0] - m[d, 1, 1])
+    quat[d, 3] = 0.25 * s
+    s = 1.0 / s
+    quat[d, 0] = (m[d, 1, 0] - m[d, 0, 1]) * s
+    quat[d, 1] = (m[d, 0, 2] + m[d, 2, 0]) * s
+    quat[d, 2] = (m[d, 1, 2] + m[d, 2, 1]) * s
+
+    quat /= np.linalg.norm(quat, axis=1)[:, np.newaxis]
+    return quat
+
+
+def fcurves_from_array(action, data_path, time, values, action_group="", interpolation=None):
+    """
+    Add one fcurve per column of the (N, K) array values, keyed at the N times.
+    """
+    co = np.empty((len(time), 2))
+    co[:, 0] = time
+    if interpolation is not None:
+        # enums are set in bulk by their integer value
+        interpolation = bpy.types.Keyframe.bl_rna.properties["interpolation"].enum_items[interpolation].value
+        interpolations = np.full(len(time), interpolation, dtype=np.int32)
+    for axis_i in range(values.shape[1]):
+        curve = action.fcurves.new(data_path=data_path, index=axis_i, action_group=action_group)
+        keyframe_points = curve.keyframe_points
+        keyframe_points.add(len(time))
+        co[:, 1] = values[:, axis_i]
+        keyframe_points.foreach_set("co", co.ravel())
+
+        if interpolation is not None:
+            keyframe_points.foreach_set("interpolation", interpolations)
+
+        curve.update()
+
+
 def read_bvh(context, file_path, rotate_mode='XYZ', global_scale=1.0):
     # File loading stuff
     # Open the file for importing
-    file = open(file_path, 'rU')
+    file = open(file_path, 'r')
 
     # Separate into a list of lists, each line a list of words.
     file_lines = file.readlines()
@@ -123,8 +274,26 @@ def read_bvh(context, file_path, rotate_mode='XYZ', global_scale=1.0):
     if len(file_lines) == 1:
         file_lines = file_lines[0].split('\r')
 
-    # Split by whitespace.
-    file_lines = [ll for ll in [l.split() for l in file_lines] if ll]
+    # Split by whitespace, up to the frames which are read as one array below.
+    # MOTION is followed by the frame count and frame time lines.
+    file_lines_iter = iter(file_lines)
+    header_lines = []
+    for l in file_lines_iter:
+        ll = l.split()
+        if ll:
+            header_lines.append(ll)
+            if len(ll) == 1 and ll[0].lower() == 'motion':
+                break
+    header_len = len(header_lines) + 2
+    for l in file_lines_iter:
+        ll = l.split()
+        if ll:
+            header_lines.append(ll)
+            if len(header_lines) == header_len:
+                break
+    motion_lines = [l for l in file_lines_iter if l and not l.isspace()]
+    file.close()
+    file_lines = header_lines
 
     # Create hierarchy as empties
     if file_lines[0][0].lower() == 'hierarchy':
@@ -274,31 +443,27 @@ def read_bvh(context, file_path, rotate_mode='XYZ', global_scale=1.0):
     # second life expects it, which isn't to spec.
     bvh_nodes_list = sorted_nodes(bvh_nodes)
 
-    while lineIdx < len(file_lines):
-        line = file_lines[lineIdx]
-        for bvh_node in bvh_nodes_list:
-            # for bvh_node in bvh_nodes_serial:
-            lx = ly = lz = rx = ry = rz = 0.0
-            channels = bvh_node.channels
-            anim_data = bvh_node.anim_data
-            if channels[0] != -1:
-                lx = global_scale * float(line[channels[0]])
-
-            if channels[1] != -1:
-                ly = global_scale * float(line[channels[1]])
-
-            if channels[2] != -1:
-                lz = global_scale * float(line[channels[2]])
-
-            if channels[3] != -1 or channels[4] != -1 or channels[5] != -1:
+    # All frames as one (frame, channel) array.
+    channel_count = channelIndex + 1
+    motion = np.array(" ".join(motion_lines).split(), dtype=np.float64)
+    if channel_count == 0:
+        motion = np.zeros((len(motion_lines), 0))
+    elif motion.size == len(motion_lines) * channel_count:
+        motion = motion.reshape(len(motion_lines), channel_count)
+    else:
+        # Lines with trailing values.
+        motion = np.array([l.split()[:channel_count] for l in motion_lines], dtype=np.float64)
+    del motion_lines
 
-                rx = radians(float(line[channels[3]]))
-                ry = radians(float(line[channels[4]]))
-                rz = radians(float(line[channels[5]]))
+    for bvh_node in bvh_nodes_list:
+        channels = bvh_node.channels
+        anim_data = bvh_node.anim_data = np.zeros((len(motion) + 1, 6))
+        for i in range(3):
+            if channels[i] != -1:
+                anim_data[1:, i] = global_scale * motion[:, channels[i]]
 
-            # Done importing motion data #
-            anim_data.append((lx, ly, lz, rx, ry, rz))
-        lineIdx += 1
+        if bvh_node.has_rot:
+            anim_data[1:, 3:] = np.radians(motion[:, channels[3:]])
 
     # Assign children
     for bvh_node in bvh_nodes_list:
@@ -388,18 +553,25 @@ def bvh_node_dict2objects(context, bvh_name, bvh_nodes, rotate_mode='NATIVE', fr
 
     for name, bvh_node in bvh_nodes.items():
         obj = bvh_node.temp
+        anim_data = bvh_node.anim_data
 
-        for frame_current in range(len(bvh_node.anim_data)):
+        if not (bvh_node.has_loc or bvh_node.has_rot):
+            continue
 
-            lx, ly, lz, rx, ry, rz = bvh_node.anim_data[frame_current]
+        obj.animation_data_create()
+        action = bpy.data.actions.new(name=obj.name + "Action")
+        obj.animation_data.action = action
 
-            if bvh_node.has_loc:
-                obj.delta_location = Vector((lx, ly, lz)) - bvh_node.rest_head_world
-                obj.keyframe_insert("delta_location", index=-1, frame=frame_start + frame_current)
+        time = np.arange(frame_start, frame_start + len(anim_data), dtype=np.float64)
 
-            if bvh_node.has_rot:
-                obj.delta_rotation_euler = rx, ry, rz
-                obj.keyframe_insert("delta_rotation_euler", index=-1, frame=frame_start + frame_current)
+        if bvh_node.has_loc:
+            fcurves_from_array(action, "delta_location", time,
+                               anim_data[:, :3] - bvh_node.rest_head_world,
+                               action_group="Object Transforms")
+
+        if bvh_node.has_rot:
+            fcurves_from_array(action, "delta_rotation_euler", time, anim_data[:, 3:],
+                               action_group="Object Transforms")
 
     return objects
 
@@ -554,99 +726,52 @@ def bvh_node_dict2armature(
         num_frame = num_frame - skip_frame
 
     # Create a shared time axis for all animation curves.
-    time = [float(frame_start)] * num_frame
+    time = np.arange(num_frame, dtype=np.float64)
     if use_fps_scale:
-        dt = scene.render.fps * bvh_frame_time
-        for frame_i in range(1, num_frame):
-            time[frame_i] += float(frame_i) * dt
-    else:
-        for frame_i in range(1, num_frame):
-            time[frame_i] += float(frame_i)
+        time *= scene.render.fps * bvh_frame_time
+    time += frame_start
 
     # print("bvh_frame_time = %f, dt = %f, num_frame = %d"
     #      % (bvh_frame_time, dt, num_frame]))
 
     for i, bvh_node in enumerate(bvh_nodes_list):
         pose_bone, bone, bone_rest_matrix, bone_rest_matrix_inv = bvh_node.temp
+        anim_data = bvh_node.anim_data[skip_frame:skip_frame + num_frame]
+        rest_matrix = np.array(bone_rest_matrix.to_3x3())
+        rest_matrix_inv = np.array(bone_rest_matrix_inv.to_3x3())
 
         if bvh_node.has_loc:
             # Not sure if there is a way to query this or access it in the
             # PoseBone structure.
             data_path = 'pose.bones["%s"].location' % pose_bone.name
 
-            location = [(0.0, 0.0, 0.0)] * num_frame
-            for frame_i in range(num_frame):
-                bvh_loc = bvh_node.anim_data[frame_i + skip_frame][:3]
-
-                bone_translate_matrix = Matrix.Translation(
-                    Vector(bvh_loc) - bvh_node.rest_head_local)
-                location[frame_i] = (bone_rest_matrix_inv @
-                                     bone_translate_matrix).to_translation()
+            # Translation of bone_rest_matrix_inv @ Matrix.Translation(bvh_loc - rest_head_local),
+            # for all frames.
+            location = (anim_data[:, :3] - np.array(bvh_node.rest_head_local)) @ rest_matrix_inv.T
 
             # For each location x, y, z.
-            for axis_i in range(3):
-                curve = action.fcurves.new(data_path=data_path, index=axis_i)
-                keyframe_points = curve.keyframe_points
-                keyframe_points.add(num_frame)
-
-                for frame_i in range(num_frame):
-                    keyframe_points[frame_i].co = (
-                        time[frame_i],
-                        location[frame_i][axis_i],
-                    )
+            fcurves_from_array(action, data_path, time, location, interpolation='LINEAR')
 
         if bvh_node.has_rot:
-            data_path = None
-            rotate = None
+            # apply rotation order and convert to XYZ
+            # note that the rot_order_str is reversed.
+            bone_rotation_matrix = euler_to_matrix_array(anim_data[:, 3:], bvh_node.rot_order_str[::-1])
+            bone_rotation_matrix = rest_matrix_inv @ bone_rotation_matrix @ rest_matrix
 
             if 'QUATERNION' == rotate_mode:
-                rotate = [(1.0, 0.0, 0.0, 0.0)] * num_frame
+                rotate = matrix_to_quaternion_array(bone_rotation_matrix)
                 data_path = ('pose.bones["%s"].rotation_quaternion'
                              % pose_bone.name)
             else:
-                rotate = [(0.0, 0.0, 0.0)] * num_frame
+                rotate = matrix_to_euler_array(bone_rotation_matrix, pose_bone.rotation_mode)
                 data_path = ('pose.bones["%s"].rotation_euler' %
                              pose_bone.name)
 
-            prev_euler = Euler((0.0, 0.0, 0.0))
-            for frame_i in range(num_frame):
-                bvh_rot = bvh_node.anim_data[frame_i + skip_frame][3:]
-
-                # apply rotation order and convert to XYZ
-                # note that the rot_order_str is reversed.
-                euler = Euler(bvh_rot, bvh_node.rot_order_str[::-1])
-                bone_rotation_matrix = euler.to_matrix().to_4x4()
-                bone_rotation_matrix = (
-                    bone_rest_matrix_inv @
-                    bone_rotation_matrix @
-                    bone_rest_matrix
-                )
-
-                if len(rotate[frame_i]) == 4:
-                    rotate[frame_i] = bone_rotation_matrix.to_quaternion()
-                else:
-                    rotate[frame_i] = bone_rotation_matrix.to_euler(
-                        pose_bone.rotation_mode, prev_euler)
-                    prev_euler = rotate[frame_i]
-
             # For each euler angle x, y, z (or quaternion w, x, y, z).
-            for axis_i in range(len(rotate[0])):
-                curve = action.fcurves.new(data_path=data_path, index=axis_i)
-                keyframe_points = curve.keyframe_points
-                keyframe_points.add(num_frame)
-
-                for frame_i in range(num_frame):
-                    keyframe_points[frame_i].co = (
-                        time[frame_i],
-                        rotate[frame_i][axis_i],
-                    )
-
-    for cu in action.fcurves:
-        if IMPORT_LOOP:
-            pass  # 2.5 doenst have cyclic now?
-
-        for bez in cu.keyframe_points:
-            bez.interpolation = 'LINEAR'
+            fcurves_from_array(action, data_path, time, rotate, interpolation='LINEAR')
+
+    if IMPORT_LOOP:
+        pass  # 2.5 doenst have cyclic now?
 
     # finally apply matrix
     arm_ob.matrix_world = global_matrix
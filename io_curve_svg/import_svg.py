@@ -30,6 +30,7 @@ from .svg_util import (units,
                        srgb_to_linearrgb,
                        check_points_equal,
                        parse_array_of_floats,
+                       parse_path_data,
                        read_float)
 
 #### Common utilities ####
@@ -55,12 +56,13 @@ SVGEmptyStyles = {'useFill': None,
                   'rotation': None}
 
 
-def SVGCreateCurve(context, layer):
+def SVGCreateCurve(context, layer, cu=None):
     """
-    Create new curve object to hold splines in
+    Create new curve object to hold splines in, or to instance the given curve data
     """
 
-    cu = bpy.data.curves.new("Curve", 'CURVE')
+    if cu is None:
+        cu = bpy.data.curves.new("Curve", 'CURVE')
     obj = bpy.data.objects.new("Curve", cu)
 
     # Save the curve object to get the list of objects created
@@ -135,6 +137,10 @@ def SVGRectFromNode(node, context):
     return (w, h)
 
 
+# Matrices of svg, use and symbol nodes, the same USE placements are repeated a lot
+SVGNodeMatricesCache = {}
+
+
 def SVGMatrixFromNode(node, context):
     """
     Get transformation matrix from given node
@@ -149,7 +155,26 @@ def SVGMatrixFromNode(node, context):
     rect = context['rect']
     has_user_coordinate = (len(context['rects']) > 1)
 
-    m = Matrix()
+    key = (rect, has_user_coordinate,
+           node.getAttribute('x'), node.getAttribute('y'),
+           node.getAttribute('width'), node.getAttribute('height'),
+           node.getAttribute('viewBox'))
+
+    m = SVGNodeMatricesCache.get(key)
+    if m is None:
+        m = _SVGMatrixFromNode(node, rect, has_user_coordinate)
+        # Frozen, so that shared matrices can't be modified in place
+        m.freeze()
+        SVGNodeMatricesCache[key] = m
+
+    return m
+
+
+def _SVGMatrixFromNode(node, rect, has_user_coordinate):
+    """
+    Compute transformation matrix of svg, use or symbol node
+    """
+
     x = SVGParseCoord(node.getAttribute('x') or '0', rect[0])
     y = SVGParseCoord(node.getAttribute('y') or '0', rect[1])
     w = SVGParseCoord(node.getAttribute('width') or str(rect[0]), rect[0])
@@ -191,15 +216,24 @@ def SVGMatrixFromNode(node, context):
     return m
 
 
+re_transform = re.compile(r'\s*([A-z]+)\s*\((.*?)\)')
+
+# Parsed "transform" attributes, the same ones are repeated a lot
+SVGTransformsCache = {}
+
+
 def SVGParseTransform(transform):
     """
     Parse transform string and return transformation matrix
     """
 
+    m = SVGTransformsCache.get(transform)
+    if m is not None:
+        return m
+
     m = Matrix()
-    r = re.compile('\s*([A-z]+)\s*\((.*?)\)')
 
-    for match in r.finditer(transform):
+    for match in re_transform.finditer(transform):
         func = match.group(1)
         params = match.group(2)
         params = params.replace(',', ' ').split()
@@ -210,6 +244,10 @@ def SVGParseTransform(transform):
 
         m = m @ proc(params)
 
+    # Frozen, so that shared matrices can't be modified in place
+    m.freeze()
+    SVGTransformsCache[transform] = m
+
     return m
 
 
@@ -515,7 +553,7 @@ class SVGPathData:
     SVG Path data token supplier
     """
 
-    __slots__ = ('_data',   # List of tokens
+    __slots__ = ('_data',   # Tuple of tokens, commands and float values
                  '_index',  # Index of current token in tokens list
                  '_len')    # Length of tokens list
 
@@ -526,29 +564,7 @@ class SVGPathData:
         d - the definition of the outline of a shape
         """
 
-        spaces = ' ,\t'
-        commands = {'m', 'l', 'h', 'v', 'c', 's', 'q', '', 't', 'a', 'z'}
-        tokens = []
-
-        i = 0
-        n = len(d)
-        while i < n:
-            c = d[i]
-
-            if c in spaces:
-                pass
-            elif c.lower() in commands:
-                tokens.append(c)
-            elif c in ['-', '.'] or c.isdigit():
-                token, last_char = read_float(d, i)
-                tokens.append(token)
-
-                # in most cases len(token) and (last_char - i) are the same
-                # but with whitespace or ',' prefix they are not.
-
-                i += (last_char - i) - 1
-
-            i += 1
+        tokens = parse_path_data(d)
 
         self._data = tokens
         self._index = 0
@@ -599,12 +615,7 @@ class SVGPathData:
         Return coordinate created from current token and move to next token
         """
 
-        token = self.next()
-
-        if token is None:
-            return None
-
-        return float(token)
+        return self.next()
 
 
 class SVGPathParser:
@@ -702,7 +713,9 @@ class SVGPathParser:
                 if handle_left_type != 'VECTOR':
                     first['handle_left_type'] = handle_left_type
 
-                if self._data.eof() or self._data.lookupNext().lower() == 'm':
+                # numbers are tokenized as floats, commands as strings
+                next_token = self._data.lookupNext()
+                if next_token is None or (isinstance(next_token, str) and next_token.lower() == 'm'):
                     self._spline['closed'] = True
 
                 return
@@ -751,7 +764,7 @@ class SVGPathParser:
         self._point = (x, y)
 
         cur = self._data.cur()
-        while cur is not None and not cur.isalpha():
+        while type(cur) is float:
             x, y = self._getCoordPair(relative, self._point)
 
             if self._spline is None:
@@ -772,7 +785,7 @@ class SVGPathParser:
         c = code.lower()
 
         cur = self._data.cur()
-        while cur is not None and not cur.isalpha():
+        while type(cur) is float:
             if c == 'l':
                 x, y = self._getCoordPair(code == 'l', self._point)
             elif c == 'h':
@@ -804,7 +817,7 @@ class SVGPathParser:
 
         c = code.lower()
         cur = self._data.cur()
-        while cur is not None and not cur.isalpha():
+        while type(cur) is float:
             if c == 'c':
                 x1, y1 = self._getCoordPair(code.islower(), self._point)
                 x2, y2 = self._getCoordPair(code.islower(), self._point)
@@ -842,7 +855,7 @@ class SVGPathParser:
         c = code.lower()
         cur = self._data.cur()
 
-        while cur is not None and not cur.isalpha():
+        while type(cur) is float:
             if c == 'q':
                 x1, y1 = self._getCoordPair(code.islower(), self._point)
             else:
@@ -974,7 +987,7 @@ class SVGPathParser:
 
         cur = self._data.cur()
 
-        while cur is not None and not cur.isalpha():
+        while type(cur) is float:
             rx = float(self._data.next())
             ry = float(self._data.next())
             ang = float(self._data.next()) / 180 * pi
@@ -1284,7 +1297,9 @@ class SVGGeometryPATH(SVGGeometry):
     """
 
     __slots__ = ('_splines',  # List of splines after parsing
-                 '_styles')  # Styles, used for displaying
+                 '_styles',  # Styles, used for displaying
+                 '_instance')  # Curve data and inverted matrix it was created with,
+                               # reused when the path is referenced again
 
     def __init__(self, node, context):
         """
@@ -1295,6 +1310,7 @@ class SVGGeometryPATH(SVGGeometry):
 
         self._splines = []
         self._styles = SVGEmptyStyles
+        self._instance = None
 
     def parse(self):
         """
@@ -1310,16 +1326,37 @@ class SVGGeometryPATH(SVGGeometry):
 
         self._splines = pathParser.getSplines()
 
+    def _createInstance(self):
+        """
+        Create an object sharing the curve data of the first creation of this path
+        (happens for paths of symbols and other elements referenced several times by USE)
+        """
+
+        cu, matrix_inv = self._instance
+
+        ob = SVGCreateCurve(self._context, self._layer, cu)
+        ob.matrix_world = self._context['matrix'] @ matrix_inv
+
+        id_names_from_node(self._node, ob)
+
     def _doCreateGeom(self, instancing):
         """
         Create real geometries
         """
 
+        if self._instance is not None:
+            self._createInstance()
+            return
+
         ob = SVGCreateCurve(self._context, self._layer)
         cu = ob.data
 
         id_names_from_node(self._node, ob)
 
+        matrix = self._context['matrix']
+        if matrix.determinant() != 0.0:
+            self._instance = (cu, matrix.inverted())
+
         if self._styles['useFill']:
             self.setGradient()
             cu.dimensions = '2D'
@@ -2135,6 +2172,9 @@ class SVGLoader(SVGGeometryContainer):
 
         rect = (0, 0)
 
+        SVGTransformsCache.clear()
+        SVGNodeMatricesCache.clear()
+
         self._context = {'svg': svg_name,
                          'active_collection': active_collection,
                          'defines': {},
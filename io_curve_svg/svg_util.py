@@ -19,6 +19,7 @@
 # <pep8 compliant>
 
 import re
+from functools import lru_cache
 
 
 units = {"": 1.0,
@@ -52,6 +53,7 @@ match_comma_pair = r",\s*(?=,)"
 match_last_comma = r",\s*$"
 
 re_match_number_optional_fractional = re.compile(match_number_optional_fractional)
+re_float_separators = re.compile(r"[\s,]*")
 
 array_of_floats_pattern = f"({match_number})|{match_first_comma}|{match_comma_pair}|{match_last_comma}"
 re_array_of_floats_pattern = re.compile(array_of_floats_pattern)
@@ -72,27 +74,41 @@ def read_float(text: str, start_index: int = 0):
     Returns the value itself (as a string) and index of first character after the value.
     """
 
-    n = len(text)
-
     # Skip leading whitespace characters and characters which we consider ignorable for float
     # (like values separator).
-    while start_index < n and (text[start_index].isspace() or text[start_index] == ','):
-        start_index += 1
-    if start_index == n:
+    start_index = re_float_separators.match(text, start_index).end()
+    if start_index == len(text):
         return "0", start_index
 
-    text_part = text[start_index:]
-    match = re_match_number_optional_fractional.match(text_part)
+    # Match in place, slicing the text would make reading all values of a long path quadratic.
+    match = re_match_number_optional_fractional.match(text, start_index)
 
     if match is None:
         raise Exception('Invalid float value near ' + text[start_index:start_index + 10])
 
     token = match.group(0)
-    endptr = start_index + match.end(0)
+    endptr = match.end(0)
 
     return token, endptr
 
 
+match_path_command = r"[MmZzLlHhVvCcSsQqTtAa]"
+match_path_number = r"[-+]?(?:\d+(?:\.\d*)?|\.\d+)(?:[eE][-+]?\d+)?"
+
+re_path_tokens = re.compile(f"({match_path_command})|({match_path_number})")
+
+
+@lru_cache(maxsize=4096)
+def parse_path_data(d: str):
+    """
+    Splits path data into commands and numbers in a single pass.
+
+    Returns a tuple of tokens, commands as strings and numbers as floats. Anything else (separators)
+    is skipped. Results are cached, fonts and maps tend to repeat the same outlines.
+    """
+    return tuple(command or float(number) for command, number in re_path_tokens.findall(d))
+
+
 def parse_coord(coord, size):
     """
     Parse coordinate component to common basis
@@ -12,6 +12,7 @@ DEFAULT_OPTIONS = {
     "grab_blocks": True,  # import block definitions True=yes, False=No
     "assure_3d_coords": False,  # guarantees (x, y, z) tuples for ALL coordinates
     "resolve_text_styles": True,  # Text, Attrib, Attdef and MText attributes will be set by the associated text style if necessary
+    "skip_sections": (),  # names of the sections to skip without parsing them, like 'OBJECTS' or 'THUMBNAILIMAGE'
 }
 
 
@@ -22,8 +23,9 @@ class Drawing(object):
         self.grab_blocks = options.get('grab_blocks', True)
         self.assure_3d_coords = options.get('assure_3d_coords', False)
         self.resolve_text_styles = options.get('resolve_text_styles', True)
+        self.skip_sections = options.get('skip_sections', ())
 
-        tagreader = stream_tagger(stream, self.assure_3d_coords)
+        tagreader = stream_tagger(stream, self.assure_3d_coords, self.skip_sections)
         self.dxfversion = 'AC1009'
         self.encoding = 'cp1252'
         self.filename = None
@@ -39,10 +41,11 @@ class Drawing(object):
             self.acdsdata = sections.acdsdata
             # sab data introduced with DXF version AC1027 (R2013)
             if self.dxfversion >= 'AC1027':
-                self.collect_sab_data()
+                self.entities.add_hook(self._set_sab_data)
 
         if self.resolve_text_styles:
-            resolve_text_styles(self.entities, self.styles)
+            # entities are built lazily, their text style is resolved as they are built
+            self.entities.add_hook(self._resolve_text_style)
             for block in self.blocks:
                 resolve_text_styles(block, self.styles)
 
@@ -54,10 +57,19 @@ class Drawing(object):
 
     def collect_sab_data(self):
         for entity in self.entities:
-            if hasattr(entity, 'set_sab_data'):
-                sab_data = self.acdsdata.sab_data[entity.handle]
+            self._set_sab_data(entity)
+
+    def _set_sab_data(self, entity):
+        if hasattr(entity, 'set_sab_data'):
+            # no data if the ACDSDATA section was skipped
+            sab_data = self.acdsdata.sab_data.get(entity.handle)
+            if sab_data is not None:
                 entity.set_sab_data(sab_data)
 
+    def _resolve_text_style(self, entity):
+        if hasattr(entity, 'resolve_text_style'):
+            entity.resolve_text_style(self.styles)
+
 
 def resolve_text_styles(entities, text_styles):
     for entity in entities:
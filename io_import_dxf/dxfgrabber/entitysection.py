@@ -5,18 +5,20 @@
 from __future__ import unicode_literals
 __author__ = "mozman <mozman@gmx.at>"
 
-from itertools import islice
-
 from .tags import TagGroups, DXFStructureError
 from .tags import Tags
 from .dxfentities import entity_factory
 
 
 class EntitySection(object):
+    """ Entities are built lazily, while the section is iterated. Built entities are kept for the next iterations.
+    """
     name = 'entities'
 
     def __init__(self):
         self._entities = list()
+        self._builder = None  # generates the entities not built yet
+        self._hooks = list()  # functions called with each new entity
 
     @classmethod
     def from_tags(cls, tags, drawing):
@@ -25,17 +27,33 @@ class EntitySection(object):
         return entity_section
 
     def get_entities(self):
+        self._build_all()
         return self._entities
 
+    def add_hook(self, hook):
+        """ Call hook(entity) for each entity, when it is built.
+        """
+        self._hooks.append(hook)
+        for entity in self._entities:
+            hook(entity)
+
     # start of public interface
 
     def __len__(self):
+        self._build_all()
         return len(self._entities)
 
     def __iter__(self):
-        return iter(self._entities)
+        index = 0
+        while True:
+            if index < len(self._entities):
+                yield self._entities[index]
+                index += 1
+            elif not self._build_next():
+                return
 
     def __getitem__(self, index):
+        self._build_all()
         return self._entities[index]
 
     # end of public interface
@@ -43,15 +61,44 @@ class EntitySection(object):
     def _build(self, tags):
         if len(tags) == 3:  # empty entities section
             return
-        groups = TagGroups(islice(tags, 2, len(tags)-1))
-        self._entities = build_entities(groups)
+        self._builder = iter_entities(iter_tag_groups(tags, 2, len(tags)-1))
+
+    def _build_next(self):
+        if self._builder is None:
+            return False
+        try:
+            entity = next(self._builder)
+        except StopIteration:
+            self._builder = None  # releases the tags of the section
+            return False
+        for hook in self._hooks:
+            hook(entity)
+        self._entities.append(entity)
+        return True
+
+    def _build_all(self):
+        while self._build_next():
+            pass
 
 
 class ObjectsSection(EntitySection):
     name = 'objects'
 
 
+def iter_tag_groups(tags, start, end):
+    """ Generates the entities of tags[start:end] as Tags(), using an index of the entity boundaries.
+    """
+    starts = [index for index in range(start, end) if tags[index].code == 0]
+    starts.append(end)
+    for index in range(len(starts) - 1):
+        yield Tags(tags[starts[index]:starts[index + 1]])
+
+
 def build_entities(tag_groups):
+    return list(iter_entities(tag_groups))
+
+
+def iter_entities(tag_groups):
     def build_entity(group):
         try:
             entity = entity_factory(Tags(group))
@@ -59,7 +106,6 @@ def build_entities(tag_groups):
             entity = None  # ignore unsupported entities
         return entity
 
-    entities = list()
     collector = None
     for group in tag_groups:
         entity = build_entity(group)
@@ -67,7 +113,7 @@ def build_entities(tag_groups):
             if collector:
                 if entity.dxftype == 'SEQEND':
                     collector.stop()
-                    entities.append(collector.entity)
+                    yield collector.entity
                     collector = None
                 else:
                     collector.append(entity)
@@ -76,8 +122,7 @@ def build_entities(tag_groups):
             elif entity.dxftype == 'INSERT' and entity.attribsfollow:
                 collector = _Collector(entity)
             else:
-                entities.append(entity)
-    return entities
+                yield entity
 
 
 class _Collector:
@@ -123,63 +123,110 @@ cast_tag = _TagCaster.cast
 cast_tag_value = _TagCaster.cast_value
 
 
-def stream_tagger(stream, assure_3d_coords=False):
-    """ Generates DXFTag() from a stream (untrusted external source). Does not skip comment tags 999.
-    """
-    class Counter:
-        def __init__(self):
-            self.counter = 0
-
-    undo_tag = None
-    line = Counter()  # writeable line counter for next_tag(), Python 2.7 does not support the nonlocal statement
-
-    def next_tag():
-        code = stream.readline()
-        value = stream.readline()
-        line.counter += 2
-        if code and value:  # StringIO(): empty strings indicates EOF
-            return DXFTag(int(code.rstrip('\r\n')), value.rstrip('\r\n'))  # without line ending
-        else:  # StringIO(): empty lines indicates EOF
-            raise EOFError()
+# size in characters of the blocks of text read at once by the stream_tagger()
+READ_BLOCK_SIZE = 1 << 22
+# dxfinfo() reads the header before the encoding is known, by small blocks so that the stream isn't decoded
+# much further than the header, like with readline()
+INFO_BLOCK_SIZE = 256
+
+# typecasters indexed by group code, codes out of this table are strings
+CASTERS = [_TagCaster._cast.get(code, tostr) for code in range(1072)]
+
 
+def _iter_line_blocks(stream, block_size=READ_BLOCK_SIZE):
+    """ Generates lists of lines of a stream, without line endings. The stream is read by blocks of block_size
+    characters, each list holds an even number of lines: complete (code, value) tag pairs.
+    The end of the stream is handled like by readline(): a code line without a value line is ignored, an empty
+    last line is no line at all.
+    """
+    rest = ''
     while True:
-        try:
-            if undo_tag is not None:
-                x = undo_tag
-                undo_tag = None
-            else:
-                x = next_tag()
-            code = x.code
-            if code == 999:  # skip comments
-                continue
-            if code in POINT_CODES:
-                y = next_tag()  # y coordinate is mandatory
-                if y.code != code + 10:
-                    raise DXFStructureError("Missing required y coordinate near line: {}.".format(line.counter))
-                z = next_tag()  # z coordinate just for 3d points
+        data = stream.read(block_size)
+        if not data:
+            break
+        data = rest + data
+        lines = data.split('\n')
+        rest = lines.pop()  # incomplete last line
+        if len(lines) % 2:  # keep the code line of an incomplete tag for the next block
+            rest = lines.pop() + '\n' + rest
+        if '\r' in data:
+            lines = [l.rstrip('\r') for l in lines]
+        yield lines
+    lines = rest.split('\n')  # at most a code line and a last line without line ending
+    if lines[-1] == '':
+        lines.pop()
+    if len(lines) == 2:
+        yield [l.rstrip('\r') for l in lines]
+
+
+def stream_tagger(stream, assure_3d_coords=False, skip_sections=(), block_size=READ_BLOCK_SIZE):
+    """ Generates DXFTag() from a stream (untrusted external source). Skips comment tags 999.
+
+    Sections named in skip_sections are not parsed, only their (0, 'SECTION'), (2, name) and (0, 'ENDSEC') tags
+    are generated.
+    """
+    casters = CASTERS
+    casters_count = len(casters)
+    line = 0
+    point_code = None  # code of the point being read
+    point_x = point_y = None  # its coordinates read so far
+    section_start = False  # previous tag was (0, 'SECTION')
+    skip_section = False
+    for lines in _iter_line_blocks(stream, block_size):
+        for code, value in zip(map(int, lines[0::2]), lines[1::2]):
+            line += 2
+            if skip_section:
+                if code == 0 and value == 'ENDSEC':
+                    skip_section = False
+                else:
+                    continue
+
+            if point_code is not None:
+                if point_y is None:
+                    if code != point_code + 10:  # y coordinate is mandatory
+                        raise DXFStructureError("Missing required y coordinate near line: {}.".format(line))
+                    point_y = value
+                    continue
+                is_z = code == point_code + 20  # z coordinate just for 3d points
                 try:
-                    if z.code == code + 20:
-                        point = (float(x.value), float(y.value), float(z.value))
+                    if is_z:
+                        point = (float(point_x), float(point_y), float(value))
+                    elif assure_3d_coords:
+                        point = (float(point_x), float(point_y), 0.)
                     else:
-                        if assure_3d_coords:
-                            point = (float(x.value), float(y.value), 0.)
-                        else:
-                            point = (float(x.value), float(y.value))
-                        undo_tag = z
+                        point = (float(point_x), float(point_y))
                 except ValueError:
-                    raise DXFStructureError('Invalid floating point values near line: {}.'.format(line.counter))
-                yield DXFTag(code, point)
-            else:  # just a single tag
+                    raise DXFStructureError('Invalid floating point values near line: {}.'.format(line))
+                yield DXFTag(point_code, point)
+                point_code = None
+                if is_z:
+                    continue
+
+            if code == 999:  # skip comments
+                continue
+            if code in POINT_CODES:
+                point_code = code
+                point_x = value
+                point_y = None
+                continue
+
+            caster = casters[code] if 0 <= code < casters_count else tostr
+            try:
+                yield DXFTag(code, caster(value))
+            except ValueError:
                 try:
-                    yield cast_tag(x)
+                    if caster is not int:
+                        raise
+                    yield DXFTag(code, int(float(value)))  # convert float to int
                 except ValueError:
                     raise DXFStructureError('Invalid tag (code={code}, value="{value}") near line: {line}.'.format(
-                        line=line.counter,
-                        code=x.code,
-                        value=x.value,
+                        line=line,
+                        code=code,
+                        value=value,
                     ))
-        except EOFError:
-            return
+            if section_start and code == 2 and value in skip_sections:
+                skip_section = True
+            section_start = code == 0 and value == 'SECTION'
 
 
 def string_tagger(s):
@@ -448,7 +495,7 @@ class DXFInfo(object):
 def dxfinfo(stream):
     info = DXFInfo()
     tag = DXFTag(999999, '')
-    tagreader = stream_tagger(stream)
+    tagreader = stream_tagger(stream, block_size=INFO_BLOCK_SIZE)
     while tag != DXFTag(0, 'ENDSEC'):
         tag = next(tagreader)
         if tag.code != 9:
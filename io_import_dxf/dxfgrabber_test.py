@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# <pep8 compliant>
+
+
+# XXX Not really nice, but that hack is needed to allow execution of that test
+#     from both automated CTest and by directly running the file manually...
+if __name__ == '__main__':
+    import dxfgrabber
+else:
+    from . import dxfgrabber
+import os
+import tempfile
+import unittest
+
+
+def dxf_lines(tags):
+    return "".join("%d\n%s\n" % tag for tag in tags)
+
+
+class EncodingTest(unittest.TestCase):
+    def setUp(self):
+        fd, self.filename = tempfile.mkstemp(suffix=".dxf")
+        os.close(fd)
+
+    def tearDown(self):
+        os.remove(self.filename)
+
+    def test_cp1252_text_after_header(self):
+        # The encoding is only known after reading the header, the rest of the file must not be decoded before.
+        header = [(0, "SECTION"), (2, "HEADER"), (9, "$ACADVER"), (1, "AC1015"),
+                  (9, "$DWGCODEPAGE"), (3, "ANSI_1252"), (0, "ENDSEC")]
+        lines = [(0, "LINE"), (8, "0"), (10, "0.0"), (20, "0.0"), (30, "0.0"), (11, "1.0"), (21, "1.0"), (31, "0.0")]
+        text = [(0, "TEXT"), (8, "0"), (10, "0.0"), (20, "0.0"), (30, "0.0"), (40, "1.0"), (1, "Grüße")]
+        entities = [(0, "SECTION"), (2, "ENTITIES")] + lines * 2000 + text + [(0, "ENDSEC"), (0, "EOF")]
+        with open(self.filename, "w", encoding="cp1252", newline="\n") as f:
+            f.write(dxf_lines(header + entities))
+
+        dwg = dxfgrabber.readfile(self.filename)
+        texts = [entity.text for entity in dwg.entities if entity.dxftype == "TEXT"]
+        self.assertEqual(texts, ["Grüße"])
+        self.assertEqual(dwg.encoding, "cp1252")
+
+    def test_encoding_of_header(self):
+        header = [(0, "SECTION"), (2, "HEADER"), (9, "$ACADVER"), (1, "AC1015"),
+                  (9, "$DWGCODEPAGE"), (3, "ANSI_1252"), (0, "ENDSEC")]
+        with open(self.filename, "w", encoding="cp1252", newline="\n") as f:
+            f.write(dxf_lines(header + [(0, "EOF")]))
+        with open(self.filename) as f:
+            info = dxfgrabber.dxfinfo(f)
+        self.assertEqual((info.release, info.encoding), ("R2000", "cp1252"))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
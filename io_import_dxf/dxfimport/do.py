@@ -25,6 +25,7 @@ from mathutils import Vector, Matrix, Euler, Color, geometry
 from math import pi, radians, sqrt
 
 import bmesh
+import numpy as np
 from .. import dxfgrabber
 from . import convert, is_, groupsort
 from .line_merger import line_merger
@@ -101,7 +102,9 @@ class Do:
     def __init__(self, dxf_filename, c=BY_LAYER, import_text=True, import_light=True, export_acis=True,
                  merge_lines=True, do_bbox=True, block_rep=LINKED_OBJECTS, recenter=False, pDXF=None, pScene=None,
                  thicknessWidth=True, but_group_by_att=True, dxf_unit_scale=1.0):
-        self.dwg = dxfgrabber.readfile(dxf_filename, {"assure_3d_coords": True})
+        # sections the importer never uses are skipped without being parsed
+        skip_sections = ("OBJECTS", "THUMBNAILIMAGE") if export_acis else ("OBJECTS", "THUMBNAILIMAGE", "ACDSDATA")
+        self.dwg = dxfgrabber.readfile(dxf_filename, {"assure_3d_coords": True, "skip_sections": skip_sections})
         self.combination = c
         self.known_blocks = {}
         self.import_text = import_text
@@ -172,6 +175,46 @@ class Do:
             else:
                 return Vector((co[0], co[1], co[2] + elevation if len(co) == 3 else elevation))
 
+    def proj_array(self, co, elevation=0):
+        """
+        Vectorized proj() for many coordinates at once.
+        :param co: coordinates, sequence of N (x,y) or (x,y,z) tuples or N x 2 / N x 3 array
+        :param elevation: float, or array of N floats
+        :return: N x 3 numpy array of transformed coordinates
+        """
+        if len(set(len(c) for c in co)) > 1:  # mixed 2d and 3d coordinates
+            co = [(c[0], c[1], c[2] if len(c) > 2 else 0.0) for c in co]
+        co = np.asarray(co, dtype=np.float64).reshape(len(co), -1)
+        c1 = co[:, 0]
+        c2 = co[:, 1]
+        c3 = (co[:, 2] if co.shape[1] > 2 else np.zeros(len(co))) + elevation
+        u = self.dxf_unit_scale
+        if u != 1.0:
+            c1 = c1 * u
+            c2 = c2 * u
+            c3 = c3 * u
+
+        if self.pScene is not None and self.pDXF is not None:
+            # add
+            add = np.zeros(3)
+            if "latitude" in self.current_scene and "longitude" in self.current_scene:
+                if PYPROJ and type(self.pScene) not in (TransverseMercator, Indicator):
+                    wgs84 = Proj(init="EPSG:4326")
+                    cscn_lat = self.current_scene.get('latitude', 0)
+                    cscn_lon = self.current_scene.get('longitude', 0)
+                    cscn_alt = self.current_scene.get('altitude', 0)
+                    add = np.array(transform(wgs84, self.pScene, cscn_lon, cscn_lat, cscn_alt))
+
+            # projection
+            newco = np.empty((len(co), 3))
+            for i, c in enumerate(transform(self.pDXF, self.pScene, c1, c2, c3)):
+                newco[:, i] = c
+            newco -= add
+            if np.isinf(newco).any():
+                self.errors.add("Projection results in +/- infinity coordinates.")
+            return newco
+        return np.column_stack((c1, c2, c3))
+
     def georeference(self, scene, center):
         if "latitude" not in scene and "longitude" not in scene:
             if type(self.pScene) is TransverseMercator:
@@ -189,7 +232,7 @@ class Do:
     # type(self, dxf entity, blender curve data)
 
     def _cubic_bezier_closed(self, ptuple, curve):
-        count = (len(ptuple)-1)/3
+        count = (len(ptuple)-1)//3
         points = [ptuple[-2]]
         ptuples = ptuple[:-2]
         points += [p for p in ptuples]
@@ -198,29 +241,24 @@ class Do:
         spl.use_cyclic_u = True
         b = spl.bezier_points
         b.add(count - 1)
-        for i, j in enumerate(range(1, len(points), 3)):
-            b[i].handle_left = self.proj(points[j - 1])
-            b[i].co = self.proj(points[j])
-            b[i].handle_right = self.proj(points[j + 1])
+        co = self.proj_array(points)
+        j = np.arange(1, len(points), 3)
+        b.foreach_set("handle_left", co[j - 1].ravel())
+        b.foreach_set("co", co[j].ravel())
+        b.foreach_set("handle_right", co[j + 1].ravel())
 
     def _cubic_bezier_open(self, points, curve):
-        count = (len(points) - 1) / 3 + 1
+        count = (len(points) - 1) // 3 + 1
         spl = curve.splines.new('BEZIER')
         b = spl.bezier_points
         b.add(count - 1)
 
-        b[0].co = self.proj(points[0])
-        b[0].handle_left = self.proj(points[0])
-        b[0].handle_right = self.proj(points[1])
-
-        b[-1].co = self.proj(points[-1])
-        b[-1].handle_right = self.proj(points[-1])
-        b[-1].handle_left = self.proj(points[-2])
-
-        for i, j in enumerate(range(3, len(points) - 2, 3), 1):
-            b[i].handle_left = self.proj(points[j - 1])
-            b[i].co = self.proj(points[j])
-            b[i].handle_right = self.proj(points[j + 1])
+        # the first and last points are their own outer handle
+        co = self.proj_array(points)
+        j = np.arange(0, len(points), 3)
+        b.foreach_set("handle_left", co[np.maximum(j - 1, 0)].ravel())
+        b.foreach_set("co", co[j].ravel())
+        b.foreach_set("handle_right", co[np.minimum(j + 1, len(points) - 1)].ravel())
 
     def _cubic_bezier(self, points, curve, is_closed):
         """
@@ -240,13 +278,43 @@ class Do:
         param elevation: float (lwpolyline code 38)
         is_closed: True / False to indicate if the polygon is open or closed
         """
-        p = curve.splines.new("POLY")
-        p.use_smooth = False
-        p.use_cyclic_u = is_closed
-        p.points.add(len(points) - 1)
+        self._polys([(points, elevation, is_closed)], curve)
 
-        for i, pt in enumerate(points):
-            p.points[i].co = self.proj(pt, elevation).to_4d()
+    def _polys(self, polys, curve):
+        """
+        polys: list of (points, elevation, is_closed) tuples, see _poly()
+        curve: Blender curve data of type "CURVE" (object.data) to which the polys should be added to
+        The points of all polys are projected at once, and set in bulk.
+        """
+        if not polys:
+            return
+        counts = np.array([len(points) for points, elevation, is_closed in polys])
+        elevations = np.repeat([elevation for points, elevation, is_closed in polys], counts)
+        co = np.ones((counts.sum(), 4))
+        co[:, :3] = self.proj_array([pt for points, elevation, is_closed in polys for pt in points], elevations)
+        start = 0
+        for (points, elevation, is_closed), count in zip(polys, counts.tolist()):
+            p = curve.splines.new("POLY")
+            p.use_smooth = False
+            p.use_cyclic_u = is_closed
+            p.points.add(count - 1)
+            p.points.foreach_set("co", co[start:start + count].ravel())
+            start += count
+
+    def _gen_polys(self, entities, curve):
+        """
+        entities: list of DXF entities of type `POLYLINE`, `POLYGON` or `LWPOLYLINE`
+        curve: Blender data structure of type `CURVE`
+        Same as _gen_poly(), but all polygons without bulges are added at once.
+        """
+        polys = []
+        for en in entities:
+            if any([b != 0 for b in en.bulge]):
+                self._cubic_bezier(convert.bulgepoly_to_cubic(self, en), curve, en.is_closed)
+            else:
+                elevation = en.elevation if en.dxftype == "LWPOLYLINE" else 0
+                polys.append((en.points, elevation, en.is_closed))
+        self._polys(polys, curve)
 
     def _gen_poly(self, en, curve, elevation=0):
         if any([b != 0 for b in en.bulge]):
@@ -527,6 +595,72 @@ class Do:
                             bm.faces.new((verts[i], iv, verts[(i + 3) % 4]))
                             bm.faces.new((verts[i + 1], iv, verts[i + 2]))
 
+    @staticmethod
+    def _simple_quads(co):
+        """
+        co: N x 4 x 3 array of quad corners
+        Returns a boolean mask of the quads which are planar and strictly convex. For those _gen_meshface() never
+        splits the face, because no side intersects the line of its opposite side.
+        """
+        co = co - co[:, :1]
+        edges = np.roll(co, -1, axis=1) - co
+        # Newell normal
+        normal = np.cross(co, np.roll(co, -1, axis=1)).sum(axis=1)
+        nlen = np.linalg.norm(normal, axis=1)
+        size = np.linalg.norm(edges, axis=2).max(axis=1)
+        turns = np.einsum("nij,nj->ni", np.cross(edges, np.roll(edges, -1, axis=1)), normal)
+        offplane = np.abs(np.einsum("nij,nj->ni", co, normal)).max(axis=1)
+        eps = 1e-6 * size * size * nlen
+        return (nlen > 0) & (turns > eps[:, None]).all(axis=1) & (offplane < 1e-6 * size * nlen)
+
+    def _gen_meshfaces(self, faces, bm):
+        """
+        faces: list of point lists (see _gen_meshface())
+        bm: bmesh to add the faces to
+        Triangles and simple quads are projected all at once and added through a temporary mesh; anything that needs
+        special treatment (duplicate points, edges, bowtie quads) goes through _gen_meshface().
+        """
+        tris = []
+        quads = []
+        for points in faces:
+            n = len(points)
+            if n == 3 and len(set(points)) == 3:
+                tris.append(points)
+            elif n == 4 and len(set(points)) == 4:
+                quads.append(points)
+            else:
+                self._gen_meshface(points, bm)
+
+        if quads:
+            qco = self.proj_array([p for points in quads for p in points]).reshape(-1, 4, 3)
+            simple = self._simple_quads(qco)
+            for points, is_simple in zip(quads, simple.tolist()):
+                if not is_simple:
+                    self._gen_meshface(points, bm)
+            qco = qco[simple]
+        else:
+            qco = np.empty((0, 4, 3))
+        tco = self.proj_array([p for points in tris for p in points]) if tris else np.empty((0, 3))
+
+        nfaces = len(tco) // 3 + len(qco)
+        if nfaces == 0:
+            return
+        co = np.concatenate((tco, qco.reshape(-1, 3)))
+        loop_total = np.repeat((3, 4), (len(tco) // 3, len(qco)))
+        loop_start = np.concatenate(((0,), np.cumsum(loop_total)[:-1]))
+
+        me = bpy.data.meshes.new("DXF_faces")
+        me.vertices.add(len(co))
+        me.vertices.foreach_set("co", co.ravel())
+        me.loops.add(len(co))
+        me.loops.foreach_set("vertex_index", np.arange(len(co), dtype=np.int32))
+        me.polygons.add(nfaces)
+        me.polygons.foreach_set("loop_start", loop_start.astype(np.int32))
+        me.polygons.foreach_set("loop_total", loop_total.astype(np.int32))
+        me.update(calc_edges=True)
+        bm.from_mesh(me)
+        bpy.data.meshes.remove(me)
+
     def the3dface(self, en, bm):
         """ f: dxf entity
             bm: Blender bmesh data to which the 3DFACE should be added to.
@@ -1114,8 +1248,7 @@ class Do:
         merges a list of LINE entities to a polygon-point-list and adds it to the Blender curve
         """
         polylines = line_merger(lines)
-        for polyline in polylines:
-            self._poly(polyline, curve, 0, polyline[0] == polyline[-1])
+        self._polys([(polyline, 0, polyline[0] == polyline[-1]) for polyline in polylines], curve)
 
     def _thickness(self, bm, thickness):
         """
@@ -1246,16 +1379,23 @@ class Do:
         bm = bmesh.new()
 
         i = 0
+        faces = []
         for en in entities:
             i += 1
+            # faces are collected and added to the bmesh all at once
             if en.dxftype == "3DFACE":
-                self.the3dface(en, bm)
+                faces.append(en.points[:3] if en.points[-1] == en.points[-2] else en.points)
+            elif en.dxftype in ("SOLID", "TRACE"):
+                p = en.points
+                faces.append((p[0], p[1], p[3], p[2]))
             else:
                 dxftype = getattr(self, en.dxftype.lower(), None)
                 if dxftype is not None:
                     dxftype(en, bm)
                 else:
                     self.errors.add(en.dxftype.lower() + " - unknown dxftype")
+        if len(faces) > 0:
+            self._gen_meshfaces(faces, bm)
         if i > 0:
             if hasattr(en, "thickness"):
                 if en.thickness != 0:
@@ -1280,12 +1420,17 @@ class Do:
 
         i = 0
         lines = []
+        polys = []
         for en in entities:
             i += 1
             TYPE = en.dxftype
-            if TYPE == "LINE" and self.merge_lines:
+            # straight segments are collected and added to the curve all at once
+            if TYPE == "LINE":
                 lines.append(en)
                 continue
+            if TYPE in ("POLYLINE", "POLYGON", "LWPOLYLINE"):
+                polys.append(en)
+                continue
             typefunc = getattr(self, TYPE.lower(), None)
             if typefunc is not None:
                 typefunc(en, d)
@@ -1293,7 +1438,12 @@ class Do:
                 self.errors.add(en.dxftype.lower() + " - unknown dxftype")
 
         if len(lines) > 0:
-            self._merge_lines(lines, d)
+            if self.merge_lines:
+                self._merge_lines(lines, d)
+            else:
+                self._polys([([en.start, en.end], 0, False) for en in lines], d)
+        if len(polys) > 0:
+            self._gen_polys(polys, d)
 
         if i > 0:
             self._check3D_object(d)
@@ -19,88 +19,159 @@
 # <pep8 compliant>
 
 
-def line_merger(lines, precision=6):
-    merger = _LineMerger(lines, precision)
+from array import array
+from collections import deque
+from math import floor
+
+
+def line_merger(lines, precision=6, tolerance=None):
+    """
+    lines: LINE entities (with start and end points)
+    precision: number of decimals under which endpoints are considered equal, when no tolerance is given
+    tolerance: maximum distance along each axis between endpoints that are merged
+    returns the merged lines as lists of points
+    """
+    if tolerance is None:
+        tolerance = 10 ** -precision
+    merger = _LineMerger(lines, tolerance)
     return merger.polylines
 
 
-def _round_point(point, precision):
-    return tuple(round(c, precision) for c in point)
+class _PointIndex:
+    """
+    Assigns an id to points, points closer than the tolerance along each axis get the id of the first one of them.
+    Points are hashed in a grid of cells much larger than the tolerance, only the points close to the border of
+    their cell need to be looked for in the neighbouring cells.
+    """
+    CELL_SIZE = 8  # in tolerance units
+
+    def __init__(self, tolerance):
+        self.tolerance = tolerance
+        self.inv_cell_size = 1.0 / (self.CELL_SIZE * tolerance)
+        self.points = []  # id -> point (the first one seen)
+        self.exact = dict()  # point -> id, for exactly matching points
+        self.cells = dict()  # cell -> list of ids of the points in this cell
+
+    def _find_in_cell(self, cell, point):
+        ids = self.cells.get(cell)
+        if ids is not None:
+            tolerance = self.tolerance
+            points = self.points
+            for i in ids:
+                if all(abs(a - b) <= tolerance for a, b in zip(points[i], point)):
+                    return i
+        return None
+
+    def _find(self, point):
+        # cells are centered on round coordinates, such as the 0 of all the z coordinates of 2D drawings
+        inv_cell_size = self.inv_cell_size
+        cell = tuple([floor(c * inv_cell_size + 0.5) for c in point])
+        i = self._find_in_cell(cell, point)
+        if i is not None:
+            return i
+
+        # neighbouring cells, along the axes where the point is close to the border of its cell
+        margin = 1.0 / self.CELL_SIZE
+        low = tuple([floor(c * inv_cell_size + (0.5 - margin)) for c in point])
+        high = tuple([floor(c * inv_cell_size + (0.5 + margin)) for c in point])
+        if low != cell or high != cell:
+            neighbours = [()]
+            for axis in zip(cell, low, high):
+                axis = set(axis)
+                neighbours = [n + (k,) for n in neighbours for k in axis]
+            for neighbour in neighbours:
+                if neighbour != cell:
+                    i = self._find_in_cell(neighbour, point)
+                    if i is not None:
+                        return i
+
+        i = len(self.points)
+        self.points.append(point)
+        self.cells.setdefault(cell, []).append(i)
+        return i
+
+    def get_id(self, point):
+        i = self.exact.get(point)
+        if i is None:
+            i = self.exact[point] = self._find(point)
+        return i
 
 
 class _LineMerger:
-    def __init__(self, lines, precision):
-        self.segments = set()  # single lines as tuples: ((sx, sy[, sz]), (ex, ey[, ez]))
-        self.used_segments = set()
-        self.points = dict()  # key: point -> value: list of segments with this point as start or end point
-        self.precision = precision
+    def __init__(self, lines, tolerance):
+        self.index = _PointIndex(tolerance)
+        # segments as pairs of point ids, stored in two arrays
+        self.starts = array('l')
+        self.ends = array('l')
         self.setup(lines)
         self.polylines = self.merge_lines()  # result of merging process
 
     def setup(self, lines):
+        get_id = self.index.get_id
+        known = set()
         for line in lines:
-            s = _round_point(line.start, self.precision)
-            e = _round_point(line.end, self.precision)
-            self.add_segment(s, e)
-
-    def add_segment(self, start, end):
-        if start == end:
-            return  # this is not a segment
-        if end < start:  # order start and end points to detect all doubles
-            segment = (end, start)
-        else:
-            segment = (start, end)
-        if segment in self.segments:
-            return  # this segment already exist
-        self.segments.add(segment)
-        self.add_point(start, segment)
-        self.add_point(end, segment)
-
-    def add_point(self, point, segment):
-        segments = self.points.get(point)
-        if segments is None:
-            segments = list()
-            self.points[point] = segments
-        segments.append(segment)
-
-    def get_segment_with_point(self, point):
-        segments = self.points.get(point)
-        if segments is None:
-            return None
-
-        # Very important: do not return already used segments
-        for segment in segments:
-            if segment not in self.used_segments:
-                return segment
-        return None
-
-    def mark_as_used_segment(self, segment):
-        self.used_segments.add(segment)
-        self.segments.discard(segment)
+            s = get_id(tuple(line.start))
+            e = get_id(tuple(line.end))
+            if s == e:
+                continue  # this is not a segment
+            segment = (s, e) if s < e else (e, s)
+            if segment in known:
+                continue  # this segment already exist
+            known.add(segment)
+            self.starts.append(s)
+            self.ends.append(e)
 
     def merge_lines(self):
+        starts = self.starts
+        ends = self.ends
+        segments_count = len(starts)
+        points_count = len(self.index.points)
+
+        # segments of each point, as ranges of the point_segments array
+        offsets = array('l', bytes(array('l').itemsize * (points_count + 1)))
+        for p in starts:
+            offsets[p + 1] += 1
+        for p in ends:
+            offsets[p + 1] += 1
+        for p in range(points_count):
+            offsets[p + 1] += offsets[p]
+        point_segments = array('l', bytes(array('l').itemsize * 2 * segments_count))
+        fill = array('l', offsets)
+        for i in range(segments_count):
+            point_segments[fill[starts[i]]] = i
+            fill[starts[i]] += 1
+            point_segments[fill[ends[i]]] = i
+            fill[ends[i]] += 1
+        # first segment of each point that may still be unused, used segments are skipped only once
+        cursors = array('l', offsets[:-1])
+        used = bytearray(segments_count)
+
         def get_extension_point(point):
-            extension = self.get_segment_with_point(point)
-            if extension is not None:
-                self.mark_as_used_segment(extension)
-                if extension[0] == point:
-                    return extension[1]
-                else:
-                    return extension[0]
-            return None
+            j = cursors[point]
+            end = offsets[point + 1]
+            while j < end and used[point_segments[j]]:
+                j += 1
+            cursors[point] = j
+            if j == end:
+                return None
+            segment = point_segments[j]
+            used[segment] = 1
+            return ends[segment] if starts[segment] == point else starts[segment]
 
+        points = self.index.points
         polylines = []
-        while len(self.segments):
-            segment = self.segments.pop()  # take an arbitrary segment
-            self.mark_as_used_segment(segment)
-            polyline = list(segment)  # start a new polyline
+        for i in range(segments_count):
+            if used[i]:
+                continue
+            used[i] = 1
+            polyline = deque((starts[i], ends[i]))  # start a new polyline
             extend_start = True
             extend_end = True
             while extend_start or extend_end:
                 if extend_start:
                     extension_point = get_extension_point(polyline[0])  # extend start of polyline
                     if extension_point is not None:
-                        polyline.insert(0, extension_point)
+                        polyline.appendleft(extension_point)
                     else:
                         extend_start = False
                 if extend_end:
@@ -109,5 +180,5 @@ class _LineMerger:
                         polyline.append(extension_point)
                     else:
                         extend_end = False
-            polylines.append(polyline)
+            polylines.append([points[p] for p in polyline])
         return polylines
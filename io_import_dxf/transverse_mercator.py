@@ -20,6 +20,8 @@
 
 from math import sin, cos, atan, atanh, radians, tan, sinh, asin, cosh, degrees
 
+import numpy as np
+
 # see conversion formulas at
 # http://en.wikipedia.org/wiki/Transverse_Mercator_projection
 # http://mathworld.wolfram.com/MercatorProjection.html
@@ -35,6 +37,8 @@ class TransverseMercator:
         self.lon_rad = radians(self.lon)
 
     def fromGeographic(self, lat, lon):
+        if isinstance(lat, np.ndarray) or isinstance(lon, np.ndarray):
+            return self.fromGeographicArray(lat, lon)
         lat_rad = radians(lat)
         lon_rad = radians(lon)
         B = cos(lat_rad) * sin(lon_rad - self.lon_rad)
@@ -42,6 +46,15 @@ class TransverseMercator:
         y = self.radius * (atan(tan(lat_rad) / cos(lon_rad - self.lon_rad)) - self.lat_rad)
         return x, y
 
+    def fromGeographicArray(self, lat, lon):
+        """fromGeographic() for arrays of coordinates"""
+        lat_rad = np.radians(lat)
+        lon_rad = np.radians(lon)
+        B = np.cos(lat_rad) * np.sin(lon_rad - self.lon_rad)
+        x = self.radius * np.arctanh(B)
+        y = self.radius * (np.arctan(np.tan(lat_rad) / np.cos(lon_rad - self.lon_rad)) - self.lat_rad)
+        return x, y
+
     def toGeographic(self, x, y):
         x /= self.radius
         y /= self.radius
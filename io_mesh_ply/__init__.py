@@ -80,6 +80,18 @@ class ImportPLY(bpy.types.Operator, ImportHelper):
     filename_ext = ".ply"
     filter_glob: StringProperty(default="*.ply", options={'HIDDEN'})
 
+    voxel_size: FloatProperty(
+        name="Voxel Size",
+        description=(
+            "Decimate point clouds (files without faces), "
+            "keeping a single point per voxel of this size "
+            "(0 imports all points)"
+        ),
+        min=0.0, max=1000.0,
+        default=0.0,
+        unit='LENGTH',
+    )
+
     def execute(self, context):
         paths = [os.path.join(self.directory, name.name)
                  for name in self.files]
@@ -89,7 +101,7 @@ class ImportPLY(bpy.types.Operator, ImportHelper):
         from . import import_ply
 
         for path in paths:
-            import_ply.load(self, context, path)
+            import_ply.load(self, context, path, voxel_size=self.voxel_size)
 
         return {'FINISHED'}
 
@@ -129,6 +141,11 @@ class ExportPLY(bpy.types.Operator, ExportHelper):
         description="Export the active vertex color layer",
         default=True,
     )
+    use_ascii: BoolProperty(
+        name="ASCII",
+        description="Export using ASCII file format, otherwise use binary",
+        default=True,
+    )
 
     global_scale: FloatProperty(
         name="Scale",
@@ -220,6 +237,7 @@ class PLY_PT_export_geometry(bpy.types.Panel):
         layout.prop(operator, "use_normals")
         layout.prop(operator, "use_uv_coords")
         layout.prop(operator, "use_colors")
+        layout.prop(operator, "use_ascii")
 
 
 def menu_func_import(self, context):
@@ -27,6 +27,56 @@ Only one mesh can be exported at a time.
 import bpy
 import os
 
+import numpy as np
+
+# Number of lines formatted at once by the ASCII writer.
+LINES_BLOCK_SIZE = 1 << 14
+
+
+def write_lines(fw, fmt, rows):
+    """
+    Write one line per row of the rows array, using the fmt line format.
+    Lines are formatted by blocks, with a single string formatting operation per block.
+    """
+    for i in range(0, len(rows), LINES_BLOCK_SIZE):
+        block = rows[i:i + LINES_BLOCK_SIZE]
+        fw(((fmt * len(block)) % tuple(block.ravel().tolist())).encode("utf8"))
+
+
+def face_runs(faces_start, faces_size):
+    """
+    Yield runs of faces of the same size as (first face, end face, loops) tuples,
+    loops being the (faces, size) array of the loop indices of the faces.
+    """
+    runs = np.flatnonzero(np.append(True, faces_size[1:] != faces_size[:-1])[:len(faces_size)])
+    runs_end = np.append(runs[1:], len(faces_size))
+    for run_start, run_end in zip(runs.tolist(), runs_end.tolist()):
+        size = int(faces_size[run_start])
+        yield run_start, run_end, faces_start[run_start:run_end, np.newaxis] + np.arange(size)
+
+
+def write_faces_ascii(fw, faces_start, faces_size, loops_vert):
+    """Write the faces lines, faces of the same size in a row are formatted together."""
+    for run_start, run_end, loops in face_runs(faces_start, faces_size):
+        size = loops.shape[1]
+        rows = np.empty((run_end - run_start, size + 1), dtype=np.int64)
+        rows[:, 0] = size
+        rows[:, 1:] = loops_vert[loops]
+        write_lines(fw, "%d" + " %d" * size + "\n", rows)
+
+
+def write_faces_binary(fw, faces_start, faces_size, loops_vert, count_type):
+    """
+    Write the faces of a binary little endian file:
+    for each face its vertex count (of count_type) followed by its vertex indices (uint).
+    """
+    for run_start, run_end, loops in face_runs(faces_start, faces_size):
+        size = loops.shape[1]
+        faces = np.empty(run_end - run_start, dtype=[("count", count_type), ("vertex_indices", "<u4", (size,))])
+        faces["count"] = size
+        faces["vertex_indices"] = loops_vert[loops]
+        fw(faces.tobytes())
+
 
 def save_mesh(
         filepath,
@@ -34,17 +84,8 @@ def save_mesh(
         use_normals=True,
         use_uv_coords=True,
         use_colors=True,
+        use_ascii=True,
 ):
-
-    def rvec3d(v):
-        return round(v[0], 6), round(v[1], 6), round(v[2], 6)
-
-    def rvec2d(v):
-        return round(v[0], 6), round(v[1], 6)
-
-    file = open(filepath, "w", encoding="utf8", newline="\n")
-    fw = file.write
-
     has_uv = bool(mesh.uv_layers)
     has_vcol = bool(mesh.vertex_colors)
 
@@ -74,112 +115,116 @@ def save_mesh(
         else:
             active_col_layer = active_col_layer.data
 
-    # in case
-    color = uvcoord = uvcoord_key = normal = normal_key = None
-
     mesh_verts = mesh.vertices  # save a lookup
-    ply_verts = []  # list of dictionaries
-    # vdict = {} # (index, normal, uv) -> new index
-    vdict = [{} for i in range(len(mesh_verts))]
-    ply_faces = [[] for f in range(len(mesh.polygons))]
-    vert_count = 0
-    for i, f in enumerate(mesh.polygons):
-
-        smooth = not use_normals or f.use_smooth
-        if not smooth:
-            normal = f.normal[:]
-            normal_key = rvec3d(normal)
-
-        if has_uv:
-            uv = [
-                active_uv_layer[l].uv[:]
-                for l in range(f.loop_start, f.loop_start + f.loop_total)
-            ]
-        if has_vcol:
-            col = [
-                active_col_layer[l].color[:]
-                for l in range(f.loop_start, f.loop_start + f.loop_total)
-            ]
-
-        pf = ply_faces[i]
-        for j, vidx in enumerate(f.vertices):
-            v = mesh_verts[vidx]
-
-            if smooth:
-                normal = v.normal[:]
-                normal_key = rvec3d(normal)
-
-            if has_uv:
-                uvcoord = uv[j][0], uv[j][1]
-                uvcoord_key = rvec2d(uvcoord)
-
-            if has_vcol:
-                color = col[j]
-                color = (
-                    int(color[0] * 255.0),
-                    int(color[1] * 255.0),
-                    int(color[2] * 255.0),
-                    int(color[3] * 255.0),
-                )
-            key = normal_key, uvcoord_key, color
-
-            vdict_local = vdict[vidx]
-            pf_vidx = vdict_local.get(key)  # Will be None initially
-
-            if pf_vidx is None:  # same as vdict_local.has_key(key)
-                pf_vidx = vdict_local[key] = vert_count
-                ply_verts.append((vidx, normal, uvcoord, color))
-                vert_count += 1
-
-            pf.append(pf_vidx)
-
-    fw("ply\n")
-    fw("format ascii 1.0\n")
-    fw("comment Created by Blender %s - "
-       "www.blender.org, source file: %r\n" %
-       (bpy.app.version_string, os.path.basename(bpy.data.filepath)))
-
-    fw("element vertex %d\n" % len(ply_verts))
-
-    fw("property float x\n"
-       "property float y\n"
-       "property float z\n")
+    mesh_polygons = mesh.polygons
+    verts_co = np.empty(len(mesh_verts) * 3, dtype=np.float32)
+    mesh_verts.foreach_get("co", verts_co)
+    verts_co = verts_co.reshape(-1, 3)
+
+    faces_start = np.empty(len(mesh_polygons), dtype=np.int64)
+    faces_size = np.empty(len(mesh_polygons), dtype=np.int64)
+    mesh_polygons.foreach_get("loop_start", faces_start)
+    mesh_polygons.foreach_get("loop_total", faces_size)
+    loops_face = np.zeros(len(mesh.loops), dtype=np.int64)
+    for run_start, run_end, loops in face_runs(faces_start, faces_size):
+        loops_face[loops] = np.arange(run_start, run_end)[:, np.newaxis]
+    loops_vidx = np.empty(len(mesh.loops), dtype=np.int64)
+    mesh.loops.foreach_get("vertex_index", loops_vidx)
+
+    # A PLY vertex is created for each distinct (vertex, normal, uv, color) combination used by the loops.
+    keys = [loops_vidx[:, np.newaxis].astype(np.float64)]
+    values = [verts_co[loops_vidx]]
+    if use_normals:
+        verts_no = np.empty(len(mesh_verts) * 3, dtype=np.float32)
+        mesh_verts.foreach_get("normal", verts_no)
+        faces_no = np.empty(len(mesh_polygons) * 3, dtype=np.float32)
+        mesh_polygons.foreach_get("normal", faces_no)
+        faces_smooth = np.empty(len(mesh_polygons), dtype=bool)
+        mesh_polygons.foreach_get("use_smooth", faces_smooth)
+        loops_no = np.where(faces_smooth[loops_face, np.newaxis],
+                            verts_no.reshape(-1, 3)[loops_vidx],
+                            faces_no.reshape(-1, 3)[loops_face])
+        # Adding 0.0 so that -0.0 and 0.0 share the same key.
+        keys.append(np.round(loops_no.astype(np.float64), 6) + 0.0)
+        values.append(loops_no)
+    if has_uv:
+        loops_uv = np.empty(len(mesh.loops) * 2, dtype=np.float32)
+        active_uv_layer.foreach_get("uv", loops_uv)
+        loops_uv = loops_uv.reshape(-1, 2)
+        keys.append(np.round(loops_uv.astype(np.float64), 6) + 0.0)
+        values.append(loops_uv)
+    if has_vcol:
+        loops_col = np.empty(len(mesh.loops) * 4, dtype=np.float32)
+        active_col_layer.foreach_get("color", loops_col)
+        loops_col = (loops_col.reshape(-1, 4).astype(np.float64) * 255.0).astype(np.int64)
+        keys.append(loops_col.astype(np.float64))
+        values.append(loops_col)
+
+    # The vertices are sorted by their keys, i.e. in the order of the mesh vertices they come from.
+    if len(mesh.loops):
+        _keys, ply_verts_loop, loops_ply_vert = np.unique(np.hstack(keys), axis=0,
+                                                          return_index=True, return_inverse=True)
+        loops_ply_vert = loops_ply_vert.ravel()
+    else:
+        ply_verts_loop = loops_ply_vert = np.empty(0, dtype=np.int64)
+
+    header = [
+        "ply\n",
+        "format ascii 1.0\n" if use_ascii else "format binary_little_endian 1.0\n",
+        "comment Created by Blender %s - "
+        "www.blender.org, source file: %r\n" %
+        (bpy.app.version_string, os.path.basename(bpy.data.filepath)),
+        "element vertex %d\n" % len(ply_verts_loop),
+        "property float x\n"
+        "property float y\n"
+        "property float z\n",
+    ]
+    fields = [("x", "<f4"), ("y", "<f4"), ("z", "<f4")]
+    fmt = "%.6f %.6f %.6f"
 
     if use_normals:
-        fw("property float nx\n"
-           "property float ny\n"
-           "property float nz\n")
+        header.append("property float nx\n"
+                      "property float ny\n"
+                      "property float nz\n")
+        fields += [("nx", "<f4"), ("ny", "<f4"), ("nz", "<f4")]
+        fmt += " %.6f %.6f %.6f"
     if use_uv_coords:
-        fw("property float s\n"
-           "property float t\n")
+        header.append("property float s\n"
+                      "property float t\n")
+        fields += [("s", "<f4"), ("t", "<f4")]
+        fmt += " %.6f %.6f"
     if use_colors:
-        fw("property uchar red\n"
-           "property uchar green\n"
-           "property uchar blue\n"
-           "property uchar alpha\n")
-
-    fw("element face %d\n" % len(mesh.polygons))
-    fw("property list uchar uint vertex_indices\n")
-    fw("end_header\n")
-
-    for i, v in enumerate(ply_verts):
-        fw("%.6f %.6f %.6f" % mesh_verts[v[0]].co[:])  # co
-        if use_normals:
-            fw(" %.6f %.6f %.6f" % v[1])  # no
-        if use_uv_coords:
-            fw(" %.6f %.6f" % v[2])  # uv
-        if use_colors:
-            fw(" %u %u %u %u" % v[3])  # col
-        fw("\n")
-
-    for pf in ply_faces:
-        # fw(f"{len(pf)} {' '.join(str(x) for x in pf)}\n")
-        fw("%d" % len(pf))
-        for v in pf:
-            fw(" %d" % v)
-        fw("\n")
-
-    file.close()
+        header.append("property uchar red\n"
+                      "property uchar green\n"
+                      "property uchar blue\n"
+                      "property uchar alpha\n")
+        fields += [("red", "u1"), ("green", "u1"), ("blue", "u1"), ("alpha", "u1")]
+        fmt += " %u %u %u %u"
+
+    # The vertex count of faces is stored in a uchar, unless some of them are too large for it.
+    count_type = np.dtype("u1") if not len(faces_size) or faces_size.max() <= 255 else np.dtype("<u4")
+    header.append("element face %d\n" % len(mesh_polygons))
+    header.append("property list %s uint vertex_indices\n" % ("uchar" if count_type.itemsize == 1 else "uint"))
+    header.append("end_header\n")
+
+    with open(filepath, "wb") as file:
+        fw = file.write
+        fw("".join(header).encode("utf8"))
+
+        if use_ascii:
+            rows = np.hstack([value[ply_verts_loop].astype(np.float64) for value in values])
+            write_lines(fw, fmt + "\n", rows)
+            write_faces_ascii(fw, faces_start, faces_size, loops_ply_vert)
+        else:
+            ply_verts = np.empty(len(ply_verts_loop), dtype=fields)
+            column = 0
+            for value in values:
+                for j in range(value.shape[1]):
+                    ply_verts[fields[column][0]] = value[ply_verts_loop, j]
+                    column += 1
+            fw(ply_verts.tobytes())
+            write_faces_binary(fw, faces_start, faces_size, loops_ply_vert, count_type)
+
     print("writing %r done" % filepath)
 
     return {'FINISHED'}
@@ -193,6 +238,7 @@ def save(
         use_normals=True,
         use_uv_coords=True,
         use_colors=True,
+        use_ascii=True,
         global_matrix=None
 ):
     obj = context.active_object
@@ -224,6 +270,7 @@ def save(
                     use_normals=use_normals,
                     use_uv_coords=use_uv_coords,
                     use_colors=use_colors,
+                    use_ascii=use_ascii,
                     )
 
     mesh_owner_object.to_mesh_clear()
@@ -18,9 +18,12 @@
 
 # <pep8 compliant>
 
+import array
 import re
 import struct
 
+import numpy as np
+
 
 class element_spec(object):
     __slots__ = (
@@ -45,6 +48,161 @@ class element_spec(object):
                 return i
         return -1
 
+    def list_index(self):
+        # Vertex indices of faces, some writers name them "vertex_index",
+        # others anything else, then take the first list.
+        for name in (b'vertex_indices', b'vertex_index'):
+            i = self.index(name)
+            if i != -1:
+                return i
+        for i, p in enumerate(self.properties):
+            if p.list_type is not None:
+                return i
+        return -1
+
+    def dtype(self, format, list_counts):
+        """
+        Numpy structured dtype of a binary record of this element, given the item count of each of its lists.
+        List counts are stored in a 'name.count' field, before the 'name' field of the list items.
+        """
+        list_counts = iter(list_counts)
+        fields = []
+        for p in self.properties:
+            name = p.name.decode('ascii', 'replace')
+            if p.list_type is not None:
+                fields.append((name + '.count', format + p.list_type))
+                fields.append((name, format + p.numeric_type, (next(list_counts),)))
+            else:
+                fields.append((name, format + p.numeric_type))
+        return np.dtype(fields)
+
+    def columns_from_records(self, records):
+        """
+        Convert records loaded one by one into columns, see load_columns().
+        """
+        columns = {}
+        for i, p in enumerate(self.properties):
+            values = [r[i] for r in records]
+            if p.numeric_type == 's':
+                columns[p.name] = values
+            elif p.list_type is not None:
+                counts = np.fromiter(map(len, values), dtype=np.int64, count=len(values))
+                columns[p.name] = (counts, np.array([v for l in values for v in l], dtype=p.numeric_type))
+            else:
+                columns[p.name] = np.array(values, dtype=p.numeric_type)
+        return columns
+
+    def load_columns(self, format, stream):
+        """
+        Load all the records of this element at once, as a dict mapping property names to columns:
+        a numpy array for scalar properties, a (counts, items) pair of numpy arrays for list properties,
+        and a list of strings for string properties.
+        """
+        if not self.count or any(p.numeric_type == 's' or p.list_type == 's' for p in self.properties):
+            return self.columns_from_records([self.load(format, stream) for j in range(self.count)])
+        if format == b'ascii':
+            return self.load_ascii_columns(stream)
+        return self.load_binary_columns(format, stream)
+
+    def load_ascii_columns(self, stream):
+        lines = [stream.readline().split() for j in range(self.count)]
+
+        # Fast path when all records have the same number of values.
+        width = len(lines[0])
+        if all(len(l) == width for l in lines):
+            tokens = np.array(lines).reshape(self.count, width)
+            columns = {}
+            col = 0
+            for p in self.properties:
+                if p.list_type is not None:
+                    if col >= width:
+                        break
+                    counts = tokens[:, col].astype(np.int64)
+                    list_count = counts[0]
+                    if (counts != list_count).any() or col + 1 + list_count > width:
+                        break
+                    items = tokens[:, col + 1:col + 1 + list_count].astype(np.float64).astype(p.numeric_type)
+                    columns[p.name] = (counts, items.ravel())
+                    col += 1 + list_count
+                else:
+                    if col >= width:
+                        break
+                    columns[p.name] = tokens[:, col].astype(np.float64).astype(p.numeric_type)
+                    col += 1
+            else:
+                return columns
+
+        return self.columns_from_records([[p.load(b'ascii', l) for p in self.properties] for l in lines])
+
+    def load_binary_columns(self, format, stream):
+        start = stream.tell()
+
+        # Fast path, when all lists of all records have the same count as in the first one:
+        # records can be read as a whole, in a numpy structured array.
+        first = self.load(format, stream)
+        stream.seek(start)
+        dtype = self.dtype(format, [len(v) for p, v in zip(self.properties, first) if p.list_type is not None])
+        data = stream.read(dtype.itemsize * self.count)
+        if len(data) == dtype.itemsize * self.count:
+            records = np.frombuffer(data, dtype=dtype)
+            list_names = [p.name.decode('ascii', 'replace') for p in self.properties if p.list_type is not None]
+            if all((records[name + '.count'] == records[name].shape[1]).all() for name in list_names):
+                columns = {}
+                for p in self.properties:
+                    name = p.name.decode('ascii', 'replace')
+                    if p.list_type is not None:
+                        columns[p.name] = (records[name + '.count'].astype(np.int64), records[name].ravel())
+                    else:
+                        columns[p.name] = records[name]
+                return columns
+
+        # Records of varying sizes, only walk over them to find their list counts.
+        stream.seek(start)
+        data = stream.read()
+        lists = []  # (fixed size before the list count, list count unpack function, list count size, list item size)
+        fixed_size = 0
+        for p in self.properties:
+            if p.list_type is not None:
+                count_struct = struct.Struct(format + p.list_type)
+                lists.append((fixed_size, count_struct.unpack_from, count_struct.size,
+                              struct.calcsize(format + p.numeric_type)))
+                fixed_size = 0
+            else:
+                fixed_size += struct.calcsize(format + p.numeric_type)
+        records_start = array.array('q')
+        lists_count = [array.array('q') for _ in lists]
+        offset = 0
+        for j in range(self.count):
+            records_start.append(offset)
+            for (size_before, unpack_count, count_size, item_size), list_count in zip(lists, lists_count):
+                offset += size_before
+                count = int(unpack_count(data, offset)[0])
+                list_count.append(count)
+                offset += count_size + count * item_size
+            offset += fixed_size
+        stream.seek(start + offset)
+
+        # Gather the values of each property, with their offsets in the records.
+        data = np.frombuffer(data, dtype=np.uint8, count=offset)
+        offsets = np.frombuffer(records_start, dtype=np.int64).copy()
+        lists_count = iter(lists_count)
+        columns = {}
+        for p in self.properties:
+            item_dtype = np.dtype(format + p.numeric_type)
+            if p.list_type is not None:
+                counts = np.frombuffer(next(lists_count), dtype=np.int64)
+                offsets += struct.calcsize(format + p.list_type)
+                # Offsets of all the items of the lists, one after the other.
+                items_offset = np.repeat(offsets - (np.cumsum(counts) - counts) * item_dtype.itemsize, counts)
+                items_offset += np.arange(counts.sum()) * item_dtype.itemsize
+                items = data[items_offset[:, np.newaxis] + np.arange(item_dtype.itemsize)].view(item_dtype).ravel()
+                columns[p.name] = (counts, items)
+                offsets += counts * item_dtype.itemsize
+            else:
+                columns[p.name] = data[offsets[:, np.newaxis] + np.arange(item_dtype.itemsize)].view(item_dtype).ravel()
+                offsets += item_dtype.itemsize
+        return columns
+
 
 class property_spec(object):
     __slots__ = (
@@ -111,7 +269,7 @@ class object_spec(object):
         self.specs = []
 
     def load(self, format, stream):
-        return dict([(i.name, [i.load(format, stream) for j in range(i.count)]) for i in self.specs])
+        return dict([(i.name, i.load_columns(format, stream)) for i in self.specs])
 
         '''
         # Longhand for above LC
@@ -126,7 +284,11 @@ class object_spec(object):
             '''
 
 
-def read(filepath):
+def read_header(plyf):
+    """
+    Read the header of an opened PLY file, leaving the file at the start of the element data.
+    Return the (obj_spec, format, texture) tuple, or None when the header is invalid.
+    """
     format = b''
     texture = b''
     version = b'1.0'
@@ -155,80 +317,275 @@ def read(filepath):
         b'string': 's',
     }
     obj_spec = object_spec()
-    invalid_ply = (None, None, None)
-
-    with open(filepath, 'rb') as plyf:
-        signature = plyf.readline()
+    invalid_ply = None
 
-        if not signature.startswith(b'ply'):
-            print('Signature line was invalid')
-            return invalid_ply
+    signature = plyf.readline()
 
-        valid_header = False
-        for line in plyf:
-            tokens = re.split(br'[ \r\n]+', line)
+    if not signature.startswith(b'ply'):
+        print('Signature line was invalid')
+        return invalid_ply
 
-            if len(tokens) == 0:
-                continue
-            if tokens[0] == b'end_header':
-                valid_header = True
-                break
-            elif tokens[0] == b'comment':
-                if len(tokens) < 2:
-                    continue
-                elif tokens[1] == b'TextureFile':
-                    if len(tokens) < 4:
-                        print('Invalid texture line')
-                    else:
-                        texture = tokens[2]
-                continue
+    valid_header = False
+    for line in plyf:
+        tokens = re.split(br'[ \r\n]+', line)
 
-            elif tokens[0] == b'obj_info':
+        if len(tokens) == 0:
+            continue
+        if tokens[0] == b'end_header':
+            valid_header = True
+            break
+        elif tokens[0] == b'comment':
+            if len(tokens) < 2:
                 continue
-            elif tokens[0] == b'format':
-                if len(tokens) < 3:
-                    print('Invalid format line')
-                    return invalid_ply
-                if tokens[1] not in format_specs:
-                    print('Unknown format', tokens[1])
-                    return invalid_ply
-                try:
-                    version_test = float(tokens[2])
-                except Exception as ex:
-                    print('Unknown version', ex)
-                    version_test = None
-                if version_test != float(version):
-                    print('Unknown version', tokens[2])
-                    return invalid_ply
-                del version_test
-                format = tokens[1]
-            elif tokens[0] == b'element':
-                if len(tokens) < 3:
-                    print(b'Invalid element line')
-                    return invalid_ply
-                obj_spec.specs.append(element_spec(tokens[1], int(tokens[2])))
-            elif tokens[0] == b'property':
-                if not len(obj_spec.specs):
-                    print('Property without element')
-                    return invalid_ply
-                if tokens[1] == b'list':
-                    obj_spec.specs[-1].properties.append(property_spec(tokens[4], type_specs[tokens[2]], type_specs[tokens[3]]))
+            elif tokens[1] == b'TextureFile':
+                if len(tokens) < 4:
+                    print('Invalid texture line')
                 else:
-                    obj_spec.specs[-1].properties.append(property_spec(tokens[2], None, type_specs[tokens[1]]))
-        if not valid_header:
-            print("Invalid header ('end_header' line not found!)")
-            return invalid_ply
+                    texture = tokens[2]
+            continue
+
+        elif tokens[0] == b'obj_info':
+            continue
+        elif tokens[0] == b'format':
+            if len(tokens) < 3:
+                print('Invalid format line')
+                return invalid_ply
+            if tokens[1] not in format_specs:
+                print('Unknown format', tokens[1])
+                return invalid_ply
+            try:
+                version_test = float(tokens[2])
+            except Exception as ex:
+                print('Unknown version', ex)
+                version_test = None
+            if version_test != float(version):
+                print('Unknown version', tokens[2])
+                return invalid_ply
+            del version_test
+            format = tokens[1]
+        elif tokens[0] == b'element':
+            if len(tokens) < 3:
+                print(b'Invalid element line')
+                return invalid_ply
+            obj_spec.specs.append(element_spec(tokens[1], int(tokens[2])))
+        elif tokens[0] == b'property':
+            if not len(obj_spec.specs):
+                print('Property without element')
+                return invalid_ply
+            if tokens[1] == b'list':
+                obj_spec.specs[-1].properties.append(property_spec(tokens[4], type_specs[tokens[2]], type_specs[tokens[3]]))
+            else:
+                obj_spec.specs[-1].properties.append(property_spec(tokens[2], None, type_specs[tokens[1]]))
+    if not valid_header:
+        print("Invalid header ('end_header' line not found!)")
+        return invalid_ply
+
+    return obj_spec, format_specs[format], texture
 
-        obj = obj_spec.load(format_specs[format], plyf)
+
+def read(filepath):
+    with open(filepath, 'rb') as plyf:
+        header = read_header(plyf)
+        if header is None:
+            return None, None, None
+        obj_spec, format, texture = header
+        obj = obj_spec.load(format, plyf)
 
     return obj_spec, obj, texture
 
 
+class voxel_grid(object):
+    """
+    Decimation filter for point clouds, keeping the first point that falls in each cell of a regular grid.
+    Points are filtered by batches, cells taken by the points of previous batches are remembered.
+    """
+    __slots__ = (
+        "size",
+        "origin",
+        "cells",
+        "far_cells",
+    )
+
+    # Cells within that many cells of the origin are packed in a single int64 key, 21 bits per axis.
+    PACK_RANGE = 1 << 20
+
+    def __init__(self, size):
+        self.size = size
+        self.origin = None
+        # Sorted keys of the taken cells: packed keys for the cells around the origin,
+        # the raw bytes of their 3 int64 grid coordinates for the others.
+        self.cells = np.empty(0, dtype=np.int64)
+        self.far_cells = np.empty(0, dtype='V24')
+
+    @staticmethod
+    def take(taken_cells, cells):
+        """
+        Add the first occurrence of the given cells to the sorted taken_cells array.
+        Return the new taken cells, and the indices in cells of the newly taken ones.
+        """
+        cells, first = np.unique(cells, return_index=True)
+        pos = np.searchsorted(taken_cells, cells)
+        taken = np.zeros(len(cells), dtype=bool)
+        inside = pos < len(taken_cells)
+        taken[inside] = taken_cells[pos[inside]] == cells[inside]
+        return np.insert(taken_cells, pos[~taken], cells[~taken]), first[~taken]
+
+    def filter(self, co):
+        """Return the indices of the points of the co array (N x 3) to keep, in ascending order."""
+        cells = np.floor(co / self.size).astype(np.int64)
+        if self.origin is None and len(cells):
+            self.origin = cells[0].copy()
+        cells -= self.origin
+        near = (np.abs(cells) < self.PACK_RANGE).all(axis=1)
+        near_idx = np.flatnonzero(near)
+        far_idx = np.flatnonzero(~near)
+
+        packed = (cells[near_idx] + self.PACK_RANGE) << np.array([42, 21, 0], dtype=np.int64)
+        self.cells, keep_near = self.take(self.cells, np.bitwise_or.reduce(packed, axis=1))
+        keep = near_idx[keep_near]
+        if len(far_idx):
+            self.far_cells, keep_far = self.take(self.far_cells,
+                                                 np.ascontiguousarray(cells[far_idx]).view('V24').ravel())
+            keep = np.concatenate((keep, far_idx[keep_far]))
+        return np.sort(keep)
+
+
+# Number of points read at once by the point cloud importer.
+POINTS_BATCH_SIZE = 1 << 20
+
+
+def is_point_cloud(obj_spec):
+    """
+    A point cloud only has vertices, and only scalar vertex properties,
+    so that its vertices can be streamed by batches.
+    """
+    names = set()
+    for el in obj_spec.specs:
+        if el.name == b'vertex':
+            if any(p.list_type is not None or p.numeric_type == 's' for p in el.properties):
+                return False
+        elif el.count:
+            return False
+        names.add(el.name)
+    return b'vertex' in names
+
+
 import bpy
 
 
-def load_ply_mesh(filepath, ply_name):
-    from bpy_extras.io_utils import unpack_face_list
+def load_ply_points(plyf, obj_spec, format, ply_name, voxel_size=0.0, batch_size=POINTS_BATCH_SIZE, report=None):
+    """
+    Create a mesh with loose vertices from a point cloud (see is_point_cloud()).
+    Vertices are read by batches of batch_size, and optionally decimated with a voxel_grid of voxel_size.
+    Normals and colors are stored in "Normal" and "Col" point attributes, which need Blender 2.91+.
+    """
+    if report is None:
+        def report(type, message):
+            print(message)
+
+    el = next(el for el in obj_spec.specs if el.name == b'vertex')
+
+    noindices = (b'nx', b'ny', b'nz')
+    if any(el.index(name) == -1 for name in noindices):
+        noindices = None
+    # ignore alpha if not present
+    if el.index(b'alpha') == -1:
+        colindices = b'red', b'green', b'blue'
+    else:
+        colindices = b'red', b'green', b'blue', b'alpha'
+    if any(el.index(name) == -1 for name in colindices):
+        if any(el.index(name) > -1 for name in colindices):
+            print("Warning: At least one obligatory color channel is missing, ignoring vertex colors.")
+        colindices = None
+        colmultiply = None
+    else:  # if not a float assume uchar
+        colmultiply = [1.0 if el.properties[el.index(name)].numeric_type in {'f', 'd'} else (1.0 / 255.0)
+                       for name in colindices]
+
+    # Loose vertices have no loops to hold vertex colors, and their normals are recalculated,
+    # only generic attributes can store them.
+    if (noindices or colindices) and "attributes" not in bpy.types.Mesh.bl_rna.properties:
+        report({'WARNING'}, "Point normals and colors need Blender 2.91 or newer, they were not imported")
+        noindices = colindices = None
+
+    grid = voxel_grid(voxel_size) if voxel_size > 0.0 else None
+
+    # Without decimation the number of points is known, batches are copied in place.
+    # Otherwise the kept points of each batch are gathered, and concatenated at the end.
+    if grid is None:
+        co = np.empty((el.count, 3), dtype=np.float32)
+        no = np.empty((el.count, 3), dtype=np.float32) if noindices else None
+        col = np.ones((el.count, 4), dtype=np.float32) if colindices else None
+    else:
+        co_batches = []
+        no_batches = []
+        col_batches = []
+
+    points_count = 0
+    for batch_start in range(0, el.count, batch_size):
+        batch = element_spec(el.name, min(batch_size, el.count - batch_start))
+        batch.properties = el.properties
+        columns = batch.load_columns(format, plyf)
+
+        batch_co = np.column_stack([columns[name] for name in (b'x', b'y', b'z')]).astype(np.float32)
+        batch_no = batch_col = None
+        if noindices:
+            batch_no = np.column_stack([columns[name] for name in noindices]).astype(np.float32)
+        if colindices:
+            batch_col = np.ones((batch.count, 4), dtype=np.float32)
+            for i, (name, mult) in enumerate(zip(colindices, colmultiply)):
+                batch_col[:, i] = columns[name] * mult
+
+        if grid is None:
+            batch_end = batch_start + batch.count
+            co[batch_start:batch_end] = batch_co
+            if noindices:
+                no[batch_start:batch_end] = batch_no
+            if colindices:
+                col[batch_start:batch_end] = batch_col
+        else:
+            keep = grid.filter(batch_co.astype(np.float64))
+            co_batches.append(batch_co[keep])
+            if noindices:
+                no_batches.append(batch_no[keep])
+            if colindices:
+                col_batches.append(batch_col[keep])
+        points_count += batch.count
+
+    if grid is not None:
+        co = np.concatenate(co_batches) if co_batches else np.empty((0, 3), dtype=np.float32)
+        if noindices:
+            no = np.concatenate(no_batches) if no_batches else np.empty((0, 3), dtype=np.float32)
+        if colindices:
+            col = np.concatenate(col_batches) if col_batches else np.empty((0, 4), dtype=np.float32)
+        report({'INFO'}, "Decimated %d points to %d" % (points_count, len(co)))
+
+    mesh = bpy.data.meshes.new(name=ply_name)
+    mesh.vertices.add(len(co))
+    mesh.vertices.foreach_set("co", co.ravel())
+
+    if noindices:
+        no_attr = mesh.attributes.new("Normal", 'FLOAT_VECTOR', 'POINT')
+        no_attr.data.foreach_set("vector", no.ravel())
+
+    if colindices:
+        col_attr = mesh.attributes.new("Col", 'FLOAT_COLOR', 'POINT')
+        col_attr.data.foreach_set("color", col.ravel())
+
+    mesh.update()
+
+    return mesh
+
+
+def load_ply_mesh(filepath, ply_name, voxel_size=0.0, report=None):
+    with open(filepath, 'rb') as plyf:
+        header = read_header(plyf)
+        if header is None:
+            print('Invalid file')
+            return
+        obj_spec, format, texture = header
+        if is_point_cloud(obj_spec):
+            return load_ply_points(plyf, obj_spec, format, ply_name, voxel_size=voxel_size, report=report)
 
     obj_spec, obj, texture = read(filepath)
     # XXX28: use texture
@@ -238,137 +595,101 @@ def load_ply_mesh(filepath, ply_name):
 
     uvindices = colindices = None
     colmultiply = None
+    faceindices = {}
 
     # noindices = None # Ignore normals
 
     for el in obj_spec.specs:
         if el.name == b'vertex':
-            vindices_x, vindices_y, vindices_z = el.index(b'x'), el.index(b'y'), el.index(b'z')
             # noindices = (el.index('nx'), el.index('ny'), el.index('nz'))
             # if -1 in noindices: noindices = None
-            uvindices = (el.index(b's'), el.index(b't'))
-            if -1 in uvindices:
+            uvindices = (b's', b't')
+            if any(el.index(name) == -1 for name in uvindices):
                 uvindices = None
             # ignore alpha if not present
             if el.index(b'alpha') == -1:
-                colindices = el.index(b'red'), el.index(b'green'), el.index(b'blue')
+                colindices = b'red', b'green', b'blue'
             else:
-                colindices = el.index(b'red'), el.index(b'green'), el.index(b'blue'), el.index(b'alpha')
-            if -1 in colindices:
-                if any(idx > -1 for idx in colindices):
+                colindices = b'red', b'green', b'blue', b'alpha'
+            if any(el.index(name) == -1 for name in colindices):
+                if any(el.index(name) > -1 for name in colindices):
                     print("Warning: At least one obligatory color channel is missing, ignoring vertex colors.")
                 colindices = None
             else:  # if not a float assume uchar
-                colmultiply = [1.0 if el.properties[i].numeric_type in {'f', 'd'} else (1.0 / 255.0) for i in colindices]
+                colmultiply = [1.0 if el.properties[el.index(name)].numeric_type in {'f', 'd'} else (1.0 / 255.0)
+                               for name in colindices]
+        elif el.name in {b'face', b'tristrips'}:
+            findex = el.list_index()
+            if findex != -1:
+                faceindices[el.name] = el.properties[findex].name
 
-        elif el.name == b'face':
-            findex = el.index(b'vertex_indices')
-        elif el.name == b'tristrips':
-            trindex = el.index(b'vertex_indices')
-        elif el.name == b'edge':
-            eindex1, eindex2 = el.index(b'vertex1'), el.index(b'vertex2')
+    verts = obj[b'vertex']
 
-    mesh_faces = []
-    mesh_uvs = []
-    mesh_colors = []
+    # Faces as a flat array of vertex indices, and the number of vertices of each face.
+    faces_size = [np.zeros(0, dtype=np.int64)]
+    loops_vert = [np.zeros(0, dtype=np.int64)]
 
-    def add_face(vertices, indices, uvindices, colindices):
-        mesh_faces.append(indices)
-        if uvindices:
-            mesh_uvs.extend([(vertices[index][uvindices[0]], vertices[index][uvindices[1]]) for index in indices])
-        if colindices:
-            if len(colindices) == 3:
-                mesh_colors.extend([
-                    (
-                       vertices[index][colindices[0]] * colmultiply[0],
-                       vertices[index][colindices[1]] * colmultiply[1],
-                       vertices[index][colindices[2]] * colmultiply[2],
-                       1.0
-                    )
-                    for index in indices
-                ])
-            elif len(colindices) == 4:
-                mesh_colors.extend([
-                    (
-                       vertices[index][colindices[0]] * colmultiply[0],
-                       vertices[index][colindices[1]] * colmultiply[1],
-                       vertices[index][colindices[2]] * colmultiply[2],
-                       vertices[index][colindices[3]] * colmultiply[3],
-                    )
-                    for index in indices
-                ])
+    if b'face' in faceindices:
+        counts, indices = obj[b'face'][faceindices[b'face']]
+        faces_size.append(counts)
+        loops_vert.append(indices.astype(np.int64))
+
+    if b'tristrips' in faceindices:
+        counts, indices = obj[b'tristrips'][faceindices[b'tristrips']]
+        # Each item of a strip starts a triangle, but the last two.
+        tris_count = np.maximum(counts - 2, 0)
+        tris_start = np.repeat(np.cumsum(counts) - counts - (np.cumsum(tris_count) - tris_count), tris_count)
+        tris_start += np.arange(tris_count.sum())
+        faces_size.append(np.full(len(tris_start), 3, dtype=np.int64))
+        loops_vert.append(indices[tris_start[:, np.newaxis] + np.arange(3)].ravel().astype(np.int64))
+
+    faces_size = np.concatenate(faces_size)
+    loops_vert = np.concatenate(loops_vert)
+    faces_loop_start = np.cumsum(faces_size) - faces_size
 
     if uvindices or colindices:
         # If we have Cols or UVs then we need to check the face order.
-        add_face_simple = add_face
-
         # EVIL EEKADOODLE - face order annoyance.
-        def add_face(vertices, indices, uvindices, colindices):
-            if len(indices) == 4:
-                if indices[2] == 0 or indices[3] == 0:
-                    indices = indices[2], indices[3], indices[0], indices[1]
-            elif len(indices) == 3:
-                if indices[2] == 0:
-                    indices = indices[1], indices[2], indices[0]
-
-            add_face_simple(vertices, indices, uvindices, colindices)
-
-    verts = obj[b'vertex']
-
-    if b'face' in obj:
-        for f in obj[b'face']:
-            ind = f[findex]
-            add_face(verts, ind, uvindices, colindices)
-
-    if b'tristrips' in obj:
-        for t in obj[b'tristrips']:
-            ind = t[trindex]
-            len_ind = len(ind)
-            for j in range(len_ind - 2):
-                add_face(verts, (ind[j], ind[j + 1], ind[j + 2]), uvindices, colindices)
+        for size, shift in ((4, 2), (3, 1)):
+            start = faces_loop_start[faces_size == size]
+            loops = start[:, np.newaxis] + np.arange(size)
+            face_verts = loops_vert[loops]
+            if size == 4:
+                rotate = (face_verts[:, 2] == 0) | (face_verts[:, 3] == 0)
+            else:
+                rotate = face_verts[:, 2] == 0
+            loops_vert[loops[rotate]] = np.roll(face_verts[rotate], -shift, axis=1)
 
     mesh = bpy.data.meshes.new(name=ply_name)
 
-    mesh.vertices.add(len(obj[b'vertex']))
+    mesh.vertices.add(len(verts[b'x']))
 
-    mesh.vertices.foreach_set("co", [a for v in obj[b'vertex'] for a in (v[vindices_x], v[vindices_y], v[vindices_z])])
+    mesh.vertices.foreach_set("co", np.column_stack((verts[b'x'], verts[b'y'], verts[b'z'])).astype(np.float32).ravel())
 
     if b'edge' in obj:
-        mesh.edges.add(len(obj[b'edge']))
-        mesh.edges.foreach_set("vertices", [a for e in obj[b'edge'] for a in (e[eindex1], e[eindex2])])
-
-    if mesh_faces:
-        loops_vert_idx = []
-        faces_loop_start = []
-        faces_loop_total = []
-        lidx = 0
-        for f in mesh_faces:
-            nbr_vidx = len(f)
-            loops_vert_idx.extend(f)
-            faces_loop_start.append(lidx)
-            faces_loop_total.append(nbr_vidx)
-            lidx += nbr_vidx
-
-        mesh.loops.add(len(loops_vert_idx))
-        mesh.polygons.add(len(mesh_faces))
-
-        mesh.loops.foreach_set("vertex_index", loops_vert_idx)
-        mesh.polygons.foreach_set("loop_start", faces_loop_start)
-        mesh.polygons.foreach_set("loop_total", faces_loop_total)
+        edges = obj[b'edge']
+        mesh.edges.add(len(edges[b'vertex1']))
+        mesh.edges.foreach_set("vertices", np.column_stack((edges[b'vertex1'], edges[b'vertex2'])).astype(np.int32).ravel())
+
+    if len(faces_size):
+        mesh.loops.add(len(loops_vert))
+        mesh.polygons.add(len(faces_size))
+
+        mesh.loops.foreach_set("vertex_index", loops_vert.astype(np.int32))
+        mesh.polygons.foreach_set("loop_start", faces_loop_start.astype(np.int32))
+        mesh.polygons.foreach_set("loop_total", faces_size.astype(np.int32))
 
         if uvindices:
             uv_layer = mesh.uv_layers.new()
-            for i, uv in enumerate(uv_layer.data):
-                uv.uv = mesh_uvs[i]
+            uvs = np.column_stack([verts[name][loops_vert] for name in uvindices])
+            uv_layer.data.foreach_set("uv", uvs.astype(np.float32).ravel())
 
         if colindices:
             vcol_lay = mesh.vertex_colors.new()
-
-            for i, col in enumerate(vcol_lay.data):
-                col.color[0] = mesh_colors[i][0]
-                col.color[1] = mesh_colors[i][1]
-                col.color[2] = mesh_colors[i][2]
-                col.color[3] = mesh_colors[i][3]
+            colors = np.ones((len(loops_vert), 4), dtype=np.float32)
+            for i, (name, mult) in enumerate(zip(colindices, colmultiply)):
+                colors[:, i] = verts[name][loops_vert] * mult
+            vcol_lay.data.foreach_set("color", colors.ravel())
 
     mesh.update()
     mesh.validate()
@@ -406,13 +727,13 @@ def load_ply_mesh(filepath, ply_name):
     return mesh
 
 
-def load_ply(filepath):
+def load_ply(filepath, voxel_size=0.0, report=None):
     import time
 
     t = time.time()
     ply_name = bpy.path.display_name_from_filepath(filepath)
 
-    mesh = load_ply_mesh(filepath, ply_name)
+    mesh = load_ply_mesh(filepath, ply_name, voxel_size=voxel_size, report=report)
     if not mesh:
         return {'CANCELLED'}
 
@@ -425,5 +746,5 @@ def load_ply(filepath):
     return {'FINISHED'}
 
 
-def load(operator, context, filepath=""):
-    return load_ply(filepath)
+def load(operator, context, filepath="", voxel_size=0.0):
+    return load_ply(filepath, voxel_size=voxel_size, report=operator.report)
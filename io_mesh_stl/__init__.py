@@ -255,7 +255,7 @@ class ExportSTL(Operator, ExportHelper):
     def execute(self, context):
         from . import stl_utils
         from . import blender_utils
-        import itertools
+        import numpy as np
         from mathutils import Matrix
         keywords = self.as_keywords(ignore=("axis_forward",
                                             "axis_up",
@@ -284,9 +284,10 @@ class ExportSTL(Operator, ExportHelper):
                                         ).to_4x4() @ Matrix.Scale(global_scale, 4)
 
         if self.batch_mode == 'OFF':
-            faces = itertools.chain.from_iterable(
-                    blender_utils.faces_from_mesh(ob, global_matrix, self.use_mesh_modifiers)
-                    for ob in data_seq)
+            faces = np.concatenate(
+                    [blender_utils.faces_from_mesh(ob, global_matrix, self.use_mesh_modifiers)
+                     for ob in data_seq] +
+                    [np.empty((0, 3, 3), dtype=np.float32)])
 
             stl_utils.write_stl(faces=faces, **keywords)
         elif self.batch_mode == 'OBJECT':
@@ -19,38 +19,44 @@
 # <pep8 compliant>
 
 import bpy
-import array
-from itertools import chain
+import numpy as np
 
 
 def create_and_link_mesh(name, faces, face_nors, points, global_matrix):
     """
-    Create a blender mesh and object called name from a list of
+    Create a blender mesh and object called name from arrays of
     *points* and *faces* and link it in the current scene.
     """
 
     mesh = bpy.data.meshes.new(name)
-    mesh.from_pydata(points, [], faces)
-
-    if face_nors:
+    mesh.vertices.add(len(points))
+    mesh.vertices.foreach_set("co", np.asarray(points, dtype=np.float32).ravel())
+    mesh.loops.add(len(faces) * 3)
+    mesh.loops.foreach_set("vertex_index", np.asarray(faces, dtype=np.int32).ravel())
+    mesh.polygons.add(len(faces))
+    mesh.polygons.foreach_set("loop_start", np.arange(0, len(faces) * 3, 3, dtype=np.int32))
+    mesh.polygons.foreach_set("loop_total", np.full(len(faces), 3, dtype=np.int32))
+    mesh.update(calc_edges=True)
+
+    if face_nors is not None:
         # Note: we store 'temp' normals in loops, since validate() may alter final mesh,
         #       we can only set custom lnors *after* calling it.
         mesh.create_normals_split()
-        lnors = tuple(chain(*chain(*zip(face_nors, face_nors, face_nors))))
-        mesh.loops.foreach_set("normal", lnors)
+        lnors = np.repeat(np.asarray(face_nors, dtype=np.float32), 3, axis=0)
+        mesh.loops.foreach_set("normal", lnors.ravel())
 
     mesh.transform(global_matrix)
 
     # update mesh to allow proper display
     mesh.validate(clean_customdata=False)  # *Very* important to not remove lnors here!
 
-    if face_nors:
-        clnors = array.array('f', [0.0] * (len(mesh.loops) * 3))
-        mesh.loops.foreach_get("normal", clnors)
+    if face_nors is not None:
+        clnors = np.empty((len(mesh.loops), 3), dtype=np.float32)
+        mesh.loops.foreach_get("normal", clnors.ravel())
 
-        mesh.polygons.foreach_set("use_smooth", [True] * len(mesh.polygons))
+        mesh.polygons.foreach_set("use_smooth", np.ones(len(mesh.polygons), dtype=np.bool_))
 
-        mesh.normals_split_custom_set(tuple(zip(*(iter(clnors),) * 3)))
+        mesh.normals_split_custom_set(clnors)
         mesh.use_auto_smooth = True
         mesh.show_edge_sharp = True
         mesh.free_normals_split()
@@ -65,16 +71,12 @@ def create_and_link_mesh(name, faces, face_nors, points, global_matrix):
 
 def faces_from_mesh(ob, global_matrix, use_mesh_modifiers=False):
     """
-    From an object, return a generator over a list of faces.
+    From an object, return an array of shape (n, 3, 3) of its triangulated faces.
 
-    Each faces is a list of his vertexes. Each vertex is a tuple of
-    his coordinate.
+    Each face is made of the coordinates of its 3 vertices.
 
     use_mesh_modifiers
         Apply the preview modifier to the returned liste
-
-    triangulate
-        Split the quad into two triangles
     """
 
     # get the editmode data
@@ -91,9 +93,9 @@ def faces_from_mesh(ob, global_matrix, use_mesh_modifiers=False):
     try:
         mesh = mesh_owner.to_mesh()
     except RuntimeError:
-        return
+        mesh = None
     if mesh is None:
-        return
+        return np.empty((0, 3, 3), dtype=np.float32)
 
     mat = global_matrix @ ob.matrix_world
     mesh.transform(mat)
@@ -101,9 +103,11 @@ def faces_from_mesh(ob, global_matrix, use_mesh_modifiers=False):
         mesh.flip_normals()
     mesh.calc_loop_triangles()
 
-    vertices = mesh.vertices
-
-    for tri in mesh.loop_triangles:
-        yield [vertices[index].co.copy() for index in tri.vertices]
+    vertices = np.empty((len(mesh.vertices), 3), dtype=np.float32)
+    mesh.vertices.foreach_get("co", vertices.ravel())
+    tris = np.empty((len(mesh.loop_triangles), 3), dtype=np.int32)
+    mesh.loop_triangles.foreach_get("vertices", tris.ravel())
 
     mesh_owner.to_mesh_clear()
+
+    return vertices[tris]
@@ -28,40 +28,10 @@ blender --python stl_utils.py -- file1.stl file2.stl file3.stl ...
 
 import os
 import struct
-import contextlib
-import itertools
-from mathutils.geometry import normal
+import numpy as np
 
 # TODO: endien
 
-class ListDict(dict):
-    """
-    Set struct with order.
-
-    You can:
-       - insert data into without doubles
-       - get the list of data in insertion order with self.list
-
-    Like collections.OrderedDict, but quicker, can be replaced if
-    ODict is optimised.
-    """
-
-    def __init__(self):
-        dict.__init__(self)
-        self.list = []
-        self._len = 0
-
-    def add(self, item):
-        """
-        Add a value to the Set, return its position in it.
-        """
-        value = self.setdefault(item, self._len)
-        if value == self._len:
-            self.list.append(item)
-            self._len += 1
-
-        return value
-
 
 # an stl binary file is
 # - 80 bytes of description
@@ -73,6 +43,12 @@ class ListDict(dict):
 #   - 2 bytes of garbage (usually 0)
 BINARY_HEADER = 80
 BINARY_STRIDE = 12 * 4 + 2
+BINARY_DTYPE = np.dtype([
+    ("normal", '<f4', (3,)),
+    ("verts", '<f4', (3, 3)),
+    ("attr", '<u2'),
+])
+assert(BINARY_DTYPE.itemsize == BINARY_STRIDE)
 
 
 def _header_version():
@@ -105,6 +81,10 @@ def _is_ascii_file(data):
 
 
 def _binary_read(data):
+    """
+    Return the facets' normals and vertices of a binary stl file,
+    as arrays of shape (n, 3) and (n, 3, 3).
+    """
     # Skip header...
     data.seek(BINARY_HEADER)
     size = struct.unpack('<I', data.read(4))[0]
@@ -120,20 +100,30 @@ def _binary_read(data):
         size = file_size // BINARY_STRIDE
         print("WARNING! Reported size (facet number) is 0, inferring %d facets from file size." % size)
 
-    # We read 4096 elements at once, avoids too much calls to read()!
-    CHUNK_LEN = 4096
-    chunks = [CHUNK_LEN] * (size // CHUNK_LEN)
-    chunks.append(size % CHUNK_LEN)
+    # Read all facets at once.
+    facets = np.fromfile(data, dtype=BINARY_DTYPE, count=size)
+    return facets["normal"], facets["verts"]
+
+
+def _ascii_read_chunk(chunk):
+    """
+    Return the facets' normals and vertices of a chunk of ascii stl data, made of whole facets only.
+    """
+    tokens = np.array(chunk.split(), dtype=np.bytes_)
+
+    verts_idx = np.flatnonzero(tokens == b'vertex')
+    nors_idx = np.flatnonzero(tokens == b'normal')
+
+    # Go through double, to get exactly the same values as when parsing numbers with float().
+    verts = tokens[verts_idx[:, np.newaxis] + np.arange(1, 4)].astype(np.float64).astype(np.float32)
+    nors = tokens[nors_idx[:, np.newaxis] + np.arange(1, 4)].astype(np.float64).astype(np.float32)
 
-    unpack = struct.Struct('<12f').unpack_from
-    for chunk_len in chunks:
-        if chunk_len == 0:
-            continue
-        buf = data.read(BINARY_STRIDE * chunk_len)
-        for i in range(chunk_len):
-            # read the normal and points coordinates of each triangle
-            pt = unpack(buf, BINARY_STRIDE * i)
-            yield pt[:3], (pt[3:6], pt[6:9], pt[9:])
+    # Each triangle uses the last normal defined before its first vertex.
+    tri_nors_idx = np.searchsorted(nors_idx, verts_idx[0::3]) - 1
+    tri_nors = np.zeros((len(tri_nors_idx), 3), dtype=np.float32)
+    tri_nors[tri_nors_idx >= 0] = nors[tri_nors_idx[tri_nors_idx >= 0]]
+
+    return tri_nors, verts[:len(tri_nors) * 3].reshape(-1, 3, 3)
 
 
 def _ascii_read(data):
@@ -152,55 +142,56 @@ def _ascii_read(data):
     # strip header
     data.readline()
 
-    curr_nor = None
+    buf = data.read()
 
-    for l in data:
-        l = l.lstrip()
-        if l.startswith(b'facet'):
-            curr_nor = tuple(map(float, l.split()[2:]))
-        # if we encounter a vertex, read next 2
-        if l.startswith(b'vertex'):
-            yield curr_nor, [tuple(map(float, l_item.split()[1:])) for l_item in (l, data.readline(), data.readline())]
+    # Split data in chunks made of whole facets, so that only one chunk is tokenized at a time.
+    CHUNK_SIZE = 1 << 24
+    chunks = []
+    start = 0
+    while start < len(buf):
+        end = buf.find(b'endfacet', start + CHUNK_SIZE)
+        end = len(buf) if end == -1 else end + len(b'endfacet')
+        chunks.append(buf[start:end])
+        start = end
+    del buf
 
+    results = [_ascii_read_chunk(chunk) for chunk in chunks]
 
-def _binary_write(filepath, faces):
-    with open(filepath, 'wb') as data:
-        fw = data.write
-        # header
-        # we write padding at header beginning to avoid to
-        # call len(list(faces)) which may be expensive
-        fw(struct.calcsize('<80sI') * b'\0')
+    if not results:
+        return np.empty((0, 3), dtype=np.float32), np.empty((0, 3, 3), dtype=np.float32)
+    return (np.concatenate([tri_nors for tri_nors, _verts in results]),
+            np.concatenate([verts for _tri_nors, verts in results]))
 
-        # 3 vertex == 9f
-        pack = struct.Struct('<9f').pack
 
-        # number of vertices written
-        nb = 0
+def _faces_normals(faces):
+    # Same as mathutils.geometry.normal(), for all faces at once (degenerated ones get a null normal).
+    nors = np.cross(faces[:, 0] - faces[:, 1], faces[:, 1] - faces[:, 2])
+    lengths = np.linalg.norm(nors, axis=1, keepdims=True)
+    return np.divide(nors, lengths, out=np.zeros_like(nors), where=(lengths != 0.0))
 
-        for face in faces:
-            # calculate face normal
-            # write normal + vertexes + pad as attributes
-            fw(struct.pack('<3f', *normal(*face)) + pack(*itertools.chain.from_iterable(face)))
-            # attribute byte count (unused)
-            fw(b'\0\0')
-            nb += 1
 
-        # header, with correct value now
-        data.seek(0)
-        fw(struct.pack('<80sI', _header_version().encode('ascii'), nb))
+def _binary_write(filepath, faces):
+    facets = np.zeros(len(faces), dtype=BINARY_DTYPE)
+    facets["normal"] = _faces_normals(faces)
+    facets["verts"] = faces
+
+    with open(filepath, 'wb') as data:
+        data.write(struct.pack('<80sI', _header_version().encode('ascii'), len(facets)))
+        facets.tofile(data)
 
 
 def _ascii_write(filepath, faces):
+    nors = _faces_normals(faces)
+
     with open(filepath, 'w') as data:
         fw = data.write
         header = _header_version()
         fw('solid %s\n' % header)
 
-        for face in faces:
-            # calculate face normal
-            fw('facet normal %f %f %f\nouter loop\n' % normal(*face)[:])
+        for nor, face in zip(nors.tolist(), faces.tolist()):
+            fw('facet normal %f %f %f\nouter loop\n' % tuple(nor))
             for vert in face:
-                fw('vertex %f %f %f\n' % vert[:])
+                fw('vertex %f %f %f\n' % tuple(vert))
             fw('endloop\nendfacet\n')
 
         fw('endsolid %s\n' % header)
@@ -217,62 +208,70 @@ def write_stl(filepath="",
        output filepath
 
     faces
-       iterable of tuple of 3 vertex, vertex is tuple of 3 coordinates as float
+       array of shape (n, 3, 3), n faces of 3 vertices of 3 coordinates as float
 
     ascii
        save the file in ascii format (very huge)
     """
+    faces = np.asarray(faces, dtype=np.float32).reshape(-1, 3, 3)
     (_ascii_write if ascii else _binary_write)(filepath, faces)
 
 
+def _weld_vertices(verts):
+    """
+    Merge identical vertices of the (n, 3, 3) faces' vertices array,
+    return the (n, 3) triangles' indices and the unique points, in order of first appearance.
+    """
+    # Adding zero turns -0.0 into 0.0, so that comparing raw bytes gives the same result as comparing floats.
+    verts = verts.reshape(-1, 3) + np.float32(0.0)
+    verts_raw = np.ascontiguousarray(verts).view(np.dtype((np.void, verts.dtype.itemsize * 3))).ravel()
+    _uniq, first_idx, inverse = np.unique(verts_raw, return_index=True, return_inverse=True)
+
+    # Re-order unique points by first appearance.
+    order = np.argsort(first_idx)
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+
+    return rank[inverse.ravel()].reshape(-1, 3), verts[first_idx[order]]
+
+
 def read_stl(filepath):
     """
     Return the triangles and points of an stl binary file.
 
-    Please note that this process can take lot of time if the file is
-    huge (~1m30 for a 1 Go stl file on an quad core i7).
-
     - returns a tuple(triangles, triangles' normals, points).
 
       triangles
-          A list of triangles, each triangle as a tuple of 3 index of
-          point in *points*.
+          An array of shape (n, 3), each triangle as 3 indices of
+          points in *points*.
 
       triangles' normals
-          A list of vectors3 (tuples, xyz).
+          An array of shape (n, 3) of vectors (xyz).
 
       points
-          An indexed list of points, each point is a tuple of 3 float
-          (xyz).
+          An array of shape (m, 3) of points (xyz).
 
     Example of use:
 
        >>> tris, tri_nors, pts = read_stl(filepath)
-       >>> pts = list(pts)
        >>>
        >>> # print the coordinate of the triangle n
-       >>> print(pts[i] for i in tris[n])
+       >>> print(pts[tris[n]])
     """
     import time
     start_time = time.process_time()
 
-    tris, tri_nors, pts = [], [], ListDict()
-
     with open(filepath, 'rb') as data:
         # check for ascii or binary
-        gen = _ascii_read if _is_ascii_file(data) else _binary_read
+        read = _ascii_read if _is_ascii_file(data) else _binary_read
+        tri_nors, verts = read(data)
 
-        for nor, pt in gen(data):
-            # Add the triangle and the point.
-            # If the point is already in the list of points, the
-            # index returned by pts.add() will be the one from the
-            # first equal point inserted.
-            tris.append([pts.add(p) for p in pt])
-            tri_nors.append(nor)
+    # If a point is used by several triangles, they all get the index of its first occurrence.
+    tris, pts = _weld_vertices(verts)
 
     print('Import finished in %.4f sec.' % (time.process_time() - start_time))
 
-    return tris, tri_nors, pts.list
+    return tris, tri_nors, pts
 
 
 if __name__ == '__main__':
@@ -47,6 +47,7 @@ from bpy.props import (
         StringProperty,
         BoolProperty,
         FloatProperty,
+        IntProperty,
         EnumProperty,
         )
 from bpy_extras.io_utils import (
@@ -193,6 +194,13 @@ class ImportFBX(bpy.types.Operator, ImportHelper):
             default=True,
             )
 
+    use_lazy_load: BoolProperty(
+            name="Lazy Loading",
+            description="Memory-map the file and only decode array data when it is actually used "
+                        "(reduces memory usage and loading time of big files)",
+            default=False,
+            )
+
     def draw(self, context):
         pass
 
@@ -231,6 +239,7 @@ class FBX_PT_import_include(bpy.types.Panel):
         sub.enabled = operator.use_custom_props
         sub.prop(operator, "use_custom_props_enum_as_string")
         layout.prop(operator, "use_image_search")
+        layout.prop(operator, "use_lazy_load")
 
 
 class FBX_PT_import_transform(bpy.types.Panel):
@@ -584,6 +593,18 @@ class ExportFBX(bpy.types.Operator, ExportHelper):
             description="Create a dir for each exported file",
             default=True,
             )
+    compression_level: IntProperty(
+            name="Compression Level",
+            description="Compression level of array data (0 stores arrays uncompressed, "
+                        "faster but produces much bigger files)",
+            min=0, max=9,
+            default=1,
+            )
+    use_threaded_compression: BoolProperty(
+            name="Threaded Compression",
+            description="Compress array data in several threads (faster on multi-cores systems)",
+            default=False,
+            )
     use_metadata: BoolProperty(
             name="Use Metadata",
             default=True,
@@ -648,6 +669,10 @@ class FBX_PT_export_main(bpy.types.Panel):
         row.prop(operator, "batch_mode")
         sub = row.row(align=True)
         sub.prop(operator, "use_batch_own_dir", text="", icon='NEWFOLDER')
+        layout.prop(operator, "compression_level")
+        sub = layout.row()
+        sub.enabled = (operator.compression_level != 0)
+        sub.prop(operator, "use_threaded_compression")
 
 
 class FBX_PT_export_include(bpy.types.Panel):
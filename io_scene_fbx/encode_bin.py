@@ -26,6 +26,7 @@ except:
     import data_types
 
 from struct import pack
+from concurrent.futures import Future, ThreadPoolExecutor
 import array
 import zlib
 
@@ -45,6 +46,42 @@ _FOOT_ID = b'\xfa\xbc\xab\x09\xd0\xc8\xd4\x66\xb1\x76\xfb\x83\x1c\xf7\x26\x7e'
 # Awful exceptions: those "classes" of elements seem to need block sentinel even when having no children and some props.
 _ELEMS_ID_ALWAYS_BLOCK_SENTINEL = {b"AnimationStack", b"AnimationLayer"}
 
+# Arrays compression settings, see init_array_compression().
+_ARRAY_COMPRESSION_LEVEL = 1
+_ARRAY_COMPRESSION_POOL = None
+
+
+def init_array_compression(level=1, use_threads=False):
+    """
+    Define how array properties added afterwards are compressed.
+
+    level is the zlib compression level, 0 meaning arrays are stored uncompressed.
+    With use_threads, compression is done in a pool of worker threads (zlib releases the GIL),
+    and the results are gathered in order when writing the file.
+    """
+    global _ARRAY_COMPRESSION_LEVEL, _ARRAY_COMPRESSION_POOL
+
+    assert(0 <= level <= 9)
+    _ARRAY_COMPRESSION_LEVEL = level
+
+    if _ARRAY_COMPRESSION_POOL is not None:
+        _ARRAY_COMPRESSION_POOL.shutdown()
+        _ARRAY_COMPRESSION_POOL = None
+    if use_threads and level != 0:
+        _ARRAY_COMPRESSION_POOL = ThreadPoolExecutor()
+
+
+def reset_array_compression():
+    """
+    Restore default arrays compression settings, and free the worker threads if any.
+    """
+    init_array_compression()
+
+
+def _pack_array_compressed(data, length, level):
+    data = zlib.compress(data, level)
+    return pack('<3I', length, 1, len(data)) + data
+
 
 class FBXElem:
     __slots__ = (
@@ -142,16 +179,14 @@ class FBXElem:
         data = data.tobytes()
 
         # mimic behavior of fbxconverter (also common sense)
-        # we could make this configurable.
-        encoding = 0 if len(data) <= 128 else 1
+        encoding = 0 if (len(data) <= 128 or _ARRAY_COMPRESSION_LEVEL == 0) else 1
         if encoding == 0:
-            pass
-        elif encoding == 1:
-            data = zlib.compress(data, 1)
-
-        comp_len = len(data)
-
-        data = pack('<3I', length, encoding, comp_len) + data
+            data = pack('<3I', length, encoding, len(data)) + data
+        elif _ARRAY_COMPRESSION_POOL is not None:
+            # Resolved into actual packed data by _calc_offsets().
+            data = _ARRAY_COMPRESSION_POOL.submit(_pack_array_compressed, data, length, _ARRAY_COMPRESSION_LEVEL)
+        else:
+            data = _pack_array_compressed(data, length, _ARRAY_COMPRESSION_LEVEL)
 
         self.props_type.append(prop_type)
         self.props.append(data)
@@ -199,18 +234,28 @@ class FBXElem:
         offset += 12  # 3 uints
         offset += 1 + len(self.id)  # len + idname
 
-        props_length = 0
-        for data in self.props:
-            # 1 byte for the prop type
-            props_length += 1 + len(data)
-        self._props_length = props_length
-        offset += props_length
+        offset += self._calc_props_length()
 
         offset = self._calc_offsets_children(offset, is_last)
 
         self._end_offset = offset
         return offset
 
+    def _calc_props_length(self):
+        props_length = 0
+        for i, data in enumerate(self.props):
+            if isinstance(data, Future):
+                data = self.props[i] = data.result()
+            # 1 byte for the prop type
+            props_length += 1 + len(data)
+        self._props_length = props_length
+        return props_length
+
+    def _write_props(self, write):
+        for i, data in enumerate(self.props):
+            write(bytes((self.props_type[i],)))
+            write(data)
+
     def _calc_offsets_children(self, offset, is_last):
         if self.elems:
             elem_last = self.elems[-1]
@@ -232,9 +277,7 @@ class FBXElem:
         write(bytes((len(self.id),)))
         write(self.id)
 
-        for i, data in enumerate(self.props):
-            write(bytes((self.props_type[i],)))
-            write(data)
+        self._write_props(write)
 
         self._write_children(write, tell, is_last)
 
@@ -254,6 +297,27 @@ class FBXElem:
                 write(_BLOCK_SENTINEL_DATA)
 
 
+def _write_timedate_hack_elem(elem):
+    # set the FileID or the CreationTime, return True if elem was one of those.
+    if elem.id == b'FileId':
+        assert(elem.props_type[0] == b'R'[0])
+        assert(len(elem.props_type) == 1)
+        elem.props.clear()
+        elem.props_type.clear()
+
+        elem.add_bytes(_FILE_ID)
+        return True
+    elif elem.id == b'CreationTime':
+        assert(elem.props_type[0] == b'S'[0])
+        assert(len(elem.props_type) == 1)
+        elem.props.clear()
+        elem.props_type.clear()
+
+        elem.add_string(_TIME_ID)
+        return True
+    return False
+
+
 def _write_timedate_hack(elem_root):
     # perform 2 changes
     # - set the FileID
@@ -261,21 +325,7 @@ def _write_timedate_hack(elem_root):
 
     ok = 0
     for elem in elem_root.elems:
-        if elem.id == b'FileId':
-            assert(elem.props_type[0] == b'R'[0])
-            assert(len(elem.props_type) == 1)
-            elem.props.clear()
-            elem.props_type.clear()
-
-            elem.add_bytes(_FILE_ID)
-            ok += 1
-        elif elem.id == b'CreationTime':
-            assert(elem.props_type[0] == b'S'[0])
-            assert(len(elem.props_type) == 1)
-            elem.props.clear()
-            elem.props_type.clear()
-
-            elem.add_string(_TIME_ID)
+        if _write_timedate_hack_elem(elem):
             ok += 1
 
         if ok == 2:
@@ -285,6 +335,31 @@ def _write_timedate_hack(elem_root):
         print("Missing fields!")
 
 
+def _write_header(write, version):
+    write(_HEAD_MAGIC)
+    write(pack('<I', version))
+
+
+def _write_footer(write, tell, version):
+    write(_FOOT_ID)
+    write(b'\x00' * 4)
+
+    # padding for alignment (values between 1 & 16 observed)
+    # if already aligned to 16, add a full 16 bytes padding.
+    ofs = tell()
+    pad = ((ofs + 15) & ~15) - ofs
+    if pad == 0:
+        pad = 16
+
+    write(b'\0' * pad)
+
+    write(pack('<I', version))
+
+    # unknown magic (always the same)
+    write(b'\0' * 120)
+    write(b'\xf8\x5a\x8c\x6a\xde\xf5\xd9\x7e\xec\xe9\x0c\xe3\x75\x8f\x29\x0b')
+
+
 def write(fn, elem_root, version):
     assert(elem_root.id == b'')
 
@@ -292,8 +367,7 @@ def write(fn, elem_root, version):
         write = f.write
         tell = f.tell
 
-        write(_HEAD_MAGIC)
-        write(pack('<I', version))
+        _write_header(write, version)
 
         # hack since we don't decode time.
         # ideally we would _not_ modify this data.
@@ -302,20 +376,126 @@ def write(fn, elem_root, version):
         elem_root._calc_offsets_children(tell(), False)
         elem_root._write_children(write, tell, False)
 
-        write(_FOOT_ID)
-        write(b'\x00' * 4)
+        _write_footer(write, tell, version)
+
+
+class FBXStreamWriter:
+    """
+    Incremental version of write(), for use as a context manager.
+
+    Children of the opened elements (starting with the root one) are written to disk and dropped
+    on each flush(), so that the whole tree never has to be kept in memory.
+    The end offset of opened elements is only patched into their header once they are closed.
+
+    Note that the last child of each opened element is only written when that element is closed,
+    since being the last one may change its encoding. An opened element which gets no children at all
+    is always written as if it was not the last one of its parent.
+    """
+    __slots__ = (
+        "_file",
+        "_version",
+        "_stack",  # opened elements, as [elem, header_offset, has_written_children] items.
+        "_timedate_fields",
+        )
 
-        # padding for alignment (values between 1 & 16 observed)
-        # if already aligned to 16, add a full 16 bytes padding.
-        ofs = tell()
-        pad = ((ofs + 15) & ~15) - ofs
-        if pad == 0:
-            pad = 16
+    def __init__(self, fn, elem_root, version):
+        assert(elem_root.id == b'')
+        self._file = open(fn, 'wb')
+        self._version = version
+        self._stack = [[elem_root, -1, False]]
+        self._timedate_fields = 0
+
+        _write_header(self._file.write, version)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self._file.close()
+
+    def _write_elem(self, elem, is_last):
+        f = self._file
+        if len(self._stack) == 1:
+            # hack since we don't decode time, see write().
+            self._timedate_fields += _write_timedate_hack_elem(elem)
+        elem._calc_offsets(f.tell(), is_last)
+        elem._write(f.write, f.tell, is_last)
+
+    def flush(self):
+        """
+        Write out all children of the innermost opened element, but its last one.
+        """
+        level = self._stack[-1]
+        elems = level[0].elems
+        if len(elems) > 1:
+            for elem in elems[:-1]:
+                self._write_elem(elem, False)
+            del elems[:-1]
+            level[2] = True
+
+    def open_elem(self, elem):
+        """
+        Write the header of given element, which must be the last child of the innermost opened element.
+        Its children are written by following flush() calls.
+        """
+        level = self._stack[-1]
+        assert(level[0].elems and level[0].elems[-1] is elem)
+        self.flush()
+        level[0].elems.clear()
+        level[2] = True
 
-        write(b'\0' * pad)
+        f = self._file
+        write = f.write
+        header_offset = f.tell()
+        # End offset is not known yet.
+        write(pack('<3I', 0, len(elem.props), elem._calc_props_length()))
+        write(bytes((len(elem.id),)))
+        write(elem.id)
+        elem._write_props(write)
 
-        write(pack('<I', version))
+        self._stack.append([elem, header_offset, False])
 
-        # unknown magic (always the same)
-        write(b'\0' * 120)
-        write(b'\xf8\x5a\x8c\x6a\xde\xf5\xd9\x7e\xec\xe9\x0c\xe3\x75\x8f\x29\x0b')
+    def close_elem(self):
+        """
+        Write remaining children of the innermost opened element, and finalize it.
+        """
+        assert(len(self._stack) > 1)
+        elem, header_offset, has_children = self._stack.pop()
+
+        if elem.elems:
+            self._flush_all(elem)
+            has_children = True
+
+        f = self._file
+        if has_children or not elem.props or elem.id in _ELEMS_ID_ALWAYS_BLOCK_SENTINEL:
+            f.write(_BLOCK_SENTINEL_DATA)
+
+        end_offset = f.tell()
+        f.seek(header_offset)
+        f.write(pack('<I', end_offset))
+        f.seek(end_offset)
+
+    def _flush_all(self, elem):
+        elem_last = elem.elems[-1]
+        for sub_elem in elem.elems:
+            self._write_elem(sub_elem, (sub_elem is elem_last))
+        elem.elems.clear()
+
+    def close(self):
+        while len(self._stack) > 1:
+            self.close_elem()
+
+        elem_root = self._stack[0][0]
+        if elem_root.elems:
+            self._flush_all(elem_root)
+        self._file.write(_BLOCK_SENTINEL_DATA)
+
+        if self._timedate_fields != 2:
+            print("Missing fields!")
+
+        f = self._file
+        _write_footer(f.write, f.tell, self._version)
+        f.close()
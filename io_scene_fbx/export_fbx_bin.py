@@ -2859,28 +2859,33 @@ def fbx_definitions_elements(root, scene_data):
     fbx_templates_generate(definitions, scene_data.templates)
 
 
-def fbx_objects_elements(root, scene_data):
+def fbx_objects_elements(root, scene_data, stream):
     """
     Data (objects, geometry, material, textures, armatures, etc.).
+    Elements are written to given stream writer as soon as they are generated.
     """
     perfmon = PerfMon()
     perfmon.level_up()
     objects = elem_empty(root, b"Objects")
+    stream.open_elem(objects)
 
     perfmon.step("FBX export fetch empties (%d)..." % len(scene_data.data_empties))
 
     for empty in scene_data.data_empties:
         fbx_data_empty_elements(objects, empty, scene_data)
+    stream.flush()
 
     perfmon.step("FBX export fetch lamps (%d)..." % len(scene_data.data_lights))
 
     for lamp in scene_data.data_lights:
         fbx_data_light_elements(objects, lamp, scene_data)
+    stream.flush()
 
     perfmon.step("FBX export fetch cameras (%d)..." % len(scene_data.data_cameras))
 
     for cam in scene_data.data_cameras:
         fbx_data_camera_elements(objects, cam, scene_data)
+    stream.flush()
 
     perfmon.step("FBX export fetch meshes (%d)..."
                  % len({me_key for me_key, _me, _free in scene_data.data_meshes.values()}))
@@ -2888,6 +2893,7 @@ def fbx_objects_elements(root, scene_data):
     done_meshes = set()
     for me_obj in scene_data.data_meshes:
         fbx_data_mesh_elements(objects, me_obj, scene_data, done_meshes)
+        stream.flush()
     del done_meshes
 
     perfmon.step("FBX export fetch objects (%d)..." % len(scene_data.objects))
@@ -2900,6 +2906,7 @@ def fbx_objects_elements(root, scene_data):
             if dp_obj not in scene_data.objects:
                 continue
             fbx_data_object_elements(objects, dp_obj, scene_data)
+        stream.flush()
 
     perfmon.step("FBX export fetch remaining...")
 
@@ -2907,35 +2914,46 @@ def fbx_objects_elements(root, scene_data):
         if not (ob_obj.is_object and ob_obj.type == 'ARMATURE'):
             continue
         fbx_data_armature_elements(objects, ob_obj, scene_data)
+        stream.flush()
 
     if scene_data.data_leaf_bones:
         fbx_data_leaf_bone_elements(objects, scene_data)
 
     for ma in scene_data.data_materials:
         fbx_data_material_elements(objects, ma, scene_data)
+    stream.flush()
 
     for blender_tex_key in scene_data.data_textures:
         fbx_data_texture_file_elements(objects, blender_tex_key, scene_data)
+    stream.flush()
 
     for vid in scene_data.data_videos:
         fbx_data_video_elements(objects, vid, scene_data)
+        stream.flush()
 
     perfmon.step("FBX export fetch animations...")
     start_time = time.process_time()
 
     fbx_data_animation_elements(objects, scene_data)
 
+    stream.close_elem()
+
     perfmon.level_down()
 
 
-def fbx_connections_elements(root, scene_data):
+def fbx_connections_elements(root, scene_data, stream):
     """
     Relations between Objects (which material uses which texture, and so on).
+    Elements are written to given stream writer as soon as they are generated.
     """
     connections = elem_empty(root, b"Connections")
+    stream.open_elem(connections)
 
     for c in scene_data.connections:
         elem_connection(connections, *c)
+        stream.flush()
+
+    stream.close_elem()
 
 
 def fbx_takes_elements(root, scene_data):
@@ -2996,6 +3014,8 @@ def save_single(operator, scene, depsgraph, filepath="",
                 use_custom_props=False,
                 bake_space_transform=False,
                 armature_nodetype='NULL',
+                compression_level=1,
+                use_threaded_compression=False,
                 **kwargs
                 ):
 
@@ -3074,32 +3094,36 @@ def save_single(operator, scene, depsgraph, filepath="",
     # Generate some data about exported scene...
     scene_data = fbx_data_from_scene(scene, depsgraph, settings)
 
-    root = elem_empty(None, b"")  # Root element has no id, as it is not saved per se!
+    # Arrays get compressed as soon as they are added to their element.
+    encode_bin.init_array_compression(compression_level, use_threaded_compression)
+    try:
+        root = elem_empty(None, b"")  # Root element has no id, as it is not saved per se!
 
-    # Mostly FBXHeaderExtension and GlobalSettings.
-    fbx_header_elements(root, scene_data)
+        # Elements are written out section by section, we never keep the whole file content in memory.
+        with encode_bin.FBXStreamWriter(filepath, root, FBX_VERSION) as stream:
+            # Mostly FBXHeaderExtension and GlobalSettings.
+            fbx_header_elements(root, scene_data)
 
-    # Documents and References are pretty much void currently.
-    fbx_documents_elements(root, scene_data)
-    fbx_references_elements(root, scene_data)
+            # Documents and References are pretty much void currently.
+            fbx_documents_elements(root, scene_data)
+            fbx_references_elements(root, scene_data)
 
-    # Templates definitions.
-    fbx_definitions_elements(root, scene_data)
+            # Templates definitions.
+            fbx_definitions_elements(root, scene_data)
 
-    # Actual data.
-    fbx_objects_elements(root, scene_data)
+            # Actual data.
+            fbx_objects_elements(root, scene_data, stream)
 
-    # How data are inter-connected.
-    fbx_connections_elements(root, scene_data)
-
-    # Animation.
-    fbx_takes_elements(root, scene_data)
+            # How data are inter-connected.
+            fbx_connections_elements(root, scene_data, stream)
 
-    # Cleanup!
-    fbx_scene_data_cleanup(scene_data)
+            # Animation.
+            fbx_takes_elements(root, scene_data)
 
-    # And we are down, we can write the whole thing!
-    encode_bin.write(filepath, root, FBX_VERSION)
+        # Cleanup!
+        fbx_scene_data_cleanup(scene_data)
+    finally:
+        encode_bin.reset_array_compression()
 
     # Clear cached ObjectWrappers!
     ObjectWrapper.cache_clear()
@@ -26,10 +26,13 @@
 Usage
 =====
 
-   fbx2json [FILES]...
+   fbx2json [--outline] [FILES]...
 
 This script will write a JSON file for each FBX argument given.
 
+With ``--outline``, only the structure of the file is written (into an ``.outline.json`` file),
+without reading any property data, which is much faster on big files.
+
 
 Output
 ======
@@ -63,6 +66,12 @@ The types are as follows:
 
 Note that key:value pairs aren't used since the id's are not
 ensured to be unique.
+
+The outline data is formatted into a list of nested lists of 4 items:
+
+   ``[id, "data_types", size, [subtree, ...]]``
+
+Where size is the number of bytes used by the element (including its subtree) in the FBX file.
 """
 
 
@@ -82,6 +91,7 @@ _IS_BIG_ENDIAN = (__import__("sys").byteorder != 'little')
 _HEAD_MAGIC = b'Kaydara FBX Binary\x20\x20\x00\x1a\x00'
 from collections import namedtuple
 FBXElem = namedtuple("FBXElem", ("id", "props", "props_type", "elems"))
+FBXElemIndex = namedtuple("FBXElemIndex", ("id", "props_type", "elems", "offset", "end_offset"))
 del namedtuple
 
 
@@ -141,14 +151,31 @@ read_data_dict = {
     }
 
 
+skip_data_dict = {
+    b'Y'[0]: 2,  # 16 bit int
+    b'C'[0]: 1,  # 1 bit bool (yes/no)
+    b'I'[0]: 4,  # 32 bit int
+    b'F'[0]: 4,  # 32 bit float
+    b'D'[0]: 8,  # 64 bit float
+    b'L'[0]: 8,  # 64 bit int
+    b'R'[0]: lambda read: read_uint(read),  # binary data
+    b'S'[0]: lambda read: read_uint(read),  # string data
+    }
+for _t in b'fidlbc':
+    # arrays: length, encoding, comp_len, then (compressed) data.
+    skip_data_dict[_t] = lambda read: unpack(b'<3I', read(12))[2]
+del _t
+
+
 # FBX 7500 (aka FBX2016) introduces incompatible changes at binary level:
 #   * The NULL block marking end of nested stuff switches from 13 bytes long to 25 bytes long.
 #   * The FBX element metadata (end_offset, prop_count and prop_length) switch from uint32 to uint64.
 def init_version(fbx_version):
     global _BLOCK_SENTINEL_LENGTH, _BLOCK_SENTINEL_DATA, read_fbx_elem_uint
 
-    assert(_BLOCK_SENTINEL_LENGTH == ...)
-    assert(_BLOCK_SENTINEL_DATA == ...)
+    _BLOCK_SENTINEL_LENGTH = ...
+    _BLOCK_SENTINEL_DATA = ...
+    read_fbx_elem_uint = ...
 
     if fbx_version < 7500:
         _BLOCK_SENTINEL_LENGTH = 13
@@ -195,6 +222,42 @@ def read_elem(read, tell, use_namedtuple):
     return FBXElem(*args) if use_namedtuple else args
 
 
+def read_elem_index(read, tell, seek):
+    offset = tell()
+
+    end_offset = read_fbx_elem_uint(read)
+    if end_offset == 0:
+        return None
+
+    prop_count = read_fbx_elem_uint(read)
+    prop_length = read_fbx_elem_uint(read)
+
+    elem_id = read_string_ubyte(read)
+    elem_props_type = bytearray(prop_count)
+    elem_subtree = []
+
+    for i in range(prop_count):
+        data_type = read(1)[0]
+        size = skip_data_dict[data_type]
+        if not isinstance(size, int):
+            size = size(read)
+        seek(size, 1)
+        elem_props_type[i] = data_type
+
+    if tell() < end_offset:
+        while tell() < (end_offset - _BLOCK_SENTINEL_LENGTH):
+            elem_subtree.append(read_elem_index(read, tell, seek))
+
+        if read(_BLOCK_SENTINEL_LENGTH) != _BLOCK_SENTINEL_DATA:
+            raise IOError("failed to read nested block sentinel, "
+                          "expected all bytes to be 0")
+
+    if tell() != end_offset:
+        raise IOError("scope length not reached, something is wrong")
+
+    return FBXElemIndex(elem_id, elem_props_type, elem_subtree, offset, end_offset)
+
+
 def parse_version(fn):
     """
     Return the FBX version,
@@ -232,6 +295,29 @@ def parse(fn, use_namedtuple=True):
     return FBXElem(*args) if use_namedtuple else args, fbx_version
 
 
+def parse_index(fn):
+    root_elems = []
+
+    with open(fn, 'rb') as f:
+        read = f.read
+        tell = f.tell
+        seek = f.seek
+
+        if read(len(_HEAD_MAGIC)) != _HEAD_MAGIC:
+            raise IOError("Invalid header")
+
+        fbx_version = read_uint(read)
+        init_version(fbx_version)
+
+        while True:
+            elem = read_elem_index(read, tell, seek)
+            if elem is None:
+                break
+            root_elems.append(elem)
+
+    return FBXElemIndex(b'', bytearray(0), root_elems, 0, 0), fbx_version
+
+
 # ----------------------------------------------------------------------------
 # Inline Modules
 
@@ -259,7 +345,8 @@ BYTE_ARRAY = b'c'[0],
 parse_bin = type(array)("parse_bin")
 parse_bin.__dict__.update(
 dict(
-parse = parse
+parse = parse,
+parse_index = parse_index,
 ))
 
 
@@ -329,6 +416,42 @@ def fbx2json(fn):
         fw(']\n')
 
 
+def fbx2json_outline_recurse(fw, fbx_elem_index, ident, is_last):
+    fbx_elem_id = fbx_elem_index.id.decode('utf-8')
+    fw('%s["%s", ' % (ident, fbx_elem_id))
+    fw('"%s", ' % (fbx_elem_index.props_type.decode('ascii')))
+    fw('%d, ' % (fbx_elem_index.end_offset - fbx_elem_index.offset))
+
+    fw('[')
+    if fbx_elem_index.elems:
+        fw('\n')
+        ident_sub = ident + "    "
+        for fbx_elem_sub in fbx_elem_index.elems:
+            fbx2json_outline_recurse(fw, fbx_elem_sub, ident_sub,
+                                     fbx_elem_sub is fbx_elem_index.elems[-1])
+    fw(']')
+
+    fw(']%s' % ('' if is_last else ',\n'))
+
+
+def fbx2json_outline(fn):
+    import os
+
+    fn_json = "%s.outline.json" % os.path.splitext(fn)[0]
+    print("Writing: %r " % fn_json, end="")
+    fbx_root_index, fbx_version = parse_index(fn)
+    print("(Version %d) ..." % fbx_version)
+
+    with open(fn_json, 'w', encoding="ascii", errors='xmlcharrefreplace') as f:
+        fw = f.write
+        fw('[\n')
+        ident_sub = "    "
+        for fbx_elem_sub in fbx_root_index.elems:
+            fbx2json_outline_recurse(f.write, fbx_elem_sub, ident_sub,
+                                     fbx_elem_sub is fbx_root_index.elems[-1])
+        fw(']\n')
+
+
 # ----------------------------------------------------------------------------
 # Command Line
 
@@ -339,9 +462,16 @@ def main():
         print(__doc__)
         return
 
+    use_outline = "--outline" in sys.argv
+
     for arg in sys.argv[1:]:
+        if arg == "--outline":
+            continue
         try:
-            fbx2json(arg)
+            if use_outline:
+                fbx2json_outline(arg)
+            else:
+                fbx2json(arg)
         except:
             print("Failed to convert %r, error:" % arg)
 
@@ -32,7 +32,10 @@ if "bpy" in locals():
     if "fbx_utils" in locals():
         importlib.reload(fbx_utils)
 
+import array
+
 import bpy
+import numpy as np
 from mathutils import Matrix, Euler, Vector
 
 # -----
@@ -758,81 +761,71 @@ def blen_read_geom_layerinfo(fbx_layer):
         )
 
 
-def blen_read_geom_array_setattr(generator, blen_data, blen_attr, fbx_data, stride, item_size, descr, xform):
-    """Generic fbx_layer to blen_data setter, generator is expected to yield tuples (ble_idx, fbx_idx)."""
-    max_idx = len(blen_data) - 1
-    print_error = True
+def blen_read_geom_array_to_np(fbx_data):
+    """Return a (flat) numpy view over given FBX array data, without copying it when possible."""
+    if isinstance(fbx_data, array.array):
+        return np.frombuffer(fbx_data, dtype=fbx_data.typecode)
+    return np.asarray(fbx_data)
 
-    def check_skip(blen_idx, fbx_idx):
-        nonlocal print_error
-        if fbx_idx < 0:  # Negative values mean 'skip'.
-            return True
-        if blen_idx > max_idx:
-            if print_error:
-                print("ERROR: too much data in this layer, compared to elements in mesh, skipping!")
-                print_error = False
-            return True
-        return False
 
+def blen_read_geom_array_foreach_set(blen_fbx_idx, blen_data, blen_attr, blen_dtype, fbx_data, stride, item_size,
+                                     descr, xform):
+    """
+    Generic fbx_layer to blen_data setter, blen_fbx_idx is expected to be a pair (blen_idx, fbx_idx) of numpy arrays.
+    blen_data is either a Blender collection (whole blen_attr is then written at once with foreach_set),
+    or a numpy array of shape (len, item_size). xform, if given, is applied to the whole (n, item_size) values array.
+    """
+    blen_idx, fbx_idx = blen_fbx_idx
+    fbx_data = blen_read_geom_array_to_np(fbx_data)
+
+    # Negative values mean 'skip'.
+    valid = (fbx_idx >= 0) & (fbx_idx + item_size <= len(fbx_data))
+    too_much = blen_idx >= len(blen_data)
+    if too_much.any():
+        print("ERROR: too much data in this layer, compared to elements in mesh, skipping!")
+        valid &= ~too_much
+    if not valid.all():
+        blen_idx = blen_idx[valid]
+        fbx_idx = fbx_idx[valid]
+
+    values = fbx_data[fbx_idx[:, np.newaxis] + np.arange(item_size)]
     if xform is not None:
-        if isinstance(blen_data, list):
-            if item_size == 1:
-                def _process(blend_data, blen_attr, fbx_data, xform, item_size, blen_idx, fbx_idx):
-                    blen_data[blen_idx] = xform(fbx_data[fbx_idx])
-            else:
-                def _process(blend_data, blen_attr, fbx_data, xform, item_size, blen_idx, fbx_idx):
-                    blen_data[blen_idx] = xform(fbx_data[fbx_idx:fbx_idx + item_size])
-        else:
-            if item_size == 1:
-                def _process(blend_data, blen_attr, fbx_data, xform, item_size, blen_idx, fbx_idx):
-                    setattr(blen_data[blen_idx], blen_attr, xform(fbx_data[fbx_idx]))
-            else:
-                def _process(blend_data, blen_attr, fbx_data, xform, item_size, blen_idx, fbx_idx):
-                    setattr(blen_data[blen_idx], blen_attr, xform(fbx_data[fbx_idx:fbx_idx + item_size]))
-    else:
-        if isinstance(blen_data, list):
-            if item_size == 1:
-                def _process(blend_data, blen_attr, fbx_data, xform, item_size, blen_idx, fbx_idx):
-                    blen_data[blen_idx] = fbx_data[fbx_idx]
-            else:
-                def _process(blend_data, blen_attr, fbx_data, xform, item_size, blen_idx, fbx_idx):
-                    blen_data[blen_idx] = fbx_data[fbx_idx:fbx_idx + item_size]
-        else:
-            if item_size == 1:
-                def _process(blend_data, blen_attr, fbx_data, xform, item_size, blen_idx, fbx_idx):
-                    setattr(blen_data[blen_idx], blen_attr, fbx_data[fbx_idx])
-            else:
-                def _process(blend_data, blen_attr, fbx_data, xform, item_size, blen_idx, fbx_idx):
-                    setattr(blen_data[blen_idx], blen_attr, fbx_data[fbx_idx:fbx_idx + item_size])
+        values = xform(values)
+
+    if isinstance(blen_data, np.ndarray):
+        blen_data[blen_idx] = values
+        return
 
-    for blen_idx, fbx_idx in generator:
-        if check_skip(blen_idx, fbx_idx):
-            continue
-        _process(blen_data, blen_attr, fbx_data, xform, item_size, blen_idx, fbx_idx)
+    data = np.empty((len(blen_data), item_size), dtype=blen_dtype)
+    if len(blen_idx) != len(blen_data):
+        # Only some items are set, keep current values of the others.
+        blen_data.foreach_get(blen_attr, data.ravel())
+    data[blen_idx] = values
+    blen_data.foreach_set(blen_attr, data.ravel())
 
 
-# generic generators.
-def blen_read_geom_array_gen_allsame(data_len):
-    return zip(*(range(data_len), (0,) * data_len))
+# generic index mappers, return (blen_idx, fbx_idx) pairs of arrays.
+def blen_read_geom_array_idx_allsame(data_len):
+    return np.arange(data_len), np.zeros(data_len, dtype=np.int64)
 
 
-def blen_read_geom_array_gen_direct(fbx_data, stride):
-    fbx_data_len = len(fbx_data)
-    return zip(*(range(fbx_data_len // stride), range(0, fbx_data_len, stride)))
+def blen_read_geom_array_idx_direct(fbx_data, stride):
+    fbx_data_len = len(fbx_data) // stride
+    return np.arange(fbx_data_len), np.arange(0, fbx_data_len * stride, stride)
 
 
-def blen_read_geom_array_gen_indextodirect(fbx_layer_index, stride):
-    return ((bi, fi * stride) for bi, fi in enumerate(fbx_layer_index))
+def blen_read_geom_array_idx_indextodirect(fbx_layer_index, stride):
+    fbx_layer_index = blen_read_geom_array_to_np(fbx_layer_index).astype(np.int64)
+    # Negative indices remain negative, and hence get skipped.
+    return np.arange(len(fbx_layer_index)), fbx_layer_index * stride
 
 
-def blen_read_geom_array_gen_direct_looptovert(mesh, fbx_data, stride):
+def blen_read_geom_array_idx_direct_looptovert(mesh, fbx_data, stride):
     fbx_data_len = len(fbx_data) // stride
-    loops = mesh.loops
-    for p in mesh.polygons:
-        for lidx in p.loop_indices:
-            vidx = loops[lidx].vertex_index
-            if vidx < fbx_data_len:
-                yield lidx, vidx * stride
+    loops_vidx = np.empty(len(mesh.loops), dtype=np.int32)
+    mesh.loops.foreach_get("vertex_index", loops_vidx)
+    loops_idx = np.flatnonzero(loops_vidx < fbx_data_len)
+    return loops_idx, loops_vidx[loops_idx].astype(np.int64) * stride
 
 
 # generic error printers.
@@ -847,7 +840,7 @@ def blen_read_geom_array_error_ref(descr, fbx_layer_ref, quiet=False):
 
 
 def blen_read_geom_array_mapped_vert(
-        mesh, blen_data, blen_attr,
+        mesh, blen_data, blen_attr, blen_dtype,
         fbx_layer_data, fbx_layer_index,
         fbx_layer_mapping, fbx_layer_ref,
         stride, item_size, descr,
@@ -856,15 +849,15 @@ def blen_read_geom_array_mapped_vert(
     if fbx_layer_mapping == b'ByVertice':
         if fbx_layer_ref == b'Direct':
             assert(fbx_layer_index is None)
-            blen_read_geom_array_setattr(blen_read_geom_array_gen_direct(fbx_layer_data, stride),
-                                         blen_data, blen_attr, fbx_layer_data, stride, item_size, descr, xform)
+            blen_read_geom_array_foreach_set(blen_read_geom_array_idx_direct(fbx_layer_data, stride),
+                                             blen_data, blen_attr, blen_dtype, fbx_layer_data, stride, item_size, descr, xform)
             return True
         blen_read_geom_array_error_ref(descr, fbx_layer_ref, quiet)
     elif fbx_layer_mapping == b'AllSame':
         if fbx_layer_ref == b'IndexToDirect':
             assert(fbx_layer_index is None)
-            blen_read_geom_array_setattr(blen_read_geom_array_gen_allsame(len(blen_data)),
-                                         blen_data, blen_attr, fbx_layer_data, stride, item_size, descr, xform)
+            blen_read_geom_array_foreach_set(blen_read_geom_array_idx_allsame(len(blen_data)),
+                                             blen_data, blen_attr, blen_dtype, fbx_layer_data, stride, item_size, descr, xform)
             return True
         blen_read_geom_array_error_ref(descr, fbx_layer_ref, quiet)
     else:
@@ -874,7 +867,7 @@ def blen_read_geom_array_mapped_vert(
 
 
 def blen_read_geom_array_mapped_edge(
-        mesh, blen_data, blen_attr,
+        mesh, blen_data, blen_attr, blen_dtype,
         fbx_layer_data, fbx_layer_index,
         fbx_layer_mapping, fbx_layer_ref,
         stride, item_size, descr,
@@ -882,15 +875,15 @@ def blen_read_geom_array_mapped_edge(
         ):
     if fbx_layer_mapping == b'ByEdge':
         if fbx_layer_ref == b'Direct':
-            blen_read_geom_array_setattr(blen_read_geom_array_gen_direct(fbx_layer_data, stride),
-                                         blen_data, blen_attr, fbx_layer_data, stride, item_size, descr, xform)
+            blen_read_geom_array_foreach_set(blen_read_geom_array_idx_direct(fbx_layer_data, stride),
+                                             blen_data, blen_attr, blen_dtype, fbx_layer_data, stride, item_size, descr, xform)
             return True
         blen_read_geom_array_error_ref(descr, fbx_layer_ref, quiet)
     elif fbx_layer_mapping == b'AllSame':
         if fbx_layer_ref == b'IndexToDirect':
             assert(fbx_layer_index is None)
-            blen_read_geom_array_setattr(blen_read_geom_array_gen_allsame(len(blen_data)),
-                                         blen_data, blen_attr, fbx_layer_data, stride, item_size, descr, xform)
+            blen_read_geom_array_foreach_set(blen_read_geom_array_idx_allsame(len(blen_data)),
+                                             blen_data, blen_attr, blen_dtype, fbx_layer_data, stride, item_size, descr, xform)
             return True
         blen_read_geom_array_error_ref(descr, fbx_layer_ref, quiet)
     else:
@@ -900,7 +893,7 @@ def blen_read_geom_array_mapped_edge(
 
 
 def blen_read_geom_array_mapped_polygon(
-        mesh, blen_data, blen_attr,
+        mesh, blen_data, blen_attr, blen_dtype,
         fbx_layer_data, fbx_layer_index,
         fbx_layer_mapping, fbx_layer_ref,
         stride, item_size, descr,
@@ -912,22 +905,22 @@ def blen_read_geom_array_mapped_polygon(
             #     We fallback to 'Direct' mapping in this case.
             #~ assert(fbx_layer_index is not None)
             if fbx_layer_index is None:
-                blen_read_geom_array_setattr(blen_read_geom_array_gen_direct(fbx_layer_data, stride),
-                                             blen_data, blen_attr, fbx_layer_data, stride, item_size, descr, xform)
+                blen_read_geom_array_foreach_set(blen_read_geom_array_idx_direct(fbx_layer_data, stride),
+                                                 blen_data, blen_attr, blen_dtype, fbx_layer_data, stride, item_size, descr, xform)
             else:
-                blen_read_geom_array_setattr(blen_read_geom_array_gen_indextodirect(fbx_layer_index, stride),
-                                             blen_data, blen_attr, fbx_layer_data, stride, item_size, descr, xform)
+                blen_read_geom_array_foreach_set(blen_read_geom_array_idx_indextodirect(fbx_layer_index, stride),
+                                                 blen_data, blen_attr, blen_dtype, fbx_layer_data, stride, item_size, descr, xform)
             return True
         elif fbx_layer_ref == b'Direct':
-            blen_read_geom_array_setattr(blen_read_geom_array_gen_direct(fbx_layer_data, stride),
-                                         blen_data, blen_attr, fbx_layer_data, stride, item_size, descr, xform)
+            blen_read_geom_array_foreach_set(blen_read_geom_array_idx_direct(fbx_layer_data, stride),
+                                             blen_data, blen_attr, blen_dtype, fbx_layer_data, stride, item_size, descr, xform)
             return True
         blen_read_geom_array_error_ref(descr, fbx_layer_ref, quiet)
     elif fbx_layer_mapping == b'AllSame':
         if fbx_layer_ref == b'IndexToDirect':
             assert(fbx_layer_index is None)
-            blen_read_geom_array_setattr(blen_read_geom_array_gen_allsame(len(blen_data)),
-                                         blen_data, blen_attr, fbx_layer_data, stride, item_size, descr, xform)
+            blen_read_geom_array_foreach_set(blen_read_geom_array_idx_allsame(len(blen_data)),
+                                             blen_data, blen_attr, blen_dtype, fbx_layer_data, stride, item_size, descr, xform)
             return True
         blen_read_geom_array_error_ref(descr, fbx_layer_ref, quiet)
     else:
@@ -937,7 +930,7 @@ def blen_read_geom_array_mapped_polygon(
 
 
 def blen_read_geom_array_mapped_polyloop(
-        mesh, blen_data, blen_attr,
+        mesh, blen_data, blen_attr, blen_dtype,
         fbx_layer_data, fbx_layer_index,
         fbx_layer_mapping, fbx_layer_ref,
         stride, item_size, descr,
@@ -949,29 +942,29 @@ def blen_read_geom_array_mapped_polyloop(
             #     We fallback to 'Direct' mapping in this case.
             #~ assert(fbx_layer_index is not None)
             if fbx_layer_index is None:
-                blen_read_geom_array_setattr(blen_read_geom_array_gen_direct(fbx_layer_data, stride),
-                                             blen_data, blen_attr, fbx_layer_data, stride, item_size, descr, xform)
+                blen_read_geom_array_foreach_set(blen_read_geom_array_idx_direct(fbx_layer_data, stride),
+                                                 blen_data, blen_attr, blen_dtype, fbx_layer_data, stride, item_size, descr, xform)
             else:
-                blen_read_geom_array_setattr(blen_read_geom_array_gen_indextodirect(fbx_layer_index, stride),
-                                             blen_data, blen_attr, fbx_layer_data, stride, item_size, descr, xform)
+                blen_read_geom_array_foreach_set(blen_read_geom_array_idx_indextodirect(fbx_layer_index, stride),
+                                                 blen_data, blen_attr, blen_dtype, fbx_layer_data, stride, item_size, descr, xform)
             return True
         elif fbx_layer_ref == b'Direct':
-            blen_read_geom_array_setattr(blen_read_geom_array_gen_direct(fbx_layer_data, stride),
-                                         blen_data, blen_attr, fbx_layer_data, stride, item_size, descr, xform)
+            blen_read_geom_array_foreach_set(blen_read_geom_array_idx_direct(fbx_layer_data, stride),
+                                             blen_data, blen_attr, blen_dtype, fbx_layer_data, stride, item_size, descr, xform)
             return True
         blen_read_geom_array_error_ref(descr, fbx_layer_ref, quiet)
     elif fbx_layer_mapping == b'ByVertice':
         if fbx_layer_ref == b'Direct':
             assert(fbx_layer_index is None)
-            blen_read_geom_array_setattr(blen_read_geom_array_gen_direct_looptovert(mesh, fbx_layer_data, stride),
-                                         blen_data, blen_attr, fbx_layer_data, stride, item_size, descr, xform)
+            blen_read_geom_array_foreach_set(blen_read_geom_array_idx_direct_looptovert(mesh, fbx_layer_data, stride),
+                                             blen_data, blen_attr, blen_dtype, fbx_layer_data, stride, item_size, descr, xform)
             return True
         blen_read_geom_array_error_ref(descr, fbx_layer_ref, quiet)
     elif fbx_layer_mapping == b'AllSame':
         if fbx_layer_ref == b'IndexToDirect':
             assert(fbx_layer_index is None)
-            blen_read_geom_array_setattr(blen_read_geom_array_gen_allsame(len(blen_data)),
-                                         blen_data, blen_attr, fbx_layer_data, stride, item_size, descr, xform)
+            blen_read_geom_array_foreach_set(blen_read_geom_array_idx_allsame(len(blen_data)),
+                                             blen_data, blen_attr, blen_dtype, fbx_layer_data, stride, item_size, descr, xform)
             return True
         blen_read_geom_array_error_ref(descr, fbx_layer_ref, quiet)
     else:
@@ -996,7 +989,7 @@ def blen_read_geom_layer_material(fbx_obj, mesh):
 
     blen_data = mesh.polygons
     blen_read_geom_array_mapped_polygon(
-        mesh, blen_data, "material_index",
+        mesh, blen_data, "material_index", np.int32,
         fbx_layer_data, None,
         fbx_layer_mapping, fbx_layer_ref,
         1, 1, layer_id,
@@ -1030,7 +1023,7 @@ def blen_read_geom_layer_uv(fbx_obj, mesh):
                 continue
 
             blen_read_geom_array_mapped_polyloop(
-                mesh, blen_data, "uv",
+                mesh, blen_data, "uv", np.float32,
                 fbx_layer_data, fbx_layer_index,
                 fbx_layer_mapping, fbx_layer_ref,
                 2, 2, layer_id,
@@ -1060,7 +1053,7 @@ def blen_read_geom_layer_color(fbx_obj, mesh):
                 continue
 
             blen_read_geom_array_mapped_polyloop(
-                mesh, blen_data, "color",
+                mesh, blen_data, "color", np.float32,
                 fbx_layer_data, fbx_layer_index,
                 fbx_layer_mapping, fbx_layer_ref,
                 4, 4, layer_id,
@@ -1094,11 +1087,11 @@ def blen_read_geom_layer_smooth(fbx_obj, mesh):
 
         blen_data = mesh.edges
         blen_read_geom_array_mapped_edge(
-            mesh, blen_data, "use_edge_sharp",
+            mesh, blen_data, "use_edge_sharp", np.bool_,
             fbx_layer_data, None,
             fbx_layer_mapping, fbx_layer_ref,
             1, 1, layer_id,
-            xform=lambda s: not s,
+            xform=np.logical_not,
             )
         # We only set sharp edges here, not face smoothing itself...
         mesh.use_auto_smooth = True
@@ -1106,7 +1099,7 @@ def blen_read_geom_layer_smooth(fbx_obj, mesh):
     elif fbx_layer_mapping == b'ByPolygon':
         blen_data = mesh.polygons
         return blen_read_geom_array_mapped_polygon(
-            mesh, blen_data, "use_smooth",
+            mesh, blen_data, "use_smooth", np.bool_,
             fbx_layer_data, None,
             fbx_layer_mapping, fbx_layer_ref,
             1, 1, layer_id,
@@ -1147,7 +1140,7 @@ def blen_read_geom_layer_edge_crease(fbx_obj, mesh):
 
         blen_data = mesh.edges
         return blen_read_geom_array_mapped_edge(
-            mesh, blen_data, "crease",
+            mesh, blen_data, "crease", np.float32,
             fbx_layer_data, None,
             fbx_layer_mapping, fbx_layer_ref,
             1, 1, layer_id,
@@ -1176,17 +1169,27 @@ def blen_read_geom_layer_normal(fbx_obj, mesh, xform=None):
              (mesh.polygons, "Polygons", True, blen_read_geom_array_mapped_polygon),
              (mesh.vertices, "Vertices", True, blen_read_geom_array_mapped_vert))
     for blen_data, blen_data_type, is_fake, func in tries:
-        bdata = [None] * len(blen_data) if is_fake else blen_data
-        if func(mesh, bdata, "normal",
+        bdata = np.zeros((len(blen_data), 3), dtype=np.float32) if is_fake else blen_data
+        if func(mesh, bdata, "normal", np.float32,
                 fbx_layer_data, fbx_layer_index, fbx_layer_mapping, fbx_layer_ref, 3, 3, layer_id, xform, True):
             if blen_data_type == "Polygons":
-                for pidx, p in enumerate(mesh.polygons):
-                    for lidx in range(p.loop_start, p.loop_start + p.loop_total):
-                        mesh.loops[lidx].normal[:] = bdata[pidx]
-            elif blen_data_type is "Vertices":
+                poly_loop_starts = np.empty(len(mesh.polygons), dtype=np.int32)
+                poly_loop_totals = np.empty(len(mesh.polygons), dtype=np.int32)
+                mesh.polygons.foreach_get("loop_start", poly_loop_starts)
+                mesh.polygons.foreach_get("loop_total", poly_loop_totals)
+                # Loop indices of all polygons, in order.
+                poly_loop_offsets = np.cumsum(poly_loop_totals) - poly_loop_totals
+                loops_idx = (np.repeat(poly_loop_starts - poly_loop_offsets, poly_loop_totals) +
+                             np.arange(poly_loop_totals.sum()))
+                loops_nors = np.empty((len(mesh.loops), 3), dtype=np.float32)
+                mesh.loops.foreach_get("normal", loops_nors.ravel())
+                loops_nors[loops_idx] = np.repeat(bdata, poly_loop_totals, axis=0)
+                mesh.loops.foreach_set("normal", loops_nors.ravel())
+            elif blen_data_type == "Vertices":
                 # We have to copy vnors to lnors! Far from elegant, but simple.
-                for l in mesh.loops:
-                    l.normal[:] = bdata[l.vertex_index]
+                loops_vidx = np.empty(len(mesh.loops), dtype=np.int32)
+                mesh.loops.foreach_get("vertex_index", loops_vidx)
+                mesh.loops.foreach_set("normal", bdata[loops_vidx].ravel())
             return True
 
     blen_read_geom_array_error_mapping("normal", fbx_layer_mapping)
@@ -1195,9 +1198,6 @@ def blen_read_geom_layer_normal(fbx_obj, mesh, xform=None):
 
 
 def blen_read_geom(fbx_tmpl, fbx_obj, settings):
-    from itertools import chain
-    import array
-
     # Vertices are in object space, but we are post-multiplying all transforms with the inverse of the
     # global matrix, so we need to apply the global matrix to the vertices to get the correct result.
     geom_mat_co = settings.global_matrix if settings.bake_space_transform else None
@@ -1215,73 +1215,49 @@ def blen_read_geom(fbx_tmpl, fbx_obj, settings):
     fbx_polys = elem_prop_first(elem_find_first(fbx_obj, b'PolygonVertexIndex'))
     fbx_edges = elem_prop_first(elem_find_first(fbx_obj, b'Edges'))
 
-    if geom_mat_co is not None:
-        def _vcos_transformed_gen(raw_cos, m=None):
-            # Note: we could most likely get much better performances with numpy, but will leave this as TODO for now.
-            return chain(*(m @ Vector(v) for v in zip(*(iter(raw_cos),) * 3)))
-        fbx_verts = array.array(fbx_verts.typecode, _vcos_transformed_gen(fbx_verts, geom_mat_co))
+    fbx_verts = np.empty(0) if fbx_verts is None else blen_read_geom_array_to_np(fbx_verts)
+    fbx_polys = np.empty(0, dtype=np.int32) if fbx_polys is None else blen_read_geom_array_to_np(fbx_polys)
 
-    if fbx_verts is None:
-        fbx_verts = ()
-    if fbx_polys is None:
-        fbx_polys = ()
+    if geom_mat_co is not None:
+        geom_mat_co = np.array(geom_mat_co)
+        fbx_verts = fbx_verts.reshape(-1, 3) @ geom_mat_co[:3, :3].T + geom_mat_co[:3, 3]
 
     mesh = bpy.data.meshes.new(name=elem_name_utf8)
-    mesh.vertices.add(len(fbx_verts) // 3)
-    mesh.vertices.foreach_set("co", fbx_verts)
+    mesh.vertices.add(len(fbx_verts.ravel()) // 3)
+    mesh.vertices.foreach_set("co", fbx_verts.ravel().astype(np.float32))
+
+    if len(fbx_polys):
+        # Last index of each polygon is negative (bitwise-inverted).
+        poly_ends = np.flatnonzero(fbx_polys < 0)
+        poly_loop_starts = np.concatenate(((0,), poly_ends + 1))
+        fbx_polys_vidx = np.where(fbx_polys < 0, np.invert(fbx_polys), fbx_polys)
 
-    if fbx_polys:
         mesh.loops.add(len(fbx_polys))
-        poly_loop_starts = []
-        poly_loop_totals = []
-        poly_loop_prev = 0
-        for i, l in enumerate(mesh.loops):
-            index = fbx_polys[i]
-            if index < 0:
-                poly_loop_starts.append(poly_loop_prev)
-                poly_loop_totals.append((i - poly_loop_prev) + 1)
-                poly_loop_prev = i + 1
-                index ^= -1
-            l.vertex_index = index
-
-        mesh.polygons.add(len(poly_loop_starts))
-        mesh.polygons.foreach_set("loop_start", poly_loop_starts)
-        mesh.polygons.foreach_set("loop_total", poly_loop_totals)
+        mesh.loops.foreach_set("vertex_index", fbx_polys_vidx)
+
+        mesh.polygons.add(len(poly_ends))
+        mesh.polygons.foreach_set("loop_start", poly_loop_starts[:-1].astype(np.int32))
+        mesh.polygons.foreach_set("loop_total", (poly_ends + 1 - poly_loop_starts[:-1]).astype(np.int32))
 
         blen_read_geom_layer_material(fbx_obj, mesh)
         blen_read_geom_layer_uv(fbx_obj, mesh)
         blen_read_geom_layer_color(fbx_obj, mesh)
 
-    if fbx_edges:
+    if fbx_edges and len(fbx_polys):
         # edges in fact index the polygons (NOT the vertices)
-        import array
-        tot_edges = len(fbx_edges)
-        edges_conv = array.array('i', [0]) * (tot_edges * 2)
-
-        edge_index = 0
-        for i in fbx_edges:
-            e_a = fbx_polys[i]
-            if e_a >= 0:
-                e_b = fbx_polys[i + 1]
-                if e_b < 0:
-                    e_b ^= -1
-            else:
-                # Last index of polygon, wrap back to the start.
+        fbx_edges = blen_read_geom_array_to_np(fbx_edges)
 
-                # ideally we wouldn't have to search back,
-                # but it should only be 2-3 iterations.
-                j = i - 1
-                while j >= 0 and fbx_polys[j] >= 0:
-                    j -= 1
-                e_a ^= -1
-                e_b = fbx_polys[j + 1]
+        # Loop index of the start of the polygon owning each loop.
+        loops_poly_start = poly_loop_starts[np.concatenate(((0,), np.cumsum(fbx_polys < 0)[:-1]))]
 
-            edges_conv[edge_index] = e_a
-            edges_conv[edge_index + 1] = e_b
-            edge_index += 2
+        e_a = fbx_polys_vidx[fbx_edges]
+        # If first index is the last of its polygon, wrap back to the start.
+        e_b = np.where(fbx_polys[fbx_edges] >= 0,
+                       fbx_polys_vidx[np.minimum(fbx_edges + 1, len(fbx_polys) - 1)],
+                       fbx_polys_vidx[loops_poly_start[fbx_edges]])
 
-        mesh.edges.add(tot_edges)
-        mesh.edges.foreach_set("vertices", edges_conv)
+        mesh.edges.add(len(fbx_edges))
+        mesh.edges.foreach_set("vertices", np.column_stack((e_a, e_b)).astype(np.int32).ravel())
 
     # must be after edge, face loading.
     ok_smooth = blen_read_geom_layer_smooth(fbx_obj, mesh)
@@ -1296,21 +1272,23 @@ def blen_read_geom(fbx_tmpl, fbx_obj, settings):
         if geom_mat_no is None:
             ok_normals = blen_read_geom_layer_normal(fbx_obj, mesh)
         else:
+            geom_mat_no = np.array(geom_mat_no)[:3, :3]
+
             def nortrans(v):
-                return geom_mat_no @ Vector(v)
+                return v @ geom_mat_no.T
             ok_normals = blen_read_geom_layer_normal(fbx_obj, mesh, nortrans)
 
     mesh.validate(clean_customdata=False)  # *Very* important to not remove lnors here!
 
     if ok_normals:
-        clnors = array.array('f', [0.0] * (len(mesh.loops) * 3))
-        mesh.loops.foreach_get("normal", clnors)
+        clnors = np.empty((len(mesh.loops), 3), dtype=np.float32)
+        mesh.loops.foreach_get("normal", clnors.ravel())
 
         if not ok_smooth:
-            mesh.polygons.foreach_set("use_smooth", [True] * len(mesh.polygons))
+            mesh.polygons.foreach_set("use_smooth", np.ones(len(mesh.polygons), dtype=np.bool_))
             ok_smooth = True
 
-        mesh.normals_split_custom_set(tuple(zip(*(iter(clnors),) * 3)))
+        mesh.normals_split_custom_set(clnors)
         mesh.use_auto_smooth = True
     else:
         mesh.calc_normals()
@@ -1319,7 +1297,7 @@ def blen_read_geom(fbx_tmpl, fbx_obj, settings):
         mesh.free_normals_split()
 
     if not ok_smooth:
-        mesh.polygons.foreach_set("use_smooth", [True] * len(mesh.polygons))
+        mesh.polygons.foreach_set("use_smooth", np.ones(len(mesh.polygons), dtype=np.bool_))
 
     if ok_crease:
         mesh.use_customdata_edge_crease = True
@@ -2330,7 +2308,8 @@ def load(operator, context, filepath="",
          automatic_bone_orientation=False,
          primary_bone_axis='Y',
          secondary_bone_axis='X',
-         use_prepost_rot=True):
+         use_prepost_rot=True,
+         use_lazy_load=False):
 
     global fbx_elem_nil
     fbx_elem_nil = FBXElem('', (), (), ())
@@ -2356,7 +2335,7 @@ def load(operator, context, filepath="",
         return {'CANCELLED'}
 
     try:
-        elem_root, version = parse_fbx.parse(filepath)
+        elem_root, version = parse_fbx.parse(filepath, use_lazy=use_lazy_load)
     except Exception as e:
         import traceback
         traceback.print_exc()
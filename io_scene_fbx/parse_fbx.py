@@ -25,11 +25,17 @@ __all__ = (
     "parse",
     "data_types",
     "parse_version",
+    "parse_index",
+    "parse_elem",
+    "index_find_iter",
     "FBXElem",
+    "FBXElemIndex",
+    "FBXLazyArray",
     )
 
 from struct import unpack
 import array
+import mmap
 import zlib
 
 from . import data_types
@@ -42,7 +48,10 @@ read_fbx_elem_uint = ...
 _IS_BIG_ENDIAN = (__import__("sys").byteorder != 'little')
 _HEAD_MAGIC = b'Kaydara FBX Binary\x20\x20\x00\x1a\x00'
 from collections import namedtuple
-FBXElem = namedtuple("FBXElem", ("id", "props", "props_type", "elems"))
+# offset is the position of the element in the file, only known for parsed elements.
+FBXElem = namedtuple("FBXElem", ("id", "props", "props_type", "elems", "offset"), defaults=(None,))
+# Lightweight version of FBXElem, as generated by parse_index().
+FBXElemIndex = namedtuple("FBXElemIndex", ("id", "props_type", "elems", "offset", "end_offset"))
 del namedtuple
 
 
@@ -64,13 +73,7 @@ def read_string_ubyte(read):
     return data
 
 
-def unpack_array(read, array_type, array_stride, array_byteswap):
-    length = read_uint(read)
-    encoding = read_uint(read)
-    comp_len = read_uint(read)
-
-    data = read(comp_len)
-
+def decode_array(data, length, encoding, array_type, array_stride, array_byteswap):
     if encoding == 0:
         pass
     elif encoding == 1:
@@ -84,6 +87,82 @@ def unpack_array(read, array_type, array_stride, array_byteswap):
     return data_array
 
 
+def unpack_array(read, array_type, array_stride, array_byteswap):
+    length = read_uint(read)
+    encoding = read_uint(read)
+    comp_len = read_uint(read)
+
+    data = read(comp_len)
+
+    return decode_array(data, length, encoding, array_type, array_stride, array_byteswap)
+
+
+class FBXLazyArray:
+    """
+    Placeholder for an array property which has not been decoded yet,
+    only the location of its (possibly compressed) data in the mapped file is stored.
+    """
+    __slots__ = (
+        "buf", "offset", "comp_len", "length", "encoding",
+        "array_type", "array_stride", "array_byteswap",
+        )
+
+    def __init__(self, buf, offset, comp_len, length, encoding, array_type, array_stride, array_byteswap):
+        self.buf = buf
+        self.offset = offset
+        self.comp_len = comp_len
+        self.length = length
+        self.encoding = encoding
+        self.array_type = array_type
+        self.array_stride = array_stride
+        self.array_byteswap = array_byteswap
+
+    def __len__(self):
+        return self.length
+
+    def decode(self):
+        data = self.buf[self.offset:self.offset + self.comp_len]
+        return decode_array(data, self.length, self.encoding,
+                            self.array_type, self.array_stride, self.array_byteswap)
+
+
+class FBXLazyProps(list):
+    """
+    List of element properties, where array properties are only decoded (and cached) when first accessed.
+    """
+    __slots__ = ()
+
+    def _decode(self, idx):
+        item = list.__getitem__(self, idx)
+        if type(item) is FBXLazyArray:
+            item = item.decode()
+            list.__setitem__(self, idx, item)
+        return item
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            for i in range(*key.indices(len(self))):
+                self._decode(i)
+            return list.__getitem__(self, key)
+        return self._decode(key)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self._decode(i)
+
+
+def unpack_array_lazy(buf, array_type, array_stride, array_byteswap):
+    read = buf.read
+    length = read_uint(read)
+    encoding = read_uint(read)
+    comp_len = read_uint(read)
+
+    offset = buf.tell()
+    buf.seek(comp_len, 1)
+
+    return FBXLazyArray(buf, offset, comp_len, length, encoding, array_type, array_stride, array_byteswap)
+
+
 read_data_dict = {
     b'Y'[0]: lambda read: unpack(b'<h', read(2))[0],  # 16 bit int
     b'C'[0]: lambda read: unpack(b'?', read(1))[0],   # 1 bit bool (yes/no)
@@ -102,6 +181,38 @@ read_data_dict = {
     }
 
 
+def read_data_dict_lazy(buf):
+    """
+    Same as read_data_dict, but array properties are only located in given buffer and skipped.
+    """
+    return {
+        **read_data_dict,
+        b'f'[0]: lambda read: unpack_array_lazy(buf, data_types.ARRAY_FLOAT32, 4, False),  # array (float)
+        b'i'[0]: lambda read: unpack_array_lazy(buf, data_types.ARRAY_INT32, 4, True),   # array (int)
+        b'd'[0]: lambda read: unpack_array_lazy(buf, data_types.ARRAY_FLOAT64, 8, False),  # array (double)
+        b'l'[0]: lambda read: unpack_array_lazy(buf, data_types.ARRAY_INT64, 8, True),   # array (long)
+        b'b'[0]: lambda read: unpack_array_lazy(buf, data_types.ARRAY_BOOL, 1, False),  # array (bool)
+        b'c'[0]: lambda read: unpack_array_lazy(buf, data_types.ARRAY_BYTE, 1, False),  # array (ubyte)
+        }
+
+
+# Size of the data of each property type, or callback returning it (used when only indexing the file).
+skip_data_dict = {
+    b'Y'[0]: 2,  # 16 bit int
+    b'C'[0]: 1,  # 1 bit bool (yes/no)
+    b'I'[0]: 4,  # 32 bit int
+    b'F'[0]: 4,  # 32 bit float
+    b'D'[0]: 8,  # 64 bit float
+    b'L'[0]: 8,  # 64 bit int
+    b'R'[0]: lambda read: read_uint(read),  # binary data
+    b'S'[0]: lambda read: read_uint(read),  # string data
+    }
+for _t in b'fidlbc':
+    # arrays: length, encoding, comp_len, then (compressed) data.
+    skip_data_dict[_t] = lambda read: unpack(b'<3I', read(12))[2]
+del _t
+
+
 # FBX 7500 (aka FBX2016) introduces incompatible changes at binary level:
 #   * The NULL block marking end of nested stuff switches from 13 bytes long to 25 bytes long.
 #   * The FBX element metadata (end_offset, prop_count and prop_length) switch from uint32 to uint64.
@@ -121,7 +232,9 @@ def init_version(fbx_version):
     _BLOCK_SENTINEL_DATA = (b'\0' * _BLOCK_SENTINEL_LENGTH)
 
 
-def read_elem(read, tell, use_namedtuple):
+def read_elem(read, tell, use_namedtuple, read_data=read_data_dict):
+    offset = tell()
+
     # [0] the offset at which this block ends
     # [1] the number of properties in the scope
     # [2] the length of the property list
@@ -139,12 +252,15 @@ def read_elem(read, tell, use_namedtuple):
 
     for i in range(prop_count):
         data_type = read(1)[0]
-        elem_props_data[i] = read_data_dict[data_type](read)
+        elem_props_data[i] = read_data[data_type](read)
         elem_props_type[i] = data_type
 
+    if read_data is not read_data_dict:
+        elem_props_data = FBXLazyProps(elem_props_data)
+
     if tell() < end_offset:
         while tell() < (end_offset - _BLOCK_SENTINEL_LENGTH):
-            elem_subtree.append(read_elem(read, tell, use_namedtuple))
+            elem_subtree.append(read_elem(read, tell, use_namedtuple, read_data))
 
         if read(_BLOCK_SENTINEL_LENGTH) != _BLOCK_SENTINEL_DATA:
             raise IOError("failed to read nested block sentinel, "
@@ -153,10 +269,49 @@ def read_elem(read, tell, use_namedtuple):
     if tell() != end_offset:
         raise IOError("scope length not reached, something is wrong")
 
-    args = (elem_id, elem_props_data, elem_props_type, elem_subtree)
+    args = (elem_id, elem_props_data, elem_props_type, elem_subtree, offset)
     return FBXElem(*args) if use_namedtuple else args
 
 
+def read_elem_index(read, tell, seek):
+    """
+    Same as read_elem(), but only gather the structure of the elements tree, all properties data is skipped.
+    """
+    offset = tell()
+
+    end_offset = read_fbx_elem_uint(read)
+    if end_offset == 0:
+        return None
+
+    prop_count = read_fbx_elem_uint(read)
+    prop_length = read_fbx_elem_uint(read)
+
+    elem_id = read_string_ubyte(read)
+    elem_props_type = bytearray(prop_count)
+    elem_subtree = []
+
+    for i in range(prop_count):
+        data_type = read(1)[0]
+        size = skip_data_dict[data_type]
+        if not isinstance(size, int):
+            size = size(read)
+        seek(size, 1)
+        elem_props_type[i] = data_type
+
+    if tell() < end_offset:
+        while tell() < (end_offset - _BLOCK_SENTINEL_LENGTH):
+            elem_subtree.append(read_elem_index(read, tell, seek))
+
+        if read(_BLOCK_SENTINEL_LENGTH) != _BLOCK_SENTINEL_DATA:
+            raise IOError("failed to read nested block sentinel, "
+                          "expected all bytes to be 0")
+
+    if tell() != end_offset:
+        raise IOError("scope length not reached, something is wrong")
+
+    return FBXElemIndex(elem_id, elem_props_type, elem_subtree, offset, end_offset)
+
+
 def parse_version(fn):
     """
     Return the FBX version,
@@ -171,10 +326,24 @@ def parse_version(fn):
         return read_uint(read)
 
 
-def parse(fn, use_namedtuple=True):
+def parse(fn, use_namedtuple=True, use_lazy=False):
+    """
+    Parse a binary FBX file, return its root element and version.
+
+    When use_lazy is enabled, the file is memory-mapped and array properties are only decoded
+    when first accessed (elements' props are then FBXLazyProps lists),
+    so that large arrays of discarded elements are never decompressed.
+    """
     root_elems = []
 
     with open(fn, 'rb') as f:
+        if use_lazy:
+            # The mapping remains valid once the file is closed, it is released with the last lazy array using it.
+            f = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            read_data = read_data_dict_lazy(f)
+        else:
+            read_data = read_data_dict
+
         read = f.read
         tell = f.tell
 
@@ -185,10 +354,78 @@ def parse(fn, use_namedtuple=True):
         init_version(fbx_version)
 
         while True:
-            elem = read_elem(read, tell, use_namedtuple)
+            elem = read_elem(read, tell, use_namedtuple, read_data)
             if elem is None:
                 break
             root_elems.append(elem)
 
-    args = (b'', [], bytearray(0), root_elems)
+    args = (b'', [], bytearray(0), root_elems, 0)
     return FBXElem(*args) if use_namedtuple else args, fbx_version
+
+
+def parse_index(fn):
+    """
+    Return an index of the elements tree of a binary FBX file (as FBXElemIndex items), and its version.
+
+    This is much faster than parse(), since properties data are never read.
+    Actual elements can then be loaded on demand with parse_elem().
+    """
+    root_elems = []
+
+    with open(fn, 'rb') as f:
+        read = f.read
+        tell = f.tell
+        seek = f.seek
+
+        if read(len(_HEAD_MAGIC)) != _HEAD_MAGIC:
+            raise IOError("Invalid header")
+
+        fbx_version = read_uint(read)
+        init_version(fbx_version)
+
+        while True:
+            elem = read_elem_index(read, tell, seek)
+            if elem is None:
+                break
+            root_elems.append(elem)
+
+    return FBXElemIndex(b'', bytearray(0), root_elems, 0, 0), fbx_version
+
+
+def parse_elem(fn, elem_index, use_namedtuple=True, use_lazy=False):
+    """
+    Load the element (and its whole subtree) matching given FBXElemIndex (as returned by parse_index()).
+    See parse() for the use_lazy option.
+    """
+    assert(elem_index.id != b'')
+
+    with open(fn, 'rb') as f:
+        if use_lazy:
+            f = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            read_data = read_data_dict_lazy(f)
+        else:
+            read_data = read_data_dict
+
+        read = f.read
+
+        if read(len(_HEAD_MAGIC)) != _HEAD_MAGIC:
+            raise IOError("Invalid header")
+
+        init_version(read_uint(read))
+
+        f.seek(elem_index.offset)
+        return read_elem(read, f.tell, use_namedtuple, read_data)
+
+
+def index_find_iter(elem_index, id_path):
+    """
+    Yield all FBXElemIndex items found under given one, following given sequence of ids,
+    e.g. (b'Objects', b'Geometry') for all geometries of the file when elem_index is the root.
+    """
+    id_search, *id_path = id_path
+    for sub_elem in elem_index.elems:
+        if sub_elem.id == id_search:
+            if id_path:
+                yield from index_find_iter(sub_elem, id_path)
+            else:
+                yield sub_elem
@@ -306,6 +306,23 @@ class ExportGLTF2_Base:
         default=False
     )
 
+    export_cache_dir: StringProperty(
+        name='Cache Directory',
+        description='Directory keeping encoded images and mesh data between exports, '
+                    'so that unchanged data is not processed again. Entries are signed with a key '
+                    'private to the user, entries written by other users are ignored. Leave empty to disable',
+        default='',
+        subtype='DIR_PATH'
+    )
+
+    export_cache_size: IntProperty(
+        name='Cache Size (MB)',
+        description='Maximum size of the cache directory. Least recently used entries are removed first',
+        default=1024,
+        min=1,
+        max=1048576
+    )
+
     will_save_settings: BoolProperty(
         name='Remember Export Settings',
         description='Store glTF export settings in the Blender project',
@@ -413,6 +430,9 @@ class ExportGLTF2_Base:
         export_settings['gltf_lights'] = self.export_lights
         export_settings['gltf_displacement'] = self.export_displacement
 
+        export_settings['gltf_cache_dir'] = bpy.path.abspath(self.export_cache_dir) if self.export_cache_dir else ''
+        export_settings['gltf_cache_size'] = self.export_cache_size * 1024 * 1024
+
         export_settings['gltf_binary'] = bytearray()
         export_settings['gltf_binaryfilename'] = os.path.splitext(os.path.basename(
             bpy.path.ensure_ext(self.filepath,self.filename_ext)))[0] + '.bin'
@@ -452,6 +472,9 @@ class GLTF_PT_export_main(bpy.types.Panel):
 
         layout.prop(operator, 'export_format')
         layout.prop(operator, 'export_copyright')
+        layout.prop(operator, 'export_cache_dir')
+        if operator.export_cache_dir:
+            layout.prop(operator, 'export_cache_size')
         layout.prop(operator, 'will_save_settings')
 
 
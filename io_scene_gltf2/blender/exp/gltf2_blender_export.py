@@ -14,6 +14,7 @@
 import time
 
 import bpy
+import os
 import sys
 import traceback
 
@@ -24,6 +25,7 @@ from io_scene_gltf2.blender.exp.gltf2_blender_gltf2_exporter import GlTF2Exporte
 from io_scene_gltf2.io.com.gltf2_io_debug import print_console, print_newline
 from io_scene_gltf2.io.exp import gltf2_io_export
 from io_scene_gltf2.io.exp import gltf2_io_draco_compression_extension
+from io_scene_gltf2.io.exp.gltf2_io_disk_cache import DiskCache
 
 
 def save(context, export_settings):
@@ -50,15 +52,35 @@ def save(context, export_settings):
 
 def __export(export_settings):
     export_settings['gltf_channelcache'] = dict()
+    export_settings[gltf2_blender_export_keys.DISK_CACHE] = __get_disk_cache(export_settings)
     exporter = GlTF2Exporter(__get_copyright(export_settings))
     __gather_gltf(exporter, export_settings)
     buffer = __create_buffer(exporter, export_settings)
     exporter.finalize_images(export_settings[gltf2_blender_export_keys.FILE_DIRECTORY])
     json = __fix_json(exporter.glTF.to_dict())
 
+    disk_cache = export_settings[gltf2_blender_export_keys.DISK_CACHE]
+    if disk_cache is not None:
+        print_console('INFO', 'Export cache: {} hits, {} misses'.format(disk_cache.hits, disk_cache.misses))
+        disk_cache.evict()
+
     return json, buffer
 
 
+def __get_disk_cache(export_settings):
+    if not export_settings.get(gltf2_blender_export_keys.CACHE_DIR):
+        return None
+    try:
+        # the key is kept with the user's settings, not in the cache directory, which may be shared
+        secret_path = os.path.join(bpy.utils.user_resource('CONFIG', create=True), 'gltf_export_cache.key')
+        return DiskCache(export_settings[gltf2_blender_export_keys.CACHE_DIR],
+                         export_settings[gltf2_blender_export_keys.CACHE_SIZE],
+                         DiskCache.load_secret(secret_path))
+    except OSError as e:
+        print_console('WARNING', 'Export cache disabled: {}'.format(e))
+        return None
+
+
 def __get_copyright(export_settings):
     if export_settings[gltf2_blender_export_keys.COPYRIGHT]:
         return export_settings[gltf2_blender_export_keys.COPYRIGHT]
@@ -53,6 +53,9 @@ EMBED_IMAGES = 'gltf_embed_images'
 BINARY = 'gltf_binary'
 EMBED_BUFFERS = 'gltf_embed_buffers'
 USE_NO_COLOR = 'gltf_use_no_color'
+CACHE_DIR = 'gltf_cache_dir'
+CACHE_SIZE = 'gltf_cache_size'
+DISK_CACHE = 'gltf_disk_cache'
 
 METALLIC_ROUGHNESS_IMAGE = "metallic_roughness_image"
 GROUP_INDEX = 'group_index'
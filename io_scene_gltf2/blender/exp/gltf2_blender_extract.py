@@ -17,8 +17,8 @@
 #
 
 from mathutils import Vector, Quaternion, Matrix
-from mathutils.geometry import tessellate_polygon
 from operator import attrgetter
+import numpy as np
 
 from . import gltf2_blender_export_keys
 from ...io.com.gltf2_io_debug import print_console
@@ -49,17 +49,6 @@ POSITION_ATTRIBUTE = 'POSITION'
 GLTF_MAX_COLORS = 2
 
 
-#
-# Classes
-#
-
-class ShapeKey:
-    def __init__(self, shape_key, vertex_normals, polygon_normals):
-        self.shape_key = shape_key
-        self.vertex_normals = vertex_normals
-        self.polygon_normals = polygon_normals
-
-
 #
 # Functions
 #
@@ -145,280 +134,224 @@ def decompose_transition(matrix, export_settings):
 
     return translation, rotation, scale
 
-def extract_primitive_floor(a, indices, use_tangents):
-    """Shift indices, that the first one starts with 0. It is assumed, that the indices are packed."""
-    attributes = {
-        POSITION_ATTRIBUTE: [],
-        NORMAL_ATTRIBUTE: []
-    }
-
-    if use_tangents:
-        attributes[TANGENT_ATTRIBUTE] = []
-
-    result_primitive = {
-        MATERIAL_ID: a[MATERIAL_ID],
-        INDICES_ID: [],
-        ATTRIBUTES_ID: attributes
-    }
-
-    source_attributes = a[ATTRIBUTES_ID]
-
-    #
-
-    tex_coord_index = 0
-    process_tex_coord = True
-    while process_tex_coord:
-        tex_coord_id = TEXCOORD_PREFIX + str(tex_coord_index)
-
-        if source_attributes.get(tex_coord_id) is not None:
-            attributes[tex_coord_id] = []
-            tex_coord_index += 1
-        else:
-            process_tex_coord = False
-
-    tex_coord_max = tex_coord_index
-
-    #
-
-    color_index = 0
-    process_color = True
-    while process_color:
-        color_id = COLOR_PREFIX + str(color_index)
-
-        if source_attributes.get(color_id) is not None:
-            attributes[color_id] = []
-            color_index += 1
-        else:
-            process_color = False
-
-    color_max = color_index
-
-    #
-
-    bone_index = 0
-    process_bone = True
-    while process_bone:
-        joint_id = JOINTS_PREFIX + str(bone_index)
-        weight_id = WEIGHTS_PREFIX + str(bone_index)
-
-        if source_attributes.get(joint_id) is not None:
-            attributes[joint_id] = []
-            attributes[weight_id] = []
-            bone_index += 1
-        else:
-            process_bone = False
-
-    bone_max = bone_index
-
-    #
-
-    morph_index = 0
-    process_morph = True
-    while process_morph:
-        morph_position_id = MORPH_POSITION_PREFIX + str(morph_index)
-        morph_normal_id = MORPH_NORMAL_PREFIX + str(morph_index)
-        morph_tangent_id = MORPH_TANGENT_PREFIX + str(morph_index)
 
-        if source_attributes.get(morph_position_id) is not None:
-            attributes[morph_position_id] = []
-            attributes[morph_normal_id] = []
-            if use_tangents:
-                attributes[morph_tangent_id] = []
-            morph_index += 1
-        else:
-            process_morph = False
-
-    morph_max = morph_index
+def convert_swizzle_array(values, export_settings):
+    """Convert an (n, 3) array from Blender coordinate system to glTF coordinate system."""
+    if export_settings[gltf2_blender_export_keys.YUP]:
+        return np.stack((values[:, 0], values[:, 2], -values[:, 1]), axis=1)
+    else:
+        return values.copy()
 
-    #
 
-    min_index = min(indices)
-    max_index = max(indices)
+def convert_swizzle_location_array(locs, armature, blender_object, export_settings):
+    """Convert an (n, 3) array of locations, see convert_swizzle_location()."""
+    if armature:
+        apply_matrix = armature.matrix_world.inverted() @ blender_object.matrix_world
+        matrix = np.array(armature.matrix_world @ apply_matrix, dtype=np.float32)
+        locs = locs @ matrix[:3, :3].T + matrix[:3, 3]
+    return convert_swizzle_array(locs, export_settings)
 
-    for old_index in indices:
-        result_primitive[INDICES_ID].append(old_index - min_index)
 
-    for old_index in range(min_index, max_index + 1):
-        for vi in range(0, 3):
-            attributes[POSITION_ATTRIBUTE].append(source_attributes[POSITION_ATTRIBUTE][old_index * 3 + vi])
-            attributes[NORMAL_ATTRIBUTE].append(source_attributes[NORMAL_ATTRIBUTE][old_index * 3 + vi])
+def convert_swizzle_normal_and_tangent_array(normals, armature, blender_object, export_settings):
+    """Convert an (n, 3) array of normals, see convert_swizzle_normal_and_tangent()."""
+    if armature:
+        apply_matrix = armature.matrix_world.inverted() @ blender_object.matrix_world
+        rotation = np.array(apply_matrix.to_quaternion().to_matrix(), dtype=np.float32)
+        normals = normals @ rotation.T
+    return convert_swizzle_array(normals, export_settings)
 
-        if use_tangents:
-            for vi in range(0, 4):
-                attributes[TANGENT_ATTRIBUTE].append(source_attributes[TANGENT_ATTRIBUTE][old_index * 4 + vi])
 
-        for tex_coord_index in range(0, tex_coord_max):
-            tex_coord_id = TEXCOORD_PREFIX + str(tex_coord_index)
-            for vi in range(0, 2):
-                attributes[tex_coord_id].append(source_attributes[tex_coord_id][old_index * 2 + vi])
+def convert_swizzle_tangent_array(tans, armature, blender_object, export_settings):
+    """Convert an (n, 3) array of tangents to an (n, 4) array, see convert_swizzle_tangent()."""
+    if not np.all(np.any(tans != 0.0, axis=1)):
+        print_console('WARNING', 'Tangent has zero length.')
 
-        for color_index in range(0, color_max):
-            color_id = COLOR_PREFIX + str(color_index)
-            for vi in range(0, 4):
-                attributes[color_id].append(source_attributes[color_id][old_index * 4 + vi])
+    tans = convert_swizzle_normal_and_tangent_array(tans, armature, blender_object, export_settings)
+    return np.hstack((tans, np.ones((len(tans), 1), dtype=tans.dtype)))
 
-        for bone_index in range(0, bone_max):
-            joint_id = JOINTS_PREFIX + str(bone_index)
-            weight_id = WEIGHTS_PREFIX + str(bone_index)
-            for vi in range(0, 4):
-                attributes[joint_id].append(source_attributes[joint_id][old_index * 4 + vi])
-                attributes[weight_id].append(source_attributes[weight_id][old_index * 4 + vi])
-
-        for morph_index in range(0, morph_max):
-            morph_position_id = MORPH_POSITION_PREFIX + str(morph_index)
-            morph_normal_id = MORPH_NORMAL_PREFIX + str(morph_index)
-            morph_tangent_id = MORPH_TANGENT_PREFIX + str(morph_index)
-            for vi in range(0, 3):
-                attributes[morph_position_id].append(source_attributes[morph_position_id][old_index * 3 + vi])
-                attributes[morph_normal_id].append(source_attributes[morph_normal_id][old_index * 3 + vi])
-            if use_tangents:
-                for vi in range(0, 4):
-                    attributes[morph_tangent_id].append(source_attributes[morph_tangent_id][old_index * 4 + vi])
+def extract_primitive_floor(a, indices):
+    """Shift indices, that the first one starts with 0. It is assumed, that the indices are packed."""
+    min_index = indices.min()
+    max_index = indices.max()
 
-    return result_primitive
+    return {
+        MATERIAL_ID: a[MATERIAL_ID],
+        INDICES_ID: indices - min_index,
+        ATTRIBUTES_ID: {
+            attribute_id: values[min_index:max_index + 1]
+            for attribute_id, values in a[ATTRIBUTES_ID].items()
+        }
+    }
 
 
-def extract_primitive_pack(a, indices, use_tangents):
+def extract_primitive_pack(a, indices):
     """Pack indices, that the first one starts with 0. Current indices can have gaps."""
-    attributes = {
-        POSITION_ATTRIBUTE: [],
-        NORMAL_ATTRIBUTE: []
-    }
-
-    if use_tangents:
-        attributes[TANGENT_ATTRIBUTE] = []
+    old_indices, new_indices = __unique_first_appearance(indices)
 
-    result_primitive = {
+    return {
         MATERIAL_ID: a[MATERIAL_ID],
-        INDICES_ID: [],
-        ATTRIBUTES_ID: attributes
+        INDICES_ID: new_indices,
+        ATTRIBUTES_ID: {
+            attribute_id: values[old_indices]
+            for attribute_id, values in a[ATTRIBUTES_ID].items()
+        }
     }
 
-    source_attributes = a[ATTRIBUTES_ID]
-
-    #
-
-    tex_coord_index = 0
-    process_tex_coord = True
-    while process_tex_coord:
-        tex_coord_id = TEXCOORD_PREFIX + str(tex_coord_index)
-
-        if source_attributes.get(tex_coord_id) is not None:
-            attributes[tex_coord_id] = []
-            tex_coord_index += 1
-        else:
-            process_tex_coord = False
-
-    tex_coord_max = tex_coord_index
-
-    #
-
-    color_index = 0
-    process_color = True
-    while process_color:
-        color_id = COLOR_PREFIX + str(color_index)
-
-        if source_attributes.get(color_id) is not None:
-            attributes[color_id] = []
-            color_index += 1
-        else:
-            process_color = False
-
-    color_max = color_index
-
-    #
-
-    bone_index = 0
-    process_bone = True
-    while process_bone:
-        joint_id = JOINTS_PREFIX + str(bone_index)
-        weight_id = WEIGHTS_PREFIX + str(bone_index)
 
-        if source_attributes.get(joint_id) is not None:
-            attributes[joint_id] = []
-            attributes[weight_id] = []
-            bone_index += 1
-        else:
-            process_bone = False
-
-    bone_max = bone_index
-
-    #
-
-    morph_index = 0
-    process_morph = True
-    while process_morph:
-        morph_position_id = MORPH_POSITION_PREFIX + str(morph_index)
-        morph_normal_id = MORPH_NORMAL_PREFIX + str(morph_index)
-        morph_tangent_id = MORPH_TANGENT_PREFIX + str(morph_index)
-
-        if source_attributes.get(morph_position_id) is not None:
-            attributes[morph_position_id] = []
-            attributes[morph_normal_id] = []
-            if use_tangents:
-                attributes[morph_tangent_id] = []
-            morph_index += 1
-        else:
-            process_morph = False
-
-    morph_max = morph_index
-
-    #
-
-    old_to_new_indices = {}
-    new_to_old_indices = {}
+def __unique_first_appearance(keys):
+    """
+    Number the distinct keys in order of first appearance.
 
-    new_index = 0
-    for old_index in indices:
-        if old_to_new_indices.get(old_index) is None:
-            old_to_new_indices[old_index] = new_index
-            new_to_old_indices[new_index] = old_index
-            new_index += 1
+    :return: the position of the first occurrence of each distinct key and, for every key, its new number
+    """
+    _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+    order = np.argsort(first)
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    return first[order], rank[inverse.ravel()]
+
+
+def __foreach_get(collection, attribute, width=1, dtype=np.float32):
+    """Read an attribute of all items of a bpy collection into an (n, width) array."""
+    data = np.empty(len(collection) * width, dtype=dtype)
+    collection.foreach_get(attribute, data)
+    if width > 1:
+        return data.reshape(-1, width)
+    return data
+
+
+def __normalized(vectors):
+    """Normalize the rows of an (n, 3) array, leaving zero vectors untouched."""
+    lengths = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(lengths > 0.0, lengths, 1.0)
+
+
+def __color_srgb_to_scene_linear(c):
+    """Array version of color_srgb_to_scene_linear()."""
+    return np.where(
+        c < 0.04045,
+        np.where(c < 0.0, 0.0, c * (1.0 / 12.92)),
+        ((np.maximum(c, 0.04045) + 0.055) * (1.0 / 1.055)) ** 2.4
+    ).astype(np.float32)
+
+
+def __rotate_by_rotation_difference(vectors, vec_from, vec_to):
+    """Rotate each vector by vec_from.rotation_difference(vec_to), as mathutils does it row by row."""
+    vec_from = __normalized(vec_from)
+    vec_to = __normalized(vec_to)
+
+    axis = np.cross(vec_from, vec_to)
+    axis_length = np.linalg.norm(axis, axis=1)
+    dot = np.einsum('ij,ij->i', vec_from, vec_to)
+    angle = np.arccos(np.clip(dot, -1.0, 1.0))
+
+    # Degenerate (parallel) case: identity, or half a turn around an orthogonal axis.
+    degenerate = axis_length <= np.finfo(np.float32).eps
+    opposite = degenerate & (dot <= 0.0)
+    if np.any(opposite):
+        v = vec_from[opposite]
+        dominant = np.argmax(np.abs(v), axis=1)
+        ortho = np.where(
+            (dominant == 0)[:, None],
+            np.stack((-v[:, 1] - v[:, 2], v[:, 0], v[:, 0]), axis=1),
+            np.where(
+                (dominant == 1)[:, None],
+                np.stack((v[:, 1], -v[:, 0] - v[:, 2], v[:, 1]), axis=1),
+                np.stack((v[:, 2], v[:, 2], -v[:, 0] - v[:, 1]), axis=1)
+            )
+        )
+        axis[opposite] = ortho
+        angle[opposite] = np.where(np.any(ortho != 0.0, axis=1), np.pi, 0.0)
+    angle[degenerate & ~opposite] = 0.0
+
+    axis = __normalized(axis)
+    cos = np.cos(angle)[:, None]
+    sin = np.sin(angle)[:, None]
+    axis_dot = np.einsum('ij,ij->i', axis, vectors)[:, None]
+
+    # Rodrigues' rotation formula
+    return (vectors * cos + np.cross(axis, vectors) * sin + axis * axis_dot * (1.0 - cos)).astype(np.float32)
+
+
+def __gather_skin_data(blender_mesh, blender_vertex_groups, armature, used_vertices, export_settings):
+    """
+    Gather the joints and weights of all vertices, in sets of 4 influences.
 
-        result_primitive[INDICES_ID].append(old_to_new_indices[old_index])
+    :return: the number of sets, and two (vertex count, 4 * sets) arrays for joints and weights
+    """
+    blender_vertices = blender_mesh.vertices
 
-    end_new_index = new_index
+    bone_max = 0
+    for vertex_index in used_vertices:
+        bones_count = len(blender_vertices[vertex_index].groups)
+        if bones_count > 0:
+            if bones_count % 4 == 0:
+                bones_count -= 1
+            bone_max = max(bone_max, bones_count // 4 + 1)
+
+    joints = np.zeros((len(blender_vertices), bone_max * 4), dtype=np.uint32)
+    weights = np.zeros((len(blender_vertices), bone_max * 4), dtype=np.float32)
+
+    if bone_max == 0 or blender_vertex_groups is None or not export_settings[gltf2_blender_export_keys.SKINS]:
+        return bone_max, joints, weights
+
+    # Resolve vertex groups to joints once, instead of for each vertex.
+    joint_indices = {}
+    if armature:
+        skin = gltf2_blender_gather_skins.gather_skin(armature, export_settings)
+        if skin is not None:
+            for index, j in enumerate(skin.joints):
+                joint_indices.setdefault(j.name, index)
+    group_to_joint = [joint_indices.get(group.name) for group in blender_vertex_groups]
+
+    for vertex_index in used_vertices:
+        vertex_groups = blender_vertices[vertex_index].groups
+        if len(vertex_groups) == 0:
+            continue
+        if not export_settings['gltf_all_vertex_influences']:
+            # sort groups by weight descending
+            vertex_groups = sorted(vertex_groups, key=attrgetter('weight'), reverse=True)
+
+        vertex_joints = []
+        vertex_weights = []
+        joint = []
+        weight = []
+        for group_element in vertex_groups:
+            if len(joint) == 4:
+                vertex_joints.extend(joint)
+                vertex_weights.extend(weight)
+                joint = []
+                weight = []
 
-    for new_index in range(0, end_new_index):
-        old_index = new_to_old_indices[new_index]
+            joint_weight = group_element.weight
+            if joint_weight <= 0.0:
+                continue
 
-        for vi in range(0, 3):
-            attributes[POSITION_ATTRIBUTE].append(source_attributes[POSITION_ATTRIBUTE][old_index * 3 + vi])
-            attributes[NORMAL_ATTRIBUTE].append(source_attributes[NORMAL_ATTRIBUTE][old_index * 3 + vi])
+            joint_index = group_to_joint[group_element.group]
+            if joint_index is not None:
+                joint.append(joint_index)
+                weight.append(joint_weight)
 
-        if use_tangents:
-            for vi in range(0, 4):
-                attributes[TANGENT_ATTRIBUTE].append(source_attributes[TANGENT_ATTRIBUTE][old_index * 4 + vi])
+        if len(joint) > 0:
+            vertex_joints.extend(joint + [0] * (4 - len(joint)))
+            vertex_weights.extend(weight + [0.0] * (4 - len(weight)))
 
-        for tex_coord_index in range(0, tex_coord_max):
-            tex_coord_id = TEXCOORD_PREFIX + str(tex_coord_index)
-            for vi in range(0, 2):
-                attributes[tex_coord_id].append(source_attributes[tex_coord_id][old_index * 2 + vi])
+        joints[vertex_index, :len(vertex_joints)] = vertex_joints
+        weights[vertex_index, :len(vertex_weights)] = vertex_weights
 
-        for color_index in range(0, color_max):
-            color_id = COLOR_PREFIX + str(color_index)
-            for vi in range(0, 4):
-                attributes[color_id].append(source_attributes[color_id][old_index * 4 + vi])
+    return bone_max, joints, weights
 
-        for bone_index in range(0, bone_max):
-            joint_id = JOINTS_PREFIX + str(bone_index)
-            weight_id = WEIGHTS_PREFIX + str(bone_index)
-            for vi in range(0, 4):
-                attributes[joint_id].append(source_attributes[joint_id][old_index * 4 + vi])
-                attributes[weight_id].append(source_attributes[weight_id][old_index * 4 + vi])
-
-        for morph_index in range(0, morph_max):
-            morph_position_id = MORPH_POSITION_PREFIX + str(morph_index)
-            morph_normal_id = MORPH_NORMAL_PREFIX + str(morph_index)
-            morph_tangent_id = MORPH_TANGENT_PREFIX + str(morph_index)
-            for vi in range(0, 3):
-                attributes[morph_position_id].append(source_attributes[morph_position_id][old_index * 3 + vi])
-                attributes[morph_normal_id].append(source_attributes[morph_normal_id][old_index * 3 + vi])
-            if use_tangents:
-                for vi in range(0, 4):
-                    attributes[morph_tangent_id].append(source_attributes[morph_tangent_id][old_index * 4 + vi])
 
-    return result_primitive
+def __primitive_to_lists(primitive):
+    """Convert the arrays of a primitive to the flat lists expected by the gather functions."""
+    return {
+        MATERIAL_ID: primitive[MATERIAL_ID],
+        INDICES_ID: primitive[INDICES_ID].tolist(),
+        ATTRIBUTES_ID: {
+            attribute_id: values.ravel().tolist()
+            for attribute_id, values in primitive[ATTRIBUTES_ID].items()
+        }
+    }
 
 
 def extract_primitives(glTF, blender_mesh, blender_object, blender_vertex_groups, modifiers, export_settings):
@@ -442,110 +375,7 @@ def extract_primitives(glTF, blender_mesh, blender_object, blender_vertex_groups
         except Exception:
             print_console('WARNING', 'Could not calculate tangents. Please try to triangulate the mesh first.')
 
-    #
-
-    material_map = {}
-
-    #
-    # Gathering position, normal and tex_coords.
-    #
-    no_material_attributes = {
-        POSITION_ATTRIBUTE: [],
-        NORMAL_ATTRIBUTE: []
-    }
-
-    if use_tangents:
-        no_material_attributes[TANGENT_ATTRIBUTE] = []
-
-    #
-    # Directory of materials with its primitive.
-    #
-    no_material_primitives = {
-        MATERIAL_ID: 0,
-        INDICES_ID: [],
-        ATTRIBUTES_ID: no_material_attributes
-    }
-
-    material_idx_to_primitives = {0: no_material_primitives}
-
-    #
-
-    vertex_index_to_new_indices = {}
-
-    material_map[0] = vertex_index_to_new_indices
-
-    #
-    # Create primitive for each material.
-    #
-    for (mat_idx, _) in enumerate(blender_mesh.materials):
-        attributes = {
-            POSITION_ATTRIBUTE: [],
-            NORMAL_ATTRIBUTE: []
-        }
-
-        if use_tangents:
-            attributes[TANGENT_ATTRIBUTE] = []
-
-        primitive = {
-            MATERIAL_ID: mat_idx,
-            INDICES_ID: [],
-            ATTRIBUTES_ID: attributes
-        }
-
-        material_idx_to_primitives[mat_idx] = primitive
-
-        #
-
-        vertex_index_to_new_indices = {}
-
-        material_map[mat_idx] = vertex_index_to_new_indices
-
-    tex_coord_max = 0
-    if blender_mesh.uv_layers.active:
-        tex_coord_max = len(blender_mesh.uv_layers)
-
-    #
-
-    vertex_colors = {}
-
-    color_index = 0
-    for vertex_color in blender_mesh.vertex_colors:
-        vertex_color_name = COLOR_PREFIX + str(color_index)
-        vertex_colors[vertex_color_name] = vertex_color
-
-        color_index += 1
-        if color_index >= GLTF_MAX_COLORS:
-            break
-    color_max = color_index
-
-    #
-
-    bone_max = 0
-    for blender_polygon in blender_mesh.polygons:
-        for loop_index in blender_polygon.loop_indices:
-            vertex_index = blender_mesh.loops[loop_index].vertex_index
-            bones_count = len(blender_mesh.vertices[vertex_index].groups)
-            if bones_count > 0:
-                if bones_count % 4 == 0:
-                    bones_count -= 1
-                bone_max = max(bone_max, bones_count // 4 + 1)
-
-    #
-
-    morph_max = 0
-
-    blender_shape_keys = []
-
-    if blender_mesh.shape_keys is not None:
-        for blender_shape_key in blender_mesh.shape_keys.key_blocks:
-            if blender_shape_key != blender_shape_key.relative_key:
-                if blender_shape_key.mute is False:
-                    morph_max += 1
-                    blender_shape_keys.append(ShapeKey(
-                        blender_shape_key,
-                        blender_shape_key.normals_vertex_get(),  # calculate vertex normals for this shape key
-                        blender_shape_key.normals_polygon_get()))  # calculate polygon normals for this shape key
-
+    blender_mesh.calc_loop_triangles()
 
     armature = None
     if modifiers is not None:
@@ -554,599 +384,213 @@ def extract_primitives(glTF, blender_mesh, blender_object, blender_vertex_groups
             modifier = modifiers_dict["ARMATURE"]
             armature = modifier.object
 
-
     #
-    # Convert polygon to primitive indices and eliminate invalid ones. Assign to material.
+    # Every corner of every triangle becomes a row of the attribute arrays below.
     #
-    for blender_polygon in blender_mesh.polygons:
-        export_color = True
-
-        #
-
-        if not blender_polygon.material_index in material_idx_to_primitives:
-            primitive = material_idx_to_primitives[0]
-            vertex_index_to_new_indices = material_map[0]
-        else:
-            primitive = material_idx_to_primitives[blender_polygon.material_index]
-            vertex_index_to_new_indices = material_map[blender_polygon.material_index]
-        #
-
-        attributes = primitive[ATTRIBUTES_ID]
-
-        face_normal = blender_polygon.normal
-        face_tangent = Vector((0.0, 0.0, 0.0))
-        face_bitangent = Vector((0.0, 0.0, 0.0))
-        if use_tangents:
-            for loop_index in blender_polygon.loop_indices:
-                temp_vertex = blender_mesh.loops[loop_index]
-                face_tangent += temp_vertex.tangent
-                face_bitangent += temp_vertex.bitangent
-
-            face_tangent.normalize()
-            face_bitangent.normalize()
-
-        #
-
-        indices = primitive[INDICES_ID]
-
-        loop_index_list = []
-
-        if len(blender_polygon.loop_indices) == 3:
-            loop_index_list.extend(blender_polygon.loop_indices)
-        elif len(blender_polygon.loop_indices) > 3:
-            # Triangulation of polygon. Using internal function, as non-convex polygons could exist.
-            polyline = []
-
-            for loop_index in blender_polygon.loop_indices:
-                vertex_index = blender_mesh.loops[loop_index].vertex_index
-                v = blender_mesh.vertices[vertex_index].co
-                polyline.append(Vector((v[0], v[1], v[2])))
-
-            triangles = tessellate_polygon((polyline,))
-
-            for triangle in triangles:
-                loop_index_list.append(blender_polygon.loop_indices[triangle[0]])
-                loop_index_list.append(blender_polygon.loop_indices[triangle[2]])
-                loop_index_list.append(blender_polygon.loop_indices[triangle[1]])
-        else:
-            continue
-
-        for loop_index in loop_index_list:
-            vertex_index = blender_mesh.loops[loop_index].vertex_index
-
-            if vertex_index_to_new_indices.get(vertex_index) is None:
-                vertex_index_to_new_indices[vertex_index] = []
-
-            #
-
-            v = None
-            n = None
-            t = None
-            b = None
-            uvs = []
-            colors = []
-            joints = []
-            weights = []
-
-            target_positions = []
-            target_normals = []
-            target_tangents = []
-
-            vertex = blender_mesh.vertices[vertex_index]
-
-            v = convert_swizzle_location(vertex.co, armature, blender_object, export_settings)
-            if blender_polygon.use_smooth or blender_mesh.use_auto_smooth:
-                if blender_mesh.has_custom_normals:
-                    n = convert_swizzle_normal_and_tangent(blender_mesh.loops[loop_index].normal, armature, blender_object, export_settings)
-                else:
-                    n = convert_swizzle_normal_and_tangent(vertex.normal, armature, blender_object, export_settings)
-                if use_tangents:
-                    t = convert_swizzle_tangent(blender_mesh.loops[loop_index].tangent, armature, blender_object, export_settings)
-                    b = convert_swizzle_location(blender_mesh.loops[loop_index].bitangent, armature, blender_object, export_settings)
-            else:
-                n = convert_swizzle_normal_and_tangent(face_normal, armature, blender_object, export_settings)
-                if use_tangents:
-                    t = convert_swizzle_tangent(face_tangent, armature, blender_object, export_settings)
-                    b = convert_swizzle_location(face_bitangent, armature, blender_object, export_settings)
 
-            if use_tangents:
-                tv = Vector((t[0], t[1], t[2]))
-                bv = Vector((b[0], b[1], b[2]))
-                nv = Vector((n[0], n[1], n[2]))
-
-                if (nv.cross(tv)).dot(bv) < 0.0:
-                    t[3] = -1.0
-
-            if blender_mesh.uv_layers.active:
-                for tex_coord_index in range(0, tex_coord_max):
-                    uv = blender_mesh.uv_layers[tex_coord_index].data[loop_index].uv
-                    uvs.append([uv.x, 1.0 - uv.y])
-
-            #
-
-            if color_max > 0 and export_color:
-                for color_index in range(0, color_max):
-                    color_name = COLOR_PREFIX + str(color_index)
-                    color = vertex_colors[color_name].data[loop_index].color
-                    if len(color) == 3:
-                        colors.append([
-                            color_srgb_to_scene_linear(color[0]),
-                            color_srgb_to_scene_linear(color[1]),
-                            color_srgb_to_scene_linear(color[2]),
-                            1.0
-                        ])
-                    else:
-                        colors.append([
-                            color_srgb_to_scene_linear(color[0]),
-                            color_srgb_to_scene_linear(color[1]),
-                            color_srgb_to_scene_linear(color[2]),
-                            color[3]
-                        ])
-
-            #
-
-            bone_count = 0
-
-            if blender_vertex_groups is not None and vertex.groups is not None and len(vertex.groups) > 0 and export_settings[gltf2_blender_export_keys.SKINS]:
-                joint = []
-                weight = []
-                vertex_groups = vertex.groups
-                if not export_settings['gltf_all_vertex_influences']:
-                    # sort groups by weight descending
-                    vertex_groups = sorted(vertex.groups, key=attrgetter('weight'), reverse=True)
-                for group_element in vertex_groups:
-
-                    if len(joint) == 4:
-                        bone_count += 1
-                        joints.append(joint)
-                        weights.append(weight)
-                        joint = []
-                        weight = []
-
-                    #
-
-                    joint_weight = group_element.weight
-                    if joint_weight <= 0.0:
-                        continue
-
-                    #
-
-                    vertex_group_index = group_element.group
-                    vertex_group_name = blender_vertex_groups[vertex_group_index].name
+    corner_loops = __foreach_get(blender_mesh.loop_triangles, 'loops', 3, np.int32).ravel()
+    corner_polygons = np.repeat(__foreach_get(blender_mesh.loop_triangles, 'polygon_index', 1, np.int32), 3)
 
-                    joint_index = None
+    if len(corner_loops) == 0:
+        print_console('INFO', 'Primitives created: 0')
+        return []
 
-                    if armature:
-                        skin = gltf2_blender_gather_skins.gather_skin(armature, export_settings)
-                        for index, j in enumerate(skin.joints):
-                            if j.name == vertex_group_name:
-                                joint_index = index
-                                break
+    loop_vertices = __foreach_get(blender_mesh.loops, 'vertex_index', 1, np.int32)
+    corner_vertices = loop_vertices[corner_loops]
 
-                    #
-                    if joint_index is not None:
-                        joint.append(joint_index)
-                        weight.append(joint_weight)
+    polygon_count = len(blender_mesh.polygons)
+    polygon_smooth = __foreach_get(blender_mesh.polygons, 'use_smooth', 1, np.bool_)
+    polygon_normals = __foreach_get(blender_mesh.polygons, 'normal', 3)
+    polygon_materials = __foreach_get(blender_mesh.polygons, 'material_index', 1, np.int32)
 
-                if len(joint) > 0:
-                    bone_count += 1
-
-                    for fill in range(0, 4 - len(joint)):
-                        joint.append(0)
-                        weight.append(0.0)
-
-                    joints.append(joint)
-                    weights.append(weight)
-
-            for fill in range(0, bone_max - bone_count):
-                joints.append([0, 0, 0, 0])
-                weights.append([0.0, 0.0, 0.0, 0.0])
+    if blender_mesh.use_auto_smooth:
+        corner_smooth = np.ones(len(corner_loops), dtype=np.bool_)
+    else:
+        corner_smooth = polygon_smooth[corner_polygons]
+    corner_smooth = corner_smooth[:, None]
 
-            #
+    #
+    # Positions, normals and tangents.
+    #
 
-            if morph_max > 0 and export_settings[gltf2_blender_export_keys.MORPH]:
-                for morph_index in range(0, morph_max):
-                    blender_shape_key = blender_shape_keys[morph_index]
+    vertex_co = __foreach_get(blender_mesh.vertices, 'co', 3)
+    positions = convert_swizzle_location_array(vertex_co[corner_vertices], armature, blender_object, export_settings)
 
-                    v_morph = convert_swizzle_location(blender_shape_key.shape_key.data[vertex_index].co,
-                                                       armature, blender_object,
-                                                       export_settings)
+    if blender_mesh.has_custom_normals:
+        smooth_normals = __foreach_get(blender_mesh.loops, 'normal', 3)[corner_loops]
+    else:
+        smooth_normals = __foreach_get(blender_mesh.vertices, 'normal', 3)[corner_vertices]
+    normals = np.where(corner_smooth, smooth_normals, polygon_normals[corner_polygons])
+    normals = convert_swizzle_normal_and_tangent_array(normals, armature, blender_object, export_settings)
 
-                    # Store delta.
-                    v_morph -= v
+    attributes = {
+        POSITION_ATTRIBUTE: positions,
+        NORMAL_ATTRIBUTE: normals
+    }
 
-                    target_positions.append(v_morph)
+    if use_tangents:
+        loop_tangents = __foreach_get(blender_mesh.loops, 'tangent', 3)
+        loop_bitangents = __foreach_get(blender_mesh.loops, 'bitangent', 3)
 
-                    #
+        # Flat shaded polygons use the average of their loop tangents.
+        loop_totals = __foreach_get(blender_mesh.polygons, 'loop_total', 1, np.int32)
+        loop_starts = __foreach_get(blender_mesh.polygons, 'loop_start', 1, np.int32)
+        polygon_loops = np.repeat(loop_starts - np.cumsum(loop_totals) + loop_totals, loop_totals) + \
+            np.arange(loop_totals.sum())
+        loop_polygons = np.repeat(np.arange(polygon_count), loop_totals)
+        face_tangents = np.zeros((polygon_count, 3), dtype=np.float32)
+        face_bitangents = np.zeros((polygon_count, 3), dtype=np.float32)
+        np.add.at(face_tangents, loop_polygons, loop_tangents[polygon_loops])
+        np.add.at(face_bitangents, loop_polygons, loop_bitangents[polygon_loops])
 
-                    n_morph = None
+        tangents = np.where(corner_smooth, loop_tangents[corner_loops], __normalized(face_tangents)[corner_polygons])
+        bitangents = np.where(corner_smooth, loop_bitangents[corner_loops],
+                              __normalized(face_bitangents)[corner_polygons])
 
-                    if blender_polygon.use_smooth:
-                        temp_normals = blender_shape_key.vertex_normals
-                        n_morph = (temp_normals[vertex_index * 3 + 0], temp_normals[vertex_index * 3 + 1],
-                                   temp_normals[vertex_index * 3 + 2])
-                    else:
-                        temp_normals = blender_shape_key.polygon_normals
-                        n_morph = (
-                            temp_normals[blender_polygon.index * 3 + 0], temp_normals[blender_polygon.index * 3 + 1],
-                            temp_normals[blender_polygon.index * 3 + 2])
+        tangents = convert_swizzle_tangent_array(tangents, armature, blender_object, export_settings)
+        bitangents = convert_swizzle_location_array(bitangents, armature, blender_object, export_settings)
 
-                    n_morph = convert_swizzle_normal_and_tangent(Vector(n_morph), armature, blender_object, export_settings)
+        flipped = np.einsum('ij,ij->i', np.cross(normals, tangents[:, :3]), bitangents) < 0.0
+        tangents[flipped, 3] = -1.0
 
-                    # Store delta.
-                    n_morph -= n
+        attributes[TANGENT_ATTRIBUTE] = tangents
 
-                    target_normals.append(n_morph)
+    #
+    # Texture coordinates and colors.
+    #
 
-                    #
+    if blender_mesh.uv_layers.active:
+        for tex_coord_index, uv_layer in enumerate(blender_mesh.uv_layers):
+            uvs = __foreach_get(uv_layer.data, 'uv', 2)[corner_loops]
+            uvs[:, 1] = 1.0 - uvs[:, 1]
+            attributes[TEXCOORD_PREFIX + str(tex_coord_index)] = uvs
 
-                    if use_tangents:
-                        rotation = n_morph.rotation_difference(n)
+    for color_index, vertex_color in enumerate(blender_mesh.vertex_colors[:GLTF_MAX_COLORS]):
+        colors = __foreach_get(vertex_color.data, 'color', 4)[corner_loops]
+        colors[:, :3] = __color_srgb_to_scene_linear(colors[:, :3])
+        attributes[COLOR_PREFIX + str(color_index)] = colors
 
-                        t_morph = Vector((t[0], t[1], t[2]))
+    #
+    # Joints and weights.
+    #
 
-                        t_morph.rotate(rotation)
+    bone_max, joints, weights = __gather_skin_data(blender_mesh, blender_vertex_groups, armature,
+                                                   np.unique(corner_vertices).tolist(), export_settings)
 
-                        target_tangents.append(t_morph)
+    if export_settings[gltf2_blender_export_keys.SKINS]:
+        for bone_index in range(0, bone_max):
+            attributes[JOINTS_PREFIX + str(bone_index)] = joints[corner_vertices, bone_index * 4:bone_index * 4 + 4]
+            attributes[WEIGHTS_PREFIX + str(bone_index)] = weights[corner_vertices, bone_index * 4:bone_index * 4 + 4]
 
-            #
-            #
+    #
+    # Morph targets, stored as deltas.
+    #
 
-            create = True
-
-            for current_new_index in vertex_index_to_new_indices[vertex_index]:
-                found = True
-
-                for i in range(0, 3):
-                    if attributes[POSITION_ATTRIBUTE][current_new_index * 3 + i] != v[i]:
-                        found = False
-                        break
-
-                    if attributes[NORMAL_ATTRIBUTE][current_new_index * 3 + i] != n[i]:
-                        found = False
-                        break
-
-                if use_tangents:
-                    for i in range(0, 4):
-                        if attributes[TANGENT_ATTRIBUTE][current_new_index * 4 + i] != t[i]:
-                            found = False
-                            break
-
-                if not found:
-                    continue
-
-                for tex_coord_index in range(0, tex_coord_max):
-                    uv = uvs[tex_coord_index]
-
-                    tex_coord_id = TEXCOORD_PREFIX + str(tex_coord_index)
-                    for i in range(0, 2):
-                        if attributes[tex_coord_id][current_new_index * 2 + i] != uv[i]:
-                            found = False
-                            break
-
-                if export_color:
-                    for color_index in range(0, color_max):
-                        color = colors[color_index]
-
-                        color_id = COLOR_PREFIX + str(color_index)
-                        for i in range(0, 3):
-                            # Alpha is always 1.0 - see above.
-                            current_color = attributes[color_id][current_new_index * 4 + i]
-                            if color_srgb_to_scene_linear(current_color) != color[i]:
-                                found = False
-                                break
-
-                if export_settings[gltf2_blender_export_keys.SKINS]:
-                    for bone_index in range(0, bone_max):
-                        joint = joints[bone_index]
-                        weight = weights[bone_index]
-
-                        joint_id = JOINTS_PREFIX + str(bone_index)
-                        weight_id = WEIGHTS_PREFIX + str(bone_index)
-                        for i in range(0, 4):
-                            if attributes[joint_id][current_new_index * 4 + i] != joint[i]:
-                                found = False
-                                break
-                            if attributes[weight_id][current_new_index * 4 + i] != weight[i]:
-                                found = False
-                                break
-
-                if export_settings[gltf2_blender_export_keys.MORPH]:
-                    for morph_index in range(0, morph_max):
-                        target_position = target_positions[morph_index]
-                        target_normal = target_normals[morph_index]
-                        if use_tangents:
-                            target_tangent = target_tangents[morph_index]
-
-                        target_position_id = MORPH_POSITION_PREFIX + str(morph_index)
-                        target_normal_id = MORPH_NORMAL_PREFIX + str(morph_index)
-                        target_tangent_id = MORPH_TANGENT_PREFIX + str(morph_index)
-                        for i in range(0, 3):
-                            if attributes[target_position_id][current_new_index * 3 + i] != target_position[i]:
-                                found = False
-                                break
-                            if attributes[target_normal_id][current_new_index * 3 + i] != target_normal[i]:
-                                found = False
-                                break
-                            if use_tangents:
-                                if attributes[target_tangent_id][current_new_index * 3 + i] != target_tangent[i]:
-                                    found = False
-                                    break
-
-                if found:
-                    indices.append(current_new_index)
-
-                    create = False
-                    break
-
-            if not create:
+    if blender_mesh.shape_keys is not None and export_settings[gltf2_blender_export_keys.MORPH]:
+        morph_index = 0
+        for blender_shape_key in blender_mesh.shape_keys.key_blocks:
+            if blender_shape_key == blender_shape_key.relative_key or blender_shape_key.mute:
                 continue
 
-            new_index = 0
+            shape_key_co = __foreach_get(blender_shape_key.data, 'co', 3)[corner_vertices]
+            target_positions = convert_swizzle_location_array(shape_key_co, armature, blender_object,
+                                                              export_settings) - positions
 
-            if primitive.get('max_index') is not None:
-                new_index = primitive['max_index'] + 1
+            # calculate vertex and polygon normals for this shape key
+            shape_key_vertex_normals = np.array(blender_shape_key.normals_vertex_get(), dtype=np.float32)
+            shape_key_polygon_normals = np.array(blender_shape_key.normals_polygon_get(), dtype=np.float32)
+            target_normals = np.where(
+                polygon_smooth[corner_polygons][:, None],
+                shape_key_vertex_normals.reshape(-1, 3)[corner_vertices],
+                shape_key_polygon_normals.reshape(-1, 3)[corner_polygons]
+            )
+            target_normals = convert_swizzle_normal_and_tangent_array(target_normals, armature, blender_object,
+                                                                      export_settings) - normals
 
-            primitive['max_index'] = new_index
+            attributes[MORPH_POSITION_PREFIX + str(morph_index)] = target_positions
+            attributes[MORPH_NORMAL_PREFIX + str(morph_index)] = target_normals
 
-            vertex_index_to_new_indices[vertex_index].append(new_index)
-
-            #
-            #
-
-            indices.append(new_index)
-
-            #
-
-            attributes[POSITION_ATTRIBUTE].extend(v)
-            attributes[NORMAL_ATTRIBUTE].extend(n)
             if use_tangents:
-                attributes[TANGENT_ATTRIBUTE].extend(t)
-
-            if blender_mesh.uv_layers.active:
-                for tex_coord_index in range(0, tex_coord_max):
-                    tex_coord_id = TEXCOORD_PREFIX + str(tex_coord_index)
-
-                    if attributes.get(tex_coord_id) is None:
-                        attributes[tex_coord_id] = []
-
-                    attributes[tex_coord_id].extend(uvs[tex_coord_index])
-
-            if export_color:
-                for color_index in range(0, color_max):
-                    color_id = COLOR_PREFIX + str(color_index)
-
-                    if attributes.get(color_id) is None:
-                        attributes[color_id] = []
-
-                    attributes[color_id].extend(colors[color_index])
-
-            if export_settings[gltf2_blender_export_keys.SKINS]:
-                for bone_index in range(0, bone_max):
-                    joint_id = JOINTS_PREFIX + str(bone_index)
-
-                    if attributes.get(joint_id) is None:
-                        attributes[joint_id] = []
-
-                    attributes[joint_id].extend(joints[bone_index])
-
-                    weight_id = WEIGHTS_PREFIX + str(bone_index)
-
-                    if attributes.get(weight_id) is None:
-                        attributes[weight_id] = []
-
-                    attributes[weight_id].extend(weights[bone_index])
-
-            if export_settings[gltf2_blender_export_keys.MORPH]:
-                for morph_index in range(0, morph_max):
-                    target_position_id = MORPH_POSITION_PREFIX + str(morph_index)
-
-                    if attributes.get(target_position_id) is None:
-                        attributes[target_position_id] = []
-
-                    attributes[target_position_id].extend(target_positions[morph_index])
-
-                    target_normal_id = MORPH_NORMAL_PREFIX + str(morph_index)
-
-                    if attributes.get(target_normal_id) is None:
-                        attributes[target_normal_id] = []
-
-                    attributes[target_normal_id].extend(target_normals[morph_index])
-
-                    if use_tangents:
-                        target_tangent_id = MORPH_TANGENT_PREFIX + str(morph_index)
+                attributes[MORPH_TANGENT_PREFIX + str(morph_index)] = __rotate_by_rotation_difference(
+                    tangents[:, :3], target_normals, normals)
 
-                        if attributes.get(target_tangent_id) is None:
-                            attributes[target_tangent_id] = []
-
-                        attributes[target_tangent_id].extend(target_tangents[morph_index])
+            morph_index += 1
 
     #
-    # Add primitive plus split them if needed.
+    # Deduplicate the corners of each material: a vertex is shared by all corners
+    # having the same blender vertex and exactly the same attribute values.
     #
 
-    result_primitives = []
+    # Adding 0.0 turns -0.0 into 0.0, so that the comparison is done on values, not bits.
+    keys = np.hstack([corner_vertices.view(np.uint32)[:, None]] + [
+        values.view(np.uint32) if values.dtype == np.uint32 else (values.astype(np.float32) + 0.0).view(np.uint32)
+        for values in attributes.values()
+    ])
+    keys = np.ascontiguousarray(keys).view(np.dtype((np.void, keys.dtype.itemsize * keys.shape[1]))).ravel()
 
-    for material_idx, primitive in material_idx_to_primitives.items():
-        export_color = True
+    material_count = max(1, len(blender_mesh.materials))
+    corner_materials = polygon_materials[corner_polygons]
+    corner_materials[corner_materials >= material_count] = 0
 
-        #
+    # NOTE: Values used by some graphics APIs as "primitive restart" values are disallowed.
+    # Specifically, the value 65535 (in UINT16) cannot be used as a vertex index.
+    # https://github.com/KhronosGroup/glTF/issues/1142
+    # https://github.com/KhronosGroup/glTF/pull/1476/files
 
-        indices = primitive[INDICES_ID]
-
-        if len(indices) == 0:
-            continue
+    range_indices = 65535
 
-        position = primitive[ATTRIBUTES_ID][POSITION_ATTRIBUTE]
-        normal = primitive[ATTRIBUTES_ID][NORMAL_ATTRIBUTE]
-        if use_tangents:
-            tangent = primitive[ATTRIBUTES_ID][TANGENT_ATTRIBUTE]
-        tex_coords = []
-        for tex_coord_index in range(0, tex_coord_max):
-            tex_coords.append(primitive[ATTRIBUTES_ID][TEXCOORD_PREFIX + str(tex_coord_index)])
-        colors = []
-        if export_color:
-            for color_index in range(0, color_max):
-                colors.append(primitive[ATTRIBUTES_ID][COLOR_PREFIX + str(color_index)])
-        joints = []
-        weights = []
-        if export_settings[gltf2_blender_export_keys.SKINS]:
-            for bone_index in range(0, bone_max):
-                joints.append(primitive[ATTRIBUTES_ID][JOINTS_PREFIX + str(bone_index)])
-                weights.append(primitive[ATTRIBUTES_ID][WEIGHTS_PREFIX + str(bone_index)])
-
-        target_positions = []
-        target_normals = []
-        target_tangents = []
-        if export_settings[gltf2_blender_export_keys.MORPH]:
-            for morph_index in range(0, morph_max):
-                target_positions.append(primitive[ATTRIBUTES_ID][MORPH_POSITION_PREFIX + str(morph_index)])
-                target_normals.append(primitive[ATTRIBUTES_ID][MORPH_NORMAL_PREFIX + str(morph_index)])
-                if use_tangents:
-                    target_tangents.append(primitive[ATTRIBUTES_ID][MORPH_TANGENT_PREFIX + str(morph_index)])
-
-        #
-
-        count = len(indices)
-
-        if count == 0:
-            continue
-
-        max_index = max(indices)
+    result_primitives = []
 
-        #
+    for material_idx in range(0, material_count):
+        corners = np.flatnonzero(corner_materials == material_idx)
 
-        # NOTE: Values used by some graphics APIs as "primitive restart" values are disallowed.
-        # Specifically, the value 65535 (in UINT16) cannot be used as a vertex index.
-        # https://github.com/KhronosGroup/glTF/issues/1142
-        # https://github.com/KhronosGroup/glTF/pull/1476/files
+        if len(corners) == 0:
+            continue
 
-        range_indices = 65535
+        first_corners, indices = __unique_first_appearance(keys[corners])
+        vertex_corners = corners[first_corners]
 
-        #
+        primitive = {
+            MATERIAL_ID: material_idx,
+            INDICES_ID: indices,
+            ATTRIBUTES_ID: {
+                attribute_id: values[vertex_corners]
+                for attribute_id, values in attributes.items()
+            }
+        }
 
-        if max_index >= range_indices:
+        if len(vertex_corners) > range_indices:
             #
             # Splitting result_primitives.
             #
 
             # At start, all indices are pending.
-            pending_attributes = {
-                POSITION_ATTRIBUTE: [],
-                NORMAL_ATTRIBUTE: []
-            }
-
-            if use_tangents:
-                pending_attributes[TANGENT_ATTRIBUTE] = []
-
-            pending_primitive = {
-                MATERIAL_ID: material_idx,
-                INDICES_ID: [],
-                ATTRIBUTES_ID: pending_attributes
-            }
-
-            pending_primitive[INDICES_ID].extend(indices)
-
-            pending_attributes[POSITION_ATTRIBUTE].extend(position)
-            pending_attributes[NORMAL_ATTRIBUTE].extend(normal)
-            if use_tangents:
-                pending_attributes[TANGENT_ATTRIBUTE].extend(tangent)
-            tex_coord_index = 0
-            for tex_coord in tex_coords:
-                pending_attributes[TEXCOORD_PREFIX + str(tex_coord_index)] = tex_coord
-                tex_coord_index += 1
-            if export_color:
-                color_index = 0
-                for color in colors:
-                    pending_attributes[COLOR_PREFIX + str(color_index)] = color
-                    color_index += 1
-            if export_settings[gltf2_blender_export_keys.SKINS]:
-                joint_index = 0
-                for joint in joints:
-                    pending_attributes[JOINTS_PREFIX + str(joint_index)] = joint
-                    joint_index += 1
-                weight_index = 0
-                for weight in weights:
-                    pending_attributes[WEIGHTS_PREFIX + str(weight_index)] = weight
-                    weight_index += 1
-            if export_settings[gltf2_blender_export_keys.MORPH]:
-                morph_index = 0
-                for target_position in target_positions:
-                    pending_attributes[MORPH_POSITION_PREFIX + str(morph_index)] = target_position
-                    morph_index += 1
-                morph_index = 0
-                for target_normal in target_normals:
-                    pending_attributes[MORPH_NORMAL_PREFIX + str(morph_index)] = target_normal
-                    morph_index += 1
-                if use_tangents:
-                    morph_index = 0
-                    for target_tangent in target_tangents:
-                        pending_attributes[MORPH_TANGENT_PREFIX + str(morph_index)] = target_tangent
-                        morph_index += 1
-
-            pending_indices = pending_primitive[INDICES_ID]
+            pending_primitive = primitive
+            pending_indices = indices
 
             # Continue until all are processed.
             while len(pending_indices) > 0:
+                triangles = pending_primitive[INDICES_ID].reshape(-1, 3)
 
-                process_indices = pending_primitive[INDICES_ID]
-                max_index = max(process_indices)
-
-                pending_indices = []
-
-                #
-                #
-
-                all_local_indices = []
-
-                for i in range(0, (max_index // range_indices) + 1):
-                    all_local_indices.append([])
-
-                #
-                #
-
-                # For all faces ...
-                for face_index in range(0, len(process_indices), 3):
-
-                    written = False
-
-                    face_min_index = min(process_indices[face_index + 0], process_indices[face_index + 1],
-                                         process_indices[face_index + 2])
-                    face_max_index = max(process_indices[face_index + 0], process_indices[face_index + 1],
-                                         process_indices[face_index + 2])
-
-                    # ... check if it can be but in a range of maximum indices.
-                    for i in range(0, (max_index // range_indices) + 1):
-                        offset = i * range_indices
-
-                        # Yes, so store the primitive with its indices.
-                        if face_min_index >= offset and face_max_index < offset + range_indices:
-                            all_local_indices[i].extend(
-                                [process_indices[face_index + 0], process_indices[face_index + 1],
-                                 process_indices[face_index + 2]])
-
-                            written = True
-                            break
-
-                    # If not written, the triangle face has indices from different ranges.
-                    if not written:
-                        pending_indices.extend([process_indices[face_index + 0], process_indices[face_index + 1],
-                                                process_indices[face_index + 2]])
+                # Check for each face if it can be put in a range of maximum indices.
+                triangle_ranges = triangles.min(axis=1) // range_indices
+                written = triangles.max(axis=1) < (triangle_ranges + 1) * range_indices
 
                 # Only add result_primitives, which do have indices in it.
-                for local_indices in all_local_indices:
-                    if len(local_indices) > 0:
-                        current_primitive = extract_primitive_floor(pending_primitive, local_indices, use_tangents)
+                for range_index in np.unique(triangle_ranges[written]):
+                    local_indices = triangles[written & (triangle_ranges == range_index)].ravel()
+                    current_primitive = extract_primitive_floor(pending_primitive, local_indices)
 
-                        result_primitives.append(current_primitive)
+                    result_primitives.append(__primitive_to_lists(current_primitive))
 
-                        print_console('DEBUG', 'Adding primitive with splitting. Indices: ' + str(
-                            len(current_primitive[INDICES_ID])) + ' Vertices: ' + str(
-                            len(current_primitive[ATTRIBUTES_ID][POSITION_ATTRIBUTE]) // 3))
+                    print_console('DEBUG', 'Adding primitive with splitting. Indices: ' + str(
+                        len(current_primitive[INDICES_ID])) + ' Vertices: ' + str(
+                        len(current_primitive[ATTRIBUTES_ID][POSITION_ATTRIBUTE])))
 
                 # Process primitive faces having indices in several ranges.
+                pending_indices = triangles[~written].ravel()
                 if len(pending_indices) > 0:
-                    pending_primitive = extract_primitive_pack(pending_primitive, pending_indices, use_tangents)
+                    pending_primitive = extract_primitive_pack(pending_primitive, pending_indices)
 
                     print_console('DEBUG', 'Creating temporary primitive for splitting')
 
@@ -1154,13 +598,11 @@ def extract_primitives(glTF, blender_mesh, blender_object, blender_vertex_groups
             #
             # No splitting needed.
             #
-            result_primitives.append(primitive)
+            result_primitives.append(__primitive_to_lists(primitive))
 
             print_console('DEBUG', 'Adding primitive without splitting. Indices: ' + str(
-                len(primitive[INDICES_ID])) + ' Vertices: ' + str(
-                len(primitive[ATTRIBUTES_ID][POSITION_ATTRIBUTE]) // 3))
+                len(indices)) + ' Vertices: ' + str(len(vertex_corners)))
 
     print_console('INFO', 'Primitives created: ' + str(len(result_primitives)))
 
     return result_primitives
-
@@ -93,6 +93,34 @@ def bonecache(func):
             return func.__bonecache[args[7]][pose_bone_if_armature.name]
     return wrapper_bonecache
 
+# Settings which do not change the exported data itself, and thus are not part of the disk cache keys
+__DISK_CACHE_IGNORED_SETTINGS = {
+    'gltf_filepath',
+    'gltf_filedirectory',
+    'gltf_binaryfilename',
+    'gltf_copyright',
+    'gltf_cache_dir',
+    'gltf_cache_size',
+}
+
+
+def disk_cache_settings_key(export_settings):
+    """
+    Return the part of a disk cache key describing the exporter version and the export settings.
+
+    Together with a hash of the datablock content, it identifies a result across exports.
+    """
+    from io_scene_gltf2 import bl_info
+
+    settings = tuple(sorted(
+        (key, value) for key, value in export_settings.items()
+        if key.startswith('gltf_')
+        and key not in __DISK_CACHE_IGNORED_SETTINGS
+        and isinstance(value, (bool, int, float, str))
+    ))
+    return bl_info['version'], settings
+
+
 # TODO: replace "cached" with "unique" in all cases where the caching is functional and not only for performance reasons
 call_or_fetch = cached
 unique = cached
@@ -13,11 +13,12 @@
 # limitations under the License.
 
 import bpy
+import numpy as np
 from typing import List, Optional, Tuple
 
-from .gltf2_blender_export_keys import NORMALS, MORPH_NORMAL, TANGENTS, MORPH_TANGENT, MORPH
+from .gltf2_blender_export_keys import NORMALS, MORPH_NORMAL, TANGENTS, MORPH_TANGENT, MORPH, SKINS, DISK_CACHE
 
-from io_scene_gltf2.blender.exp.gltf2_blender_gather_cache import cached
+from io_scene_gltf2.blender.exp.gltf2_blender_gather_cache import cached, disk_cache_settings_key
 from io_scene_gltf2.blender.exp import gltf2_blender_extract
 from io_scene_gltf2.blender.exp import gltf2_blender_gather_accessors
 from io_scene_gltf2.blender.exp import gltf2_blender_gather_primitive_attributes
@@ -88,6 +89,17 @@ def __gather_cache_primitives(
     """
     Gather parts that are identical for instances, i.e. excluding materials
     """
+    disk_cache = export_settings[DISK_CACHE]
+    if disk_cache is not None:
+        cache_key = disk_cache.key(
+            'primitives',
+            disk_cache_settings_key(export_settings),
+            *__mesh_content(blender_mesh, blender_object, vertex_groups, modifiers, export_settings)
+        )
+        primitives = disk_cache.get_object(cache_key)
+        if primitives is not None:
+            return primitives
+
     primitives = []
 
     blender_primitives = gltf2_blender_extract.extract_primitives(
@@ -102,8 +114,81 @@ def __gather_cache_primitives(
         }
         primitives.append(primitive)
 
+    if disk_cache is not None:
+        disk_cache.put_object(cache_key, primitives)
+
     return primitives
 
+
+def __mesh_content(blender_mesh, blender_object, vertex_groups, modifiers, export_settings):
+    """Yield everything extract_primitives() reads, as parts of a disk cache key."""
+    def foreach_get(collection, attribute, width, dtype=np.float32):
+        data = np.empty(len(collection) * width, dtype=dtype)
+        collection.foreach_get(attribute, data)
+        return data
+
+    if blender_mesh.has_custom_normals:
+        blender_mesh.calc_normals_split()
+
+    yield blender_mesh.use_auto_smooth, blender_mesh.has_custom_normals, len(blender_mesh.materials)
+    yield foreach_get(blender_mesh.vertices, 'co', 3)
+    yield foreach_get(blender_mesh.vertices, 'normal', 3)
+    yield foreach_get(blender_mesh.loops, 'vertex_index', 1, np.int32)
+    if blender_mesh.has_custom_normals:
+        yield foreach_get(blender_mesh.loops, 'normal', 3)
+    yield foreach_get(blender_mesh.polygons, 'loop_start', 1, np.int32)
+    yield foreach_get(blender_mesh.polygons, 'loop_total', 1, np.int32)
+    yield foreach_get(blender_mesh.polygons, 'material_index', 1, np.int32)
+    yield foreach_get(blender_mesh.polygons, 'use_smooth', 1, np.bool_)
+
+    if blender_mesh.uv_layers.active:
+        for uv_layer in blender_mesh.uv_layers:
+            yield foreach_get(uv_layer.data, 'uv', 2)
+    for vertex_color in blender_mesh.vertex_colors:
+        yield foreach_get(vertex_color.data, 'color', 4)
+
+    if blender_mesh.shape_keys is not None:
+        for blender_shape_key in blender_mesh.shape_keys.key_blocks:
+            yield blender_shape_key.name, blender_shape_key.mute, blender_shape_key.relative_key.name
+            yield foreach_get(blender_shape_key.data, 'co', 3)
+
+    if export_settings[SKINS] and vertex_groups is not None:
+        yield tuple(group.name for group in vertex_groups)
+        yield from __vertex_weights(blender_mesh)
+
+    armature = None
+    if modifiers is not None:
+        armature = {m.type: m for m in modifiers}.get("ARMATURE")
+    if armature is not None and armature.object is not None:
+        # skinned meshes are exported in armature space
+        yield tuple(tuple(row) for row in blender_object.matrix_world)
+        yield tuple(tuple(row) for row in armature.object.matrix_world)
+        yield tuple(bone.name for bone in armature.object.data.bones)
+
+def __vertex_weights(blender_mesh):
+    """Return the group counts, groups and weights of all vertices, as flat arrays."""
+    # There is no bulk access to the weights of all vertices, each vertex is read with foreach_get()
+    # instead of its group elements one by one.
+    vertices = blender_mesh.vertices
+    counts = np.zeros(len(vertices), dtype=np.int32)
+    groups = np.empty(len(vertices) * 4, dtype=np.int32)
+    weights = np.empty(len(vertices) * 4, dtype=np.float32)
+    offset = 0
+    for vertex_index, vertex in enumerate(vertices):
+        vertex_groups = vertex.groups
+        count = len(vertex_groups)
+        if count == 0:
+            continue
+        if offset + count > len(groups):
+            groups = np.resize(groups, 2 * (offset + count))
+            weights = np.resize(weights, 2 * (offset + count))
+        vertex_groups.foreach_get('group', groups[offset:offset + count])
+        vertex_groups.foreach_get('weight', weights[offset:offset + count])
+        counts[vertex_index] = count
+        offset += count
+    return counts, groups[:offset], weights[:offset]
+
+
 def __gather_indices(blender_primitive, blender_mesh, modifiers, export_settings):
     indices = blender_primitive['indices']
 
@@ -101,7 +101,7 @@ class ExportImage:
     def __add__(self, other):
         self.append(other)
 
-    def encode(self, mime_type: typing.Optional[str]) -> bytes:
+    def encode(self, mime_type: typing.Optional[str], disk_cache=None) -> bytes:
         file_format = {
             "image/jpeg": "JPEG",
             "image/png": "PNG"
@@ -114,6 +114,14 @@ class ExportImage:
                     encoded_image = f.read()
                 return encoded_image
 
+        # encoding through a temporary blender image is slow; the result only depends on the pixels
+        cache_key = None
+        if disk_cache is not None:
+            cache_key = disk_cache.key('image', file_format, self._has_alpha, self._img)
+            encoded_image = disk_cache.get(cache_key)
+            if encoded_image is not None:
+                return encoded_image
+
         image = bpy.data.images.new("TmpImage", width=self.width, height=self.height, alpha=self._has_alpha)
         pixels = self._img.flatten().tolist()
         image.pixels = pixels
@@ -131,5 +139,8 @@ class ExportImage:
 
         bpy.data.images.remove(image, do_unlink=True)
 
+        if disk_cache is not None:
+            disk_cache.put(cache_key, encoded_image)
+
         return encoded_image
 
@@ -77,9 +77,6 @@ class BlenderMesh():
 
         pymesh.blender_name = mesh.name
 
-        # Clear accessor cache after all primitives are done
-        gltf.accessor_cache = {}
-
         return mesh
 
     @staticmethod
@@ -13,7 +13,6 @@
 # limitations under the License.
 
 import bpy
-from mathutils import Vector
 
 from .gltf2_blender_material import BlenderMaterial
 from ..com.gltf2_blender_conversion import loc_gltf_to_blender
@@ -44,12 +43,13 @@ class BlenderPrimitive():
             pyprimitive.num_faces = 0
             return
 
-        positions = BinaryData.get_data_from_accessor(gltf, attributes['POSITION'], cache=True)
+        position_array = BinaryData.get_array_from_accessor(gltf, attributes['POSITION'], cache=True)
+        positions = position_array.tolist()
 
         if pyprimitive.indices is not None:
             # Not using cache, this is not useful for indices
-            indices = BinaryData.get_data_from_accessor(gltf, pyprimitive.indices)
-            indices = [i[0] for i in indices]
+            indices = BinaryData.get_array_from_accessor(gltf, pyprimitive.indices)
+            indices = indices[:, 0].tolist()
         else:
             indices = list(range(len(positions)))
 
@@ -209,13 +209,11 @@ class BlenderPrimitive():
             layer_name = pymesh.shapekey_names[sk]
             layer = BlenderPrimitive.get_layer(bme.verts.layers.shape, layer_name)
 
-            morph_positions = BinaryData.get_data_from_accessor(gltf, target['POSITION'], cache=True)
+            morph_positions = BinaryData.get_array_from_accessor(gltf, target['POSITION'], cache=True)
+            morph_positions = (position_array + morph_positions).tolist()
 
             for bidx, pidx in vert_idxs:
-                bme_verts[bidx][layer] = (
-                    Vector(positions[pidx]) +
-                    Vector(morph_positions[pidx])
-                )
+                bme_verts[bidx][layer] = morph_positions[pidx]
 
     @staticmethod
     def edges_and_faces(mode, indices):
@@ -0,0 +1,162 @@
+# Copyright 2018-2019 The glTF-Blender-IO authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import hashlib
+import hmac
+import os
+import pickle
+import tempfile
+import typing
+
+import numpy as np
+
+from io_scene_gltf2.io.com.gltf2_io_debug import print_console
+
+
+class DiskCache:
+    """
+    Content addressed store for export results, shared by successive exports.
+
+    Entries are files named after the hash of everything they were computed from, so an entry never needs
+    to be invalidated: changed data simply produces a different key. The least recently used entries are removed
+    once the directory grows larger than max_size bytes.
+
+    Entries are signed with an HMAC of the secret, which must be private to the user: entries hold pickled
+    objects, an entry written by anyone else who can write to the directory is ignored instead of being loaded.
+    """
+
+    def __init__(self, directory: str, max_size: int, secret: bytes):
+        self.directory = directory
+        self.max_size = max_size
+        self.secret = secret
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def load_secret(path: str) -> bytes:
+        """Read the secret from path, creating it readable by the user only if it doesn't exist."""
+        try:
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        except FileExistsError:
+            pass
+        else:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(os.urandom(32))
+        with open(path, 'rb') as f:
+            secret = f.read()
+        if len(secret) < 32:
+            raise OSError('Invalid export cache key: {}'.format(path))
+        return secret
+
+    def __signature(self, key: str, data) -> bytes:
+        return hmac.new(self.secret, key.encode() + b'\0' + data, hashlib.sha256).digest()
+
+    @staticmethod
+    def key(*parts) -> str:
+        """Hash the given parts (bytes, numpy arrays or anything with a stable repr) into a cache key."""
+        h = hashlib.sha256()
+        for part in parts:
+            if isinstance(part, np.ndarray):
+                h.update(repr((part.dtype.str, part.shape)).encode())
+                h.update(np.ascontiguousarray(part).data)
+            elif isinstance(part, (bytes, bytearray)):
+                h.update(part)
+            else:
+                h.update(repr(part).encode())
+            # separator, so that ('ab', 'c') and ('a', 'bc') differ
+            h.update(b'\0')
+        return h.hexdigest()
+
+    def __path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key)
+
+    def get(self, key: str) -> typing.Optional[bytes]:
+        path = self.__path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            self.misses += 1
+            return None
+
+        signature, data = data[:32], data[32:]
+        if not hmac.compare_digest(signature, self.__signature(key, data)):
+            print_console('WARNING', 'Ignoring export cache entry with an invalid signature: {}'.format(path))
+            self.misses += 1
+            return None
+
+        # mark as recently used
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.hits += 1
+        return data
+
+    def put(self, key: str, data: bytes):
+        path = self.__path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # write to a temporary file first, so that concurrent exports never read a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(self.__signature(key, data))
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print_console('WARNING', 'Could not write to the export cache: {}'.format(e))
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def get_object(self, key: str):
+        data = self.get(key)
+        if data is None:
+            return None
+        try:
+            return pickle.loads(data)
+        except Exception:
+            # stale entry written by an incompatible version of the exporter
+            return None
+
+    def put_object(self, key: str, obj):
+        self.put(key, pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL))
+
+    def evict(self):
+        """Remove the least recently used entries until the cache fits in max_size. Called once per export."""
+        entries = []
+        total_size = 0
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total_size += stat.st_size
+
+        if total_size <= self.max_size:
+            return
+
+        entries.sort()
+        for _, size, path in entries:
+            if total_size <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total_size -= size
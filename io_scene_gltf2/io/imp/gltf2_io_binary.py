@@ -12,11 +12,20 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import struct
 import base64
 from os.path import dirname, join, isfile, basename
 from urllib.parse import unquote
 
+import numpy as np
+
+# component_type: (divisor, signed) for normalized integer accessors
+NORMALIZE_DIVISORS = {
+    5120: (127.0, True),     # Byte
+    5121: (255.0, False),    # Unsigned Byte
+    5122: (32767.0, True),   # Short
+    5123: (65535.0, False),  # Unsigned Short
+}
+
 
 class BinaryData():
     """Binary reader."""
@@ -46,37 +55,57 @@ class BinaryData():
         return buffer[accessor_offset + bufferview_offset:accessor_offset + bufferview_offset + bufferView.byte_length]
 
     @staticmethod
-    def get_data_from_accessor(gltf, accessor_idx, cache=False):
-        """Get data from accessor."""
+    def get_buffer_view_array(gltf, buffer_view_idx, byte_offset, count, component_type, component_nb):
+        """Get a numpy view of count elements from a buffer view, without copying."""
+        bufferView = gltf.data.buffer_views[buffer_view_idx]
+        if bufferView.buffer not in gltf.buffers.keys():
+            # load buffer
+            gltf.load_buffer(bufferView.buffer)
+        buffer = gltf.buffers[bufferView.buffer]
+
+        dtype = np.dtype('<' + gltf.fmt_char_dict[component_type])
+        offset = (bufferView.byte_offset or 0) + (byte_offset or 0)
+        # TODO data alignment stuff (matrices of 1 or 2 bytes components)
+        stride = bufferView.byte_stride or dtype.itemsize * component_nb
+
+        return np.ndarray(
+            shape=(count, component_nb),
+            dtype=dtype,
+            buffer=buffer,
+            offset=offset,
+            strides=(stride, dtype.itemsize),
+        )
+
+    @staticmethod
+    def get_array_from_accessor(gltf, accessor_idx, cache=False):
+        """Get data from accessor, as a (count, component_nb) numpy array.
+
+        When the accessor is neither sparse nor normalized, the array is a
+        read-only view over the buffer.
+        """
         if accessor_idx in gltf.accessor_cache:
             return gltf.accessor_cache[accessor_idx]
 
         accessor = gltf.data.accessors[accessor_idx]
-
-        bufferView = gltf.data.buffer_views[accessor.buffer_view]  # TODO initialize with 0 when not present!
-        buffer_data = BinaryData.get_binary_from_accessor(gltf, accessor_idx)
-
-        fmt_char = gltf.fmt_char_dict[accessor.component_type]
         component_nb = gltf.component_nb_dict[accessor.type]
-        fmt = '<' + (fmt_char * component_nb)
-        stride_ = struct.calcsize(fmt)
-        # TODO data alignment stuff
 
-        if bufferView.byte_stride:
-            stride = bufferView.byte_stride
+        if accessor.buffer_view is not None:
+            data = BinaryData.get_buffer_view_array(
+                gltf,
+                accessor.buffer_view,
+                accessor.byte_offset,
+                accessor.count,
+                accessor.component_type,
+                component_nb
+            )
         else:
-            stride = stride_
-
-        data = []
-        offset = 0
-        while len(data) < accessor.count:
-            element = struct.unpack_from(fmt, buffer_data, offset)
-            data.append(element)
-            offset += stride
+            # No buffer view: all values are zeros, until sparse is applied
+            dtype = np.dtype('<' + gltf.fmt_char_dict[accessor.component_type])
+            data = np.zeros((accessor.count, component_nb), dtype=dtype)
 
         if accessor.sparse:
-            sparse_indices_data = BinaryData.get_data_from_sparse(gltf, accessor.sparse, "indices")
-            sparse_values_values = BinaryData.get_data_from_sparse(
+            sparse_indices = BinaryData.get_data_from_sparse(gltf, accessor.sparse, "indices")
+            sparse_values = BinaryData.get_data_from_sparse(
                 gltf,
                 accessor.sparse,
                 "values",
@@ -85,71 +114,50 @@ class BinaryData():
             )
 
             # apply sparse
-            for cpt_idx, idx in enumerate(sparse_indices_data):
-                data[idx[0]] = sparse_values_values[cpt_idx]
+            data = data.copy()
+            data[sparse_indices[:, 0]] = sparse_values
 
         # Normalization
         if accessor.normalized:
-            for idx, tuple in enumerate(data):
-                new_tuple = ()
-                for i in tuple:
-                    if accessor.component_type == 5120:
-                        new_tuple += (max(float(i / 127.0 ), -1.0),)
-                    elif accessor.component_type == 5121:
-                        new_tuple += (float(i / 255.0),)
-                    elif accessor.component_type == 5122:
-                        new_tuple += (max(float(i / 32767.0), -1.0),)
-                    elif accessor.component_type == 5123:
-                        new_tuple += (i / 65535.0,)
-                    else:
-                        new_tuple += (float(i),)
-                data[idx] = new_tuple
+            divisor, signed = NORMALIZE_DIVISORS.get(accessor.component_type, (None, False))
+            data = data.astype(np.float32)
+            if divisor is not None:
+                data /= divisor
+                if signed:
+                    np.maximum(data, -1.0, out=data)
 
         if cache:
             gltf.accessor_cache[accessor_idx] = data
 
         return data
 
+    @staticmethod
+    def get_data_from_accessor(gltf, accessor_idx, cache=False):
+        """Get data from accessor, as a list of tuples."""
+        data = BinaryData.get_array_from_accessor(gltf, accessor_idx, cache)
+        return list(map(tuple, data.tolist()))
+
     @staticmethod
     def get_data_from_sparse(gltf, sparse, type_, type_val=None, comp_type=None):
         """Get data from sparse."""
         if type_ == "indices":
-            bufferView = gltf.data.buffer_views[sparse.indices.buffer_view]
-            offset = sparse.indices.byte_offset
-            component_nb = gltf.component_nb_dict['SCALAR']
-            fmt_char = gltf.fmt_char_dict[sparse.indices.component_type]
+            return BinaryData.get_buffer_view_array(
+                gltf,
+                sparse.indices.buffer_view,
+                sparse.indices.byte_offset,
+                sparse.count,
+                sparse.indices.component_type,
+                gltf.component_nb_dict['SCALAR']
+            )
         elif type_ == "values":
-            bufferView = gltf.data.buffer_views[sparse.values.buffer_view]
-            offset = sparse.values.byte_offset
-            component_nb = gltf.component_nb_dict[type_val]
-            fmt_char = gltf.fmt_char_dict[comp_type]
-
-        if bufferView.buffer in gltf.buffers.keys():
-            buffer = gltf.buffers[bufferView.buffer]
-        else:
-            # load buffer
-            gltf.load_buffer(bufferView.buffer)
-            buffer = gltf.buffers[bufferView.buffer]
-
-        bin_data = buffer[bufferView.byte_offset + offset:bufferView.byte_offset + offset + bufferView.byte_length]
-
-        fmt = '<' + (fmt_char * component_nb)
-        stride_ = struct.calcsize(fmt)
-        # TODO data alignment stuff ?
-
-        if bufferView.byte_stride:
-            stride = bufferView.byte_stride
-        else:
-            stride = stride_
-
-        data = []
-        offset = 0
-        while len(data) < sparse.count:
-            element = struct.unpack_from(fmt, bin_data, offset)
-            data.append(element)
-            offset += stride
-
-        return data
+            return BinaryData.get_buffer_view_array(
+                gltf,
+                sparse.values.buffer_view,
+                sparse.values.byte_offset,
+                sparse.count,
+                comp_type,
+                gltf.component_nb_dict[type_val]
+            )
 
     @staticmethod
     def get_image_data(gltf, img_idx):
@@ -21,6 +21,7 @@
 import os
 
 import bpy
+import numpy as np
 from mathutils import Matrix, Vector, Color
 from bpy_extras import io_utils, node_shader_utils
 
@@ -236,6 +237,86 @@ def write_nurb(fw, ob, ob_mat):
     return tot_verts
 
 
+# Number of lines formatted at once.
+LINES_BLOCK_SIZE = 1 << 14
+
+
+def write_lines(fw, fmt, rows):
+    """
+    Write one line per row of the rows array, using the fmt line format.
+    Lines are formatted by blocks, with a single string formatting operation per block.
+    """
+    for i in range(0, len(rows), LINES_BLOCK_SIZE):
+        block = rows[i:i + LINES_BLOCK_SIZE]
+        fw((fmt * len(block)) % tuple(block.ravel().tolist()))
+
+
+def write_pieces(fw, pieces):
+    """
+    Write a list of pieces of OBJ data, each one being either a string,
+    or a (fmt, rows) pair as expected by write_lines().
+    """
+    for piece in pieces:
+        if isinstance(piece, str):
+            fw(piece)
+        else:
+            write_lines(fw, *piece)
+
+
+def loop_ranges(starts, totals):
+    """Concatenated ranges [start, start + total), i.e. the loops of the given polygons."""
+    offsets = np.cumsum(totals) - totals
+    return np.repeat(starts - offsets, totals) + np.arange(totals.sum())
+
+
+def unique_rows(rows):
+    """
+    Return the index of the first occurrence of each distinct row of the given 2D array, in order of appearance,
+    and the index in that list of each row.
+    """
+    if not len(rows):
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    _uniq, first, inverse = np.unique(rows, axis=0, return_index=True, return_inverse=True)
+    order = np.argsort(first)
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    return first[order], rank[inverse.ravel()]
+
+
+def values_switch(values):
+    """Tag the items of the values array that differ from the previous one, the first item always does."""
+    return np.append(True, values[1:] != values[:-1])[:len(values)]
+
+
+def faces_vertex_group(loops_face, loops_vert, faces_count, verts_groups_count, groups_index, groups_weight, groups_rank):
+    """
+    Find the vertex group each face belongs to, -1 for none.
+    We use a frequency system in order to sort out the name because a given vertex can
+    belong to two or more groups at the same time. The group with the highest total weight over the face's vertices
+    wins, ties are resolved by group name (using the groups_rank order of names).
+    """
+    verts_groups_start = np.cumsum(verts_groups_count) - verts_groups_count
+    loops_groups_count = verts_groups_count[loops_vert]
+    entries = loop_ranges(verts_groups_start[loops_vert], loops_groups_count)
+    entries_face = np.repeat(loops_face, loops_groups_count)
+    faces_group = np.full(faces_count, -1, dtype=np.int64)
+    if not len(entries):
+        return faces_group
+
+    # Total weight of each group used by each face.
+    groups_count = len(groups_rank)
+    keys, inverse = np.unique(entries_face * groups_count + groups_index[entries], return_inverse=True)
+    weights = np.bincount(inverse.ravel(), weights=groups_weight[entries].astype(np.float64), minlength=len(keys))
+    keys_face = keys // groups_count
+    keys_group = keys % groups_count
+
+    # The last one of each face is its top group.
+    order = np.lexsort((groups_rank[keys_group], weights, keys_face))
+    is_last = np.append(keys_face[order][1:] != keys_face[order][:-1], True)
+    faces_group[keys_face[order][is_last]] = keys_group[order][is_last]
+    return faces_group
+
+
 def write_file(filepath, objects, depsgraph, scene,
                EXPORT_TRI=False,
                EXPORT_EDGES=False,
@@ -265,51 +346,26 @@ def write_file(filepath, objects, depsgraph, scene,
     if EXPORT_GLOBAL_MATRIX is None:
         EXPORT_GLOBAL_MATRIX = Matrix()
 
-    def veckey3d(v):
-        return round(v.x, 4), round(v.y, 4), round(v.z, 4)
-
-    def veckey2d(v):
-        return round(v[0], 4), round(v[1], 4)
-
-    def findVertexGroupName(face, vWeightMap):
-        """
-        Searches the vertexDict to see what groups is assigned to a given face.
-        We use a frequency system in order to sort out the name because a given vertex can
-        belong to two or more groups at the same time. To find the right name for the face
-        we list all the possible vertex group names with their frequency and then sort by
-        frequency in descend order. The top element is the one shared by the highest number
-        of vertices is the face's group
-        """
-        weightDict = {}
-        for vert_index in face.vertices:
-            vWeights = vWeightMap[vert_index]
-            for vGroupName, weight in vWeights:
-                weightDict[vGroupName] = weightDict.get(vGroupName, 0.0) + weight
-
-        if weightDict:
-            return max((weight, vGroupName) for vGroupName, weight in weightDict.items())[1]
-        else:
-            return '(null)'
+    def foreach_get(collection, attr, dtype, size=1):
+        data = np.empty(len(collection) * size, dtype=dtype)
+        collection.foreach_get(attr, data)
+        return data.reshape(-1, size) if size > 1 else data
 
     with ProgressReportSubstep(progress, 2, "OBJ Export path: %r" % filepath, "OBJ Export Finished") as subprogress1:
         with open(filepath, "w", encoding="utf8", newline="\n") as f:
-            fw = f.write
-
             # Write Header
-            fw('# Blender v%s OBJ File: %r\n' % (bpy.app.version_string, os.path.basename(bpy.data.filepath)))
-            fw('# www.blender.org\n')
+            f.write('# Blender v%s OBJ File: %r\n' % (bpy.app.version_string, os.path.basename(bpy.data.filepath)))
+            f.write('# www.blender.org\n')
 
             # Tell the obj file what material file to use.
             if EXPORT_MTL:
                 mtlfilepath = os.path.splitext(filepath)[0] + ".mtl"
                 # filepath can contain non utf8 chars, use repr
-                fw('mtllib %s\n' % repr(os.path.basename(mtlfilepath))[1:-1])
+                f.write('mtllib %s\n' % repr(os.path.basename(mtlfilepath))[1:-1])
 
             # Initialize totals, these are updated each object
             totverts = totuvco = totno = 1
 
-            face_vert_index = 1
-
             # A Dict of Materials
             # (material.name, image.name):matname_imagename # matname_imagename has gaps removed.
             mtl_dict = {}
@@ -337,6 +393,10 @@ def write_file(filepath, objects, depsgraph, scene,
 
                 subprogress1.enter_substeps(len(obs))
                 for ob, ob_mat in obs:
+                    # Text of this object, written once it's complete.
+                    pieces = []
+                    fw = pieces.append
+
                     with ProgressReportSubstep(subprogress1, 6) as subprogress2:
                         uv_unique_count = no_unique_count = 0
 
@@ -344,6 +404,7 @@ def write_file(filepath, objects, depsgraph, scene,
                         if EXPORT_CURVE_AS_NURBS and test_nurbs_compat(ob):
                             ob_mat = EXPORT_GLOBAL_MATRIX @ ob_mat
                             totverts += write_nurb(fw, ob, ob_mat)
+                            write_pieces(f.write, pieces)
                             continue
                         # END NURBS
 
@@ -369,33 +430,22 @@ def write_file(filepath, objects, depsgraph, scene,
 
                         if EXPORT_UV:
                             faceuv = len(me.uv_layers) > 0
-                            if faceuv:
-                                uv_layer = me.uv_layers.active.data[:]
                         else:
                             faceuv = False
 
-                        me_verts = me.vertices[:]
-
-                        # Make our own list so it can be sorted to reduce context switching
-                        face_index_pairs = [(face, index) for index, face in enumerate(me.polygons)]
-
-                        if EXPORT_EDGES:
-                            edges = me.edges
-                        else:
-                            edges = []
+                        faces_count = len(me.polygons)
+                        edges_count = len(me.edges) if EXPORT_EDGES else 0
 
-                        if not (len(face_index_pairs) + len(edges) + len(me.vertices)):  # Make sure there is something to write
+                        if not (faces_count + edges_count + len(me.vertices)):  # Make sure there is something to write
                             # clean up
                             ob_for_convert.to_mesh_clear()
                             continue  # dont bother with this mesh.
 
-                        if EXPORT_NORMALS and face_index_pairs:
+                        if EXPORT_NORMALS and faces_count:
                             me.calc_normals_split()
                             # No need to call me.free_normals_split later, as this mesh is deleted anyway!
 
-                        loops = me.loops
-
-                        if (EXPORT_SMOOTH_GROUPS or EXPORT_SMOOTH_GROUPS_BITFLAGS) and face_index_pairs:
+                        if (EXPORT_SMOOTH_GROUPS or EXPORT_SMOOTH_GROUPS_BITFLAGS) and faces_count:
                             smooth_groups, smooth_groups_tot = me.calc_smooth_groups(use_bitflags=EXPORT_SMOOTH_GROUPS_BITFLAGS)
                             if smooth_groups_tot <= 1:
                                 smooth_groups, smooth_groups_tot = (), 0
@@ -410,32 +460,31 @@ def write_file(filepath, objects, depsgraph, scene,
                             materials = [None]
                             material_names = [name_compat(None)]
 
+                        verts_co = foreach_get(me.vertices, "co", np.float32, 3)
+                        faces_loop_start = foreach_get(me.polygons, "loop_start", np.int64)
+                        faces_loop_total = foreach_get(me.polygons, "loop_total", np.int64)
+                        faces_material_index = foreach_get(me.polygons, "material_index", np.int64)
+                        faces_use_smooth = foreach_get(me.polygons, "use_smooth", np.bool_)
+                        loops_vert = foreach_get(me.loops, "vertex_index", np.int64)
+
+                        # Smooth state of each face: 0 when flat, its smooth group (or 1 without groups) otherwise.
+                        faces_smooth = faces_use_smooth.astype(np.int64)
+                        if smooth_groups:
+                            faces_smooth[faces_use_smooth] = np.asarray(smooth_groups, dtype=np.int64)[faces_use_smooth]
+
                         # Sort by Material, then images
                         # so we dont over context switch in the obj file.
                         if EXPORT_KEEP_VERT_ORDER:
-                            pass
+                            faces_order = np.arange(faces_count)
+                        elif len(materials) > 1:
+                            faces_order = np.lexsort((faces_smooth, faces_material_index))
                         else:
-                            if len(materials) > 1:
-                                if smooth_groups:
-                                    sort_func = lambda a: (a[0].material_index,
-                                                           smooth_groups[a[1]] if a[0].use_smooth else False)
-                                else:
-                                    sort_func = lambda a: (a[0].material_index,
-                                                           a[0].use_smooth)
-                            else:
-                                # no materials
-                                if smooth_groups:
-                                    sort_func = lambda a: smooth_groups[a[1] if a[0].use_smooth else False]
-                                else:
-                                    sort_func = lambda a: a[0].use_smooth
-
-                            face_index_pairs.sort(key=sort_func)
-
-                            del sort_func
+                            # no materials
+                            faces_order = np.argsort(faces_smooth, kind='stable')
 
-                        # Set the default mat to no material and no image.
-                        contextMat = 0, 0  # Can never be this, so we will label a new material the first chance we get.
-                        contextSmooth = None  # Will either be true or false,  set bad to force initialization switch.
+                        sorted_loop_total = faces_loop_total[faces_order]
+                        loops_order = loop_ranges(faces_loop_start[faces_order], sorted_loop_total)
+                        sorted_loops_vert = loops_vert[loops_order]
 
                         if EXPORT_BLEN_OBS or EXPORT_GROUP_BY_OB:
                             name1 = ob.name
@@ -453,97 +502,85 @@ def write_file(filepath, objects, depsgraph, scene,
                         subprogress2.step()
 
                         # Vert
-                        for v in me_verts:
-                            fw('v %.6f %.6f %.6f\n' % v.co[:])
+                        fw(('v %.6f %.6f %.6f\n', verts_co))
 
                         subprogress2.step()
 
+                        # Face corners: vertex, then uv and normal indices when exported.
+                        loops_values = [totverts + sorted_loops_vert]
+                        corner_fmt = " %d"
+
                         # UV
                         if faceuv:
-                            # in case removing some of these dont get defined.
-                            uv = f_index = uv_index = uv_key = uv_val = uv_ls = None
-
-                            uv_face_mapping = [None] * len(face_index_pairs)
-
-                            uv_dict = {}
-                            uv_get = uv_dict.get
-                            for f, f_index in face_index_pairs:
-                                uv_ls = uv_face_mapping[f_index] = []
-                                for uv_index, l_index in enumerate(f.loop_indices):
-                                    uv = uv_layer[l_index].uv
-                                    # include the vertex index in the key so we don't share UV's between vertices,
-                                    # allowed by the OBJ spec but can cause issues for other importers, see: T47010.
-
-                                    # this works too, shared UV's for all verts
-                                    #~ uv_key = veckey2d(uv)
-                                    uv_key = loops[l_index].vertex_index, veckey2d(uv)
-
-                                    uv_val = uv_get(uv_key)
-                                    if uv_val is None:
-                                        uv_val = uv_dict[uv_key] = uv_unique_count
-                                        fw('vt %.6f %.6f\n' % uv[:])
-                                        uv_unique_count += 1
-                                    uv_ls.append(uv_val)
-
-                            del uv_dict, uv, f_index, uv_index, uv_ls, uv_get, uv_key, uv_val
-                            # Only need uv_unique_count and uv_face_mapping
+                            uv_layer = me.uv_layers.active.data
+                            loops_uv = foreach_get(uv_layer, "uv", np.float32, 2)[loops_order]
+                            # include the vertex index in the key so we don't share UV's between vertices,
+                            # allowed by the OBJ spec but can cause issues for other importers, see: T47010.
+                            # Adding 0.0 turns -0.0 into 0.0, so that both give the same key.
+                            uv_keys = np.column_stack((sorted_loops_vert, np.round(loops_uv.astype(np.float64), 4) + 0.0))
+                            uv_first, loops_uv_index = unique_rows(uv_keys)
+                            fw(('vt %.6f %.6f\n', loops_uv[uv_first]))
+                            uv_unique_count = len(uv_first)
+                            loops_values.append(totuvco + loops_uv_index)
+                            corner_fmt += "/%d"
 
                         subprogress2.step()
 
                         # NORMAL, Smooth/Non smoothed.
                         if EXPORT_NORMALS:
-                            no_key = no_val = None
-                            normals_to_idx = {}
-                            no_get = normals_to_idx.get
-                            loops_to_normals = [0] * len(loops)
-                            for f, f_index in face_index_pairs:
-                                for l_idx in f.loop_indices:
-                                    no_key = veckey3d(loops[l_idx].normal)
-                                    no_val = no_get(no_key)
-                                    if no_val is None:
-                                        no_val = normals_to_idx[no_key] = no_unique_count
-                                        fw('vn %.4f %.4f %.4f\n' % no_key)
-                                        no_unique_count += 1
-                                    loops_to_normals[l_idx] = no_val
-                            del normals_to_idx, no_get, no_key, no_val
-                        else:
-                            loops_to_normals = []
+                            no_keys = np.round(foreach_get(me.loops, "normal", np.float32, 3)[loops_order].astype(np.float64), 4)
+                            no_first, loops_no_index = unique_rows(no_keys + 0.0)
+                            fw(('vn %.4f %.4f %.4f\n', no_keys[no_first]))
+                            no_unique_count = len(no_first)
+                            loops_values.append(totno + loops_no_index)
+                            corner_fmt += "/%d" if faceuv else "//%d"
 
                         subprogress2.step()
 
-                        # XXX
+                        # Where each face starts a new run of faces to write:
+                        # vertex group, material or smooth state switch, or different number of vertices.
+                        vgroups_switch = np.zeros(faces_count, dtype=np.bool_)
                         if EXPORT_POLYGROUPS:
                             # Retrieve the list of vertex groups
                             vertGroupNames = ob.vertex_groups.keys()
                             if vertGroupNames:
-                                currentVGroup = ''
-                                # Create a dictionary keyed by face id and listing, for each vertex, the vertex groups it belongs to
-                                vgroupsMap = [[] for _i in range(len(me_verts))]
-                                for v_idx, v_ls in enumerate(vgroupsMap):
-                                    v_ls[:] = [(vertGroupNames[g.group], g.weight) for g in me_verts[v_idx].groups]
-
-                        for f, f_index in face_index_pairs:
-                            f_smooth = f.use_smooth
-                            if f_smooth and smooth_groups:
-                                f_smooth = smooth_groups[f_index]
-                            f_mat = min(f.material_index, len(materials) - 1)
-
-                            # MAKE KEY
-                            key = material_names[f_mat], None  # No image, use None instead.
-
+                                verts_groups = [v.groups for v in me.vertices]
+                                verts_groups_count = np.array([len(groups) for groups in verts_groups], dtype=np.int64)
+                                groups_index = np.array([g.group for groups in verts_groups for g in groups], dtype=np.int64)
+                                groups_weight = np.array([g.weight for groups in verts_groups for g in groups], dtype=np.float32)
+                                groups_rank = np.argsort(np.argsort(np.array(vertGroupNames, dtype=object)))
+                                # find what vertext group the faces belong to, '(null)' (-1) for none.
+                                faces_vgroup = faces_vertex_group(
+                                    np.repeat(np.arange(faces_count), sorted_loop_total),
+                                    sorted_loops_vert, faces_count,
+                                    verts_groups_count, groups_index, groups_weight, groups_rank,
+                                )
+                                vgroup_names = list(vertGroupNames) + ['(null)']
+                                vgroups_switch = values_switch(faces_vgroup)
+
+                        # MAKE KEY, faces using differently named materials switch context.
+                        faces_material = np.minimum(faces_material_index[faces_order], len(materials) - 1)
+                        material_keys = {name: i for i, name in enumerate(dict.fromkeys(material_names))}
+                        faces_key = np.array([material_keys[name] for name in material_names], dtype=np.int64)[faces_material]
+                        material_switch = values_switch(faces_key)
+                        sorted_faces_smooth = faces_smooth[faces_order]
+                        smooth_switch = values_switch(sorted_faces_smooth)
+                        size_switch = values_switch(sorted_loop_total)
+
+                        runs_start = np.flatnonzero(vgroups_switch | material_switch | smooth_switch | size_switch)
+                        runs_end = np.append(runs_start[1:], faces_count)
+                        loops_values = np.column_stack(loops_values)
+                        faces_loop_start_sorted = np.cumsum(sorted_loop_total) - sorted_loop_total
+
+                        for run_start, run_end in zip(runs_start.tolist(), runs_end.tolist()):
                             # Write the vertex group
-                            if EXPORT_POLYGROUPS:
-                                if vertGroupNames:
-                                    # find what vertext group the face belongs to
-                                    vgroup_of_face = findVertexGroupName(f, vgroupsMap)
-                                    if vgroup_of_face != currentVGroup:
-                                        currentVGroup = vgroup_of_face
-                                        fw('g %s\n' % vgroup_of_face)
+                            if vgroups_switch[run_start]:
+                                fw('g %s\n' % vgroup_names[faces_vgroup[run_start]])
 
                             # CHECK FOR CONTEXT SWITCH
-                            if key == contextMat:
-                                pass  # Context already switched, dont do anything
-                            else:
+                            if material_switch[run_start]:
+                                f_mat = faces_material[run_start]
+                                key = material_names[f_mat], None  # No image, use None instead.
                                 if key[0] is None and key[1] is None:
                                     # Write a null material, since we know the context has changed.
                                     if EXPORT_GROUP_BY_MAT:
@@ -584,63 +621,37 @@ def write_file(filepath, objects, depsgraph, scene,
                                     if EXPORT_MTL:
                                         fw("usemtl %s\n" % mat_data[0])  # can be mat_image or (null)
 
-                            contextMat = key
-                            if f_smooth != contextSmooth:
+                            if smooth_switch[run_start]:
+                                f_smooth = sorted_faces_smooth[run_start]
                                 if f_smooth:  # on now off
-                                    if smooth_groups:
-                                        f_smooth = smooth_groups[f_index]
-                                        fw('s %d\n' % f_smooth)
-                                    else:
-                                        fw('s 1\n')
+                                    fw('s %d\n' % f_smooth)
                                 else:  # was off now on
                                     fw('s off\n')
-                                contextSmooth = f_smooth
-
-                            f_v = [(vi, me_verts[v_idx], l_idx)
-                                   for vi, (v_idx, l_idx) in enumerate(zip(f.vertices, f.loop_indices))]
-
-                            fw('f')
-                            if faceuv:
-                                if EXPORT_NORMALS:
-                                    for vi, v, li in f_v:
-                                        fw(" %d/%d/%d" % (totverts + v.index,
-                                                          totuvco + uv_face_mapping[f_index][vi],
-                                                          totno + loops_to_normals[li],
-                                                          ))  # vert, uv, normal
-                                else:  # No Normals
-                                    for vi, v, li in f_v:
-                                        fw(" %d/%d" % (totverts + v.index,
-                                                       totuvco + uv_face_mapping[f_index][vi],
-                                                       ))  # vert, uv
-
-                                face_vert_index += len(f_v)
-
-                            else:  # No UV's
-                                if EXPORT_NORMALS:
-                                    for vi, v, li in f_v:
-                                        fw(" %d//%d" % (totverts + v.index, totno + loops_to_normals[li]))
-                                else:  # No Normals
-                                    for vi, v, li in f_v:
-                                        fw(" %d" % (totverts + v.index))
-
-                            fw('\n')
+
+                            # All faces of a run have the same number of vertices.
+                            f_len = sorted_loop_total[run_start]
+                            loop_start = faces_loop_start_sorted[run_start]
+                            run_values = loops_values[loop_start:loop_start + f_len * (run_end - run_start)]
+                            fw(('f' + corner_fmt * f_len + '\n', run_values.reshape(run_end - run_start, -1)))
 
                         subprogress2.step()
 
                         # Write edges.
                         if EXPORT_EDGES:
-                            for ed in edges:
-                                if ed.is_loose:
-                                    fw('l %d %d\n' % (totverts + ed.vertices[0], totverts + ed.vertices[1]))
+                            edges_loose = foreach_get(me.edges, "is_loose", np.bool_)
+                            edges_vertices = foreach_get(me.edges, "vertices", np.int64, 2)
+                            fw(('l %d %d\n', totverts + edges_vertices[edges_loose]))
 
                         # Make the indices global rather then per mesh
-                        totverts += len(me_verts)
+                        totverts += len(verts_co)
                         totuvco += uv_unique_count
                         totno += no_unique_count
 
                         # clean up
                         ob_for_convert.to_mesh_clear()
 
+                        write_pieces(f.write, pieces)
+
                 subprogress1.leave_substeps("Finished writing geometry of '%s'." % ob_main.name)
             subprogress1.leave_substeps()
 
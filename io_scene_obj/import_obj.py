@@ -32,12 +32,15 @@ http://wiki.blender.org/index.php/Scripts/Manual/Import/wavefront_obj
 """
 
 import array
+import collections
 import os
+import re
 import time
+
 import bpy
 import mathutils
+import numpy as np
 
-from bpy_extras.io_utils import unpack_list
 from bpy_extras.image_utils import load_image
 from bpy_extras.wm_utils.progress_report import ProgressReport
 
@@ -474,14 +477,43 @@ def create_materials(filepath, relpath,
             mtl.close()
 
 
-def face_is_edge(face):
+# Bits of ObjFaces.flags
+FACE_INVALID_BLENPOLY = 1  # ngon that may use a same edge more than once (holes...)
+FACE_POLYLINE = 2  # 'l' record, not a real face
+
+# All faces of an OBJ file, as flat arrays (one item per face or per face corner).
+ObjFaces = collections.namedtuple("ObjFaces", (
+    "loops_vert",  # vertex index of each face corner
+    "loops_tex",  # uv index of each face corner (0 when not given)
+    "loops_nor",  # normal index of each face corner (0 when not given)
+    "sizes",  # number of corners of each face
+    "flags",  # FACE_ flags of each face
+    "contexts",  # index of the (material, smooth group, object key) of each face, see load()
+))
+
+
+def face_ranges(starts, sizes):
+    """Concatenated ranges [start, start + size), i.e. the corners of the given faces."""
+    sizes = np.asarray(sizes, dtype=np.int64)
+    offsets = np.cumsum(sizes) - sizes
+    return np.repeat(np.asarray(starts, dtype=np.int64) - offsets, sizes) + np.arange(sizes.sum())
+
+
+def face_is_edge(faces):
     """Simple check to test whether given (temp, working) data is an edge, and not a real face."""
-    face_vert_loc_indices = face[0]
-    face_vert_nor_indices = face[1]
-    return len(face_vert_nor_indices) == 1 or len(face_vert_loc_indices) == 2
+    return ((faces.flags & FACE_POLYLINE) != 0) | (faces.sizes == 1) | (faces.sizes == 2)
 
 
-def split_mesh(verts_loc, faces, unique_materials, filepath, SPLIT_OB_OR_GROUP):
+def unique_first_appearance(values):
+    """Return the distinct values in order of first appearance, and the index of each value in that list."""
+    uniq, first, inverse = np.unique(values, return_index=True, return_inverse=True)
+    order = np.argsort(first)
+    remap = np.empty_like(order)
+    remap[order] = np.arange(len(order))
+    return uniq[order], remap[inverse.ravel()]
+
+
+def split_mesh(verts_loc, faces, face_contexts, unique_materials, filepath, SPLIT_OB_OR_GROUP):
     """
     Takes vert_loc and faces, and separates into multiple sets of
     (verts_loc, faces, unique_materials, dataname)
@@ -489,9 +521,11 @@ def split_mesh(verts_loc, faces, unique_materials, filepath, SPLIT_OB_OR_GROUP):
 
     filename = os.path.splitext((os.path.basename(filepath)))[0]
 
-    if not SPLIT_OB_OR_GROUP or not faces:
-        use_verts_nor = any(f[1] for f in faces)
-        use_verts_tex = any(f[2] for f in faces)
+    # Only real faces store uv and normal indices.
+    is_face = ~face_is_edge(faces) & (faces.sizes > 0)
+
+    if not SPLIT_OB_OR_GROUP or not len(faces.sizes):
+        use_verts_nor = use_verts_tex = bool(is_face.any())
         # use the filename for the object name since we aren't chopping up the mesh.
         return [(verts_loc, faces, unique_materials, filename, use_verts_nor, use_verts_tex)]
 
@@ -505,53 +539,40 @@ def split_mesh(verts_loc, faces, unique_materials, filepath, SPLIT_OB_OR_GROUP):
             return "_".join(k.decode('utf-8', 'replace') for k in key)
 
     # Return a key that makes the faces unique.
-    face_split_dict = {}
-
-    oldkey = -1  # initialize to a value that will never match the key
-
-    for face in faces:
-        (face_vert_loc_indices,
-         face_vert_nor_indices,
-         face_vert_tex_indices,
-         context_material,
-         context_smooth_group,
-         context_object_key,
-         face_invalid_blenpoly,
-         ) = face
-        key = context_object_key
-
-        if oldkey != key:
-            # Check the key has changed.
-            (verts_split, faces_split, unique_materials_split, vert_remap,
-             use_verts_nor, use_verts_tex) = face_split_dict.setdefault(key, ([], [], {}, {}, [], []))
-            oldkey = key
-
-        if not face_is_edge(face):
-            if not use_verts_nor and face_vert_nor_indices:
-                use_verts_nor.append(True)
-
-            if not use_verts_tex and face_vert_tex_indices:
-                use_verts_tex.append(True)
-
-        # Remap verts to new vert list and add where needed
-        for loop_idx, vert_idx in enumerate(face_vert_loc_indices):
-            map_index = vert_remap.get(vert_idx)
-            if map_index is None:
-                map_index = len(verts_split)
-                vert_remap[vert_idx] = map_index  # set the new remapped index so we only add once and can reference next time.
-                verts_split.append(verts_loc[vert_idx])  # add the vert to the local verts
-
-            face_vert_loc_indices[loop_idx] = map_index  # remap to the local index
+    object_keys = list(dict.fromkeys(context[2] for context in face_contexts))
+    context_object = np.array([object_keys.index(context[2]) for context in face_contexts], dtype=np.int32)
+    faces_object = context_object[faces.contexts]
+    faces_start = np.cumsum(faces.sizes, dtype=np.int64) - faces.sizes
+
+    split_data = []
+    for object_idx in unique_first_appearance(faces_object)[0]:
+        face_idx = np.flatnonzero(faces_object == object_idx)
+        loop_idx = face_ranges(faces_start[face_idx], faces.sizes[face_idx])
+
+        # Remap verts to new vert list, in order of first use.
+        verts_idx, loops_vert = unique_first_appearance(faces.loops_vert[loop_idx])
+
+        faces_split = ObjFaces(
+            loops_vert.astype(np.int32),
+            faces.loops_tex[loop_idx],
+            faces.loops_nor[loop_idx],
+            faces.sizes[face_idx],
+            faces.flags[face_idx],
+            faces.contexts[face_idx],
+        )
 
-            if context_material not in unique_materials_split:
-                unique_materials_split[context_material] = unique_materials[context_material]
+        # Materials of the faces having corners, in order of first use.
+        used_contexts = unique_first_appearance(faces_split.contexts[faces_split.sizes > 0])[0]
+        unique_materials_split = {}
+        for context_idx in used_contexts:
+            context_material = face_contexts[context_idx][0]
+            unique_materials_split.setdefault(context_material, unique_materials[context_material])
 
-        faces_split.append(face)
+        use_verts = bool(is_face[face_idx].any())
+        split_data.append((verts_loc[verts_idx], faces_split, unique_materials_split,
+                           key_to_name(object_keys[object_idx]), use_verts, use_verts))
 
-    # remove one of the items and reorder
-    return [(verts_split, faces_split, unique_materials_split, key_to_name(key), bool(use_vnor), bool(use_vtex))
-            for key, (verts_split, faces_split, unique_materials_split, _, use_vnor, use_vtex)
-            in face_split_dict.items()]
+    return split_data
 
 
 def create_mesh(new_objects,
@@ -560,6 +581,7 @@ def create_mesh(new_objects,
                 verts_nor,
                 verts_tex,
                 faces,
+                face_contexts,
                 unique_materials,
                 unique_smooth_groups,
                 vertex_groups,
@@ -569,110 +591,91 @@ def create_mesh(new_objects,
     Takes all the data gathered and generates a mesh, adding the new object to new_objects
     deals with ngons, sharp edges and assigning materials
     """
+    faces_start = np.cumsum(faces.sizes, dtype=np.int64) - faces.sizes
+    loops_vert = faces.loops_vert
 
-    if unique_smooth_groups:
-        sharp_edges = set()
-        smooth_group_users = {context_smooth_group: {} for context_smooth_group in unique_smooth_groups.keys()}
-        context_smooth_group_old = -1
+    is_edge = face_is_edge(faces)
+    # cant add single vert faces
+    is_face = ~is_edge & (faces.sizes >= 3)
+    is_invalid = is_face & ((faces.flags & FACE_INVALID_BLENPOLY) != 0)
 
+    # Face with a single item in face_vert_nor_indices is actually a polyline!
+    edges = np.empty((0, 2), dtype=np.int32)
+    if use_edges:
+        face_idx = np.flatnonzero(is_edge & (faces.sizes >= 2))
+        loop_idx = face_ranges(faces_start[face_idx], faces.sizes[face_idx])
+        loop_face = np.repeat(face_idx, faces.sizes[face_idx])
+        same_face = loop_face[:-1] == loop_face[1:]
+        edges = np.stack((loops_vert[loop_idx[:-1][same_face]], loops_vert[loop_idx[1:][same_face]]), axis=1)
+
+    # Smooth Group
+    sharp_edges = None
+    context_smooth = np.array([bool(context[1]) for context in face_contexts], dtype=np.bool_)
+    if unique_smooth_groups:
+        # Edges used by only one face of a smooth group are on its boundary.
+        smooth_ids = {}
+        context_smooth_id = np.array([smooth_ids.setdefault(context[1], len(smooth_ids))
+                                      for context in face_contexts], dtype=np.int64)
+        face_idx = np.flatnonzero(is_face & context_smooth[faces.contexts])
+        if len(face_idx):
+            sizes = faces.sizes[face_idx]
+            loop_idx = face_ranges(faces_start[face_idx], sizes)
+            # previous corner of each corner, wrapping around in each face
+            local_start = np.cumsum(sizes, dtype=np.int64) - sizes
+            prev_idx = np.arange(len(loop_idx)) - 1
+            prev_idx[local_start] = local_start + sizes - 1
+            vidx = loops_vert[loop_idx].astype(np.int64)
+            prev_vidx = vidx[prev_idx]
+            edge_keys = np.stack((
+                np.repeat(context_smooth_id[faces.contexts[face_idx]], sizes),
+                np.minimum(prev_vidx, vidx),
+                np.maximum(prev_vidx, vidx),
+            ), axis=1)
+            edge_keys, users = np.unique(edge_keys, axis=0, return_counts=True)
+            sharp_edges = np.unique(edge_keys[users == 1, 1:], axis=0)
+
+    # NGons into triangles
     fgon_edges = set()  # Used for storing fgon keys when we need to tessellate/untessellate them (ngons with hole).
-    edges = []
-    tot_loops = 0
-
-    context_object_key = None
-
-    # reverse loop through face indices
-    for f_idx in range(len(faces) - 1, -1, -1):
-        face = faces[f_idx]
-
-        (face_vert_loc_indices,
-         face_vert_nor_indices,
-         face_vert_tex_indices,
-         context_material,
-         context_smooth_group,
-         context_object_key,
-         face_invalid_blenpoly,
-         ) = face
-
-        len_face_vert_loc_indices = len(face_vert_loc_indices)
-
-        if len_face_vert_loc_indices == 1:
-            faces.pop(f_idx)  # cant add single vert faces
-
-        # Face with a single item in face_vert_nor_indices is actually a polyline!
-        elif face_is_edge(face):
-            if use_edges:
-                edges.extend((face_vert_loc_indices[i], face_vert_loc_indices[i + 1])
-                             for i in range(len_face_vert_loc_indices - 1))
-            faces.pop(f_idx)
-
-        else:
-            # Smooth Group
-            if unique_smooth_groups and context_smooth_group:
-                # Is a part of of a smooth group and is a face
-                if context_smooth_group_old is not context_smooth_group:
-                    edge_dict = smooth_group_users[context_smooth_group]
-                    context_smooth_group_old = context_smooth_group
-
-                prev_vidx = face_vert_loc_indices[-1]
-                for vidx in face_vert_loc_indices:
+    tess_loops = []
+    tess_contexts = []
+    invalid_idx = np.flatnonzero(is_invalid & (faces.sizes > 3))
+    if len(invalid_idx):
+        from bpy_extras.mesh_utils import ngon_tessellate
+        verts_loc_list = verts_loc.tolist()
+    # Same order as when faces were tessellated in a reversed loop.
+    for f_idx in invalid_idx[::-1].tolist():
+        loop_idx = np.arange(faces_start[f_idx], faces_start[f_idx] + faces.sizes[f_idx])
+        face_vert_loc_indices = loops_vert[loop_idx].tolist()
+        ngon_face_indices = ngon_tessellate(verts_loc_list, face_vert_loc_indices, debug_print=bpy.app.debug)
+        tess_loops.extend(loop_idx[list(ngon)] for ngon in ngon_face_indices)
+        tess_contexts.extend([faces.contexts[f_idx]] * len(ngon_face_indices))
+
+        # edges to make ngons
+        if len(ngon_face_indices) > 1:
+            edge_users = set()
+            for ngon in ngon_face_indices:
+                prev_vidx = face_vert_loc_indices[ngon[-1]]
+                for ngidx in ngon:
+                    vidx = face_vert_loc_indices[ngidx]
+                    if vidx == prev_vidx:
+                        continue  # broken OBJ... Just skip.
                     edge_key = (prev_vidx, vidx) if (prev_vidx < vidx) else (vidx, prev_vidx)
                     prev_vidx = vidx
-                    edge_dict[edge_key] = edge_dict.get(edge_key, 0) + 1
-
-            # NGons into triangles
-            if face_invalid_blenpoly:
-                # ignore triangles with invalid indices
-                if len(face_vert_loc_indices) > 3:
-                    from bpy_extras.mesh_utils import ngon_tessellate
-                    ngon_face_indices = ngon_tessellate(verts_loc, face_vert_loc_indices, debug_print=bpy.app.debug)
-                    faces.extend([([face_vert_loc_indices[ngon[0]],
-                                    face_vert_loc_indices[ngon[1]],
-                                    face_vert_loc_indices[ngon[2]],
-                                    ],
-                                [face_vert_nor_indices[ngon[0]],
-                                    face_vert_nor_indices[ngon[1]],
-                                    face_vert_nor_indices[ngon[2]],
-                                    ] if face_vert_nor_indices else [],
-                                [face_vert_tex_indices[ngon[0]],
-                                    face_vert_tex_indices[ngon[1]],
-                                    face_vert_tex_indices[ngon[2]],
-                                    ] if face_vert_tex_indices else [],
-                                context_material,
-                                context_smooth_group,
-                                context_object_key,
-                                [],
-                                )
-                                for ngon in ngon_face_indices]
-                                )
-                    tot_loops += 3 * len(ngon_face_indices)
-
-                    # edges to make ngons
-                    if len(ngon_face_indices) > 1:
-                        edge_users = set()
-                        for ngon in ngon_face_indices:
-                            prev_vidx = face_vert_loc_indices[ngon[-1]]
-                            for ngidx in ngon:
-                                vidx = face_vert_loc_indices[ngidx]
-                                if vidx == prev_vidx:
-                                    continue  # broken OBJ... Just skip.
-                                edge_key = (prev_vidx, vidx) if (prev_vidx < vidx) else (vidx, prev_vidx)
-                                prev_vidx = vidx
-                                if edge_key in edge_users:
-                                    fgon_edges.add(edge_key)
-                                else:
-                                    edge_users.add(edge_key)
-
-                faces.pop(f_idx)
-            else:
-                tot_loops += len_face_vert_loc_indices
-
-    # Build sharp edges
-    if unique_smooth_groups:
-        for edge_dict in smooth_group_users.values():
-            for key, users in edge_dict.items():
-                if users == 1:  # This edge is on the boundary of a group
-                    sharp_edges.add(key)
+                    if edge_key in edge_users:
+                        fgon_edges.add(edge_key)
+                    else:
+                        edge_users.add(edge_key)
+
+    # Valid faces, followed by the triangles of invalid ngons (invalid triangles are ignored).
+    face_idx = np.flatnonzero(is_face & ~is_invalid)
+    loop_idx = face_ranges(faces_start[face_idx], faces.sizes[face_idx])
+    faces_loop_total = faces.sizes[face_idx].astype(np.int32)
+    faces_context = faces.contexts[face_idx]
+    if tess_loops:
+        loop_idx = np.concatenate([loop_idx] + tess_loops)
+        faces_loop_total = np.concatenate((faces_loop_total, np.full(len(tess_loops), 3, dtype=np.int32)))
+        faces_context = np.concatenate((faces_context, np.array(tess_contexts, dtype=np.int32)))
+    faces_loop_start = (np.cumsum(faces_loop_total, dtype=np.int64) - faces_loop_total).astype(np.int32)
 
     # map the material names to an index
     material_mapping = {name: i for i, name in enumerate(unique_materials)}  # enumerate over unique_materials keys()
@@ -689,55 +692,35 @@ def create_mesh(new_objects,
         me.materials.append(material)
 
     me.vertices.add(len(verts_loc))
-    me.loops.add(tot_loops)
-    me.polygons.add(len(faces))
-
-    # verts_loc is a list of (x, y, z) tuples
-    me.vertices.foreach_set("co", unpack_list(verts_loc))
-
-    loops_vert_idx = tuple(vidx for (face_vert_loc_indices, _, _, _, _, _, _) in faces for vidx in face_vert_loc_indices)
-    faces_loop_start = []
-    lidx = 0
-    for f in faces:
-        face_vert_loc_indices = f[0]
-        nbr_vidx = len(face_vert_loc_indices)
-        faces_loop_start.append(lidx)
-        lidx += nbr_vidx
-    faces_loop_total = tuple(len(face_vert_loc_indices) for (face_vert_loc_indices, _, _, _, _, _, _) in faces)
-
-    me.loops.foreach_set("vertex_index", loops_vert_idx)
+    me.loops.add(len(loop_idx))
+    me.polygons.add(len(faces_loop_total))
+
+    # verts_loc is a (n, 3) float array
+    me.vertices.foreach_set("co", np.ascontiguousarray(verts_loc, dtype=np.float32).ravel())
+
+    me.loops.foreach_set("vertex_index", loops_vert[loop_idx].astype(np.int32))
     me.polygons.foreach_set("loop_start", faces_loop_start)
     me.polygons.foreach_set("loop_total", faces_loop_total)
 
-    faces_ma_index = tuple(material_mapping[context_material] for (_, _, _, context_material, _, _, _) in faces)
-    me.polygons.foreach_set("material_index", faces_ma_index)
-
-    faces_use_smooth = tuple(bool(context_smooth_group) for (_, _, _, _, context_smooth_group, _, _) in faces)
-    me.polygons.foreach_set("use_smooth", faces_use_smooth)
+    context_material = np.array([material_mapping.get(context[0], 0) for context in face_contexts], dtype=np.int32)
+    me.polygons.foreach_set("material_index", context_material[faces_context])
+    me.polygons.foreach_set("use_smooth", context_smooth[faces_context])
 
-    if verts_nor and me.loops:
+    if len(verts_nor) and me.loops:
         # Note: we store 'temp' normals in loops, since validate() may alter final mesh,
         #       we can only set custom lnors *after* calling it.
         me.create_normals_split()
-        loops_nor = tuple(no for (_, face_vert_nor_indices, _, _, _, _, _) in faces
-                             for face_noidx in face_vert_nor_indices
-                             for no in verts_nor[face_noidx])
-        me.loops.foreach_set("normal", loops_nor)
-
-    if verts_tex and me.polygons:
-        # Some files Do not explicitely write the 'v' value when it's 0.0, see T68249...
-        verts_tex = [uv if len(uv) == 2 else uv + [0.0] for uv in verts_tex]
+        me.loops.foreach_set("normal", verts_nor[faces.loops_nor[loop_idx]].ravel())
+
+    if len(verts_tex) and me.polygons:
         me.uv_layers.new(do_init=False)
-        loops_uv = tuple(uv for (_, _, face_vert_tex_indices, _, _, _, _) in faces
-                            for face_uvidx in face_vert_tex_indices
-                            for uv in verts_tex[face_uvidx])
-        me.uv_layers[0].data.foreach_set("uv", loops_uv)
+        me.uv_layers[0].data.foreach_set("uv", verts_tex[faces.loops_tex[loop_idx]].ravel())
 
-    use_edges = use_edges and bool(edges)
+    use_edges = use_edges and bool(len(edges))
     if use_edges:
         me.edges.add(len(edges))
-        # edges should be a list of (a, b) tuples
-        me.edges.foreach_set("vertices", unpack_list(edges))
+        # edges should be a (n, 2) int array
+        me.edges.foreach_set("vertices", edges.astype(np.int32).ravel())
 
     me.validate(clean_customdata=False)  # *Very* important to not remove lnors here!
     me.update(calc_edges=use_edges, calc_edges_loose=use_edges)
@@ -761,12 +744,18 @@ def create_mesh(new_objects,
         bm.free()
 
     # XXX If validate changes the geometry, this is likely to be broken...
-    if unique_smooth_groups and sharp_edges:
-        for e in me.edges:
-            if e.key in sharp_edges:
-                e.use_edge_sharp = True
-
-    if verts_nor:
+    if sharp_edges is not None and len(sharp_edges):
+        mesh_edges = np.empty(len(me.edges) * 2, dtype=np.int32)
+        me.edges.foreach_get("vertices", mesh_edges)
+        mesh_edges = np.sort(mesh_edges.reshape(-1, 2), axis=1).astype(np.int64)
+        stride = len(me.vertices) + 1
+        is_sharp = np.isin(mesh_edges[:, 0] * stride + mesh_edges[:, 1],
+                           sharp_edges[:, 0] * stride + sharp_edges[:, 1])
+        use_edge_sharp = np.empty(len(me.edges), dtype=np.bool_)
+        me.edges.foreach_get("use_edge_sharp", use_edge_sharp)
+        me.edges.foreach_set("use_edge_sharp", use_edge_sharp | is_sharp)
+
+    if len(verts_nor):
         clnors = array.array('f', [0.0] * (len(me.loops) * 3))
         me.loops.foreach_get("normal", clnors)
 
@@ -817,7 +806,9 @@ def create_nurbs(context_nurbs, vert_loc, new_objects):
 
     nu = cu.splines.new('NURBS')
     nu.points.add(len(curv_idx) - 1)  # a point is added to start with
-    nu.points.foreach_set("co", [co_axis for vt_idx in curv_idx for co_axis in (vert_loc[vt_idx] + (1.0,))])
+    points_co = np.ones((len(curv_idx), 4), dtype=np.float32)
+    points_co[:, :3] = vert_loc[curv_idx]
+    nu.points.foreach_set("co", points_co.ravel())
 
     nu.order_u = deg[0] + 1
 
@@ -870,6 +861,191 @@ def strip_slash(line_split):
     return False
 
 
+# Runs of consecutive 'v', 'vn', 'vt' or 'f' records, each one on a single line (without any '\').
+OBJ_RUN_RE = re.compile(
+    rb"^(?:(?P<v>(?:v[ \t][^\n\\]*\n)+)"
+    rb"|(?P<vn>(?:vn[ \t][^\n\\]*\n)+)"
+    rb"|(?P<vt>(?:vt[ \t][^\n\\]*\n)+)"
+    rb"|(?P<f>(?:f[ \t][^\n\\]*\n)+))",
+    re.MULTILINE,
+)
+
+# Runs shorter than that are not worth the cost of numpy calls.
+OBJ_RUN_MIN_LINES = 64
+
+
+def iter_obj_blocks(file, chunk_size=1 << 24):
+    """
+    Read an OBJ file by chunks of whole lines, and split them into (tag, block) pairs.
+
+    Runs of single line 'v', 'vn', 'vt' and 'f' records are yielded as one block with their tag,
+    so that they can be parsed at once. All other lines are yielded with an empty tag.
+    """
+    while True:
+        chunk = file.read(chunk_size)
+        if not chunk:
+            break
+        chunk += file.readline()
+        if not chunk.endswith(b'\n'):
+            chunk += b'\n'
+
+        pos = 0
+        for match in OBJ_RUN_RE.finditer(chunk):
+            if match.start() > pos:
+                yield b'', chunk[pos:match.start()]
+            yield match.lastgroup.encode(), match.group()
+            pos = match.end()
+        if pos < len(chunk):
+            yield b'', chunk[pos:]
+
+
+def parse_vec_lines(data, vec_len, use_comma):
+    """
+    Parse a block of single line 'v', 'vn' or 'vt' records into a (n, vec_len) float32 array.
+    Missing values are set to 0.0 (some files do not explicitly write the 'v' uv value when it's 0.0, see T68249).
+    """
+    if use_comma:
+        data = data.replace(b',', b'.')
+    line_count = data.count(b'\n')
+    tokens = data.split()
+
+    if line_count >= OBJ_RUN_MIN_LINES and len(tokens) % line_count == 0:
+        width = len(tokens) // line_count
+        tokens = np.array(tokens).reshape(line_count, width)
+        # Lines of different lengths would misalign the tags.
+        if (tokens[:, 0] == tokens[0, 0]).all():
+            vecs = np.zeros((line_count, vec_len), dtype=np.float32)
+            try:
+                # Go through double, to get exactly the same values as when parsing numbers with float().
+                vecs[:, :width - 1] = tokens[:, 1:vec_len + 1].astype(np.float64)
+            except ValueError:
+                pass
+            else:
+                return vecs
+
+    vecs = []
+    for line in data.splitlines():
+        vec = [float(v) for v in line.split()[1:vec_len + 1]]
+        vecs.append(vec + [0.0] * (vec_len - len(vec)))
+    return np.array(vecs, dtype=np.float64).astype(np.float32).reshape(-1, vec_len)
+
+
+def flag_invalid_ngons(loops_vert, sizes):
+    """
+    Return the FACE_ flags of the given faces, tagging ngons that *may* use a same edge more than once.
+    """
+    flags = np.zeros(len(sizes), dtype=np.uint8)
+    faces_start = np.cumsum(sizes) - sizes
+
+    # This a first round to quick-detect ngons that *may* use a same edge more than once:
+    # if we use more than once a same vertex, invalid ngon is suspected.
+    loops_face = np.repeat(np.arange(len(sizes)), sizes)
+    order = np.lexsort((loops_vert, loops_face))
+    loops_face = loops_face[order]
+    loops_vert_sorted = loops_vert[order]
+    is_dup = (loops_face[1:] == loops_face[:-1]) & (loops_vert_sorted[1:] == loops_vert_sorted[:-1])
+
+    # Potential candidates are re-checked on their edges.
+    for f_idx in np.unique(loops_face[1:][is_dup]).tolist():
+        face_vert_loc_indices = loops_vert[faces_start[f_idx]:faces_start[f_idx] + sizes[f_idx]].tolist()
+        face_items_usage = set()
+        prev_vidx = face_vert_loc_indices[-1]
+        for vidx in face_vert_loc_indices:
+            edge_key = (prev_vidx, vidx) if (prev_vidx < vidx) else (vidx, prev_vidx)
+            if edge_key in face_items_usage:
+                flags[f_idx] = FACE_INVALID_BLENPOLY
+                break
+            face_items_usage.add(edge_key)
+            prev_vidx = vidx
+
+    return flags
+
+
+def parse_face_lines(data, verts_loc_len, verts_tex_len, verts_nor_len):
+    """
+    Parse a block of single line 'f' records into an ObjFaces (with a null context),
+    relative indices are resolved using the number of vertices, uvs and normals defined before the block.
+    """
+    line_count = data.count(b'\n')
+    loops = None
+
+    if line_count >= OBJ_RUN_MIN_LINES:
+        tokens = np.array(data.split())
+        is_corner = tokens != b'f'
+        sizes = np.diff(np.append(np.flatnonzero(~is_corner), len(tokens))) - 1
+        corners = tokens[is_corner]
+
+        # All corners have to use the same 'loc/tex/nor' layout.
+        chars = corners.view(np.uint8).reshape(len(corners), -1)
+        is_slash = chars == ord('/')
+        slash_count = is_slash.sum(axis=1)
+        has_no_tex = (is_slash[:, :-1] & is_slash[:, 1:]).any(axis=1)
+        if len(corners) and (slash_count == slash_count[0]).all() and (has_no_tex == has_no_tex[0]).all():
+            fields = {
+                (0, False): ('loc',),
+                (1, False): ('loc', 'tex'),
+                (2, True): ('loc', 'nor'),
+                (2, False): ('loc', 'tex', 'nor'),
+            }.get((slash_count[0], has_no_tex[0]))
+            numbers = np.array(data.replace(b'/', b' ').split())
+            numbers = numbers[numbers != b'f']
+            if fields and len(numbers) == len(fields) * len(corners):
+                try:
+                    numbers = numbers.astype(np.int64).reshape(len(corners), len(fields))
+                except ValueError:
+                    pass
+                else:
+                    loops = dict(zip(fields, numbers.T))
+
+    if loops is not None:
+        # Note that we assume here we cannot get OBJ invalid 0 index for vertices,
+        # while a 0 uv or normal index means there is none.
+        idx = loops['loc']
+        loops_vert = np.where(idx < 1, idx + verts_loc_len, idx - 1)
+        zeros = np.zeros(len(idx), dtype=np.int64)
+        idx = loops.get('tex', zeros)
+        loops_tex = np.where(idx < 0, idx + verts_tex_len, np.maximum(idx - 1, 0))
+        idx = loops.get('nor', zeros)
+        loops_nor = np.where(idx < 0, idx + verts_nor_len, np.maximum(idx - 1, 0))
+    else:
+        sizes = []
+        loops_vert = []
+        loops_tex = []
+        loops_nor = []
+        for line in data.splitlines():
+            line_split = line.split()[1:]
+            sizes.append(len(line_split))
+            for v in line_split:
+                obj_vert = v.split(b'/')
+                idx = int(obj_vert[0])
+                loops_vert.append((idx + verts_loc_len) if (idx < 1) else idx - 1)
+
+                # formatting for faces with normals and textures is
+                # loc_index/tex_index/nor_index
+                if len(obj_vert) > 1 and obj_vert[1] and obj_vert[1] != b'0':
+                    idx = int(obj_vert[1])
+                    loops_tex.append((idx + verts_tex_len) if (idx < 1) else idx - 1)
+                else:
+                    loops_tex.append(0)
+
+                if len(obj_vert) > 2 and obj_vert[2] and obj_vert[2] != b'0':
+                    idx = int(obj_vert[2])
+                    loops_nor.append((idx + verts_nor_len) if (idx < 1) else idx - 1)
+                else:
+                    loops_nor.append(0)
+
+    loops_vert = np.array(loops_vert, dtype=np.int32)
+    sizes = np.array(sizes, dtype=np.int32)
+    return ObjFaces(
+        loops_vert,
+        np.array(loops_tex, dtype=np.int32),
+        np.array(loops_nor, dtype=np.int32),
+        sizes,
+        flag_invalid_ngons(loops_vert, sizes),
+        np.zeros(len(sizes), dtype=np.int32),
+    )
+
+
 def get_float_func(filepath):
     """
     find the float function for this obj file
@@ -908,7 +1084,7 @@ def load(context,
          use_image_search=True,
          use_groups_as_vgroups=False,
          relpath=None,
-         global_matrix=None
+         global_matrix=None,
          ):
     """
     Called by the user interface or another script.
@@ -927,29 +1103,21 @@ def load(context,
         existing_names.add(name)
         return name
 
-    def handle_vec(line_start, context_multi_line, line_split, tag, data, vec, vec_len):
-        ret_context_multi_line = tag if strip_slash(line_split) else b''
-        if line_start == tag:
-            vec[:] = [float_func(v) for v in line_split[1:]]
-        elif context_multi_line == tag:
-            vec += [float_func(v) for v in line_split]
-        if not ret_context_multi_line:
-            data.append(tuple(vec[:vec_len]))
-        return ret_context_multi_line
-
-    def create_face(context_material, context_smooth_group, context_object_key):
-        face_vert_loc_indices = []
-        face_vert_nor_indices = []
-        face_vert_tex_indices = []
-        return (
-            face_vert_loc_indices,
-            face_vert_nor_indices,
-            face_vert_tex_indices,
-            context_material,
-            context_smooth_group,
-            context_object_key,
-            [],  # If non-empty, that face is a Blender-invalid ngon (holes...), need a mutable object for that...
-        )
+    def faces_store(context_material, context_smooth_group, context_object_key, context_vgroup, flags=0):
+        face_context = (context_material, context_smooth_group, context_object_key)
+        context_idx = face_contexts_idx.get(face_context)
+        if context_idx is None:
+            context_idx = face_contexts_idx[face_context] = len(face_contexts)
+            face_contexts.append(face_context)
+
+        def store(faces):
+            faces_blocks.append(faces._replace(contexts=np.full(len(faces.sizes), context_idx, dtype=np.int32),
+                                               flags=faces.flags | flags))
+            # Add the vertices to the current group
+            # *warning*, this wont work for files that have groups defined around verts
+            if context_vgroup:
+                vertex_groups[context_vgroup].extend(faces.loops_vert.tolist())
+        return store
 
     with ProgressReport(context.window_manager) as progress:
         progress.enter_substeps(1, "Importing OBJ %r..." % filepath)
@@ -962,15 +1130,19 @@ def load(context,
 
         time_main = time.time()
 
-        verts_loc = []
-        verts_nor = []
-        verts_tex = []
-        faces = []  # tuples of the faces
+        # Blocks of parsed data, concatenated once the whole file is read.
+        verts_loc_blocks = []
+        verts_nor_blocks = []
+        verts_tex_blocks = []
+        faces_blocks = []  # ObjFaces of the faces
+        face_contexts = []  # (material, smooth group, object key) of the faces
+        face_contexts_idx = {}
         material_libs = set()  # filenames to material libs this OBJ uses
         vertex_groups = {}  # when use_groups_as_vgroups is true
 
         # Get the string to float conversion func for this file- is 'float' for almost all files.
         float_func = get_float_func(filepath)
+        use_comma = float_func is not float
 
         # Context variables
         context_material = None
@@ -997,243 +1169,191 @@ def load(context,
         # since we use xreadline we cant skip to the next line
         # so we need to know whether
         context_multi_line = b''
+        multi_line_split = []
+        multi_line_store = None
 
-        # Per-face handling data.
-        face_vert_loc_indices = None
-        face_vert_nor_indices = None
-        face_vert_tex_indices = None
+        # Number of items parsed so far, to resolve relative indices.
         verts_loc_len = verts_nor_len = verts_tex_len = 0
-        face_items_usage = set()
-        face_invalid_blenpoly = None
-        prev_vidx = None
-        face = None
-        vec = []
 
-        quick_vert_failures = 0
-        skip_quick_vert = False
+        vec_data = {
+            b'v': (verts_loc_blocks, 3),
+            b'vn': (verts_nor_blocks, 3),
+            b'vt': (verts_tex_blocks, 2),
+        }
+
+        multi_line_tags = {b'v', b'vn', b'vt', b'f', b'l'}
 
         progress.enter_substeps(3, "Parsing OBJ file...")
         with open(filepath, 'rb') as f:
-            for line in f:
-                line_split = line.split()
-
-                if not line_split:
-                    continue
-
-                line_start = line_split[0]  # we compare with this a _lot_
-
-                # Handling vertex data are pretty similar, factorize that.
-                # Also, most OBJ files store all those on a single line, so try fast parsing for that first,
-                # and only fallback to full multi-line parsing when needed, this gives significant speed-up
-                # (~40% on affected code).
-                if line_start == b'v':
-                    vdata, vdata_len, do_quick_vert = verts_loc, 3, not skip_quick_vert
-                elif line_start == b'vn':
-                    vdata, vdata_len, do_quick_vert = verts_nor, 3, not skip_quick_vert
-                elif line_start == b'vt':
-                    vdata, vdata_len, do_quick_vert = verts_tex, 2, not skip_quick_vert
-                elif context_multi_line == b'v':
-                    vdata, vdata_len, do_quick_vert = verts_loc, 3, False
-                elif context_multi_line == b'vn':
-                    vdata, vdata_len, do_quick_vert = verts_nor, 3, False
-                elif context_multi_line == b'vt':
-                    vdata, vdata_len, do_quick_vert = verts_tex, 2, False
-                else:
-                    vdata_len = 0
-
-                if vdata_len:
-                    if do_quick_vert:
-                        try:
-                            vdata.append(list(map(float_func, line_split[1:vdata_len + 1])))
-                        except:
-                            do_quick_vert = False
-                            # In case we get too many failures on quick parsing, force fallback to full multi-line one.
-                            # Exception handling can become costly...
-                            quick_vert_failures += 1
-                            if quick_vert_failures > 10000:
-                                skip_quick_vert = True
-                    if not do_quick_vert:
-                        context_multi_line = handle_vec(line_start, context_multi_line, line_split,
-                                                        context_multi_line or line_start,
-                                                        vdata, vec, vdata_len)
-
-                elif line_start == b'f' or context_multi_line == b'f':
-                    if not context_multi_line:
-                        line_split = line_split[1:]
-                        # Instantiate a face
-                        face = create_face(context_material, context_smooth_group, context_object_key)
-                        (face_vert_loc_indices, face_vert_nor_indices, face_vert_tex_indices,
-                         _1, _2, _3, face_invalid_blenpoly) = face
-                        faces.append(face)
-                        face_items_usage.clear()
-                        verts_loc_len = len(verts_loc)
-                        verts_nor_len = len(verts_nor)
-                        verts_tex_len = len(verts_tex)
+            for run_tag, block in iter_obj_blocks(f):
+                if run_tag and not context_multi_line:
+                    # Runs of single line records, parsed at once.
+                    line_count = block.count(b'\n')
+                    if run_tag == b'f':
                         if context_material is None:
                             use_default_material = True
-                    # Else, use face_vert_loc_indices and face_vert_tex_indices previously defined and used the obj_face
-
-                    context_multi_line = b'f' if strip_slash(line_split) else b''
-
-                    for v in line_split:
-                        obj_vert = v.split(b'/')
-                        idx = int(obj_vert[0])  # Note that we assume here we cannot get OBJ invalid 0 index...
-                        vert_loc_index = (idx + verts_loc_len) if (idx < 1) else idx - 1
-                        # Add the vertex to the current group
-                        # *warning*, this wont work for files that have groups defined around verts
-                        if use_groups_as_vgroups and context_vgroup:
-                            vertex_groups[context_vgroup].append(vert_loc_index)
-                        # This a first round to quick-detect ngons that *may* use a same edge more than once.
-                        # Potential candidate will be re-checked once we have done parsing the whole face.
-                        if not face_invalid_blenpoly:
-                            # If we use more than once a same vertex, invalid ngon is suspected.
-                            if vert_loc_index in face_items_usage:
-                                face_invalid_blenpoly.append(True)
-                            else:
-                                face_items_usage.add(vert_loc_index)
-                        face_vert_loc_indices.append(vert_loc_index)
-
-                        # formatting for faces with normals and textures is
-                        # loc_index/tex_index/nor_index
-                        if len(obj_vert) > 1 and obj_vert[1] and obj_vert[1] != b'0':
-                            idx = int(obj_vert[1])
-                            face_vert_tex_indices.append((idx + verts_tex_len) if (idx < 1) else idx - 1)
+                        store = faces_store(context_material, context_smooth_group, context_object_key,
+                                            context_vgroup if use_groups_as_vgroups else None)
+                        store(parse_face_lines(block, verts_loc_len, verts_tex_len, verts_nor_len))
+                    else:
+                        vdata, vdata_len = vec_data[run_tag]
+                        vdata.append(parse_vec_lines(block, vdata_len, use_comma))
+                        if run_tag == b'v':
+                            verts_loc_len += line_count
+                        elif run_tag == b'vn':
+                            verts_nor_len += line_count
                         else:
-                            face_vert_tex_indices.append(0)
+                            verts_tex_len += line_count
+                    continue
 
-                        if len(obj_vert) > 2 and obj_vert[2] and obj_vert[2] != b'0':
-                            idx = int(obj_vert[2])
-                            face_vert_nor_indices.append((idx + verts_nor_len) if (idx < 1) else idx - 1)
-                        else:
-                            face_vert_nor_indices.append(0)
-
-                    if not context_multi_line:
-                        # Means we have finished a face, we have to do final check if ngon is suspected to be blender-invalid...
-                        if face_invalid_blenpoly:
-                            face_invalid_blenpoly.clear()
-                            face_items_usage.clear()
-                            prev_vidx = face_vert_loc_indices[-1]
-                            for vidx in face_vert_loc_indices:
-                                edge_key = (prev_vidx, vidx) if (prev_vidx < vidx) else (vidx, prev_vidx)
-                                if edge_key in face_items_usage:
-                                    face_invalid_blenpoly.append(True)
-                                    break
-                                face_items_usage.add(edge_key)
-                                prev_vidx = vidx
-
-                elif use_edges and (line_start == b'l' or context_multi_line == b'l'):
-                    # very similar to the face load function above with some parts removed
-                    if not context_multi_line:
-                        line_split = line_split[1:]
-                        # Instantiate a face
-                        face = create_face(context_material, context_smooth_group, context_object_key)
-                        face_vert_loc_indices = face[0]
-                        # XXX A bit hackish, we use special 'value' of face_vert_nor_indices (a single True item) to tag this
-                        #     as a polyline, and not a regular face...
-                        face[1][:] = [True]
-                        faces.append(face)
-                        if context_material is None:
-                            use_default_material = True
-                    # Else, use face_vert_loc_indices previously defined and used the obj_face
-
-                    context_multi_line = b'l' if strip_slash(line_split) else b''
-
-                    for v in line_split:
-                        obj_vert = v.split(b'/')
-                        idx = int(obj_vert[0]) - 1
-                        face_vert_loc_indices.append((idx + len(verts_loc) + 1) if (idx < 0) else idx)
-
-                elif line_start == b's':
-                    if use_smooth_groups:
-                        context_smooth_group = line_value(line_split)
-                        if context_smooth_group == b'off':
-                            context_smooth_group = None
-                        elif context_smooth_group:  # is not None
-                            unique_smooth_groups[context_smooth_group] = None
-
-                elif line_start == b'o':
-                    if use_split_objects:
-                        context_object_key = unique_name(objects_names, line_value(line_split))
-                        context_object_obpart = context_object_key
-                        # unique_objects[context_object_key]= None
-
-                elif line_start == b'g':
-                    if use_split_groups:
-                        grppart = line_value(line_split)
-                        context_object_key = (context_object_obpart, grppart) if context_object_obpart else grppart
-                        # print 'context_object_key', context_object_key
-                        # unique_objects[context_object_key]= None
-                    elif use_groups_as_vgroups:
-                        context_vgroup = line_value(line.split())
-                        if context_vgroup and context_vgroup != b'(null)':
-                            vertex_groups.setdefault(context_vgroup, [])
+                for line in block.splitlines():
+                    line_split = line.split()
+
+                    if not line_split:
+                        continue
+
+                    line_start = line_split[0]  # we compare with this a _lot_
+
+                    # Vertex data, faces and polylines may be spread over several lines, gather all their items
+                    # before parsing them like single line ones.
+                    if line_start in multi_line_tags or context_multi_line in multi_line_tags:
+                        if not context_multi_line:
+                            multi_line_split[:] = [line_start]
+                            line_split = line_split[1:]
+                            if line_start in vec_data:
+                                vdata, vdata_len = vec_data[line_start]
+                                multi_line_store = (vdata.append, parse_vec_lines, vdata_len, use_comma)
+                                if line_start == b'v':
+                                    verts_loc_len += 1
+                                elif line_start == b'vn':
+                                    verts_nor_len += 1
+                                else:
+                                    verts_tex_len += 1
+                            elif line_start == b'f' or use_edges:
+                                # Relative indices are resolved with the data defined before the face.
+                                # Polylines are parsed as faces, tagged with FACE_POLYLINE.
+                                if context_material is None:
+                                    use_default_material = True
+                                is_polyline = line_start == b'l'
+                                store = faces_store(context_material, context_smooth_group, context_object_key,
+                                                    None if is_polyline or not use_groups_as_vgroups else context_vgroup,
+                                                    FACE_POLYLINE if is_polyline else 0)
+                                multi_line_store = (store, parse_face_lines,
+                                                    verts_loc_len, verts_tex_len, verts_nor_len)
+                            else:
+                                multi_line_store = None
+
+                        context_multi_line = multi_line_split[0] if strip_slash(line_split) else b''
+                        multi_line_split += line_split
+
+                        if not context_multi_line and multi_line_store is not None:
+                            if multi_line_split[0] == b'l':
+                                # Only keep vertex indices of polylines.
+                                multi_line_split[1:] = [v.split(b'/')[0] for v in multi_line_split[1:]]
+                                multi_line_split[0] = b'f'
+                            store, func, *args = multi_line_store
+                            store(func(b' '.join(multi_line_split) + b'\n', *args))
+
+                    elif line_start == b's':
+                        if use_smooth_groups:
+                            context_smooth_group = line_value(line_split)
+                            if context_smooth_group == b'off':
+                                context_smooth_group = None
+                            elif context_smooth_group:  # is not None
+                                unique_smooth_groups[context_smooth_group] = None
+
+                    elif line_start == b'o':
+                        if use_split_objects:
+                            context_object_key = unique_name(objects_names, line_value(line_split))
+                            context_object_obpart = context_object_key
+                            # unique_objects[context_object_key]= None
+
+                    elif line_start == b'g':
+                        if use_split_groups:
+                            grppart = line_value(line_split)
+                            context_object_key = (context_object_obpart, grppart) if context_object_obpart else grppart
+                            # print 'context_object_key', context_object_key
+                            # unique_objects[context_object_key]= None
+                        elif use_groups_as_vgroups:
+                            context_vgroup = line_value(line.split())
+                            if context_vgroup and context_vgroup != b'(null)':
+                                vertex_groups.setdefault(context_vgroup, [])
+                            else:
+                                context_vgroup = None  # dont assign a vgroup
+
+                    elif line_start == b'usemtl':
+                        context_material = line_value(line.split())
+                        unique_materials[context_material] = None
+                    elif line_start == b'mtllib':  # usemap or usemat
+                        # can have multiple mtllib filenames per line, mtllib can appear more than once,
+                        # so make sure only occurrence of material exists
+                        material_libs |= {os.fsdecode(f) for f in filenames_group_by_ext(line.lstrip()[7:].strip(), b'.mtl')
+                        }
+
+                        # Nurbs support
+                    elif line_start == b'cstype':
+                        context_nurbs[b'cstype'] = line_value(line.split())  # 'rat bspline' / 'bspline'
+                    elif line_start == b'curv' or context_multi_line == b'curv':
+                        curv_idx = context_nurbs[b'curv_idx'] = context_nurbs.get(b'curv_idx', [])  # in case were multiline
+
+                        if not context_multi_line:
+                            context_nurbs[b'curv_range'] = float_func(line_split[1]), float_func(line_split[2])
+                            line_split[0:3] = []  # remove first 3 items
+
+                        if strip_slash(line_split):
+                            context_multi_line = b'curv'
                         else:
-                            context_vgroup = None  # dont assign a vgroup
-
-                elif line_start == b'usemtl':
-                    context_material = line_value(line.split())
-                    unique_materials[context_material] = None
-                elif line_start == b'mtllib':  # usemap or usemat
-                    # can have multiple mtllib filenames per line, mtllib can appear more than once,
-                    # so make sure only occurrence of material exists
-                    material_libs |= {os.fsdecode(f) for f in filenames_group_by_ext(line.lstrip()[7:].strip(), b'.mtl')
-                    }
-
-                    # Nurbs support
-                elif line_start == b'cstype':
-                    context_nurbs[b'cstype'] = line_value(line.split())  # 'rat bspline' / 'bspline'
-                elif line_start == b'curv' or context_multi_line == b'curv':
-                    curv_idx = context_nurbs[b'curv_idx'] = context_nurbs.get(b'curv_idx', [])  # in case were multiline
-
-                    if not context_multi_line:
-                        context_nurbs[b'curv_range'] = float_func(line_split[1]), float_func(line_split[2])
-                        line_split[0:3] = []  # remove first 3 items
-
-                    if strip_slash(line_split):
-                        context_multi_line = b'curv'
-                    else:
-                        context_multi_line = b''
+                            context_multi_line = b''
 
-                    for i in line_split:
-                        vert_loc_index = int(i) - 1
+                        for i in line_split:
+                            vert_loc_index = int(i) - 1
 
-                        if vert_loc_index < 0:
-                            vert_loc_index = len(verts_loc) + vert_loc_index + 1
+                            if vert_loc_index < 0:
+                                vert_loc_index = verts_loc_len + vert_loc_index + 1
 
-                        curv_idx.append(vert_loc_index)
+                            curv_idx.append(vert_loc_index)
 
-                elif line_start == b'parm' or context_multi_line == b'parm':
-                    if context_multi_line:
-                        context_multi_line = b''
-                    else:
-                        context_parm = line_split[1]
-                        line_split[0:2] = []  # remove first 2
+                    elif line_start == b'parm' or context_multi_line == b'parm':
+                        if context_multi_line:
+                            context_multi_line = b''
+                        else:
+                            context_parm = line_split[1]
+                            line_split[0:2] = []  # remove first 2
 
-                    if strip_slash(line_split):
-                        context_multi_line = b'parm'
-                    else:
-                        context_multi_line = b''
-
-                    if context_parm.lower() == b'u':
-                        context_nurbs.setdefault(b'parm_u', []).extend([float_func(f) for f in line_split])
-                    elif context_parm.lower() == b'v':  # surfaces not supported yet
-                        context_nurbs.setdefault(b'parm_v', []).extend([float_func(f) for f in line_split])
-                    # else: # may want to support other parm's ?
-
-                elif line_start == b'deg':
-                    context_nurbs[b'deg'] = [int(i) for i in line.split()[1:]]
-                elif line_start == b'end':
-                    # Add the nurbs curve
-                    if context_object_key:
-                        context_nurbs[b'name'] = context_object_key
-                    nurbs.append(context_nurbs)
-                    context_nurbs = {}
-                    context_parm = b''
-
-                ''' # How to use usemap? deprecated?
-                elif line_start == b'usema': # usemap or usemat
-                    context_image= line_value(line_split)
-                '''
+                        if strip_slash(line_split):
+                            context_multi_line = b'parm'
+                        else:
+                            context_multi_line = b''
+
+                        if context_parm.lower() == b'u':
+                            context_nurbs.setdefault(b'parm_u', []).extend([float_func(f) for f in line_split])
+                        elif context_parm.lower() == b'v':  # surfaces not supported yet
+                            context_nurbs.setdefault(b'parm_v', []).extend([float_func(f) for f in line_split])
+                        # else: # may want to support other parm's ?
+
+                    elif line_start == b'deg':
+                        context_nurbs[b'deg'] = [int(i) for i in line.split()[1:]]
+                    elif line_start == b'end':
+                        # Add the nurbs curve
+                        if context_object_key:
+                            context_nurbs[b'name'] = context_object_key
+                        nurbs.append(context_nurbs)
+                        context_nurbs = {}
+                        context_parm = b''
+
+                    ''' # How to use usemap? deprecated?
+                    elif line_start == b'usema': # usemap or usemat
+                        context_image= line_value(line_split)
+                    '''
+
+        verts_loc = np.concatenate(verts_loc_blocks) if verts_loc_blocks else np.empty((0, 3), dtype=np.float32)
+        verts_nor = np.concatenate(verts_nor_blocks) if verts_nor_blocks else np.empty((0, 3), dtype=np.float32)
+        verts_tex = np.concatenate(verts_tex_blocks) if verts_tex_blocks else np.empty((0, 2), dtype=np.float32)
+        if faces_blocks:
+            faces = ObjFaces(*(np.concatenate(field) for field in zip(*faces_blocks)))
+        else:
+            faces = parse_face_lines(b'', 0, 0, 0)
+        del verts_loc_blocks, verts_nor_blocks, verts_tex_blocks, faces_blocks
 
         progress.step("Done, loading materials and images...")
 
@@ -1243,7 +1363,7 @@ def load(context,
                          use_image_search, float_func)
 
         progress.step("Done, building geometries (verts:%i faces:%i materials: %i smoothgroups:%i) ..." %
-                      (len(verts_loc), len(faces), len(unique_materials), len(unique_smooth_groups)))
+                      (len(verts_loc), len(faces.sizes), len(unique_materials), len(unique_smooth_groups)))
 
         # deselect all
         if bpy.ops.object.select_all.poll():
@@ -1255,16 +1375,17 @@ def load(context,
         # Split the mesh by objects/materials, may
         SPLIT_OB_OR_GROUP = bool(use_split_objects or use_split_groups)
 
-        for data in split_mesh(verts_loc, faces, unique_materials, filepath, SPLIT_OB_OR_GROUP):
+        for data in split_mesh(verts_loc, faces, face_contexts, unique_materials, filepath, SPLIT_OB_OR_GROUP):
             verts_loc_split, faces_split, unique_materials_split, dataname, use_vnor, use_vtex = data
             # Create meshes from the data, warning 'vertex_groups' wont support splitting
             #~ print(dataname, use_vnor, use_vtex)
             create_mesh(new_objects,
                         use_edges,
                         verts_loc_split,
-                        verts_nor if use_vnor else [],
-                        verts_tex if use_vtex else [],
+                        verts_nor if use_vnor else verts_nor[:0],
+                        verts_tex if use_vtex else verts_tex[:0],
                         faces_split,
+                        face_contexts,
                         unique_materials_split,
                         unique_smooth_groups,
                         vertex_groups,
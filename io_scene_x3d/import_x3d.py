@@ -22,10 +22,12 @@ DEBUG = False
 
 # This should work without a blender at all
 import os
-import shlex
+import re
+import warnings
 import math
 from math import sin, cos, pi
-from itertools import chain
+
+import numpy as np
 
 texture_cache = {}
 material_cache = {}
@@ -63,304 +65,144 @@ def imageConvertCompat(path):
 
 # =============================== VRML Spesific
 
-def vrml_split_fields(value):
-    """
-    key 0.0 otherkey 1,2,3 opt1 opt1 0.0
-        -> [key 0.0], [otherkey 1,2,3], [opt1 opt1 0.0]
-    """
-    def iskey(k):
-        if k[0] != '"' and k[0].isalpha() and k.upper() not in {'TRUE', 'FALSE'}:
-            return True
-        return False
-
-    field_list = []
-    field_context = []
-
-    for v in value:
-        if iskey(v):
-            if field_context:
-                field_context_len = len(field_context)
-                if (field_context_len > 2) and (field_context[-2] in {'DEF', 'USE'}):
-                    field_context.append(v)
-                elif (not iskey(field_context[-1])) or ((field_context_len == 3 and field_context[1] == 'IS')):
-                    # this IS a key but the previous value was not a key, ot it was a defined field.
-                    field_list.append(field_context)
-                    field_context = [v]
-                else:
-                    # The last item was not a value, multiple keys are needed in some cases.
-                    field_context.append(v)
-            else:
-                # Is empty, just add this on
-                field_context.append(v)
-        else:
-            # Add a value to the list
-            field_context.append(v)
-
-    if field_context:
-        field_list.append(field_context)
-
-    return field_list
-
-
-def vrmlFormat(data):
-    """
-    Keep this as a valid vrml file, but format in a way we can predict.
-    """
-    # Strip all comments - # not in strings - warning multiline strings are ignored.
-    def strip_comment(l):
-        #l = ' '.join(l.split())
-        l = l.strip()
-
-        if l.startswith('#'):
-            return ''
-
-        i = l.find('#')
-
-        if i == -1:
-            return l
-
-        # Most cases accounted for! if we have a comment at the end of the line do this...
-        #j = l.find('url "')
-        j = l.find('"')
-
-        if j == -1:  # simple no strings
-            return l[:i].strip()
-
-        q = False
-        for i, c in enumerate(l):
-            if c == '"':
-                q = not q  # invert
-
-            elif c == '#':
-                if q is False:
-                    return l[:i - 1]
-
-        return l
-
-    data = '\n'.join([strip_comment(l) for l in data.split('\n')])  # remove all whitespace
-
-    EXTRACT_STRINGS = True  # only needed when strings or filename contains ,[]{} chars :/
-
-    if EXTRACT_STRINGS:
-
-        # We need this so we can detect URL's
-        data = '\n'.join([' '.join(l.split()) for l in data.split('\n')])  # remove all whitespace
-
-        string_ls = []
-
-        #search = 'url "'
-        search = '"'
-
-        ok = True
-        last_i = 0
-        while ok:
-            ok = False
-            i = data.find(search, last_i)
-            if i != -1:
-
-                start = i + len(search)  # first char after end of search
-                end = data.find('"', start)
-                if end != -1:
-                    item = data[start:end]
-                    string_ls.append(item)
-                    data = data[:start] + data[end:]
-                    ok = True  # keep looking
-
-                    last_i = (end - len(item)) + 1
-                    # print(last_i, item, '|' + data[last_i] + '|')
-
-    # done with messy extracting strings part
-
-    # Bad, dont take strings into account
-    '''
-    data = data.replace('#', '\n#')
-    data = '\n'.join([ll for l in data.split('\n') for ll in (l.strip(),) if not ll.startswith('#')]) # remove all whitespace
-    '''
-    data = data.replace('{', '\n{\n')
-    data = data.replace('}', '\n}\n')
-    data = data.replace('[', '\n[\n')
-    data = data.replace(']', '\n]\n')
-    data = data.replace(',', ' , ')  # make sure comma's separate
-
-    # We need to write one property (field) per line only, otherwise we fail later to detect correctly new nodes.
-    # See T45195 for details.
-    data = '\n'.join([' '.join(value) for l in data.split('\n') for value in vrml_split_fields(l.split())])
-
-    if EXTRACT_STRINGS:
-        # add strings back in
-
-        search = '"'  # fill in these empty strings
-
-        ok = True
-        last_i = 0
-        while ok:
-            ok = False
-            i = data.find(search + '"', last_i)
-            # print(i)
-            if i != -1:
-                start = i + len(search)  # first char after end of search
-                item = string_ls.pop(0)
-                # print(item)
-                data = data[:start] + item + data[start:]
-
-                last_i = start + len(item) + 1
-
-                ok = True
-
-    # More annoying obscure cases where USE or DEF are placed on a newline
-    # data = data.replace('\nDEF ', ' DEF ')
-    # data = data.replace('\nUSE ', ' USE ')
-
-    data = '\n'.join([' '.join(l.split()) for l in data.split('\n')])  # remove all whitespace
-
-    # Better to parse the file accounting for multiline arrays
-    '''
-    data = data.replace(',\n', ' , ') # remove line endings with commas
-    data = data.replace(']', '\n]\n') # very very annoying - but some comma's are at the end of the list, must run this again.
-    '''
-
-    return [l for l in data.split('\n') if l]
-
 NODE_NORMAL = 1  # {}
 NODE_ARRAY = 2  # []
 NODE_REFERENCE = 3  # USE foobar
 # NODE_PROTO = 4 #
 
-lines = []
-
-
-def getNodePreText(i, words):
-    # print(lines[i])
-    use_node = False
-    while len(words) < 5:
-
-        if i >= len(lines):
-            break
-            '''
-        elif lines[i].startswith('PROTO'):
-            return NODE_PROTO, i+1
-            '''
-        elif lines[i] == '{':
-            # words.append(lines[i]) # no need
-            # print("OK")
-            return NODE_NORMAL, i + 1
-        elif lines[i].count('"') % 2 != 0:  # odd number of quotes? - part of a string.
-            # print('ISSTRING')
-            break
-        else:
-            new_words = lines[i].split()
-            if 'USE' in new_words:
-                use_node = True
-
-            words.extend(new_words)
-            i += 1
-
-        # Check for USE node - no {
-        # USE #id - should always be on the same line.
-        if use_node:
-            # print('LINE', i, words[:words.index('USE')+2])
-            words[:] = words[:words.index('USE') + 2]
-            if lines[i] == '{' and lines[i + 1] == '}':
-                # USE sometimes has {} after it anyway
-                i += 2
-            return NODE_REFERENCE, i
+# Keywords starting a field declaration of PROTO's and Script's, followed by a type and a name.
+FIELD_DECLARATIONS = {'field', 'exposedField', 'eventIn', 'eventOut',
+                      'initializeOnly', 'inputOutput', 'inputOnly', 'outputOnly'}
 
-    # print("error value!!!", words)
-    return 0, -1
+# Words which are field values rather than field names or node types.
+VALUE_WORDS = {'TRUE', 'FALSE', 'NULL'}
 
+re_vrml_token = re.compile(r'''
+    [\s,]*                          # commas are whitespace in VRML
+    (?:
+        \#[^\n\r]*                  # comment
+        |(?P<token>
+            "(?:[^"\\]|\\.)*"?      # string, may span several lines
+            |[\[\]{}]
+            |[^\s,\[\]{}"\#]+       # words and numbers
+        )
+    )''', re.VERBOSE | re.DOTALL)
 
-def is_nodeline(i, words):
+# Quick scan for the extent of a run of numbers, checked when converting it.
+re_vrml_number_run = re.compile(r'[-+\d.eE\s,]+')
 
-    if not lines[i][0].isalpha():
-        return 0, 0
+re_vrml_numbers = re.compile(r'''
+    (?:
+        [\s,]*
+        [-+]?(?:0[xX][0-9a-fA-F]+|(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)
+        (?![^\s,\[\]{}"\#])         # a number has to end at a separator
+    )+''', re.VERBOSE)
 
-    #if lines[i].startswith('field'):
-    #   return 0, 0
-
-    # Is this a prototype??
-    if lines[i].startswith('PROTO'):
-        words[:] = lines[i].split()
-        return NODE_NORMAL, i + 1  # TODO - assumes the next line is a '[\n', skip that
-    if lines[i].startswith('EXTERNPROTO'):
-        words[:] = lines[i].split()
-        return NODE_ARRAY, i + 1  # TODO - assumes the next line is a '[\n', skip that
-
-    '''
-    proto_type, new_i = is_protoline(i, words, proto_field_defs)
-    if new_i != -1:
-        return proto_type, new_i
-    '''
-
-    # Simple "var [" type
-    if lines[i + 1] == '[':
-        if lines[i].count('"') % 2 == 0:
-            words[:] = lines[i].split()
-            return NODE_ARRAY, i + 2
-
-    node_type, new_i = getNodePreText(i, words)
-
-    if not node_type:
-        if DEBUG:
-            print("not node_type", lines[i])
-        return 0, 0
-
-    # Ok, we have a { after some values
-    # Check the values are not fields
-    for i, val in enumerate(words):
-        if i != 0 and words[i - 1] in {'DEF', 'USE'}:
-            # ignore anything after DEF, it is a ID and can contain any chars.
-            pass
-        elif val[0].isalpha() and val not in {'TRUE', 'FALSE'}:
-            pass
-        else:
-            # There is a number in one of the values, therefor we are not a node.
-            return 0, 0
 
-    #if node_type==NODE_REFERENCE:
-    #   print(words, "REF_!!!!!!!")
-    return node_type, new_i
+def vrml_is_number(token):
+    return token[0] in '0123456789+-.'
 
 
-def is_numline(i):
+def vrml_parse_numbers(text):
     """
-    Does this line start with a number?
+    Convert a run of numbers to a numpy array, of integers if all the values are integers.
     """
+    text = text.replace(',', ' ')
+    if 'x' in text or 'X' in text:
+        # hexadecimal, as used by SFImage pixels
+        return np.array([int(v, 0) for v in text.split()], dtype=np.int64)
+    dtype = np.float64 if ('.' in text or 'e' in text or 'E' in text) else np.int64
+    try:
+        with warnings.catch_warnings():
+            # Older numpy versions only warn about values they could not read
+            warnings.simplefilter('error', DeprecationWarning)
+            return np.fromstring(text, dtype=dtype, sep=' ')
+    except (ValueError, DeprecationWarning):
+        pass
 
-    # Works but too slow.
-    '''
-    l = lines[i]
-    for w in l.split():
-        if w==',':
-            pass
-        else:
-            try:
-                float(w)
-                return True
-
-            except:
-                return False
+    values = []
+    for v in text.split():
+        try:
+            values.append(float(v))
+        except ValueError:
+            print('\tWarning: could not parse the number "%s"' % v)
+    return np.array(values, dtype=dtype)
 
-    return False
-    '''
 
-    l = lines[i]
+class vrmlTokenizer(object):
+    """
+    Single pass tokenizer for VRML data: strings (with their quotes), brackets, and words.
+    Runs of numbers can be read at once with readNumbers().
+    """
+    __slots__ = ('data',
+                 'pos',  # Position after the last token read (or peeked)
+                 'peeked',  # Tokens read ahead, as (token, start) tuples
+                 'lineno',
+                 'lineno_pos')
 
-    line_start = 0
+    def __init__(self, data):
+        self.data = data
+        self.pos = 0
+        self.peeked = []
+        self.lineno = 1
+        self.lineno_pos = 0
 
-    if l.startswith(', '):
-        line_start += 2
+    def __read(self):
+        data = self.data
+        while True:
+            m = re_vrml_token.match(data, self.pos)
+            if m is None or m.end() == self.pos:
+                return None, len(data)
+            self.pos = m.end()
+            token = m.group('token')
+            if token is not None:
+                return token, m.start('token')
+
+    def peek(self, n=0):
+        """
+        Return the token n positions ahead without reading it, None at the end of the data.
+        """
+        peeked = self.peeked
+        while len(peeked) <= n:
+            peeked.append(self.__read())
+        return peeked[n][0]
 
-    line_end = len(l) - 1
-    line_end_new = l.find(' ', line_start)  # comma's always have a space before them
+    def next(self):
+        if self.peeked:
+            return self.peeked.pop(0)[0]
+        return self.__read()[0]
 
-    if line_end_new != -1:
-        line_end = line_end_new
+    def getLineNumber(self):
+        """
+        Line of the next token
+        """
+        self.peek()
+        start = self.peeked[0][1]
+        self.lineno += self.data.count('\n', self.lineno_pos, start)
+        self.lineno_pos = start
+        return self.lineno
 
-    try:
-        float(l[line_start:line_end])  # works for a float or int
-        return True
-    except:
-        return False
+    def readNumbers(self):
+        """
+        Read the run of numbers starting at the next token, return it as a numpy array.
+        """
+        data = self.data
+        self.peek()
+        start = self.peeked[0][1]
+        end = re_vrml_number_run.match(data, start).end()
+        if end < len(data) and data[end] not in '[]{}"#':
+            # The run ends within a word, leave that word out
+            end = max(data.rfind(c, start, end) for c in ' \t\r\n,')
+            if end <= start:
+                # eg: hexadecimal values
+                m = re_vrml_numbers.match(data, start)
+                if m is None:
+                    return None
+                end = m.end()
+
+        self.peeked.clear()
+        self.pos = end
+        return vrml_parse_numbers(data[start:end])
 
 
 class vrmlNode(object):
@@ -829,6 +671,17 @@ class vrmlNode(object):
             # Normal vrml
             array_data = child_array.array_data
 
+            if type(array_data) == np.ndarray:
+                # Flat array of numbers
+                if group > 0:
+                    remaining = len(array_data) % group
+                    if remaining:
+                        print('\twarning, array was not aligned to requested grouping', group,
+                              'remaining value', array_data[-remaining:].tolist())
+                        array_data = array_data[:-remaining]
+                    array_data = array_data.reshape(-1, group)
+                return array_data.tolist()
+
         # print('array_data', array_data)
         if group == -1 or len(array_data) == 0:
             return array_data
@@ -873,6 +726,29 @@ class vrmlNode(object):
 
         return new_array
 
+    def getFieldAsNumpyArray(self, field, group, ancestry, dtype=np.float64):
+        """
+        Same as getFieldAsArray() but as a numpy array, of shape (n, group) when group > 0, flat otherwise.
+        Avoids going through python lists for the large arrays of meshes.
+        """
+        self_real = self.getRealNode()  # in case we're an instance
+
+        child_array = self_real.getFieldName(field, ancestry, True, SPLIT_COMMAS=True)
+        if child_array is not None and type(child_array) != list and type(child_array.array_data) == np.ndarray:
+            array_data = child_array.array_data.astype(dtype, copy=False)
+        else:
+            array_data = np.array(self.getFieldAsArray(field, 0, ancestry), dtype=dtype).ravel()
+
+        if group > 0:
+            remaining = len(array_data) % group
+            if remaining:
+                print('\twarning, array was not aligned to requested grouping', group,
+                      'remaining value', array_data[-remaining:].tolist())
+                array_data = array_data[:len(array_data) - remaining]
+            array_data = array_data.reshape(-1, group)
+
+        return array_data
+
     def getFieldAsStringArray(self, field, ancestry):
         """
         Get a list of strings
@@ -958,8 +834,13 @@ class vrmlNode(object):
 
         return text
 
-    def parse(self, i, IS_PROTO_DATA=False):
-        new_i = self.__parse(i, IS_PROTO_DATA)
+    def parse(self, tokens, words=None):
+        """
+        Parse this node from the tokens, its opening bracket has been read already.
+        words are the ones preceding the bracket (field name, DEF name, node type...),
+        None for anonymous lists.
+        """
+        self.__parse(tokens, words)
 
         # print(self.id, self.getFilename())
 
@@ -1034,22 +915,9 @@ class vrmlNode(object):
                             # Tricky - inline another VRML
                             print('\tLoading Inline:"%s"...' % url)
 
-                            # Watch it! - backup lines
-                            lines_old = lines[:]
-
-                            lines[:] = vrmlFormat(data)
-
-                            lines.insert(0, '{')
-                            lines.insert(0, 'root_node____')
-                            lines.append('}')
-                            '''
-                            ff = open('/tmp/test.txt', 'w')
-                            ff.writelines([l+'\n' for l in lines])
-                            '''
-
                             child = vrmlNode(self, NODE_NORMAL, -1)
                             child.setRoot(url)  # initialized dicts
-                            child.parse(0)
+                            child.parse(vrmlTokenizer(data), ['root_node____'])
 
                             # if self.getExternprotoName():
                             if self.getExternprotoName():
@@ -1072,38 +940,24 @@ class vrmlNode(object):
                                     else:
                                         print("\tEXTERNPROTO ID not found!:", extern_key)
 
-                            # Watch it! - restore lines
-                            lines[:] = lines_old
-
-        return new_i
-
-    def __parse(self, i, IS_PROTO_DATA=False):
-        '''
-        print('parsing at', i, end="")
-        print(i, self.id, self.lineno)
-        '''
-        l = lines[i]
-
-        if l == '[':
+    def __parse(self, tokens, words):
+        if words is None:
             # An anonymous list
             self.id = None
-            i += 1
-        else:
-            words = []
-
-            node_type, new_i = is_nodeline(i, words)
-            if not node_type:  # fail for parsing new node.
-                print("Failed to parse new node")
-                raise ValueError
 
-            if self.node_type == NODE_REFERENCE:
-                # Only assign the reference and quit
-                key = words[words.index('USE') + 1]
-                self.id = (words[0],)
+        elif self.node_type == NODE_REFERENCE:
+            # Only assign the reference and quit
+            key = words[words.index('USE') + 1]
+            self.id = (words[0],)
 
+            try:
                 self.reference = self.getDefDict()[key]
-                return new_i
+            except KeyError:
+                print('\tWarning: USE of an undefined node "%s", line %d' % (key, self.lineno))
+                self.parent.children.remove(self)
+            return
 
+        else:
             self.id = tuple(words)
 
             # fill in DEF/USE
@@ -1120,14 +974,24 @@ class vrmlNode(object):
                 proto_dict[key] = self
 
                 # Parse the proto nodes fields
-                self.proto_node = vrmlNode(self, NODE_ARRAY, new_i)
-                new_i = self.proto_node.parse(new_i)
+                self.__expect(tokens, '[')
+                self.proto_node = vrmlNode(self, NODE_ARRAY, tokens.getLineNumber())
+                self.proto_node.parse(tokens)
 
                 self.children.remove(self.proto_node)
 
                 # print(self.proto_node)
 
-                new_i += 1  # skip past the {
+                if self.node_type == NODE_ARRAY:
+                    # EXTERNPROTO, only its url(s) follow
+                    if tokens.peek() == '[':
+                        tokens.next()
+                        self.__parseBody(tokens)
+                    elif tokens.peek() is not None and tokens.peek()[0] == '"':
+                        self.fields.append([tokens.next()])
+                    return
+
+                self.__expect(tokens, '{')
 
             else:  # If we're a proto instance, add the proto node as our child.
                 spec = self.getSpec()
@@ -1141,111 +1005,146 @@ class vrmlNode(object):
 
             del proto_dict, key
 
-            i = new_i
+        self.__parseBody(tokens)
 
-        # print(self.id)
-        ok = True
-        while ok:
-            if i >= len(lines):
-                return len(lines) - 1
+    def __parseBody(self, tokens):
+        array_data = []
 
-            l = lines[i]
-            # print('\tDEBUG:', i, self.node_type, l)
-            if l == '':
-                i += 1
-                continue
+        while True:
+            tok = tokens.peek()
+            if tok is None:
+                break
 
-            if l == '}':
+            if tok == '}':
+                tokens.next()
                 if self.node_type != NODE_NORMAL:  # also ends proto nodes, we may want a type for these too.
-                    print('wrong node ending, expected an } ' + str(i) + ' ' + str(self.node_type))
+                    print('wrong node ending, expected an } ' + str(tokens.getLineNumber()) + ' ' + str(self.node_type))
                     if DEBUG:
                         raise ValueError
-                ### print("returning", i)
-                return i + 1
-            if l == ']':
+                break
+            if tok == ']':
+                tokens.next()
                 if self.node_type != NODE_ARRAY:
-                    print('wrong node ending, expected a ] ' + str(i) + ' ' + str(self.node_type))
+                    print('wrong node ending, expected a ] ' + str(tokens.getLineNumber()) + ' ' + str(self.node_type))
                     if DEBUG:
                         raise ValueError
-                ### print("returning", i)
-                return i + 1
-
-            node_type, new_i = is_nodeline(i, [])
-            if node_type:  # check text\n{
-                child = vrmlNode(self, node_type, i)
-                i = child.parse(i)
-
-            elif l == '[':  # some files have these anonymous lists
-                child = vrmlNode(self, NODE_ARRAY, i)
-                i = child.parse(i)
-
-            elif is_numline(i):
-                l_split = l.split(',')
+                break
 
-                values = None
-                # See if each item is a float?
+            if vrml_is_number(tok):
+                values = tokens.readNumbers()
+                if values is None:
+                    print('\tWarning: could not parse the number "%s", line %d' % (tok, tokens.getLineNumber()))
+                    tokens.next()
+                else:
+                    array_data.append(values)
 
-                for num_type in (int, float):
-                    try:
-                        values = [num_type(v) for v in l_split]
-                        break
-                    except:
-                        pass
+            elif tok[0] == '"' or tok in VALUE_WORDS:
+                # eg: the strings of: url ["a.png" "b.png"]
+                self.fields.append([tokens.next()])
 
-                    try:
-                        values = [[num_type(v) for v in segment.split()] for segment in l_split]
-                        break
-                    except:
-                        pass
+            elif tok == '[':  # some files have these anonymous lists
+                child = vrmlNode(self, NODE_ARRAY, tokens.getLineNumber())
+                tokens.next()
+                child.parse(tokens)
 
-                if values is None:  # dont parse
-                    values = l_split
+            elif tok == '{':
+                child = vrmlNode(self, NODE_NORMAL, tokens.getLineNumber())
+                tokens.next()
+                child.parse(tokens, [])
 
-                # This should not extend over multiple lines however it is possible
-                # print(self.array_data)
-                if values:
-                    self.array_data.extend(values)
-                i += 1
             else:
-                words = l.split()
-                if len(words) > 2 and words[1] == 'USE':
-                    vrmlNode(self, NODE_REFERENCE, i)
-                else:
-
-                    # print("FIELD", i, l)
-                    #
-                    #words = l.split()
-                    ### print('\t\ttag', i)
-                    # this is a tag/
-                    # print(words, i, l)
-                    value = l
-                    # print(i)
-                    # javastrips can exist as values.
-                    quote_count = l.count('"')
-                    if quote_count % 2:  # odd number?
-                        # print('MULTILINE')
-                        while 1:
-                            i += 1
-                            l = lines[i]
-                            quote_count = l.count('"')
-                            if quote_count % 2:  # odd number?
-                                value += '\n' + l[:l.rfind('"')]
-                                break  # assume
-                            else:
-                                value += '\n' + l
+                self.__parseStatement(tokens)
 
-                    # use shlex so we get '"a b" "b v"' --> '"a b"', '"b v"'
-                    value_all = shlex.split(value, posix=False)
+        # This is read in chunks, one for each run of numbers
+        if len(array_data) == 1:
+            self.array_data = array_data[0]
+        elif array_data:
+            self.array_data = np.concatenate(array_data)
 
-                    for value in vrml_split_fields(value_all):
-                        # Split
-
-                        if value[0] == 'field':
-                            # field SFFloat creaseAngle 4
-                            self.proto_field_defs.append(value)
-                        else:
-                            self.fields.append(value)
-                i += 1
+    def __parseStatement(self, tokens):
+        """
+        Parse a node, reference, route or field, starting at a word.
+        """
+        lineno = tokens.getLineNumber()
+        tok = tokens.next()
+
+        if tok in {'PROTO', 'EXTERNPROTO'}:
+            child = vrmlNode(self, NODE_NORMAL if tok == 'PROTO' else NODE_ARRAY, lineno)
+            child.parse(tokens, [tok, tokens.next()])
+        elif tok == 'ROUTE':
+            # ROUTE from_node.eventOut TO to_node.eventIn
+            self.fields.append([tok, tokens.next(), tokens.next(), tokens.next()])
+        elif tok == 'USE':
+            self.__parseReference(tokens, ['USE', tokens.next()], lineno)
+        elif tok == 'DEF':
+            self.__parseNode(tokens, ['DEF', tokens.next(), tokens.next()], lineno)
+        elif tokens.peek() == '{':
+            self.__parseNode(tokens, [tok], lineno)
+        else:
+            words = [tok]
+            if tok in FIELD_DECLARATIONS:
+                # field SFColor seatColor .6 .6 .1
+                words.append(tokens.next())
+                words.append(tokens.next())
+            self.__parseField(tokens, words, lineno)
+
+    def __parseField(self, tokens, words, lineno):
+        """
+        Parse the value of a field, either a child node or values.
+        """
+        tok = tokens.peek()
+
+        if tok == '[':
+            tokens.next()
+            child = vrmlNode(self, NODE_ARRAY, lineno)
+            child.parse(tokens, words)
+        elif tok == '{':
+            self.__parseNode(tokens, words, lineno)
+        elif tok == 'IS':
+            # eg: 'diffuseColor IS legColor'
+            words.append(tokens.next())
+            words.append(tokens.next())
+            self.fields.append(words)
+        elif tok == 'USE':
+            tokens.next()
+            self.__parseReference(tokens, words + ['USE', tokens.next()], lineno)
+        elif tok == 'DEF':
+            tokens.next()
+            self.__parseNode(tokens, words + ['DEF', tokens.next(), tokens.next()], lineno)
+        elif (tok is not None and tok[0].isalpha() and tok not in VALUE_WORDS and
+              tokens.peek(1) == '{'):
+            # eg: 'geometry Box {'
+            self.__parseNode(tokens, words + [tokens.next()], lineno)
+        else:
+            # The values, numbers strings or booleans
+            while tok is not None and (vrml_is_number(tok) or tok[0] == '"' or tok in VALUE_WORDS):
+                words.append(tokens.next())
+                tok = tokens.peek()
+
+            if words[0] == 'field':
+                # field SFFloat creaseAngle 4
+                self.proto_field_defs.append(words)
+            else:
+                self.fields.append(words)
+
+    def __parseNode(self, tokens, words, lineno):
+        self.__expect(tokens, '{')
+        child = vrmlNode(self, NODE_NORMAL, lineno)
+        child.parse(tokens, words)
+
+    def __parseReference(self, tokens, words, lineno):
+        if tokens.peek() == '{' and tokens.peek(1) == '}':
+            # USE sometimes has {} after it anyway
+            tokens.next()
+            tokens.next()
+        child = vrmlNode(self, NODE_REFERENCE, lineno)
+        child.parse(tokens, words)
+
+    @staticmethod
+    def __expect(tokens, token):
+        tok = tokens.next()
+        if tok != token:
+            print('\tWarning: expected "%s" at line %d, found "%s"' % (token, tokens.getLineNumber(), tok))
 
     # This is a prerequisite for DEF/USE-based material caching
     def canHaveReferences(self):
@@ -1267,7 +1166,7 @@ def gzipOpen(path):
 
     if data is None:
         try:
-            filehandle = open(path, 'rU', encoding='utf-8', errors='surrogateescape')
+            filehandle = open(path, 'r', encoding='utf-8', errors='surrogateescape')
             data = filehandle.read()
             filehandle.close()
         except:
@@ -1289,35 +1188,14 @@ def vrml_parse(path):
     if data is None:
         return None, 'Failed to open file: ' + path
 
-    # Stripped above
-    lines[:] = vrmlFormat(data)
-
-    lines.insert(0, '{')
-    lines.insert(0, 'dymmy_node')
-    lines.append('}')
-    # Use for testing our parsed output, so we can check on line numbers.
-
-    '''
-    ff = open('/tmp/test.txt', 'w')
-    ff.writelines([l+'\n' for l in lines])
-    ff.close()
-    '''
-
-    # Now evaluate it
-    node_type, new_i = is_nodeline(0, [])
-    if not node_type:
-        return None, 'Error: VRML file has no starting Node'
-
-    # Trick to make sure we get all root nodes.
-    lines.insert(0, '{')
-    lines.insert(0, 'root_node____')  # important the name starts with an ascii char
-    lines.append('}')
-
     root = vrmlNode(None, NODE_NORMAL, -1)
     root.setRoot(path)  # we need to set the root so we have a namespace and know the path in case of inlineing
 
-    # Parse recursively
-    root.parse(0)
+    # Parse recursively, the root node gets all the nodes of the file as its children
+    root.parse(vrmlTokenizer(data), ['root_node____'])  # important the name starts with an ascii char
+
+    if not root.children:
+        return None, 'Error: VRML file has no starting Node'
 
     # This prints a load of text
     if DEBUG:
@@ -1610,23 +1488,24 @@ def importMesh_ApplyColors(bpymesh, geom, ancestry):
     colors = geom.getChildBySpec(['ColorRGBA', 'Color'])
     if colors:
         if colors.getSpec() == 'ColorRGBA':
-            rgb = colors.getFieldAsArray('color', 4, ancestry)
+            rgb = colors.getFieldAsNumpyArray('color', 4, ancestry)
         else:
-            # Array of arrays; no need to flatten
-            rgb = [c + [1.0] for c in colors.getFieldAsArray('color', 3, ancestry)]
+            rgb = colors.getFieldAsNumpyArray('color', 3, ancestry)
+            rgb = np.hstack((rgb, np.ones((len(rgb), 1))))
         lcol_layer = bpymesh.vertex_colors.new()
 
         if len(rgb) == len(bpymesh.vertices):
-            rgb = [rgb[l.vertex_index] for l in bpymesh.loops]
-            rgb = tuple(chain(*rgb))
+            vertex_index = np.empty(len(bpymesh.loops), dtype=np.int32)
+            bpymesh.loops.foreach_get("vertex_index", vertex_index)
+            rgb = rgb[vertex_index]
         elif len(rgb) == len(bpymesh.loops):
-            rgb = tuple(chain(*rgb))
+            pass
         else:
             printf("WARNING not applying vertex colors, non matching numbers of vertices or loops (%d vs %d/%d)"
                    "" % (len(rgb), len(bpymesh.vertices), len(bpymesh.loops)))
             return
 
-        lcol_layer.data.foreach_set("color", rgb)
+        lcol_layer.data.foreach_set("color", rgb.astype(np.float32).ravel())
 
 
 # Assumes that the vertices have not been rearranged compared to the
@@ -1639,7 +1518,7 @@ def importMesh_ApplyNormals(bpymesh, geom, ancestry):
         return
 
     per_vertex = geom.getFieldAsBool('normalPerVertex', True, ancestry)
-    vectors = normals.getFieldAsArray('vector', 0, ancestry)
+    vectors = normals.getFieldAsNumpyArray('vector', 0, ancestry, dtype=np.float32)
     if per_vertex:
         bpymesh.vertices.foreach_set("normal", vectors)
     else:
@@ -1659,7 +1538,7 @@ def importMesh_ReadVertices(bpymesh, geom, ancestry):
     # IndexedFaceSet presumes a 2D one.
     # The case for caching is stronger over there.
     coord = geom.getChildBySpec('Coordinate')
-    points = coord.getFieldAsArray('point', 0, ancestry)
+    points = coord.getFieldAsNumpyArray('point', 0, ancestry, dtype=np.float32)
     bpymesh.vertices.add(len(points) // 3)
     bpymesh.vertices.foreach_set("co", points)
 
@@ -1675,15 +1554,15 @@ def importMesh_ApplyUVs(bpymesh, geom, ancestry):
     if not tex_coord:
         return
 
-    uvs = tex_coord.getFieldAsArray('point', 2, ancestry)
-    if not uvs:
+    uvs = tex_coord.getFieldAsNumpyArray('point', 2, ancestry, dtype=np.float32)
+    if not len(uvs):
         return
 
     d = bpymesh.uv_layers.new().data
-    uvs = [i for poly in bpymesh.polygons
-            for vidx in poly.vertices
-            for i in uvs[vidx]]
-    d.foreach_set('uv', uvs)
+    # The loops of the polygons are in order, so this follows the loops
+    vertex_index = np.empty(len(bpymesh.loops), dtype=np.int32)
+    bpymesh.loops.foreach_get("vertex_index", vertex_index)
+    d.foreach_set('uv', uvs[vertex_index].ravel())
 
 
 # Common steps for all triangle meshes once the geometry has been set:
@@ -1721,16 +1600,16 @@ def importMesh_IndexedTriangleSet(geom, ancestry):
     importMesh_ReadVertices(bpymesh, geom, ancestry)
 
     # Read the faces
-    index = geom.getFieldAsArray('index', 0, ancestry)
-    num_polys = len(index) // 3
+    index = geom.getFieldAsNumpyArray('index', 3, ancestry, dtype=np.int32)
+    num_polys = len(index)
     if not ccw:
-        index = [index[3 * i + j] for i in range(num_polys) for j in (1, 0, 2)]
+        index = index[:, (1, 0, 2)]
 
     bpymesh.loops.add(num_polys * 3)
     bpymesh.polygons.add(num_polys)
-    bpymesh.polygons.foreach_set("loop_start", range(0, num_polys * 3, 3))
-    bpymesh.polygons.foreach_set("loop_total", (3,) * num_polys)
-    bpymesh.polygons.foreach_set("vertices", index)
+    bpymesh.polygons.foreach_set("loop_start", np.arange(0, num_polys * 3, 3, dtype=np.int32))
+    bpymesh.polygons.foreach_set("loop_total", np.full(num_polys, 3, dtype=np.int32))
+    bpymesh.polygons.foreach_set("vertices", index.ravel())
 
     return importMesh_FinalizeTriangleMesh(bpymesh, geom, ancestry)
 
@@ -1898,158 +1777,119 @@ def importMesh_IndexedFaceSet(geom, ancestry):
         # TODO: resolve that somehow, so that vertex set can be effectively
         # reused between different mesh types?
     else:
-        points = coord.getFieldAsArray('point', 3, ancestry)
+        points = coord.getFieldAsNumpyArray('point', 3, ancestry)
         if coord.canHaveReferences():
             coord.parsed = points
-    index = geom.getFieldAsArray('coordIndex', 0, ancestry)
-
-    while index and index[-1] == -1:
-        del index[-1]
-
-    if len(points) >= 2 * len(index):  # Need to cull
-        culled_points = []
-        cull = {}  # Maps old vertex indices to new ones
-        uncull = []  # Maps new indices to the old ones
-        new_index = 0
+    index = geom.getFieldAsNumpyArray('coordIndex', 0, ancestry, dtype=np.int64)
+
+    # Positions in the index of the face corners, faces are separated by -1's.
+    # Empty faces are skipped, faces are numbered in the order they appear.
+    is_separator = index == -1
+    corners = np.flatnonzero(~is_separator)
+    face_of_corner = np.cumsum(is_separator)[corners]
+    loop_start = np.flatnonzero(np.diff(face_of_corner, prepend=-1))
+    loop_total = np.diff(loop_start, append=len(corners))
+    num_faces = len(loop_start)
+    loop_face = np.repeat(np.arange(num_faces), loop_total)
+
+    # Index position of each loop, faces might need to be flipped
+    if ccw:
+        loop_pos = corners
     else:
-        uncull = cull = None
-
-    faces = []
-    face = []
-    # Generate faces. Cull the vertices if necessary,
-    for i in index:
-        if i == -1:
-            if face:
-                faces.append(flip(face, ccw))
-            face = []
-        else:
-            if cull is not None:
-                if not(i in cull):
-                    culled_points.append(points[i])
-                    cull[i] = new_index
-                    uncull.append(i)
-                    i = new_index
-                    new_index += 1
-                else:
-                    i = cull[i]
-            face.append(i)
-    if face:
-        faces.append(flip(face, ccw))  # The last face
-
-    if cull:
-        points = culled_points
+        loop_offset = np.arange(len(corners)) - loop_start[loop_face]
+        loop_pos = corners[loop_start[loop_face] + loop_total[loop_face] - 1 - loop_offset]
+
+    loop_vertex = index[loop_pos]
+
+    if len(points) >= 2 * len(index) and len(loop_vertex):  # Need to cull
+        # Keep the used vertices, in the order they first appear in
+        used, first, inverse = np.unique(loop_vertex, return_index=True, return_inverse=True)
+        order = np.argsort(first)
+        new_index = np.empty(len(order), dtype=np.int64)
+        new_index[order] = np.arange(len(order))
+        points = points[used[order]]
+        loop_vertex_culled = new_index[inverse.ravel()]
+    else:
+        loop_vertex_culled = loop_vertex
 
     bpymesh = bpy.data.meshes.new(name="IndexedFaceSet")
-    bpymesh.from_pydata(points, [], faces)
+    bpymesh.vertices.add(len(points))
+    bpymesh.vertices.foreach_set("co", points.astype(np.float32).ravel())
+    bpymesh.loops.add(len(loop_vertex_culled))
+    bpymesh.loops.foreach_set("vertex_index", loop_vertex_culled.astype(np.int32))
+    bpymesh.polygons.add(num_faces)
+    bpymesh.polygons.foreach_set("loop_start", loop_start.astype(np.int32))
+    bpymesh.polygons.foreach_set("loop_total", loop_total.astype(np.int32))
+    bpymesh.update(calc_edges=True)
     # No validation here. It throws off the per-face stuff.
 
     # Similar treatment for normal and color indices
 
     def processPerVertexIndex(ind):
-        if ind:
-            # Deflatten into an array of arrays by face; the latter might
-            # need to be flipped
-            i = 0
-            verts_by_face = []
-            for f in faces:
-                verts_by_face.append(flip(ind[i:i + len(f)], ccw))
-                i += len(f) + 1
-            return verts_by_face
-        elif uncull:
-            return [[uncull[v] for v in f] for f in faces]
+        """
+        Per loop indices, from an index with the same layout as coordIndex
+        """
+        if len(ind) and len(ind) > corners.max(initial=-1):
+            return ind[loop_pos]
         else:
-            return faces  # Reuse coordIndex, as per the spec
+            return loop_vertex  # Reuse coordIndex, as per the spec
 
     # Normals
     normals = geom.getChildBySpec('Normal')
     if normals:
         per_vertex = geom.getFieldAsBool('normalPerVertex', True, ancestry)
-        vectors = normals.getFieldAsArray('vector', 3, ancestry)
-        normal_index = geom.getFieldAsArray('normalIndex', 0, ancestry)
+        vectors = normals.getFieldAsNumpyArray('vector', 3, ancestry)
+        normal_index = geom.getFieldAsNumpyArray('normalIndex', 0, ancestry, dtype=np.int64)
         if per_vertex:
-            co = [co for f in processPerVertexIndex(normal_index)
-                     for v in f
-                     for co in vectors[v]]
-            bpymesh.vertices.foreach_set("normal", co)
+            co = np.zeros((len(points), 3))
+            co[loop_vertex_culled] = vectors[processPerVertexIndex(normal_index)]
+            bpymesh.vertices.foreach_set("normal", co.astype(np.float32).ravel())
         else:
-            co = [co for (i, f) in enumerate(faces)
-                     for j in f
-                     for co in vectors[normal_index[i] if normal_index else i]]
-            bpymesh.polygons.foreach_set("normal", co)
+            co = vectors[normal_index[:num_faces] if len(normal_index) else np.arange(num_faces)]
+            bpymesh.polygons.foreach_set("normal", co.astype(np.float32).ravel())
 
     # Apply vertex/face colors
     colors = geom.getChildBySpec(['ColorRGBA', 'Color'])
     if colors:
         if colors.getSpec() == 'ColorRGBA':
-            rgb = colors.getFieldAsArray('color', 4, ancestry)
+            rgb = colors.getFieldAsNumpyArray('color', 4, ancestry)
         else:
-            # Array of arrays; no need to flatten
-            rgb = [c + [1.0] for c in colors.getFieldAsArray('color', 3, ancestry)]
+            rgb = colors.getFieldAsNumpyArray('color', 3, ancestry)
+            rgb = np.hstack((rgb, np.ones((len(rgb), 1))))
 
         color_per_vertex = geom.getFieldAsBool('colorPerVertex', True, ancestry)
-        color_index = geom.getFieldAsArray('colorIndex', 0, ancestry)
+        color_index = geom.getFieldAsNumpyArray('colorIndex', 0, ancestry, dtype=np.int64)
 
         d = bpymesh.vertex_colors.new().data
         if color_per_vertex:
-            cco = [cco for f in processPerVertexIndex(color_index)
-                       for v in f
-                       for cco in rgb[v]]
-        elif color_index:  # Color per face with index
-            cco = [cco for (i, f) in enumerate(faces)
-                       for j in f
-                       for cco in rgb[color_index[i]]]
+            cco = rgb[processPerVertexIndex(color_index)]
+        elif len(color_index):  # Color per face with index
+            cco = rgb[color_index[loop_face]]
         else:  # Color per face without index
-            cco = [cco for (i, f) in enumerate(faces)
-                       for j in f
-                       for cco in rgb[i]]
-        d.foreach_set('color', cco)
+            cco = rgb[loop_face]
+        d.foreach_set('color', cco.astype(np.float32).ravel())
 
     # Texture coordinates (UVs)
     tex_coord = geom.getChildBySpec('TextureCoordinate')
     if tex_coord:
-        tex_coord_points = tex_coord.getFieldAsArray('point', 2, ancestry)
-        tex_index = geom.getFieldAsArray('texCoordIndex', 0, ancestry)
-        tex_index = processPerVertexIndex(tex_index)
-        loops = [co for f in tex_index
-                    for v in f
-                    for co in tex_coord_points[v]]
-    else:
-        x_min = x_max = y_min = y_max = z_min = z_max = None
-        for f in faces:
-            # Unused vertices don't participate in size; X3DOM does so
-            for v in f:
-                (x, y, z) = points[v]
-                if x_min is None or x < x_min:
-                    x_min = x
-                if x_max is None or x > x_max:
-                    x_max = x
-                if y_min is None or y < y_min:
-                    y_min = y
-                if y_max is None or y > y_max:
-                    y_max = y
-                if z_min is None or z < z_min:
-                    z_min = z
-                if z_max is None or z > z_max:
-                    z_max = z
-
-        mins = (x_min, y_min, z_min)
-        deltas = (x_max - x_min, y_max - y_min, z_max - z_min)
+        tex_coord_points = tex_coord.getFieldAsNumpyArray('point', 2, ancestry)
+        tex_index = geom.getFieldAsNumpyArray('texCoordIndex', 0, ancestry, dtype=np.int64)
+        loops = tex_coord_points[processPerVertexIndex(tex_index)]
+    elif len(loop_vertex_culled):
+        # Unused vertices don't participate in size; X3DOM does so
+        used_points = points[loop_vertex_culled]
+        mins = used_points.min(axis=0)
+        deltas = used_points.max(axis=0) - mins
         axes = [0, 1, 2]
         axes.sort(key=lambda a: (-deltas[a], a))
         # Tuple comparison breaks ties
         (s_axis, t_axis) = axes[0:2]
-        s_min = mins[s_axis]
-        ds = deltas[s_axis]
-        t_min = mins[t_axis]
-        dt = deltas[t_axis]
 
-        def generatePointCoords(pt):
-            return (pt[s_axis] - s_min) / ds, (pt[t_axis] - t_min) / dt
-        loops = [co for f in faces
-                    for v in f
-                    for co in generatePointCoords(points[v])]
+        loops = (used_points[:, (s_axis, t_axis)] - mins[[s_axis, t_axis]]) / deltas[[s_axis, t_axis]]
+    else:
+        loops = np.empty((0, 2))
 
-    importMesh_ApplyTextureToLoops(bpymesh, loops)
+    importMesh_ApplyTextureToLoops(bpymesh, loops.astype(np.float32).ravel())
 
     bpymesh.validate()
     bpymesh.update()